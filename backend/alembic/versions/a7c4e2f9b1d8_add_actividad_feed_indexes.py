@@ -0,0 +1,31 @@
+"""add dashboard activity feed indexes
+
+Revision ID: a7c4e2f9b1d8
+Revises: f1b7d2e9a4c3
+Create Date: 2026-10-16 23:02:41.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e2f9b1d8'
+down_revision: Union[str, Sequence[str], None] = 'f1b7d2e9a4c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_creditos_fecha_desembolso_id', 'creditos', ['fecha_desembolso', 'id'], unique=False)
+    op.create_index('ix_movimientos_ahorro_fecha_id', 'movimientos_ahorro', ['fecha_movimiento', 'id'], unique=False)
+    op.create_index('ix_asociados_created_at_id', 'asociados', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_asociados_created_at_id', table_name='asociados')
+    op.drop_index('ix_movimientos_ahorro_fecha_id', table_name='movimientos_ahorro')
+    op.drop_index('ix_creditos_fecha_desembolso_id', table_name='creditos')
@@ -0,0 +1,89 @@
+"""add estadisticas_mensuales table
+
+Revision ID: b8d3f5a2c6e1
+Revises: a7c4e2f9b1d8
+Create Date: 2026-10-17 00:14:52.260317
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d3f5a2c6e1'
+down_revision: Union[str, Sequence[str], None] = 'a7c4e2f9b1d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    estadisticas = op.create_table('estadisticas_mensuales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('anio', sa.Integer(), nullable=False),
+    sa.Column('mes', sa.Integer(), nullable=False),
+    sa.Column('metrica', sa.String(length=30), nullable=False),
+    sa.Column('cantidad', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('anio', 'mes', 'metrica', name='uq_estadisticas_mensuales_periodo_metrica')
+    )
+    op.create_index(op.f('ix_estadisticas_mensuales_id'), 'estadisticas_mensuales', ['id'], unique=False)
+
+    # Poblar las estadísticas con el histórico existente
+    movimientos = sa.table(
+        'movimientos_ahorro',
+        sa.column('tipo_movimiento', sa.String),
+        sa.column('valor', sa.Numeric(15, 2)),
+        sa.column('fecha_movimiento', sa.DateTime),
+    )
+    creditos = sa.table(
+        'creditos',
+        sa.column('monto_aprobado', sa.Numeric(15, 2)),
+        sa.column('fecha_desembolso', sa.Date),
+    )
+    asociados = sa.table(
+        'asociados',
+        sa.column('fecha_ingreso', sa.Date),
+    )
+
+    def agrupar(metrica, columna_fecha, columna_total, filtro):
+        anio = sa.extract('year', columna_fecha)
+        mes = sa.extract('month', columna_fecha)
+        consulta = sa.select(
+            anio.label('anio'),
+            mes.label('mes'),
+            sa.func.count().label('cantidad'),
+            sa.func.coalesce(sa.func.sum(columna_total), 0).label('total'),
+        ).where(filtro).group_by(anio, mes)
+        return [
+            {
+                'anio': int(fila.anio),
+                'mes': int(fila.mes),
+                'metrica': metrica,
+                'cantidad': fila.cantidad,
+                'total': fila.total,
+                'updated_at': datetime.utcnow(),
+            }
+            for fila in op.get_bind().execute(consulta).fetchall()
+        ]
+
+    filas = (
+        agrupar('consignaciones', movimientos.c.fecha_movimiento, movimientos.c.valor,
+                movimientos.c.tipo_movimiento == 'consignacion')
+        + agrupar('desembolsos', creditos.c.fecha_desembolso, creditos.c.monto_aprobado,
+                  creditos.c.fecha_desembolso.isnot(None))
+        + agrupar('asociados_nuevos', asociados.c.fecha_ingreso, sa.literal(0), sa.true())
+    )
+    if filas:
+        op.bulk_insert(estadisticas, filas)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_estadisticas_mensuales_id'), table_name='estadisticas_mensuales')
+    op.drop_table('estadisticas_mensuales')
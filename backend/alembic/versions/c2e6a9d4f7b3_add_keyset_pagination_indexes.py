@@ -0,0 +1,47 @@
+"""add keyset pagination indexes
+
+Revision ID: c2e6a9d4f7b3
+Revises: b8d3f5a2c6e1
+Create Date: 2026-10-17 01:37:09.482615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e6a9d4f7b3'
+down_revision: Union[str, Sequence[str], None] = 'b8d3f5a2c6e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICES = [
+    ('ix_asociados_fecha_ingreso_id', 'asociados', ['fecha_ingreso', 'id']),
+    ('ix_creditos_fecha_solicitud_id', 'creditos', ['fecha_solicitud', 'id']),
+    ('ix_cuentas_ahorro_fecha_apertura_id', 'cuentas_ahorro', ['fecha_apertura', 'id']),
+    ('ix_documentos_fecha_subida_id', 'documentos', ['fecha_subida', 'id']),
+    ('ix_registros_auditoria_fecha_hora_id', 'registros_auditoria', ['fecha_hora', 'id']),
+]
+
+
+def _tablas_existentes() -> set:
+    # registros_auditoria no tiene migración propia: la crea create_all
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tablas = _tablas_existentes()
+    for nombre, tabla, columnas in INDICES:
+        if tabla in tablas:
+            op.create_index(nombre, tabla, columnas, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    tablas = _tablas_existentes()
+    for nombre, tabla, _ in reversed(INDICES):
+        if tabla in tablas:
+            op.drop_index(nombre, table_name=tabla)
@@ -0,0 +1,89 @@
+"""add saldos_mensuales table
+
+Revision ID: c3a9e1f4d2b7
+Revises: bea13a3fdb87
+Create Date: 2026-10-16 09:12:41.503112
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9e1f4d2b7'
+down_revision: Union[str, Sequence[str], None] = 'bea13a3fdb87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    saldos = op.create_table('saldos_mensuales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cuenta_id', sa.Integer(), nullable=False),
+    sa.Column('anio', sa.Integer(), nullable=False),
+    sa.Column('mes', sa.Integer(), nullable=False),
+    sa.Column('total_debito', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('total_credito', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['cuenta_id'], ['cuentas_contables.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cuenta_id', 'anio', 'mes', name='uq_saldos_mensuales_cuenta_periodo')
+    )
+    op.create_index(op.f('ix_saldos_mensuales_id'), 'saldos_mensuales', ['id'], unique=False)
+    op.create_index(op.f('ix_saldos_mensuales_cuenta_id'), 'saldos_mensuales', ['cuenta_id'], unique=False)
+    op.create_index(op.f('ix_saldos_mensuales_anio'), 'saldos_mensuales', ['anio'], unique=False)
+
+    # Poblar los saldos con el histórico existente
+    movimientos = sa.table(
+        'movimientos_contables',
+        sa.column('asiento_id', sa.Integer),
+        sa.column('cuenta_id', sa.Integer),
+        sa.column('debito', sa.Numeric(15, 2)),
+        sa.column('credito', sa.Numeric(15, 2)),
+    )
+    asientos = sa.table(
+        'asientos_contables',
+        sa.column('id', sa.Integer),
+        sa.column('fecha', sa.Date),
+        sa.column('anulado', sa.Boolean),
+    )
+    anio = sa.extract('year', asientos.c.fecha)
+    mes = sa.extract('month', asientos.c.fecha)
+    consulta = sa.select(
+        movimientos.c.cuenta_id,
+        anio.label('anio'),
+        mes.label('mes'),
+        sa.func.coalesce(sa.func.sum(movimientos.c.debito), 0).label('total_debito'),
+        sa.func.coalesce(sa.func.sum(movimientos.c.credito), 0).label('total_credito'),
+    ).select_from(
+        movimientos.join(asientos, movimientos.c.asiento_id == asientos.c.id)
+    ).where(
+        asientos.c.anulado == sa.false()
+    ).group_by(movimientos.c.cuenta_id, anio, mes)
+
+    filas = op.get_bind().execute(consulta).fetchall()
+    if filas:
+        ahora = datetime.utcnow()
+        op.bulk_insert(saldos, [
+            {
+                'cuenta_id': fila.cuenta_id,
+                'anio': int(fila.anio),
+                'mes': int(fila.mes),
+                'total_debito': fila.total_debito,
+                'total_credito': fila.total_credito,
+                'updated_at': ahora,
+            }
+            for fila in filas
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_saldos_mensuales_anio'), table_name='saldos_mensuales')
+    op.drop_index(op.f('ix_saldos_mensuales_cuenta_id'), table_name='saldos_mensuales')
+    op.drop_index(op.f('ix_saldos_mensuales_id'), table_name='saldos_mensuales')
+    op.drop_table('saldos_mensuales')
@@ -0,0 +1,115 @@
+"""add asociados search index
+
+Revision ID: d4a8b1e6c3f9
+Revises: c2e6a9d4f7b3
+Create Date: 2026-10-17 02:21:40.118305
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8b1e6c3f9'
+down_revision: Union[str, Sequence[str], None] = 'c2e6a9d4f7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNAS_FTS = 'nombre_busqueda, numero_documento, correo_electronico'
+
+SQLITE_UPGRADE = [
+    f"""
+    CREATE VIRTUAL TABLE asociados_fts USING fts5(
+        {COLUMNAS_FTS},
+        content='asociados', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER asociados_fts_ai AFTER INSERT ON asociados BEGIN
+        INSERT INTO asociados_fts(rowid, {COLUMNAS_FTS})
+        VALUES (new.id, new.nombre_busqueda, new.numero_documento, new.correo_electronico);
+    END
+    """,
+    f"""
+    CREATE TRIGGER asociados_fts_ad AFTER DELETE ON asociados BEGIN
+        INSERT INTO asociados_fts(asociados_fts, rowid, {COLUMNAS_FTS})
+        VALUES ('delete', old.id, old.nombre_busqueda, old.numero_documento, old.correo_electronico);
+    END
+    """,
+    f"""
+    CREATE TRIGGER asociados_fts_au
+    AFTER UPDATE OF {COLUMNAS_FTS} ON asociados BEGIN
+        INSERT INTO asociados_fts(asociados_fts, rowid, {COLUMNAS_FTS})
+        VALUES ('delete', old.id, old.nombre_busqueda, old.numero_documento, old.correo_electronico);
+        INSERT INTO asociados_fts(rowid, {COLUMNAS_FTS})
+        VALUES (new.id, new.nombre_busqueda, new.numero_documento, new.correo_electronico);
+    END
+    """,
+    "INSERT INTO asociados_fts(asociados_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS asociados_fts_au",
+    "DROP TRIGGER IF EXISTS asociados_fts_ad",
+    "DROP TRIGGER IF EXISTS asociados_fts_ai",
+    "DROP TABLE IF EXISTS asociados_fts",
+]
+
+
+def _normalizar(texto):
+    # Copia de app.core.texto.normalizar_texto a la fecha de esta migración
+    descompuesto = unicodedata.normalize('NFKD', (texto or '').lower())
+    sin_tildes = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(re.split(r'[^0-9a-z]+', sin_tildes)).strip()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('asociados') as batch_op:
+        batch_op.add_column(sa.Column('nombre_busqueda', sa.String(length=300), nullable=False, server_default=''))
+
+    conexion = op.get_bind()
+    asociados = sa.table(
+        'asociados',
+        sa.column('id', sa.Integer),
+        sa.column('nombres', sa.String),
+        sa.column('apellidos', sa.String),
+        sa.column('nombre_busqueda', sa.String),
+    )
+    filas = conexion.execute(sa.select(asociados.c.id, asociados.c.nombres, asociados.c.apellidos)).fetchall()
+    if filas:
+        conexion.execute(
+            asociados.update().where(asociados.c.id == sa.bindparam('asociado_id')),
+            [
+                {'asociado_id': fila.id, 'nombre_busqueda': _normalizar(f'{fila.nombres} {fila.apellidos}')}
+                for fila in filas
+            ]
+        )
+
+    if conexion.dialect.name == 'sqlite':
+        for sentencia in SQLITE_UPGRADE:
+            op.execute(sentencia)
+    elif conexion.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index(
+            'ix_asociados_nombre_busqueda_trgm', 'asociados', ['nombre_busqueda'],
+            postgresql_using='gin', postgresql_ops={'nombre_busqueda': 'gin_trgm_ops'}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conexion = op.get_bind()
+    if conexion.dialect.name == 'sqlite':
+        for sentencia in SQLITE_DOWNGRADE:
+            op.execute(sentencia)
+    elif conexion.dialect.name == 'postgresql':
+        op.drop_index('ix_asociados_nombre_busqueda_trgm', table_name='asociados')
+
+    with op.batch_alter_table('asociados') as batch_op:
+        batch_op.drop_column('nombre_busqueda')
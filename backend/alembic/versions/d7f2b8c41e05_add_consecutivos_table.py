@@ -0,0 +1,40 @@
+"""add consecutivos table
+
+Revision ID: d7f2b8c41e05
+Revises: c3a9e1f4d2b7
+Create Date: 2026-10-16 11:03:27.918264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7f2b8c41e05'
+down_revision: Union[str, Sequence[str], None] = 'c3a9e1f4d2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Las filas se crean al primer uso de cada período, continuando desde el
+    # último número ya emitido, por lo que no se requiere poblar la tabla.
+    op.create_table('consecutivos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('prefijo', sa.String(length=20), nullable=False),
+    sa.Column('periodo', sa.String(length=8), nullable=False),
+    sa.Column('ultimo_valor', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('prefijo', 'periodo', name='uq_consecutivos_prefijo_periodo')
+    )
+    op.create_index(op.f('ix_consecutivos_id'), 'consecutivos', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_consecutivos_id'), table_name='consecutivos')
+    op.drop_table('consecutivos')
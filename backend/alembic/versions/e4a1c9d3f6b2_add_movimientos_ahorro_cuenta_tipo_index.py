@@ -0,0 +1,32 @@
+"""add movimientos_ahorro cuenta/tipo/fecha index
+
+Revision ID: e4a1c9d3f6b2
+Revises: d7f2b8c41e05
+Create Date: 2026-10-16 12:20:05.347711
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a1c9d3f6b2'
+down_revision: Union[str, Sequence[str], None] = 'd7f2b8c41e05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_movimientos_ahorro_cuenta_tipo_fecha',
+        'movimientos_ahorro',
+        ['cuenta_id', 'tipo_movimiento', 'fecha_movimiento'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_movimientos_ahorro_cuenta_tipo_fecha', table_name='movimientos_ahorro')
@@ -0,0 +1,95 @@
+"""promote asociado json fields
+
+Revision ID: e5b9c2d7a4f1
+Revises: d4a8b1e6c3f9
+Create Date: 2026-10-17 03:48:12.907221
+
+"""
+import json
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b9c2d7a4f1'
+down_revision: Union[str, Sequence[str], None] = 'd4a8b1e6c3f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNAS = [
+    ('ciudad', sa.String(length=100)),
+    ('fecha_nacimiento', sa.Date()),
+    ('empresa', sa.String(length=200)),
+    ('salario_basico', sa.Numeric(precision=15, scale=2)),
+]
+
+
+def _cargar(texto):
+    try:
+        valor = json.loads(texto) if texto else {}
+    except ValueError:
+        return {}
+    return valor if isinstance(valor, dict) else {}
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor) if valor else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _decimal(valor):
+    try:
+        return Decimal(str(valor)) if valor not in (None, '') else None
+    except InvalidOperation:
+        return None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for nombre, tipo in COLUMNAS:
+        op.add_column('asociados', sa.Column(nombre, tipo, nullable=True))
+        op.create_index(f'ix_asociados_{nombre}', 'asociados', [nombre], unique=False)
+    op.create_index('ix_asociados_telefono_principal', 'asociados', ['telefono_principal'], unique=False)
+
+    # Copiar los valores desde los datos JSON (campos de app.models.asociado.campos_promovidos)
+    conexion = op.get_bind()
+    asociados = sa.table(
+        'asociados',
+        sa.column('id', sa.Integer),
+        sa.column('telefono_principal', sa.String),
+        sa.column('datos_personales', sa.Text),
+        sa.column('datos_laborales', sa.Text),
+        *[sa.column(nombre, tipo) for nombre, tipo in COLUMNAS],
+    )
+    filas = conexion.execute(sa.select(
+        asociados.c.id, asociados.c.telefono_principal, asociados.c.datos_personales, asociados.c.datos_laborales
+    )).fetchall()
+    valores = []
+    for fila in filas:
+        personales = _cargar(fila.datos_personales)
+        laborales = _cargar(fila.datos_laborales)
+        valores.append({
+            'asociado_id': fila.id,
+            # Registros antiguos guardaban el teléfono dentro de datos_personales
+            'telefono_principal': fila.telefono_principal or personales.get('telefono') or None,
+            'ciudad': personales.get('ciudad') or None,
+            'fecha_nacimiento': _fecha(personales.get('fecha_nacimiento')),
+            'empresa': laborales.get('empresa') or laborales.get('institucion_educativa') or None,
+            'salario_basico': _decimal(laborales.get('salario_basico')),
+        })
+    if valores:
+        conexion.execute(asociados.update().where(asociados.c.id == sa.bindparam('asociado_id')), valores)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_asociados_telefono_principal', table_name='asociados')
+    for nombre, _ in reversed(COLUMNAS):
+        op.drop_index(f'ix_asociados_{nombre}', table_name='asociados')
+        op.drop_column('asociados', nombre)
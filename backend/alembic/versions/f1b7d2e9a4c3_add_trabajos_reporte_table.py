@@ -0,0 +1,51 @@
+"""add trabajos_reporte table
+
+Revision ID: f1b7d2e9a4c3
+Revises: e4a1c9d3f6b2
+Create Date: 2026-10-16 21:24:05.513097
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7d2e9a4c3'
+down_revision: Union[str, Sequence[str], None] = 'e4a1c9d3f6b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('trabajos_reporte',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('parametros', sa.JSON(), nullable=False),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('ruta_archivo', sa.String(length=500), nullable=True),
+    sa.Column('nombre_archivo', sa.String(length=255), nullable=True),
+    sa.Column('tipo_contenido', sa.String(length=100), nullable=True),
+    sa.Column('tamano_bytes', sa.Integer(), nullable=True),
+    sa.Column('mensaje_error', sa.Text(), nullable=True),
+    sa.Column('solicitado_por_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('iniciado_at', sa.DateTime(), nullable=True),
+    sa.Column('finalizado_at', sa.DateTime(), nullable=True),
+    sa.Column('expira_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['solicitado_por_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_trabajos_reporte_id'), 'trabajos_reporte', ['id'], unique=False)
+    op.create_index(op.f('ix_trabajos_reporte_solicitado_por_id'), 'trabajos_reporte', ['solicitado_por_id'], unique=False)
+    op.create_index('ix_trabajos_reporte_estado_id', 'trabajos_reporte', ['estado', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_trabajos_reporte_estado_id', table_name='trabajos_reporte')
+    op.drop_index(op.f('ix_trabajos_reporte_solicitado_por_id'), table_name='trabajos_reporte')
+    op.drop_index(op.f('ix_trabajos_reporte_id'), table_name='trabajos_reporte')
+    op.drop_table('trabajos_reporte')
@@ -0,0 +1,46 @@
+"""Add archivos_auditoria table
+
+Revision ID: f8c3d1a6b9e2
+Revises: e5b9c2d7a4f1
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8c3d1a6b9e2'
+down_revision: Union[str, Sequence[str], None] = 'e5b9c2d7a4f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('archivos_auditoria',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('periodo', sa.String(length=7), nullable=False),
+    sa.Column('ruta_archivo', sa.String(length=500), nullable=False),
+    sa.Column('registros', sa.Integer(), nullable=False),
+    sa.Column('id_minimo', sa.Integer(), nullable=False),
+    sa.Column('id_maximo', sa.Integer(), nullable=False),
+    sa.Column('fecha_desde', sa.DateTime(), nullable=False),
+    sa.Column('fecha_hasta', sa.DateTime(), nullable=False),
+    sa.Column('tamano_bytes', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archivos_auditoria_id'), 'archivos_auditoria', ['id'], unique=False)
+    op.create_index(op.f('ix_archivos_auditoria_periodo'), 'archivos_auditoria', ['periodo'], unique=False)
+    op.create_index(op.f('ix_archivos_auditoria_fecha_hasta'), 'archivos_auditoria', ['fecha_hasta'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_archivos_auditoria_fecha_hasta'), table_name='archivos_auditoria')
+    op.drop_index(op.f('ix_archivos_auditoria_periodo'), table_name='archivos_auditoria')
+    op.drop_index(op.f('ix_archivos_auditoria_id'), table_name='archivos_auditoria')
+    op.drop_table('archivos_auditoria')
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from .endpoints import ahorros, asociados, auth, auditoria, contabilidad, creditos, dashboard, documentos, reportes
+from .endpoints import ahorros, asociados, auth, auditoria, contabilidad, creditos, dashboard, documentos, perfiles, reportes
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["Autenticación"])
@@ -12,3 +12,4 @@ api_router.include_router(contabilidad.router, prefix="/contabilidad", tags=["Co
 api_router.include_router(creditos.router, prefix="/creditos", tags=["Créditos"])
 api_router.include_router(ahorros.router, prefix="/ahorros", tags=["Ahorros"])
 api_router.include_router(reportes.router, prefix="/reportes", tags=["Reportes"])
+api_router.include_router(perfiles.router, prefix="/perfiles", tags=["Perfiles"])
@@ -5,10 +5,13 @@ from datetime import date
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_current_active_user
-from app.database import get_db
+from app.core.paginacion import ParametrosCursor
+from app.core.proyeccion import ParametrosProyeccion, filas_a_diccionarios, resolver_campos
+from app.database import get_db, get_db_readonly
 from app.models.usuario import Usuario
 from app.schemas.ahorro import (
     ConfiguracionAhorroActualizar,
@@ -23,7 +26,9 @@ from app.schemas.ahorro import (
     RetiroCrear,
     TransferenciaCrear,
 )
-from app.services.ahorros import AhorroService
+from app.services.ahorros import (
+    CAMPOS_LISTADO_CUENTAS, CAMPOS_RESUMEN_CUENTAS, TAMANO_LOTE_INTERESES, AhorroService
+)
 
 router = APIRouter()
 
@@ -57,6 +62,8 @@ def listar_cuentas_ahorro(
     asociado_id: Optional[int] = None,
     tipo_ahorro: Optional[str] = None,
     estado: Optional[str] = None,
+    paginacion: ParametrosCursor = Depends(),
+    proyeccion: ParametrosProyeccion = Depends(),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
@@ -66,17 +73,42 @@ def listar_cuentas_ahorro(
     - **asociado_id**: Filtrar por asociado
     - **tipo_ahorro**: Filtrar por tipo de ahorro
     - **estado**: Filtrar por estado
-    """
+    - **paginacion**: `cursor` para paginar con `siguiente_cursor` en lugar de `skip`
+    - **campos**: `resumen` o lista de campos para responder solo esas columnas
+    """
+    campos = None
+    if proyeccion.activa:
+        try:
+            campos = resolver_campos(proyeccion.campos, CAMPOS_LISTADO_CUENTAS, CAMPOS_RESUMEN_CUENTAS)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    def responder(cuentas, **paginado):
+        # La proyección ya viene serializada: se responde sin pasar por el codificador de FastAPI
+        if campos:
+            return JSONResponse({"cuentas": filas_a_diccionarios(cuentas, campos), **paginado})
+        return {"cuentas": [CuentaAhorroResponse.from_orm(c) for c in cuentas], **paginado}
+
+    if paginacion.activa:
+        try:
+            pagina = AhorroService.listar_cuentas_por_cursor(
+                db, paginacion.cursor, limit, asociado_id, tipo_ahorro, estado, paginacion.total, campos
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return responder(
+            pagina.items,
+            total=pagina.total,
+            total_exacto=pagina.total_exacto,
+            limit=limit,
+            siguiente_cursor=pagina.siguiente_cursor
+        )
+    
     cuentas, total = AhorroService.listar_cuentas(
-        db, skip, limit, asociado_id, tipo_ahorro, estado
+        db, skip, limit, asociado_id, tipo_ahorro, estado, campos
     )
     
-    return {
-        "cuentas": [CuentaAhorroResponse.from_orm(c) for c in cuentas],
-        "total": total,
-        "skip": skip,
-        "limit": limit
-    }
+    return responder(cuentas, total=total, skip=skip, limit=limit)
 
 
 @router.get("/{cuenta_id}", response_model=CuentaAhorroResponse)
@@ -234,7 +266,7 @@ def listar_movimientos_cuenta(
 
 @router.get("/estadisticas/general", response_model=EstadisticasAhorroResponse)
 def obtener_estadisticas_ahorros(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
@@ -315,6 +347,8 @@ def calcular_intereses_cuenta(
 def calcular_intereses_masivo(
     fecha_calculo: Optional[date] = None,
     tipo_ahorro: Optional[str] = None,
+    dry_run: bool = False,
+    tamano_lote: int = Query(TAMANO_LOTE_INTERESES, ge=1, le=10000),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
@@ -323,6 +357,8 @@ def calcular_intereses_masivo(
     
     - **fecha_calculo**: Fecha hasta la cual calcular (por defecto hoy)
     - **tipo_ahorro**: Filtrar por tipo de ahorro (opcional)
+    - **dry_run**: Solo calcular, sin registrar movimientos (opcional)
+    - **tamano_lote**: Cuentas procesadas por transacción
     
     Solo usuarios con permisos de administrador.
     """
@@ -334,7 +370,9 @@ def calcular_intereses_masivo(
     
     fecha = fecha_calculo or date.today()
     resultado = AhorroService.calcular_intereses_masivo(
-        db, fecha, current_user.id, tipo_ahorro
+        db, fecha, current_user.id, tipo_ahorro,
+        dry_run=dry_run,
+        tamano_lote=tamano_lote
     )
     
     return resultado
@@ -1,16 +1,24 @@
+import math
 import os
 import uuid
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_current_active_user, require_permission
+from app.core.paginacion import ParametrosCursor
+from app.core.proyeccion import ParametrosProyeccion, filas_a_diccionarios, resolver_campos
 from app.core.validators import validar_asociado_completo
-from app.database import get_db
+from app.database import get_db, get_db_readonly
 from app.models.usuario import Usuario
-from app.schemas import AsociadoActualizar, AsociadoCrear, AsociadoEnDB, AsociadoDetalle, AsociadosListResponse
+from app.schemas import (
+    AsociadoActualizar, AsociadoCrear, AsociadoDetalle, AsociadoDirectorio, AsociadoEnDB, AsociadosListResponse,
+    InfoPaginacion
+)
 from app.services import asociados as service
+from app.services import directorio_asociados
 
 router = APIRouter()
 
@@ -23,8 +31,12 @@ def listar_asociados(
     numero_documento: Optional[str] = Query(default=None, description="Buscar por número de documento"),
     nombre: Optional[str] = Query(default=None, description="Buscar por nombre o apellidos"),
     correo: Optional[str] = Query(default=None, description="Buscar por correo electrónico"),
+    ciudad: Optional[str] = Query(default=None, description="Filtrar por ciudad de residencia"),
+    empresa: Optional[str] = Query(default=None, description="Filtrar por empresa o institución"),
     ordenar_por: Optional[str] = Query(default="fecha_ingreso", description="Campo por el cual ordenar"),
     orden: Optional[str] = Query(default="desc", pattern="^(asc|desc)$", description="Orden ascendente o descendente"),
+    paginacion: ParametrosCursor = Depends(),
+    proyeccion: ParametrosProyeccion = Depends(),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(require_permission("asociados:leer")),
 ) -> AsociadosListResponse:
@@ -32,19 +44,64 @@ def listar_asociados(
     Listar asociados con paginación y filtros avanzados.
     
     Permite filtrar por múltiples criterios y ordenar los resultados.
-    Retorna información de paginación junto con los datos.
+    Retorna información de paginación junto con los datos. Con
+    `paginacion=cursor` se ignora `skip` y se continúa con `siguiente_cursor`.
+    Con `campos=resumen` (o una lista de campos) cada asociado trae solo esas columnas.
     """
-    return service.listar_asociados(
-        db, 
-        skip=skip, 
-        limit=limit, 
-        estado=estado, 
+    campos = None
+    if proyeccion.activa:
+        try:
+            campos = resolver_campos(proyeccion.campos, service.CAMPOS_LISTADO, service.CAMPOS_RESUMEN)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    def responder(asociados, paginacion_info: InfoPaginacion):
+        # La proyección ya viene serializada: se responde sin validar contra response_model
+        if campos:
+            return JSONResponse({
+                "datos": filas_a_diccionarios(asociados, campos),
+                "paginacion": paginacion_info.dict()
+            })
+        return AsociadosListResponse(datos=asociados, paginacion=paginacion_info)
+
+    filtros = dict(
+        estado=estado,
         numero_documento=numero_documento,
         nombre=nombre,
         correo=correo,
+        ciudad=ciudad,
+        empresa=empresa,
         ordenar_por=ordenar_por,
-        orden=orden
+        orden=orden,
+        campos=campos
     )
+    if paginacion.activa:
+        try:
+            pagina = service.listar_asociados_por_cursor(
+                db, limit=limit, cursor=paginacion.cursor, total=paginacion.total, **filtros
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return responder(pagina.items, InfoPaginacion(
+            total=pagina.total,
+            por_pagina=limit,
+            tiene_siguiente=pagina.siguiente_cursor is not None,
+            tiene_anterior=bool(paginacion.cursor),
+            siguiente_cursor=pagina.siguiente_cursor,
+            total_exacto=pagina.total_exacto
+        ))
+
+    asociados, total = service.listar_asociados(db, skip=skip, limit=limit, **filtros)
+    pagina_actual = (skip // limit) + 1
+    total_paginas = math.ceil(total / limit) if total > 0 else 1
+    return responder(asociados, InfoPaginacion(
+        total=total,
+        pagina_actual=pagina_actual,
+        por_pagina=limit,
+        total_paginas=total_paginas,
+        tiene_siguiente=pagina_actual < total_paginas,
+        tiene_anterior=pagina_actual > 1
+    ))
 
 
 @router.post("/", response_model=AsociadoDetalle, status_code=status.HTTP_201_CREATED)
@@ -91,7 +148,7 @@ def crear_asociado(
 
 @router.get("/estadisticas", response_model=dict)
 def obtener_estadisticas(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("asociados:leer")),
 ) -> dict:
     """
@@ -112,12 +169,31 @@ def buscar_asociados(
     """
     Búsqueda de texto libre en asociados.
     
-    Busca en nombres, apellidos, número de documento y correo electrónico.
+    Busca en nombres, apellidos, número de documento y correo electrónico,
+    por prefijo de palabra y sin distinguir mayúsculas ni tildes.
     Útil para autocompletado y búsqueda rápida.
     """
     return service.buscar_asociados(db, termino=q, limite=limite)
 
 
+@router.get("/directorio", response_model=List[AsociadoDirectorio])
+def buscar_en_directorio(
+    q: str = Query(..., min_length=2, description="Documento (prefijo) o nombre; tolera un error por palabra"),
+    limite: int = Query(default=20, ge=1, le=50, description="Límite de resultados"),
+    estado: Optional[str] = Query(default=None, description="Filtrar por estado (activo, inactivo, retirado)"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_permission("asociados:leer")),
+) -> List[AsociadoDirectorio]:
+    """
+    Búsqueda rápida de asociados para ventanilla.
+
+    Responde desde el directorio en memoria sin consultar la base de datos:
+    prefijo de documento, prefijo de palabra del nombre y, si no hay
+    coincidencias, palabras con un error de digitación.
+    """
+    return [miembro._asdict() for miembro in directorio_asociados.buscar(db, q, limite, estado)]
+
+
 @router.get("/{asociado_id}", response_model=AsociadoDetalle)
 def obtener_asociado(asociado_id: int, db: Session = Depends(get_db)) -> AsociadoDetalle:
     """
@@ -1,20 +1,21 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
 from datetime import datetime
 
 from app.database import get_db
 from app.models.usuario import Usuario
-from app.models.auditoria import RegistroAuditoria
 from app.schemas.auditoria import RegistroAuditoriaResponse, RegistroAuditoriaFilter
 from app.core.deps import get_current_user
+from app.core.paginacion import ParametrosCursor
+from app.services.auditoria import AuditoriaService
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[RegistroAuditoriaResponse])
 def listar_registros(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     usuario_id: Optional[int] = None,
@@ -23,42 +24,50 @@ def listar_registros(
     entidad_id: Optional[int] = None,
     fecha_desde: Optional[datetime] = None,
     fecha_hasta: Optional[datetime] = None,
+    incluir_archivados: bool = Query(False, description="Continuar con los meses archivados al terminar la tabla"),
+    paginacion: ParametrosCursor = Depends(),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
     """
     Listar registros de auditoría con filtros opcionales.
     Solo accesible para Admins y Auditores.
+    
+    Con `paginacion=cursor` se ignora `skip`: el cursor de la página siguiente
+    llega en el encabezado `X-Siguiente-Cursor` y, si se pide `total`, el
+    conteo en `X-Total-Count` (`X-Total-Exacto: false` si es una cota).
+    
+    Los meses cerrados se archivan fuera de la tabla; `incluir_archivados`
+    los agrega al final del listado (leerlos es más lento que la tabla).
     """
     # Verificar permisos (case-insensitive)
     if current_user.rol.lower() not in ["admin", "auditor"]:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a los registros de auditoría")
     
-    query = db.query(RegistroAuditoria)
-    
-    # Aplicar filtros
-    filtros = []
-    if usuario_id:
-        filtros.append(RegistroAuditoria.usuario_id == usuario_id)
-    if accion:
-        filtros.append(RegistroAuditoria.accion == accion)
-    if entidad:
-        filtros.append(RegistroAuditoria.entidad == entidad)
-    if entidad_id:
-        filtros.append(RegistroAuditoria.entidad_id == entidad_id)
-    if fecha_desde:
-        filtros.append(RegistroAuditoria.fecha_hora >= fecha_desde)
-    if fecha_hasta:
-        filtros.append(RegistroAuditoria.fecha_hora <= fecha_hasta)
-    
-    if filtros:
-        query = query.filter(and_(*filtros))
-    
-    # Ordenar por fecha más reciente primero
-    query = query.order_by(RegistroAuditoria.fecha_hora.desc())
+    filtros = dict(
+        usuario_id=usuario_id,
+        accion=accion,
+        entidad=entidad,
+        entidad_id=entidad_id,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta
+    )
     
-    # Paginación
-    registros = query.offset(skip).limit(limit).all()
+    if paginacion.activa:
+        try:
+            pagina = AuditoriaService.listar_registros_por_cursor(
+                db, paginacion.cursor, limit, paginacion.total, incluir_archivados, **filtros
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if pagina.siguiente_cursor:
+            response.headers["X-Siguiente-Cursor"] = pagina.siguiente_cursor
+        if pagina.total is not None:
+            response.headers["X-Total-Count"] = str(pagina.total)
+            response.headers["X-Total-Exacto"] = "true" if pagina.total_exacto else "false"
+        registros = pagina.items
+    else:
+        registros = AuditoriaService.listar_registros(db, skip, limit, incluir_archivados, **filtros)
     
     # Convertir a diccionarios para evitar problemas de serialización con relaciones
     return [RegistroAuditoriaResponse.from_orm(r) for r in registros]
@@ -77,7 +86,7 @@ def obtener_registro(
     if current_user.rol.lower() not in ["admin", "auditor"]:
         raise HTTPException(status_code=403, detail="No tienes permiso para acceder a los registros de auditoría")
         
-    registro = db.query(RegistroAuditoria).filter(RegistroAuditoria.id == registro_id).first()
+    registro = AuditoriaService.obtener_registro(db, registro_id)
     
     if not registro:
         raise HTTPException(status_code=404, detail="Registro de auditoría no encontrado")
@@ -9,7 +9,8 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.core import deps
-from app.database import get_db
+from app.core.paginacion import ParametrosCursor
+from app.database import get_db, get_db_readonly
 from app.models.usuario import Usuario
 from app.models.contabilidad import CuentaContable, AsientoContable, Aporte
 from app.schemas.contabilidad import (
@@ -198,9 +199,32 @@ def listar_asientos(
     solo_activos: bool = Query(True, description="Excluir asientos anulados"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    paginacion: ParametrosCursor = Depends(),
     usuario_actual: Usuario = Depends(deps.get_current_active_user)
 ):
-    """Listar asientos contables con filtros."""
+    """Listar asientos contables con filtros. Con `paginacion=cursor` se ignora `skip`."""
+    if paginacion.activa:
+        try:
+            pagina = ContabilidadService.listar_asientos_por_cursor(
+                db=db,
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin,
+                tipo_movimiento=tipo_movimiento,
+                solo_activos=solo_activos,
+                cursor=paginacion.cursor,
+                limit=limit,
+                total=paginacion.total
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return {
+            "asientos": pagina.items,
+            "total": pagina.total,
+            "total_exacto": pagina.total_exacto,
+            "limit": limit,
+            "siguiente_cursor": pagina.siguiente_cursor
+        }
+    
     asientos, total = ContabilidadService.listar_asientos(
         db=db,
         fecha_inicio=fecha_inicio,
@@ -291,9 +315,32 @@ def listar_aportes(
     estado: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    paginacion: ParametrosCursor = Depends(),
     usuario_actual: Usuario = Depends(deps.get_current_active_user)
 ):
-    """Listar aportes con filtros."""
+    """Listar aportes con filtros. Con `paginacion=cursor` se ignora `skip`."""
+    if paginacion.activa:
+        try:
+            pagina = ContabilidadService.listar_aportes_por_cursor(
+                db=db,
+                asociado_id=asociado_id,
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin,
+                estado=estado,
+                cursor=paginacion.cursor,
+                limit=limit,
+                total=paginacion.total
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return {
+            "aportes": pagina.items,
+            "total": pagina.total,
+            "total_exacto": pagina.total_exacto,
+            "limit": limit,
+            "siguiente_cursor": pagina.siguiente_cursor
+        }
+    
     aportes, total = ContabilidadService.listar_aportes(
         db=db,
         asociado_id=asociado_id,
@@ -351,7 +398,7 @@ def obtener_total_aportes_asociado(
 
 @router.get("/estadisticas", response_model=EstadisticasContables)
 def obtener_estadisticas(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     usuario_actual: Usuario = Depends(deps.get_current_active_user)
 ):
     """Obtener estadísticas generales de contabilidad."""
@@ -5,10 +5,13 @@ from datetime import date
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.core import deps
-from app.database import get_db
+from app.core.paginacion import ParametrosCursor
+from app.core.proyeccion import ParametrosProyeccion, filas_a_diccionarios, resolver_campos
+from app.database import get_db, get_db_readonly
 from app.models.usuario import Usuario
 from app.models.credito import Credito, Pago
 from app.schemas.credito import (
@@ -24,7 +27,7 @@ from app.schemas.credito import (
     EstadisticasCredito,
     SimulacionCredito
 )
-from app.services.creditos import CreditoService
+from app.services.creditos import CAMPOS_LISTADO_CREDITOS, CAMPOS_RESUMEN_CREDITOS, CreditoService
 
 
 router = APIRouter()
@@ -114,27 +117,61 @@ def listar_creditos(
     tipo_credito: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    paginacion: ParametrosCursor = Depends(),
+    proyeccion: ParametrosProyeccion = Depends(),
     usuario_actual: Usuario = Depends(deps.get_current_active_user)
 ):
-    """Listar créditos con filtros."""
+    """
+    Listar créditos con filtros. Con `paginacion=cursor` se ignora `skip`.
+
+    Con `campos=resumen` (o una lista de campos) cada crédito trae solo esas columnas.
+    """
+    campos = None
+    if proyeccion.activa:
+        try:
+            campos = resolver_campos(proyeccion.campos, CAMPOS_LISTADO_CREDITOS, CAMPOS_RESUMEN_CREDITOS)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    def responder(creditos, **paginado):
+        # La proyección ya viene serializada: se responde sin pasar por el codificador de FastAPI
+        if campos:
+            return JSONResponse({"creditos": filas_a_diccionarios(creditos, campos), **paginado})
+        return {"creditos": [CreditoConAsociado.from_orm(c) for c in creditos], **paginado}
+
+    if paginacion.activa:
+        try:
+            pagina = CreditoService.listar_creditos_por_cursor(
+                db=db,
+                asociado_id=asociado_id,
+                estado=estado,
+                tipo_credito=tipo_credito,
+                cursor=paginacion.cursor,
+                limit=limit,
+                total=paginacion.total,
+                campos=campos
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return responder(
+            pagina.items,
+            total=pagina.total,
+            total_exacto=pagina.total_exacto,
+            limit=limit,
+            siguiente_cursor=pagina.siguiente_cursor
+        )
+    
     creditos, total = CreditoService.listar_creditos(
         db=db,
         asociado_id=asociado_id,
         estado=estado,
         tipo_credito=tipo_credito,
         skip=skip,
-        limit=limit
+        limit=limit,
+        campos=campos
     )
     
-    # Convertir a schema con asociado
-    creditos_con_asociado = [CreditoConAsociado.from_orm(c) for c in creditos]
-    
-    return {
-        "creditos": creditos_con_asociado,
-        "total": total,
-        "skip": skip,
-        "limit": limit
-    }
+    return responder(creditos, total=total, skip=skip, limit=limit)
 
 
 @router.get("/{credito_id}", response_model=CreditoCompleto)
@@ -257,17 +294,17 @@ def calcular_mora(
     usuario_actual: Usuario = Depends(deps.get_current_active_user)
 ):
     """Calcular mora de todos los créditos activos."""
-    CreditoService.calcular_mora(db, fecha_corte)
+    resumen = CreditoService.calcular_mora(db, fecha_corte)
     
     return {
         "message": "Mora calculada exitosamente",
-        "fecha_corte": fecha_corte or date.today()
+        **resumen
     }
 
 
 @router.get("/estadisticas/general", response_model=EstadisticasCredito)
 def obtener_estadisticas(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     usuario_actual: Usuario = Depends(deps.get_current_active_user)
 ):
     """Obtener estadísticas generales de créditos."""
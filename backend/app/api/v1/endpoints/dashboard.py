@@ -1,14 +1,14 @@
 """
 Endpoints para el Dashboard con KPIs y estadísticas generales.
 """
-from datetime import datetime
-from typing import Dict
+from datetime import date, datetime
+from typing import Dict, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_current_active_user, require_permission
-from app.database import get_db
+from app.core.deps import get_current_active_user, get_current_superuser, require_permission
+from app.database import get_db_readonly
 from app.models.usuario import Usuario
 from app.services.dashboard import DashboardService
 
@@ -17,7 +17,7 @@ router = APIRouter()
 
 @router.get("/kpis")
 def obtener_kpis(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(get_current_active_user),
 ) -> Dict:
     """
@@ -34,9 +34,22 @@ def obtener_kpis(
     return DashboardService.obtener_kpis(db)
 
 
+@router.get("/kpis/cache")
+def obtener_estadisticas_cache_kpis(
+    current_user: Usuario = Depends(get_current_superuser),
+) -> Dict:
+    """
+    Obtener los contadores de la caché de KPIs del proceso.
+
+    Retorna aciertos, fallos, invalidaciones y tasa de aciertos desde el
+    arranque del proceso que atiende la petición.
+    """
+    return DashboardService.estadisticas_cache()
+
+
 @router.get("/actividad-reciente")
 def obtener_actividad_reciente(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(get_current_active_user),
 ) -> Dict:
     """
@@ -51,18 +64,48 @@ def obtener_actividad_reciente(
     return DashboardService.obtener_actividad_reciente(db)
 
 
+@router.get("/actividad")
+def obtener_actividad(
+    limite: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="siguiente_cursor de la página anterior"),
+    db: Session = Depends(get_db_readonly),
+    current_user: Usuario = Depends(get_current_active_user),
+) -> Dict:
+    """
+    Obtener el feed de actividad paginado por cursor.
+
+    Retorna desembolsos, consignaciones, retiros y nuevos asociados del más
+    reciente al más antiguo. Para continuar se envía el `siguiente_cursor`
+    de la respuesta; es None cuando no hay eventos más antiguos.
+    """
+    try:
+        return DashboardService.obtener_actividad(db, limite, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.get("/estadisticas-mensuales")
 def obtener_estadisticas_mensuales(
-    db: Session = Depends(get_db),
+    fecha_inicio: Optional[date] = Query(None, description="Mes inicial (default: 11 meses antes de fecha_fin)"),
+    fecha_fin: Optional[date] = Query(None, description="Mes final (default: hoy)"),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(get_current_active_user),
 ) -> Dict:
     """
     Obtener estadísticas mensuales para gráficos.
     
-    Retorna datos de los últimos 12 meses:
+    Retorna datos por mes del rango (por defecto los últimos 12 meses):
     - Ahorros mensuales
     - Créditos desembolsados
     - Número de asociados nuevos
-    - Cartera total
     """
-    return DashboardService.obtener_estadisticas_mensuales(db)
+    try:
+        return DashboardService.obtener_estadisticas_mensuales(db, fecha_inicio, fecha_fin)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
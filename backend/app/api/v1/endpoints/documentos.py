@@ -18,7 +18,8 @@ from sqlalchemy.orm import Session
 
 from app.core.deps import get_current_active_user, require_permission
 from app.core.file_storage import FileStorageManager
-from app.database import get_db
+from app.core.paginacion import ParametrosCursor
+from app.database import get_db, get_db_readonly
 from app.models.usuario import Usuario
 from app.schemas.documento import (
     DocumentoEnDB,
@@ -117,14 +118,38 @@ def listar_documentos(
     es_valido: Optional[bool] = Query(None, description="Filtrar por estado de validación"),
     skip: int = Query(default=0, ge=0, description="Registros a saltar"),
     limit: int = Query(default=100, ge=1, le=1000, description="Máximo de registros"),
+    paginacion: ParametrosCursor = Depends(),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(require_permission("documentos:leer"))
 ):
     """
     Listar documentos con filtros opcionales.
     
+    Con `paginacion=cursor` se ignora `skip` y se continúa con `siguiente_cursor`.
+    
     Requiere permiso: documentos:leer
     """
+    if paginacion.activa:
+        try:
+            pagina = DocumentoService.listar_documentos_por_cursor(
+                db=db,
+                asociado_id=asociado_id,
+                credito_id=credito_id,
+                tipo_documento=tipo_documento,
+                es_valido=es_valido,
+                cursor=paginacion.cursor,
+                limit=limit,
+                total=paginacion.total
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return DocumentoListaResponse(
+            total=pagina.total,
+            total_exacto=pagina.total_exacto,
+            siguiente_cursor=pagina.siguiente_cursor,
+            documentos=[DocumentoEnDB.from_orm(doc) for doc in pagina.items]
+        )
+    
     documentos, total = DocumentoService.listar_documentos(
         db=db,
         asociado_id=asociado_id,
@@ -338,7 +363,7 @@ def eliminar_documento(
 @router.get("/asociado/{asociado_id}/estadisticas")
 def obtener_estadisticas_asociado(
     asociado_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("documentos:leer"))
 ):
     """
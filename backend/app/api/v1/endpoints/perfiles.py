@@ -0,0 +1,36 @@
+"""
+Endpoints para consultar los perfiles guardados por el perfilador.
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.core.deps import get_current_superuser
+from app.core.perfilador import listar_perfiles, ruta_perfil
+from app.models.usuario import Usuario
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[dict])
+def listar(current_user: Usuario = Depends(get_current_superuser)):
+    """
+    Listar los perfiles guardados, del más reciente al más antiguo.
+
+    Los pedidos con `X-Perfilar` empiezan por `pedido_` y los de peticiones
+    lentas por `lenta_`. Solo superusuarios.
+    """
+    return listar_perfiles()
+
+
+@router.get("/{nombre}")
+def descargar(nombre: str, current_user: Usuario = Depends(get_current_superuser)):
+    """Descargar un perfil en formato de pilas plegadas (flamegraph.pl, speedscope)."""
+    ruta = ruta_perfil(nombre)
+    if ruta is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Perfil no encontrado"
+        )
+    return FileResponse(ruta, media_type="text/plain; charset=utf-8", filename=nombre)
@@ -4,21 +4,27 @@ Endpoints para reportes financieros y administrativos.
 from datetime import date
 from typing import Optional
 from fastapi import APIRouter, Depends, Query, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core import deps
 from app.core.deps import require_permission
-from app.database import get_db
-from app.models.usuario import Usuario
+from app.database import get_db, get_db_readonly
+from app.models.trabajo_reporte import EstadoTrabajoReporte
+from app.models.usuario import RolUsuario, Usuario
+from app.services import exportaciones
 from app.services import reportes as service
+from app.services.trabajos_reporte import TrabajoReporteService
 from app.schemas.reportes import (
     BalanceGeneralResponse,
     EstadoResultadosResponse,
+    EstadoResultadosComparativoResponse,
     ReporteCarteraResponse,
     EstadoCuentaAsociadoResponse,
     ReporteMoraResponse,
-    EstadisticasGeneralesResponse
+    EstadisticasGeneralesResponse,
+    TrabajoReporteCrear,
+    TrabajoReporteResponse
 )
 
 router = APIRouter()
@@ -27,7 +33,7 @@ router = APIRouter()
 @router.get("/balance-general", response_model=BalanceGeneralResponse)
 def generar_balance_general(
     fecha_corte: date = Query(..., description="Fecha de corte del balance"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:leer")),
 ):
     """
@@ -45,7 +51,7 @@ def generar_balance_general(
 def generar_estado_resultados(
     fecha_inicio: date = Query(..., description="Fecha inicial del período"),
     fecha_fin: date = Query(..., description="Fecha final del período"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:leer")),
 ):
     """
@@ -65,12 +71,45 @@ def generar_estado_resultados(
     return service.generar_estado_resultados(db, fecha_inicio, fecha_fin)
 
 
+@router.get("/estado-resultados/comparativo", response_model=EstadoResultadosComparativoResponse)
+def generar_estado_resultados_comparativo(
+    fecha_inicio: date = Query(..., description="Fecha inicial del rango"),
+    fecha_fin: date = Query(..., description="Fecha final del rango"),
+    agrupacion: str = Query("mensual", description="Agrupación de períodos (mensual, trimestral, anual)"),
+    db: Session = Depends(get_db_readonly),
+    current_user: Usuario = Depends(require_permission("reportes:leer")),
+):
+    """
+    Generar Estado de Resultados comparativo.
+    
+    Divide el rango en períodos y muestra, lado a lado:
+    - Ingresos y gastos por cuenta en cada período
+    - Totales, utilidad y margen de cada período
+    
+    Ejemplos: los 12 meses de un año (mensual) o este año contra el
+    anterior (anual sobre un rango de dos años).
+    """
+    if fecha_inicio > fecha_fin:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha inicial no puede ser mayor a la fecha final"
+        )
+    
+    try:
+        return service.generar_estado_resultados_comparativo(db, fecha_inicio, fecha_fin, agrupacion)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.get("/cartera", response_model=ReporteCarteraResponse)
 def generar_reporte_cartera(
     fecha_corte: Optional[date] = Query(None, description="Fecha de corte (default: hoy)"),
     tipo_credito: Optional[str] = Query(None, description="Filtrar por tipo de crédito"),
     estado: Optional[str] = Query(None, description="Filtrar por estado (al_día, mora, castigado)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:leer")),
 ):
     """
@@ -93,7 +132,7 @@ def generar_reporte_cartera(
 @router.get("/mora", response_model=ReporteMoraResponse)
 def generar_reporte_mora(
     dias_mora_minimo: int = Query(default=1, ge=1, description="Días mínimos de mora"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:leer")),
 ):
     """
@@ -113,7 +152,7 @@ def generar_estado_cuenta(
     numero_documento: str,
     fecha_inicio: Optional[date] = Query(None, description="Fecha inicial (default: hace 6 meses)"),
     fecha_fin: Optional[date] = Query(None, description="Fecha final (default: hoy)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:leer")),
 ):
     """
@@ -144,7 +183,7 @@ def generar_estado_cuenta(
 
 @router.get("/estadisticas", response_model=EstadisticasGeneralesResponse)
 def obtener_estadisticas_generales(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:leer")),
 ):
     """
@@ -163,7 +202,7 @@ def obtener_estadisticas_generales(
 @router.get("/balance-general/export/pdf")
 def exportar_balance_pdf(
     fecha_corte: date = Query(..., description="Fecha de corte del balance"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:exportar")),
 ):
     """Exportar Balance General a PDF."""
@@ -181,7 +220,7 @@ def exportar_balance_pdf(
 @router.get("/cartera/export/excel")
 def exportar_cartera_excel(
     fecha_corte: Optional[date] = Query(None, description="Fecha de corte"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:exportar")),
 ):
     """Exportar Reporte de Cartera a Excel."""
@@ -191,7 +230,7 @@ def exportar_cartera_excel(
     )
     
     return StreamingResponse(
-        excel_content,
+        service.iterar_archivo(excel_content),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={
             "Content-Disposition": f"attachment; filename=cartera_{fecha_corte or date.today()}.xlsx"
@@ -203,7 +242,7 @@ def exportar_cartera_excel(
 def exportar_estado_resultados_pdf(
     fecha_inicio: date = Query(..., description="Fecha inicial del período"),
     fecha_fin: date = Query(..., description="Fecha final del período"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:exportar")),
 ):
     """Exportar Estado de Resultados a PDF."""
@@ -221,14 +260,14 @@ def exportar_estado_resultados_pdf(
 @router.get("/mora/export/excel")
 def exportar_mora_excel(
     dias_mora_minimo: int = Query(default=1, ge=1, description="Días mínimos de mora"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:exportar")),
 ):
     """Exportar Reporte de Mora a Excel."""
     excel_content = service.exportar_mora_excel(db, dias_mora_minimo)
     
     return StreamingResponse(
-        excel_content,
+        service.iterar_archivo(excel_content),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={
             "Content-Disposition": f"attachment; filename=reporte_mora_{date.today()}.xlsx"
@@ -241,7 +280,7 @@ def exportar_estado_cuenta_pdf(
     numero_documento: str,
     fecha_inicio: Optional[date] = Query(None, description="Fecha inicial"),
     fecha_fin: Optional[date] = Query(None, description="Fecha final"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:exportar")),
 ):
     """Exportar Estado de Cuenta a PDF (buscar por número de documento)."""
@@ -272,7 +311,7 @@ def exportar_estado_cuenta_excel(
     numero_documento: str,
     fecha_inicio: Optional[date] = Query(None, description="Fecha inicial"),
     fecha_fin: Optional[date] = Query(None, description="Fecha final"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:exportar")),
 ):
     """Exportar Estado de Cuenta a Excel (buscar por número de documento)."""
@@ -298,12 +337,207 @@ def exportar_estado_cuenta_excel(
         )
 
 
+# ==================== EXPORTACIÓN TABULAR (CSV / PARQUET) ====================
+
+def _respuesta_tabular(db: Session, reporte: exportaciones.ReporteTabular, formato: str, nombre_archivo: str):
+    """
+    Enviar un reporte tabular por bloques.
+    
+    Las filas se leen mientras se envía la respuesta, por eso la sesión se
+    cierra al terminar la descarga y no al salir del endpoint.
+    """
+    def contenido():
+        try:
+            yield from exportaciones.exportar_reporte(reporte, formato)
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        contenido(),
+        media_type=exportaciones.TIPOS_CONTENIDO[formato],
+        headers={
+            "Content-Disposition": f"attachment; filename={nombre_archivo}.{formato}"
+        }
+    )
+
+
+def _validar_formato(formato: str) -> str:
+    try:
+        return exportaciones.validar_formato(formato)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/cartera/export/{formato}")
+def exportar_cartera_tabular(
+    formato: str,
+    fecha_corte: Optional[date] = Query(None, description="Fecha de corte (default: hoy)"),
+    tipo_credito: Optional[str] = Query(None, description="Filtrar por tipo de crédito"),
+    estado: Optional[str] = Query(None, description="Filtrar por estado (al_día, mora, castigado)"),
+    db: Session = Depends(get_db_readonly),
+    current_user: Usuario = Depends(require_permission("reportes:exportar")),
+):
+    """Exportar el detalle de cartera a CSV o Parquet."""
+    formato = _validar_formato(formato)
+    reporte = exportaciones.tabla_cartera(db, tipo_credito=tipo_credito, estado=estado)
+    return _respuesta_tabular(db, reporte, formato, f"cartera_{fecha_corte or date.today()}")
+
+
+@router.get("/mora/export/{formato}")
+def exportar_mora_tabular(
+    formato: str,
+    dias_mora_minimo: int = Query(default=1, ge=1, description="Días mínimos de mora"),
+    db: Session = Depends(get_db_readonly),
+    current_user: Usuario = Depends(require_permission("reportes:exportar")),
+):
+    """Exportar el detalle de créditos en mora a CSV o Parquet."""
+    formato = _validar_formato(formato)
+    reporte = exportaciones.tabla_mora(db, dias_mora_minimo)
+    return _respuesta_tabular(db, reporte, formato, f"reporte_mora_{date.today()}")
+
+
+@router.get("/balance-general/export/{formato}")
+def exportar_balance_tabular(
+    formato: str,
+    fecha_corte: date = Query(..., description="Fecha de corte del balance"),
+    db: Session = Depends(get_db_readonly),
+    current_user: Usuario = Depends(require_permission("reportes:exportar")),
+):
+    """Exportar el Balance General por cuenta a CSV o Parquet."""
+    formato = _validar_formato(formato)
+    reporte = exportaciones.tabla_balance_general(db, fecha_corte)
+    return _respuesta_tabular(db, reporte, formato, f"balance_general_{fecha_corte}")
+
+
+@router.get("/estado-resultados/export/{formato}")
+def exportar_estado_resultados_tabular(
+    formato: str,
+    fecha_inicio: date = Query(..., description="Fecha inicial del período"),
+    fecha_fin: date = Query(..., description="Fecha final del período"),
+    db: Session = Depends(get_db_readonly),
+    current_user: Usuario = Depends(require_permission("reportes:exportar")),
+):
+    """Exportar el Estado de Resultados por cuenta a CSV o Parquet."""
+    formato = _validar_formato(formato)
+    reporte = exportaciones.tabla_estado_resultados(db, fecha_inicio, fecha_fin)
+    return _respuesta_tabular(db, reporte, formato, f"estado_resultados_{fecha_inicio}_{fecha_fin}")
+
+
+@router.get("/estado-cuenta/{numero_documento}/export/{formato}")
+def exportar_estado_cuenta_tabular(
+    numero_documento: str,
+    formato: str,
+    fecha_inicio: Optional[date] = Query(None, description="Fecha inicial"),
+    fecha_fin: Optional[date] = Query(None, description="Fecha final"),
+    db: Session = Depends(get_db_readonly),
+    current_user: Usuario = Depends(require_permission("reportes:exportar")),
+):
+    """Exportar el Estado de Cuenta de un asociado a CSV o Parquet."""
+    formato = _validar_formato(formato)
+    try:
+        reporte = exportaciones.tabla_estado_cuenta(
+            db,
+            numero_documento=numero_documento,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin or date.today()
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    
+    return _respuesta_tabular(db, reporte, formato, f"estado_cuenta_{numero_documento}_{date.today()}")
+
+
+# ==================== TRABAJOS EN SEGUNDO PLANO ====================
+
+def _obtener_trabajo_usuario(db: Session, trabajo_id: int, current_user: Usuario):
+    """Obtener un trabajo del usuario actual (los administradores ven todos)."""
+    trabajo = TrabajoReporteService.obtener_trabajo(db, trabajo_id)
+    if not trabajo or (
+        trabajo.solicitado_por_id != current_user.id and current_user.rol != RolUsuario.ADMIN
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trabajo de reporte no encontrado"
+        )
+    return trabajo
+
+
+@router.post("/trabajos", response_model=TrabajoReporteResponse, status_code=status.HTTP_202_ACCEPTED)
+def crear_trabajo_reporte(
+    datos: TrabajoReporteCrear,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_permission("reportes:exportar")),
+):
+    """
+    Solicitar un reporte en segundo plano.
+    
+    El reporte se genera fuera de la petición; consulte el estado en
+    `GET /trabajos/{id}` y descargue el archivo en `GET /trabajos/{id}/descarga`.
+    
+    Tipos: balance_pdf, estado_resultados_pdf, cartera_excel, mora_excel,
+    estado_cuenta_pdf, estado_cuenta_excel, certificado_paz_salvo,
+    certificado_aportes y certificados_masivos (ZIP con el certificado
+    de aportes o de paz y salvo de todos los asociados activos).
+    """
+    try:
+        return TrabajoReporteService.crear_trabajo(db, datos.tipo, datos.parametros, current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/trabajos/{trabajo_id}", response_model=TrabajoReporteResponse)
+def obtener_trabajo_reporte(
+    trabajo_id: int,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_permission("reportes:exportar")),
+):
+    """Consultar el estado de un trabajo de reporte."""
+    return _obtener_trabajo_usuario(db, trabajo_id, current_user)
+
+
+@router.get("/trabajos/{trabajo_id}/descarga")
+def descargar_trabajo_reporte(
+    trabajo_id: int,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_permission("reportes:exportar")),
+):
+    """Descargar el archivo de un trabajo completado."""
+    trabajo = _obtener_trabajo_usuario(db, trabajo_id, current_user)
+    
+    if TrabajoReporteService.esta_expirado(trabajo):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="El archivo del reporte expiró; solicite el reporte nuevamente"
+        )
+    
+    if trabajo.estado != EstadoTrabajoReporte.COMPLETADO.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El reporte no está disponible (estado: {trabajo.estado})"
+        )
+    
+    return FileResponse(
+        trabajo.ruta_archivo,
+        media_type=trabajo.tipo_contenido,
+        filename=trabajo.nombre_archivo
+    )
+
+
 # ==================== CERTIFICADOS ====================
 
 @router.get("/certificados/paz-salvo/{numero_documento}")
 def generar_certificado_paz_salvo(
     numero_documento: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:leer")),
 ):
     """
@@ -335,7 +569,7 @@ def generar_certificado_paz_salvo(
 def generar_certificado_aportes(
     numero_documento: str,
     ano: Optional[int] = Query(None, description="Año específico (default: histórico)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_readonly),
     current_user: Usuario = Depends(require_permission("reportes:leer")),
 ):
     """
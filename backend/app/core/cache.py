@@ -0,0 +1,86 @@
+"""
+Caché en memoria con expiración por tiempo (TTL).
+
+La caché vive en el proceso: cada worker de la aplicación tiene la suya, por
+lo que la invalidación explícita solo alcanza al proceso que hizo la escritura
+y el TTL acota la desactualización en los demás.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class CacheTTL:
+    """
+    Caché clave/valor con expiración y contadores de aciertos y fallos.
+
+    `obtener` calcula el valor fuera del candado para no bloquear a otros
+    hilos mientras se consulta la base de datos. Cada invalidación aumenta una
+    generación; un valor calculado antes de una invalidación no se guarda.
+    """
+
+    def __init__(self, ttl_segundos: float, reloj: Callable[[], float] = time.monotonic):
+        self.ttl_segundos = ttl_segundos
+        self._reloj = reloj
+        self._valores: Dict[str, Tuple[float, Any]] = {}
+        self._candado = threading.Lock()
+        self._generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def obtener(self, clave: str, calcular: Callable[[], Any]) -> Any:
+        """
+        Obtener el valor de `clave`, calculándolo con `calcular` si no está vigente.
+
+        Con TTL menor o igual a cero la caché queda deshabilitada y siempre se calcula.
+        """
+        if self.ttl_segundos <= 0:
+            return calcular()
+
+        with self._candado:
+            entrada = self._valores.get(clave)
+            if entrada is not None and entrada[0] > self._reloj():
+                self.aciertos += 1
+                return entrada[1]
+            self.fallos += 1
+            generacion = self._generacion
+
+        valor = calcular()
+
+        with self._candado:
+            if generacion == self._generacion:
+                self._valores[clave] = (self._reloj() + self.ttl_segundos, valor)
+        return valor
+
+    def invalidar(self, clave: Optional[str] = None) -> None:
+        """Descartar una clave o, sin clave, todo el contenido."""
+        with self._candado:
+            if clave is None:
+                self._valores.clear()
+            else:
+                self._valores.pop(clave, None)
+            self._generacion += 1
+            self.invalidaciones += 1
+
+    def estadisticas(self) -> Dict:
+        """Contadores de uso de la caché."""
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "ttl_segundos": self.ttl_segundos,
+                "entradas": len(self._valores),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "invalidaciones": self.invalidaciones,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            }
+
+    def reiniciar(self) -> None:
+        """Vaciar la caché y poner los contadores en cero."""
+        with self._candado:
+            self._valores.clear()
+            self._generacion += 1
+            self.aciertos = 0
+            self.fallos = 0
+            self.invalidaciones = 0
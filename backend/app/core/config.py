@@ -10,6 +10,23 @@ class Settings(BaseSettings):
     app_name: str = Field("Coopeenortol API", env="APP_NAME")
     app_version: str = Field("0.1.0", env="APP_VERSION")
     database_url: str = Field("sqlite:///backend/data/coopeenortol.db", env="DATABASE_URL")
+    # Réplica de lectura para reportes, dashboard y estadísticas (vacío: se usa la principal)
+    database_url_replica: str = Field("", env="DATABASE_URL_REPLICA")
+
+    # Pool de conexiones (no aplica a SQLite en memoria)
+    db_pool_tamano: int = Field(10, env="DB_POOL_TAMANO")
+    db_pool_desborde: int = Field(20, env="DB_POOL_DESBORDE")
+    db_pool_espera_segundos: int = Field(30, env="DB_POOL_ESPERA_SEGUNDOS")
+    # Reciclar y verificar conexiones solo en motores de servidor (PostgreSQL)
+    db_pool_reciclar_segundos: int = Field(1800, env="DB_POOL_RECICLAR_SEGUNDOS")
+    # Tiempo máximo de cada sentencia en PostgreSQL (0 sin límite)
+    db_timeout_sentencias_ms: int = Field(30000, env="DB_TIMEOUT_SENTENCIAS_MS")
+    # PRAGMAs de SQLite aplicados a cada conexión
+    sqlite_wal: bool = Field(True, env="SQLITE_WAL")
+    sqlite_synchronous: str = Field("NORMAL", env="SQLITE_SYNCHRONOUS", regex="^(OFF|NORMAL|FULL|EXTRA)$")
+    sqlite_busy_timeout_ms: int = Field(5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_cache_mb: int = Field(64, env="SQLITE_CACHE_MB")
+    sqlite_mmap_mb: int = Field(256, env="SQLITE_MMAP_MB")
     backend_cors_origins: str = Field("", env="BACKEND_CORS_ORIGINS")
     
     # Configuración de seguridad
@@ -26,6 +43,49 @@ class Settings(BaseSettings):
     # Configuración de archivos
     max_file_size_mb: int = Field(10, env="MAX_FILE_SIZE_MB")
     allowed_file_types: str = Field("pdf,doc,docx,jpg,jpeg,png", env="ALLOWED_FILE_TYPES")
+    
+    # Cola de reportes en segundo plano (0 workers deshabilita el procesamiento)
+    reportes_workers: int = Field(2, env="REPORTES_WORKERS")
+    reportes_dir: str = Field("data/reportes", env="REPORTES_DIR")
+    reportes_ttl_horas: int = Field(24, env="REPORTES_TTL_HORAS")
+    # Procesos de renderizado de los certificados masivos dentro de un worker de la cola (1: en el mismo proceso)
+    reportes_certificados_workers: int = Field(1, env="REPORTES_CERTIFICADOS_WORKERS", ge=1)
+
+    # Caché de KPIs del dashboard (0 la deshabilita)
+    dashboard_cache_ttl_segundos: int = Field(60, env="DASHBOARD_CACHE_TTL_SEGUNDOS")
+
+    # Cargar el directorio de asociados al iniciar (si no, se carga en el primer uso)
+    directorio_asociados_precargar: bool = Field(True, env="DIRECTORIO_ASOCIADOS_PRECARGAR")
+
+    # Auditoría escrita en segundo plano por lotes (False la escribe en la sesión de cada petición)
+    auditoria_asincrona: bool = Field(True, env="AUDITORIA_ASINCRONA")
+    auditoria_cola_capacidad: int = Field(10000, env="AUDITORIA_COLA_CAPACIDAD")
+    auditoria_tamano_lote: int = Field(500, env="AUDITORIA_TAMANO_LOTE")
+    auditoria_intervalo_segundos: float = Field(1.0, env="AUDITORIA_INTERVALO_SEGUNDOS")
+    # Qué hacer con un registro si la cola está llena: bloquear (y luego escribirlo en la petición), descartar o sincrono
+    auditoria_cola_llena: str = Field(
+        "bloquear", env="AUDITORIA_COLA_LLENA", regex="^(bloquear|descartar|sincrono)$"
+    )
+    # Archivo de meses cerrados: cuántos meses (incluido el actual) quedan en la tabla
+    auditoria_meses_en_linea: int = Field(3, env="AUDITORIA_MESES_EN_LINEA")
+    auditoria_archivo_dir: str = Field("data/auditoria", env="AUDITORIA_ARCHIVO_DIR")
+
+    # Métricas por ruta en /metrics (solo superusuarios o quien presente METRICAS_TOKEN)
+    instrumentacion_habilitada: bool = Field(True, env="INSTRUMENTACION_HABILITADA")
+    metricas_token: str = Field("", env="METRICAS_TOKEN")
+    # Encabezado Server-Timing en cada respuesta; expone tiempos internos, solo para depuración
+    instrumentacion_server_timing: bool = Field(False, env="INSTRUMENTACION_SERVER_TIMING")
+    # Consultas SQL por petición a partir de las cuales se registra un posible N+1 (0 lo desactiva)
+    instrumentacion_umbral_consultas: int = Field(30, env="INSTRUMENTACION_UMBRAL_CONSULTAS")
+
+    # Perfilado estadístico bajo demanda (X-Perfilar, solo superusuarios); deshabilitado no tiene costo
+    perfilador_habilitado: bool = Field(False, env="PERFILADOR_HABILITADO")
+    perfilador_intervalo_ms: float = Field(10.0, env="PERFILADOR_INTERVALO_MS")
+    perfilador_ventana_segundos: int = Field(300, env="PERFILADOR_VENTANA_SEGUNDOS")
+    perfilador_dir: str = Field("data/perfiles", env="PERFILADOR_DIR")
+    # Muestreo continuo: perfiles de las peticiones que superan el umbral (0 lo desactiva)
+    perfilador_lentas_umbral_ms: int = Field(0, env="PERFILADOR_LENTAS_UMBRAL_MS")
+    perfilador_lentas_por_ruta: int = Field(3, env="PERFILADOR_LENTAS_POR_RUTA")
 
     @property
     def cors_origins(self) -> List[str]:
@@ -0,0 +1,309 @@
+"""
+Instrumentación por petición: latencia por ruta y consultas SQL.
+
+`MiddlewareInstrumentacion` mide cada petición HTTP y, con los listeners de
+SQLAlchemy que instala `instrumentar_consultas`, cuenta las sentencias SQL
+que generó y el tiempo que pasó en la base de datos. Los acumulados por ruta
+se publican en `/metrics` en el formato de texto de Prometheus; con
+`INSTRUMENTACION_SERVER_TIMING` cada respuesta lleva además un encabezado
+`Server-Timing` (db, app y total) para depurar desde el navegador.
+
+`/metrics` exige `autorizar_metricas`: un superusuario o el token de
+`METRICAS_TOKEN` (el que se configura en Prometheus como bearer token).
+
+Las peticiones que superan `INSTRUMENTACION_UMBRAL_CONSULTAS` sentencias se
+registran en el log junto con la sentencia más repetida: casi siempre es un
+N+1 (una consulta por cada fila de un listado).
+
+`exportar_pools` agrega a `/metrics` el estado de los pools de conexiones.
+"""
+import logging
+import secrets
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+from app.core.deps import get_current_superuser, get_current_user
+from app.database import estadisticas_pool, get_db
+
+logger = logging.getLogger(__name__)
+
+# Límites en segundos de los buckets del histograma de latencia
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Etiqueta de las peticiones que no corresponden a ninguna ruta (404)
+RUTA_DESCONOCIDA = "sin_ruta"
+
+_INICIOS = "instrumentacion_inicios"
+
+
+class MedicionPeticion:
+    """Consultas SQL y tiempo en base de datos de una petición."""
+    __slots__ = ("consultas", "segundos_db", "sentencias")
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos_db = 0.0
+        self.sentencias: Counter = Counter()
+
+    def sentencia_mas_repetida(self) -> Optional[Tuple[str, int]]:
+        comunes = self.sentencias.most_common(1)
+        return comunes[0] if comunes else None
+
+
+# La petición en curso; los hilos del threadpool de FastAPI heredan el contexto
+_medicion: ContextVar[Optional[MedicionPeticion]] = ContextVar("medicion_peticion", default=None)
+
+
+def medicion_actual() -> Optional[MedicionPeticion]:
+    """Medición de la petición en curso, o None fuera de una petición."""
+    return _medicion.get()
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if _medicion.get() is not None:
+        conn.info.setdefault(_INICIOS, []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    medicion = _medicion.get()
+    inicios = conn.info.get(_INICIOS)
+    if medicion is None or not inicios:
+        return
+    medicion.segundos_db += time.perf_counter() - inicios.pop()
+    medicion.consultas += 1
+    medicion.sentencias[statement] += 1
+
+
+def _al_fallar(contexto):
+    # Una sentencia que falla no llega a after_cursor_execute
+    conexion = contexto.connection
+    if conexion is not None and conexion.info.get(_INICIOS):
+        conexion.info[_INICIOS].pop()
+
+
+def instrumentar_consultas(motor=Engine):
+    """
+    Contar las sentencias SQL de cada petición (idempotente).
+
+    Por defecto escucha todos los motores, incluidos los de réplicas o
+    pruebas; fuera de una petición instrumentada los listeners no hacen nada.
+    """
+    if event.contains(motor, "before_cursor_execute", _antes_de_ejecutar):
+        return
+    event.listen(motor, "before_cursor_execute", _antes_de_ejecutar)
+    event.listen(motor, "after_cursor_execute", _despues_de_ejecutar)
+    event.listen(motor, "handle_error", _al_fallar)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(**valores) -> str:
+    return "{" + ",".join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in valores.items()) + "}"
+
+
+class _MetricaRuta:
+    __slots__ = ("buckets", "cantidad", "segundos", "consultas", "segundos_db", "excesos")
+
+    def __init__(self, cantidad_buckets: int):
+        self.buckets = [0] * cantidad_buckets
+        self.cantidad = 0
+        self.segundos = 0.0
+        self.consultas = 0
+        self.segundos_db = 0.0
+        self.excesos = 0
+
+
+class MetricasRutas:
+    """Acumulados por (método, ruta, estado) exportables en formato Prometheus."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS_LATENCIA):
+        self.buckets = buckets
+        self._rutas: Dict[Tuple[str, str, int], _MetricaRuta] = {}
+        self._lock = threading.Lock()
+
+    def registrar(
+        self,
+        metodo: str,
+        ruta: str,
+        estado: int,
+        segundos: float,
+        consultas: int = 0,
+        segundos_db: float = 0.0,
+        excede_umbral: bool = False
+    ):
+        """Sumar una petición terminada."""
+        with self._lock:
+            metrica = self._rutas.get((metodo, ruta, estado))
+            if metrica is None:
+                metrica = self._rutas[(metodo, ruta, estado)] = _MetricaRuta(len(self.buckets) + 1)
+            metrica.buckets[bisect_left(self.buckets, segundos)] += 1
+            metrica.cantidad += 1
+            metrica.segundos += segundos
+            metrica.consultas += consultas
+            metrica.segundos_db += segundos_db
+            metrica.excesos += excede_umbral
+
+    def reiniciar(self):
+        """Descartar lo acumulado."""
+        with self._lock:
+            self._rutas.clear()
+
+    def exportar(self) -> str:
+        """Métricas en el formato de texto de exposición de Prometheus."""
+        with self._lock:
+            rutas = sorted(
+                (llave, metrica.buckets[:], metrica.cantidad, metrica.segundos,
+                 metrica.consultas, metrica.segundos_db, metrica.excesos)
+                for llave, metrica in self._rutas.items()
+            )
+
+        lineas: List[str] = [
+            "# HELP http_request_duration_seconds Duración de las peticiones HTTP por ruta.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (metodo, ruta, estado), buckets, cantidad, segundos, *_ in rutas:
+            acumulado = 0
+            for limite, en_bucket in zip(self.buckets, buckets):
+                acumulado += en_bucket
+                etiquetas = _etiquetas(method=metodo, route=ruta, status=estado, le=limite)
+                lineas.append(f"http_request_duration_seconds_bucket{etiquetas} {acumulado}")
+            etiquetas = _etiquetas(method=metodo, route=ruta, status=estado, le="+Inf")
+            lineas.append(f"http_request_duration_seconds_bucket{etiquetas} {cantidad}")
+            etiquetas = _etiquetas(method=metodo, route=ruta, status=estado)
+            lineas.append(f"http_request_duration_seconds_sum{etiquetas} {segundos}")
+            lineas.append(f"http_request_duration_seconds_count{etiquetas} {cantidad}")
+
+        contadores = (
+            ("http_db_queries_total", "Sentencias SQL ejecutadas por las peticiones.", 4),
+            ("http_db_duration_seconds_total", "Tiempo en base de datos de las peticiones.", 5),
+            ("http_requests_over_query_threshold_total",
+             "Peticiones que superaron el umbral de consultas (posible N+1).", 6),
+        )
+        for nombre, ayuda, indice in contadores:
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} counter")
+            for fila in rutas:
+                metodo, ruta, estado = fila[0]
+                lineas.append(f"{nombre}{_etiquetas(method=metodo, route=ruta, status=estado)} {fila[indice]}")
+        return "\n".join(lineas) + "\n"
+
+
+metricas = MetricasRutas()
+
+# Métrica de Prometheus por cada valor de `estadisticas_pool`
+_METRICAS_POOL = (
+    ("db_pool_size", "Conexiones que el pool mantiene abiertas.", "tamano"),
+    ("db_pool_checked_out", "Conexiones del pool en uso.", "en_uso"),
+    ("db_pool_checked_in", "Conexiones del pool disponibles.", "disponibles"),
+    ("db_pool_overflow", "Conexiones abiertas por encima del tamaño del pool.", "desborde"),
+)
+
+
+def exportar_pools(motores: Dict[str, Engine]) -> str:
+    """Estado de los pools de conexiones, con el nombre de cada motor como etiqueta."""
+    estadisticas = {nombre: estadisticas_pool(motor) for nombre, motor in motores.items()}
+    lineas: List[str] = []
+    for nombre_metrica, ayuda, llave in _METRICAS_POOL:
+        lineas.append(f"# HELP {nombre_metrica} {ayuda}")
+        lineas.append(f"# TYPE {nombre_metrica} gauge")
+        for nombre, valores in estadisticas.items():
+            if valores:
+                lineas.append(f"{nombre_metrica}{_etiquetas(pool=nombre)} {valores[llave]}")
+    return "\n".join(lineas) + "\n"
+
+
+def autorizar_metricas(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: Session = Depends(get_db)
+):
+    """
+    Dependencia de `/metrics`: acepta el token de `METRICAS_TOKEN` o un superusuario.
+
+    Cualquier otra petición falla con 401/403.
+    """
+    token = settings.metricas_token
+    if credentials is not None and token and secrets.compare_digest(
+        credentials.credentials.encode(), token.encode()
+    ):
+        return
+    get_current_superuser(get_current_user(credentials, db))
+
+
+class MiddlewareInstrumentacion:
+    """
+    Middleware ASGI que mide cada petición HTTP.
+
+    Acumula la petición en `metricas` bajo la plantilla de su ruta (p. ej.
+    `/api/v1/asociados/{asociado_id}`), registra en el log las que superan
+    `umbral_consultas` (0 lo desactiva) y, con `server_timing`, agrega el
+    encabezado `Server-Timing` a la respuesta.
+    """
+
+    def __init__(
+        self,
+        app,
+        metricas_rutas: Optional[MetricasRutas] = None,
+        umbral_consultas: int = 0,
+        server_timing: bool = False
+    ):
+        self.app = app
+        self.metricas = metricas_rutas if metricas_rutas is not None else metricas
+        self.umbral_consultas = umbral_consultas
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicion = MedicionPeticion()
+        token = _medicion.set(medicion)
+        inicio = time.perf_counter()
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            if mensaje["type"] == "http.response.start" and self.server_timing:
+                total = (time.perf_counter() - inicio) * 1000
+                db = medicion.segundos_db * 1000
+                MutableHeaders(scope=mensaje).append(
+                    "Server-Timing",
+                    f'db;dur={db:.1f};desc="{medicion.consultas} consultas", '
+                    f"app;dur={max(total - db, 0):.1f}, total;dur={total:.1f}"
+                )
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _medicion.reset(token)
+            segundos = time.perf_counter() - inicio
+            ruta = scope["route"].path if "route" in scope else RUTA_DESCONOCIDA
+            excede = bool(self.umbral_consultas) and medicion.consultas > self.umbral_consultas
+            self.metricas.registrar(
+                scope["method"], ruta, estado, segundos, medicion.consultas, medicion.segundos_db, excede
+            )
+            if excede:
+                sentencia, repeticiones = medicion.sentencia_mas_repetida()
+                logger.warning(
+                    "%s %s ejecutó %s consultas (umbral %s, %.0f ms en base de datos); "
+                    "la más repetida (%s veces): %s",
+                    scope["method"], ruta, medicion.consultas, self.umbral_consultas,
+                    medicion.segundos_db * 1000, repeticiones, " ".join(sentencia.split())[:300]
+                )
@@ -0,0 +1,165 @@
+"""
+Paginación por llave (keyset) compartida por los listados.
+
+En lugar de OFFSET/LIMIT, cada página continúa desde la llave de orden de la
+última fila de la anterior: `WHERE (orden, id) < (:valor, :id)`. El costo de
+una página no depende de qué tan profunda sea y no requiere contar el total.
+
+El cursor es opaco para el cliente: codifica las columnas de orden, la
+dirección y los valores de la última fila entregada.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from fastapi import Query
+from sqlalchemy import func, literal, tuple_
+from sqlalchemy.orm import Query as ConsultaORM
+
+# Con total "estimado" se cuenta hasta este número de filas
+LIMITE_CONTEO_ESTIMADO = 10000
+
+MODOS_TOTAL = ("exacto", "estimado")
+
+
+class PaginaCursor(NamedTuple):
+    """Una página de resultados paginados por llave."""
+    items: List[Any]
+    siguiente_cursor: Optional[str]
+    total: Optional[int]
+    # False si `total` es la cota de LIMITE_CONTEO_ESTIMADO y hay más filas
+    total_exacto: bool
+
+
+class ParametrosCursor:
+    """
+    Parámetros de consulta para activar la paginación por cursor (dependencia de FastAPI).
+
+    La paginación por cursor es opcional: se activa con `paginacion=cursor` o
+    al enviar un `cursor`; sin ellos los listados siguen usando skip/limit.
+    """
+
+    def __init__(
+        self,
+        paginacion: str = Query("offset", pattern="^(offset|cursor)$", description="offset (skip/limit) o cursor"),
+        cursor: Optional[str] = Query(None, description="siguiente_cursor de la página anterior"),
+        total: Optional[str] = Query(
+            None, pattern="^(exacto|estimado)$",
+            description="Con paginación por cursor: incluir el total exacto o estimado"
+        ),
+    ):
+        self.cursor = cursor
+        self.total = total
+        self.activa = paginacion == "cursor" or cursor is not None
+
+
+def _serializar(valor: Any) -> Any:
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+def _deserializar(columna, valor: Any) -> Any:
+    tipo = columna.type.python_type
+    if tipo in (date, datetime):
+        return tipo.fromisoformat(valor)
+    return tipo(valor)
+
+
+def codificar_cursor(columnas: Sequence, descendente: bool, item: Any) -> str:
+    """Cursor que apunta a la fila `item` para el orden dado."""
+    contenido = {
+        "o": [columna.key for columna in columnas],
+        "d": descendente,
+        "v": [_serializar(getattr(item, columna.key)) for columna in columnas],
+    }
+    return base64.urlsafe_b64encode(json.dumps(contenido, separators=(",", ":")).encode()).decode()
+
+
+def decodificar_cursor(cursor: str, columnas: Sequence, descendente: bool) -> list:
+    """
+    Valores de la llave de orden guardados en el cursor.
+
+    Raises:
+        ValueError: Si el cursor está malformado o corresponde a otro orden.
+    """
+    try:
+        contenido = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if contenido["o"] != [columna.key for columna in columnas] or contenido["d"] != descendente:
+            raise ValueError
+        return [_deserializar(columna, valor) for columna, valor in zip(columnas, contenido["v"], strict=True)]
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Cursor de paginación inválido")
+
+
+def contar(consulta: ConsultaORM, modo: Optional[str]) -> tuple:
+    """
+    Total de filas de la consulta según el modo.
+
+    Returns:
+        (total, es_exacto); total es None si no se pidió.
+    """
+    if modo is None:
+        return None, True
+    consulta = consulta.order_by(None)
+    if modo == "exacto":
+        return consulta.count(), True
+
+    acotada = consulta.limit(LIMITE_CONTEO_ESTIMADO + 1).subquery()
+    total = consulta.session.query(func.count()).select_from(acotada).scalar()
+    if total > LIMITE_CONTEO_ESTIMADO:
+        return LIMITE_CONTEO_ESTIMADO, False
+    return total, True
+
+
+def paginar_por_cursor(
+    consulta: ConsultaORM,
+    columnas: Sequence,
+    limite: int,
+    cursor: Optional[str] = None,
+    descendente: bool = True,
+    total: Optional[str] = None
+) -> PaginaCursor:
+    """
+    Obtener una página de `consulta` ordenada por `columnas`.
+
+    Args:
+        consulta: Consulta ORM ya filtrada y sin ORDER BY
+        columnas: Columnas de orden; la última debe ser única (normalmente el id)
+        limite: Filas por página
+        cursor: `siguiente_cursor` de la página anterior (None = primera página)
+        descendente: Dirección del orden, la misma para todas las columnas
+        total: None, "exacto" o "estimado" (cuenta hasta LIMITE_CONTEO_ESTIMADO)
+
+    Raises:
+        ValueError: Si el cursor o el modo de total no son válidos.
+    """
+    if total is not None and total not in MODOS_TOTAL:
+        raise ValueError(f"Modo de total '{total}' no soportado. Use uno de: {', '.join(MODOS_TOTAL)}")
+    # Las comparaciones de tuplas no ordenan los nulos
+    if any(columna.expression.nullable for columna in columnas):
+        raise ValueError("La paginación por cursor requiere ordenar por columnas sin valores nulos")
+
+    conteo, total_exacto = contar(consulta, total)
+
+    if cursor:
+        llave = tuple_(*columnas)
+        valores = tuple_(*[
+            literal(valor, columna.type)
+            for columna, valor in zip(columnas, decodificar_cursor(cursor, columnas, descendente))
+        ])
+        consulta = consulta.filter(llave < valores if descendente else llave > valores)
+
+    orden = [columna.desc() if descendente else columna.asc() for columna in columnas]
+    filas = consulta.order_by(*orden).limit(limite + 1).all()
+
+    items = filas[:limite]
+    siguiente = codificar_cursor(columnas, descendente, items[-1]) if len(filas) > limite else None
+    return PaginaCursor(items, siguiente, conteo, total_exacto)
@@ -0,0 +1,320 @@
+"""
+Perfilado estadístico de peticiones en vivo.
+
+Con `PERFILADOR_HABILITADO`, un superusuario puede pedir el perfil de una
+petición agregando `X-Perfilar: 1` o `?perfilar=1`. Mientras la petición
+corre, un hilo toma muestras de las pilas de todos los hilos ocupados cada
+`PERFILADOR_INTERVALO_MS`. Al terminar, el perfil se guarda en
+`PERFILADOR_DIR` en formato de pilas plegadas (una línea
+`hilo;marco;...;marco cantidad` por pila), que leen flamegraph.pl y
+speedscope. El nombre del archivo viaja en el encabezado `X-Perfil` y se
+descarga en `/api/v1/perfiles/{nombre}`.
+
+Con `PERFILADOR_LENTAS_UMBRAL_MS` el muestreo es continuo y se conservan en
+disco los perfiles de las `PERFILADOR_LENTAS_POR_RUTA` peticiones más lentas
+de cada ruta que superaron el umbral.
+
+Las muestras son de todo el proceso: una petición concurrente aparece en el
+mismo perfil (bajo el nombre de su hilo). Los hilos en espera (colas, locks,
+el event loop sin trabajo) se omiten. Deshabilitado no se registra ni el
+middleware ni la dependencia, y no corre ningún hilo.
+"""
+import heapq
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from fastapi import Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+from app.core.deps import get_current_superuser, get_current_user
+from app.database import get_db
+
+logger = logging.getLogger(__name__)
+
+ENCABEZADO_PERFILAR = b"x-perfilar"
+ENCABEZADO_PERFIL = "X-Perfil"
+EXTENSION = ".folded"
+PATRON_NOMBRE = re.compile(r"^[\w.-]+\.folded$")
+
+# Marcos hoja de un hilo que espera sin consumir CPU
+_MARCOS_INACTIVOS = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+
+def _ubicacion(marco) -> str:
+    codigo = marco.f_code
+    archivo = "/".join(Path(codigo.co_filename).parts[-2:])
+    return f"{codigo.co_name} ({archivo}:{marco.f_lineno})"
+
+
+def plegar_pila(hilo: str, marco) -> Optional[str]:
+    """Pila de un hilo, de la raíz a la hoja, separada por `;`; None si el hilo está en espera."""
+    if (os.path.basename(marco.f_code.co_filename), marco.f_code.co_name) in _MARCOS_INACTIVOS:
+        return None
+    ubicaciones = []
+    while marco is not None:
+        ubicaciones.append(_ubicacion(marco))
+        marco = marco.f_back
+    ubicaciones.append(hilo.replace(";", ":"))
+    return ";".join(reversed(ubicaciones))
+
+
+class Muestreador:
+    """
+    Hilo que toma muestras de las pilas del proceso mientras alguien lo use.
+
+    Conserva las muestras de los últimos `ventana` segundos para extraer
+    después las del intervalo de cada petición.
+    """
+
+    def __init__(self, intervalo: float = 0.005, ventana: float = 300.0):
+        self.intervalo = intervalo
+        self._muestras: Deque[Tuple[float, List[str]]] = deque(maxlen=max(int(ventana / intervalo), 1))
+        self._lock = threading.Lock()
+        self._usos = 0
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+
+    @property
+    def activo(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def adquirir(self):
+        """Empezar a muestrear (o seguir, si otro ya lo está usando)."""
+        with self._lock:
+            self._usos += 1
+            if self._hilo is None:
+                self._detener.clear()
+                self._hilo = threading.Thread(target=self._ejecutar, name="perfilador", daemon=True)
+                self._hilo.start()
+
+    def liberar(self):
+        """Dejar de usarlo; el hilo se detiene cuando nadie más lo usa."""
+        with self._lock:
+            self._usos = max(self._usos - 1, 0)
+            if self._usos or self._hilo is None:
+                return
+            hilo, self._hilo = self._hilo, None
+            self._detener.set()
+        hilo.join()
+        with self._lock:
+            if self._hilo is None:
+                self._muestras.clear()
+
+    def perfil(self, desde: float, hasta: float) -> Counter:
+        """Pilas plegadas muestreadas entre `desde` y `hasta` (reloj `perf_counter`)."""
+        with self._lock:
+            muestras = list(self._muestras)
+        pilas: Counter = Counter()
+        for instante, pilas_muestra in reversed(muestras):
+            if instante < desde:
+                break
+            if instante <= hasta:
+                pilas.update(pilas_muestra)
+        return pilas
+
+    def _ejecutar(self):
+        propio = threading.get_ident()
+        while not self._detener.wait(self.intervalo):
+            nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+            pilas = []
+            for ident, marco in sys._current_frames().items():
+                if ident == propio:
+                    continue
+                pila = plegar_pila(nombres.get(ident, str(ident)), marco)
+                if pila:
+                    # Las pilas se repiten entre muestras: se guarda una sola copia de cada una
+                    pilas.append(sys.intern(pila))
+            with self._lock:
+                self._muestras.append((time.perf_counter(), pilas))
+
+
+def escribir_perfil(ruta: Path, pilas: Counter):
+    """Guardar las pilas en formato plegado, de la más frecuente a la menos."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_suffix(".tmp")
+    temporal.write_text("".join(f"{pila} {cantidad}\n" for pila, cantidad in pilas.most_common()), encoding="utf-8")
+    os.replace(temporal, ruta)
+
+
+def nombre_perfil(tipo: str, metodo: str, ruta: str, milisegundos: Optional[float] = None) -> str:
+    """Nombre de archivo de un perfil: tipo, instante, método, ruta y duración."""
+    ruta = re.sub(r"[^A-Za-z0-9]+", "-", ruta).strip("-") or "raiz"
+    duracion = f"_{milisegundos:.0f}ms" if milisegundos is not None else ""
+    return f"{tipo}_{datetime.now():%Y%m%dT%H%M%S%f}_{metodo}_{ruta}{duracion}{EXTENSION}"
+
+
+class PeticionesLentas:
+    """Perfiles de las `por_ruta` peticiones más lentas de cada ruta."""
+
+    def __init__(self, directorio: Path, por_ruta: int):
+        self.directorio = directorio
+        self.por_ruta = por_ruta
+        self._rutas: Dict[Tuple[str, str], List[Tuple[float, str]]] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, metodo: str, ruta: str, milisegundos: float, pilas: Counter) -> Optional[Path]:
+        """Guardar el perfil si está entre las más lentas; borra el que desplaza."""
+        if not pilas:
+            return None
+        with self._lock:
+            lentas = self._rutas.setdefault((metodo, ruta), [])
+            if len(lentas) >= self.por_ruta and milisegundos <= lentas[0][0]:
+                return None
+            archivo = self.directorio / nombre_perfil("lenta", metodo, ruta, milisegundos)
+            escribir_perfil(archivo, pilas)
+            heapq.heappush(lentas, (milisegundos, str(archivo)))
+            if len(lentas) > self.por_ruta:
+                _, desplazado = heapq.heappop(lentas)
+                Path(desplazado).unlink(missing_ok=True)
+        return archivo
+
+
+class SolicitudPerfil:
+    """Perfil pedido para una petición; empieza cuando se autoriza."""
+    __slots__ = ("inicio", "nombre")
+
+    def __init__(self):
+        self.inicio: Optional[float] = None
+        self.nombre: Optional[str] = None
+
+    @property
+    def autorizada(self) -> bool:
+        return self.inicio is not None
+
+
+_solicitud: ContextVar[Optional[SolicitudPerfil]] = ContextVar("solicitud_perfil", default=None)
+
+muestreador = Muestreador(
+    intervalo=settings.perfilador_intervalo_ms / 1000,
+    ventana=settings.perfilador_ventana_segundos
+)
+
+
+def autorizar_perfil(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: Session = Depends(get_db)
+):
+    """
+    Dependencia de las rutas de la API que inicia el perfil pedido.
+
+    Solo un superusuario puede pedir un perfil; para cualquier otro la
+    petición falla con 401/403. Sin perfil pedido no hace nada.
+    """
+    solicitud = _solicitud.get()
+    if solicitud is None or solicitud.autorizada:
+        return
+    get_current_superuser(get_current_user(credentials, db))
+    muestreador.adquirir()
+    solicitud.inicio = time.perf_counter()
+
+
+def _pide_perfil(scope) -> bool:
+    for nombre, valor in scope["headers"]:
+        if nombre == ENCABEZADO_PERFILAR:
+            return valor.strip() not in (b"", b"0", b"false")
+    return re.search(rb"(^|&)perfilar=(1|true)(&|$)", scope.get("query_string", b"")) is not None
+
+
+class MiddlewarePerfilador:
+    """
+    Middleware ASGI que guarda los perfiles pedidos y los de peticiones lentas.
+
+    El muestreo continuo para las peticiones lentas se inicia en el arranque
+    de la aplicación (`muestreador.adquirir()`).
+    """
+
+    def __init__(
+        self,
+        app,
+        muestreador_pilas: Optional[Muestreador] = None,
+        directorio: Optional[str] = None,
+        umbral_lentas_ms: int = 0,
+        lentas_por_ruta: int = 3
+    ):
+        self.app = app
+        self.muestreador = muestreador_pilas or muestreador
+        self.directorio = Path(directorio or settings.perfilador_dir)
+        self.umbral_lentas_ms = umbral_lentas_ms
+        self.lentas = PeticionesLentas(self.directorio, lentas_por_ruta)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        solicitud = SolicitudPerfil() if _pide_perfil(scope) else None
+        if solicitud is None and not self.umbral_lentas_ms:
+            await self.app(scope, receive, send)
+            return
+
+        token = _solicitud.set(solicitud)
+        inicio = time.perf_counter()
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start" and solicitud and solicitud.autorizada:
+                solicitud.nombre = nombre_perfil(
+                    "pedido", scope["method"], scope["route"].path if "route" in scope else scope["path"]
+                )
+                MutableHeaders(scope=mensaje).append(ENCABEZADO_PERFIL, solicitud.nombre)
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _solicitud.reset(token)
+            fin = time.perf_counter()
+            ruta = scope["route"].path if "route" in scope else None
+            if solicitud and solicitud.autorizada:
+                try:
+                    pilas = self.muestreador.perfil(solicitud.inicio, fin)
+                    nombre = solicitud.nombre or nombre_perfil("pedido", scope["method"], scope["path"])
+                    await run_in_threadpool(escribir_perfil, self.directorio / nombre, pilas)
+                    logger.info("Perfil de %s %s guardado en %s", scope["method"], scope["path"], nombre)
+                finally:
+                    await run_in_threadpool(self.muestreador.liberar)
+            elif ruta and self.muestreador.activo and (fin - inicio) * 1000 >= self.umbral_lentas_ms:
+                pilas = self.muestreador.perfil(inicio, fin)
+                await run_in_threadpool(
+                    self.lentas.registrar, scope["method"], ruta, (fin - inicio) * 1000, pilas
+                )
+
+
+def listar_perfiles(directorio: Optional[str] = None) -> List[dict]:
+    """Perfiles guardados, del más reciente al más antiguo."""
+    directorio = Path(directorio or settings.perfilador_dir)
+    if not directorio.is_dir():
+        return []
+    archivos = sorted(directorio.glob(f"*{EXTENSION}"), key=lambda a: a.stat().st_mtime, reverse=True)
+    return [
+        {
+            "nombre": archivo.name,
+            "tamano_bytes": archivo.stat().st_size,
+            "fecha": datetime.fromtimestamp(archivo.stat().st_mtime),
+        }
+        for archivo in archivos
+    ]
+
+
+def ruta_perfil(nombre: str, directorio: Optional[str] = None) -> Optional[Path]:
+    """Ruta de un perfil guardado por su nombre, o None si no existe o el nombre no es válido."""
+    if not PATRON_NOMBRE.match(nombre):
+        return None
+    ruta = Path(directorio or settings.perfilador_dir) / nombre
+    return ruta if ruta.is_file() else None
@@ -0,0 +1,25 @@
+"""
+Normalización de texto para búsquedas.
+
+Las búsquedas comparan texto en minúsculas y sin tildes, de modo que
+"Garcia" encuentra a "García" y "NUÑEZ" a "Núñez".
+"""
+import re
+import unicodedata
+from typing import List, Optional
+
+_NO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """Texto en minúsculas, sin tildes y con un solo espacio entre palabras."""
+    if not texto:
+        return ""
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(_NO_ALFANUMERICO.split(sin_tildes)).strip()
+
+
+def tokens_busqueda(texto: Optional[str]) -> List[str]:
+    """Palabras normalizadas de un término de búsqueda."""
+    return normalizar_texto(texto).split()
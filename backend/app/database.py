@@ -1,13 +1,125 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from typing import Dict
 
-from .core.config import settings
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import ORMExecuteState, Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
-)
+from .core.config import Settings, settings
+
+
+def _es_sqlite_en_memoria(url) -> bool:
+    return url.database in (None, "", ":memory:") or url.database.startswith("file::memory:")
+
+
+def _configurar_sqlite(motor: Engine, config: Settings):
+    """Aplicar los PRAGMA de SQLite a cada conexión nueva del pool."""
+    pragmas = [
+        f"PRAGMA busy_timeout = {config.sqlite_busy_timeout_ms}",
+        # Negativo: tamaño en KiB en lugar de páginas
+        f"PRAGMA cache_size = -{config.sqlite_cache_mb * 1024}",
+        f"PRAGMA mmap_size = {config.sqlite_mmap_mb * 1024 * 1024}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if config.sqlite_wal and not _es_sqlite_en_memoria(motor.url):
+        # Con WAL los lectores no bloquean al escritor, y NORMAL solo hace fsync en los checkpoints
+        pragmas += ["PRAGMA journal_mode = WAL", f"PRAGMA synchronous = {config.sqlite_synchronous}"]
+
+    @event.listens_for(motor, "connect")
+    def _al_conectar(conexion_dbapi, registro):
+        cursor = conexion_dbapi.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def crear_motor(url: str = None, config: Settings = settings) -> Engine:
+    """
+    Crear un motor con el pool y los ajustes de `Settings`.
+
+    En PostgreSQL (y demás motores de servidor) el pool verifica las
+    conexiones antes de entregarlas, las recicla periódicamente y cada
+    sentencia tiene un tiempo máximo. En SQLite se activa WAL con
+    `synchronous` NORMAL, espera en lugar de fallar con "database is
+    locked" y usa caché y mmap más grandes; las bases en memoria conservan
+    el pool por defecto de SQLAlchemy.
+    """
+    url = make_url(url or config.database_url)
+    opciones = {}
+    connect_args = {}
+
+    if url.get_backend_name() == "sqlite":
+        connect_args["check_same_thread"] = False
+        if not _es_sqlite_en_memoria(url):
+            opciones.update(
+                poolclass=QueuePool,
+                pool_size=config.db_pool_tamano,
+                max_overflow=config.db_pool_desborde,
+                pool_timeout=config.db_pool_espera_segundos,
+            )
+    else:
+        opciones.update(
+            pool_size=config.db_pool_tamano,
+            max_overflow=config.db_pool_desborde,
+            pool_timeout=config.db_pool_espera_segundos,
+            pool_recycle=config.db_pool_reciclar_segundos,
+            pool_pre_ping=True,
+        )
+        if url.get_backend_name() == "postgresql" and config.db_timeout_sentencias_ms:
+            connect_args["options"] = f"-c statement_timeout={config.db_timeout_sentencias_ms}"
+
+    motor = create_engine(url, connect_args=connect_args, **opciones)
+    if url.get_backend_name() == "sqlite":
+        _configurar_sqlite(motor, config)
+    return motor
+
+
+def estadisticas_pool(motor: Engine) -> Dict[str, int]:
+    """Conexiones del pool del motor; vacío si el pool no lleva la cuenta."""
+    pool = motor.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+    return {
+        "tamano": pool.size(),
+        "en_uso": pool.checkedout(),
+        "disponibles": pool.checkedin(),
+        "desborde": max(pool.overflow(), 0),
+    }
+
+
+def _rechazar_flush(session: Session, contexto, instancias):
+    if session.new or session.dirty or session.deleted:
+        raise RuntimeError("La sesión de solo lectura no puede escribir; use get_db")
+
+
+def _rechazar_dml(estado: ORMExecuteState):
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        raise RuntimeError("La sesión de solo lectura no puede escribir; use get_db")
+
+
+def crear_sesiones_lectura(url_replica: str, motor_principal: Engine) -> sessionmaker:
+    """
+    Fábrica de sesiones de solo lectura.
+
+    Con `url_replica` las sesiones van a la réplica con su propio pool; sin
+    ella usan el motor principal. En ambos casos rechazan los flush con
+    cambios y los INSERT/UPDATE/DELETE, para que un endpoint enrutado a la
+    réplica no escriba en la principal solo porque no hay réplica configurada.
+    """
+    motor = crear_motor(url_replica) if url_replica else motor_principal
+    fabrica = sessionmaker(autocommit=False, autoflush=False, bind=motor)
+    event.listen(fabrica, "before_flush", _rechazar_flush)
+    event.listen(fabrica, "do_orm_execute", _rechazar_dml)
+    return fabrica
+
+
+engine = crear_motor()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Reportes, dashboard y estadísticas leen de la réplica para no competir con las escrituras
+SessionLecturaLocal = crear_sesiones_lectura(settings.database_url_replica, engine)
+engine_lectura = SessionLecturaLocal.kw["bind"]
 Base = declarative_base()
 
 
@@ -17,3 +129,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_db_readonly():
+    """Sesión de solo lectura en la réplica (o en la base principal si no hay réplica)."""
+    db = SessionLecturaLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,15 +1,26 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, status
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
 import logging
 
 from app.api.v1.api import api_router
 from app.core.config import settings
-from app.database import Base, engine
+from app.core.instrumentacion import (
+    MiddlewareInstrumentacion,
+    autorizar_metricas,
+    exportar_pools,
+    instrumentar_consultas,
+    metricas,
+)
+from app.core.perfilador import MiddlewarePerfilador, autorizar_perfil, muestreador
+from app.database import Base, SessionLocal, engine, engine_lectura
+from app.services.directorio_asociados import directorio
+from app.services.escritor_auditoria import escritor as escritor_auditoria
+from app.services.trabajos_reporte import ColaReportes
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +31,32 @@ async def lifespan(app: FastAPI):
     # Startup
     Base.metadata.create_all(bind=engine)
     logger.info("Base de datos inicializada")
+    if settings.directorio_asociados_precargar:
+        db = SessionLocal()
+        try:
+            logger.info(f"Directorio de asociados cargado: {directorio.cargar(db)} asociados")
+        except Exception as e:
+            logger.error(f"No se pudo cargar el directorio de asociados, se cargará en el primer uso: {e}")
+        finally:
+            db.close()
+    cola_reportes = None
+    if settings.reportes_workers > 0:
+        cola_reportes = ColaReportes(settings.reportes_workers)
+        cola_reportes.iniciar()
+    if settings.auditoria_asincrona:
+        escritor_auditoria.iniciar()
+    # Muestreo continuo para guardar los perfiles de las peticiones lentas
+    muestreo_continuo = settings.perfilador_habilitado and settings.perfilador_lentas_umbral_ms > 0
+    if muestreo_continuo:
+        muestreador.adquirir()
     yield
-    # Shutdown (si se necesita limpieza)
+    # Shutdown
+    if cola_reportes:
+        cola_reportes.detener()
+    # Escribir la auditoría pendiente antes de salir
+    escritor_auditoria.detener()
+    if muestreo_continuo:
+        muestreador.liberar()
     logger.info("Cerrando aplicación")
 
 
@@ -41,6 +76,22 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if settings.perfilador_habilitado:
+        app.add_middleware(
+            MiddlewarePerfilador,
+            umbral_lentas_ms=settings.perfilador_lentas_umbral_ms,
+            lentas_por_ruta=settings.perfilador_lentas_por_ruta
+        )
+
+    # Registrada al final para quedar por fuera: mide también el resto de middlewares
+    if settings.instrumentacion_habilitada:
+        instrumentar_consultas()
+        app.add_middleware(
+            MiddlewareInstrumentacion,
+            umbral_consultas=settings.instrumentacion_umbral_consultas,
+            server_timing=settings.instrumentacion_server_timing
+        )
+
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
         logger.error(f"Error de validación en {request.method} {request.url.path}")
@@ -54,7 +105,12 @@ def create_app() -> FastAPI:
             }
         )
 
-    app.include_router(api_router, prefix="/api/v1")
+    # La dependencia del perfilador verifica que quien pide un perfil sea superusuario
+    app.include_router(
+        api_router,
+        prefix="/api/v1",
+        dependencies=[Depends(autorizar_perfil)] if settings.perfilador_habilitado else None
+    )
     
     # Servir archivos estáticos (fotos de asociados)
     app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -63,6 +119,23 @@ def create_app() -> FastAPI:
     def healthcheck() -> dict[str, str]:
         return {"estado": "ok", "aplicacion": settings.app_name, "version": settings.app_version}
 
+    if settings.instrumentacion_habilitada:
+        motores = {"principal": engine}
+        if engine_lectura is not engine:
+            motores["replica"] = engine_lectura
+
+        @app.get(
+            "/metrics",
+            tags=["Sistema"],
+            include_in_schema=False,
+            dependencies=[Depends(autorizar_metricas)]
+        )
+        def exportar_metricas() -> PlainTextResponse:
+            return PlainTextResponse(
+                metricas.exportar() + exportar_pools(motores),
+                media_type="text/plain; version=0.0.4"
+            )
+
     return app
 
 
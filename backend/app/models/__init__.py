@@ -1,25 +1,33 @@
 from .asociado import Asociado
 from .usuario import Usuario
-from .auditoria import RegistroAuditoria
+from .auditoria import ArchivoAuditoria, RegistroAuditoria
 from .documento import Documento
-from .contabilidad import CuentaContable, AsientoContable, MovimientoContable, Aporte
+from .contabilidad import CuentaContable, AsientoContable, MovimientoContable, Aporte, SaldoMensual
 from .credito import Credito, Cuota, Pago, AbonoCuota
 from .ahorro import CuentaAhorro, MovimientoAhorro, ConfiguracionAhorro
+from .consecutivo import Consecutivo
+from .trabajo_reporte import TrabajoReporte
+from .estadistica_mensual import EstadisticaMensual
 
 __all__ = [
     "Asociado", 
     "Usuario", 
     "RegistroAuditoria", 
+    "ArchivoAuditoria",
     "Documento",
     "CuentaContable",
     "AsientoContable",
     "MovimientoContable",
     "Aporte",
+    "SaldoMensual",
     "Credito",
     "Cuota",
     "Pago",
     "AbonoCuota",
     "CuentaAhorro",
     "MovimientoAhorro",
-    "ConfiguracionAhorro"
+    "ConfiguracionAhorro",
+    "Consecutivo",
+    "TrabajoReporte",
+    "EstadisticaMensual"
 ]
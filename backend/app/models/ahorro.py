@@ -11,6 +11,7 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -54,6 +55,10 @@ class TipoMovimientoAhorro(str, Enum):
 class CuentaAhorro(Base):
     """Modelo para cuentas de ahorro."""
     __tablename__ = "cuentas_ahorro"
+    __table_args__ = (
+        # Paginación por cursor del listado
+        Index("ix_cuentas_ahorro_fecha_apertura_id", "fecha_apertura", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     numero_cuenta = Column(String(20), unique=True, nullable=False, index=True)
@@ -115,6 +120,12 @@ class CuentaAhorro(Base):
 class MovimientoAhorro(Base):
     """Modelo para movimientos de cuentas de ahorro."""
     __tablename__ = "movimientos_ahorro"
+    __table_args__ = (
+        # Último movimiento de un tipo por cuenta (ej: último interés liquidado)
+        Index("ix_movimientos_ahorro_cuenta_tipo_fecha", "cuenta_id", "tipo_movimiento", "fecha_movimiento"),
+        # Feed de actividad del dashboard paginado por (fecha, id)
+        Index("ix_movimientos_ahorro_fecha_id", "fecha_movimiento", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     numero_movimiento = Column(String(30), unique=True, nullable=False, index=True)
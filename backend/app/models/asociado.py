@@ -1,14 +1,55 @@
 import json
 from datetime import date, datetime
-from typing import Any
+from decimal import Decimal, InvalidOperation
+from typing import Any, Optional
 
-from sqlalchemy import Column, Date, DateTime, Integer, String, Text
+from sqlalchemy import DDL, Column, Date, DateTime, Index, Integer, Numeric, String, Text, event, inspect
 from sqlalchemy.ext.mutable import MutableDict
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.types import TEXT, TypeDecorator
 
+from app.core.texto import normalizar_texto
 from app.database import Base
 
+# Grupo de columnas JSON que no se cargan con el asociado: los listados nunca
+# las deserializan. Usar `undefer_group(GRUPO_DATOS_JSON)` al consultar asociados
+# cuyo detalle completo se va a devolver.
+GRUPO_DATOS_JSON = "datos_json"
+
+# Índice de texto completo de SQLite para la búsqueda de asociados. Tabla FTS5
+# con contenido externo (las columnas existen en `asociados`) sincronizada por
+# triggers; el tokenizador ignora mayúsculas y tildes en correo y documento.
+DDL_BUSQUEDA_SQLITE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS asociados_fts USING fts5(
+        nombre_busqueda, numero_documento, correo_electronico,
+        content='asociados', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS asociados_fts_ai AFTER INSERT ON asociados BEGIN
+        INSERT INTO asociados_fts(rowid, nombre_busqueda, numero_documento, correo_electronico)
+        VALUES (new.id, new.nombre_busqueda, new.numero_documento, new.correo_electronico);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS asociados_fts_ad AFTER DELETE ON asociados BEGIN
+        INSERT INTO asociados_fts(asociados_fts, rowid, nombre_busqueda, numero_documento, correo_electronico)
+        VALUES ('delete', old.id, old.nombre_busqueda, old.numero_documento, old.correo_electronico);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS asociados_fts_au
+    AFTER UPDATE OF nombre_busqueda, numero_documento, correo_electronico ON asociados BEGIN
+        INSERT INTO asociados_fts(asociados_fts, rowid, nombre_busqueda, numero_documento, correo_electronico)
+        VALUES ('delete', old.id, old.nombre_busqueda, old.numero_documento, old.correo_electronico);
+        INSERT INTO asociados_fts(rowid, nombre_busqueda, numero_documento, correo_electronico)
+        VALUES (new.id, new.nombre_busqueda, new.numero_documento, new.correo_electronico);
+    END
+    """,
+]
+
 
 def _json_serializer(value: Any) -> Any:
     if isinstance(value, (datetime, date)):
@@ -33,25 +74,53 @@ class JSONEncodedDict(TypeDecorator):
 
 class Asociado(Base):
     __tablename__ = "asociados"
+    __table_args__ = (
+        # Feed de actividad del dashboard paginado por (fecha, id)
+        Index("ix_asociados_created_at_id", "created_at", "id"),
+        # Paginación por cursor del listado
+        Index("ix_asociados_fecha_ingreso_id", "fecha_ingreso", "id"),
+        # Búsqueda por subcadena del nombre en PostgreSQL (en SQLite se usa asociados_fts)
+        Index(
+            "ix_asociados_nombre_busqueda_trgm",
+            "nombre_busqueda",
+            postgresql_using="gin",
+            postgresql_ops={"nombre_busqueda": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tipo_documento = Column(String(10), nullable=False)
     numero_documento = Column(String(30), nullable=False, unique=True, index=True)
     nombres = Column(String(150), nullable=False)
     apellidos = Column(String(150), nullable=False)
+    # Nombres y apellidos normalizados (minúsculas, sin tildes); se calcula al guardar
+    nombre_busqueda = Column(String(300), nullable=False, default="", server_default="")
     correo_electronico = Column(String(200), nullable=False)
-    telefono_principal = Column(String(50), nullable=True)
+    telefono_principal = Column(String(50), nullable=True, index=True)
     estado = Column(String(30), nullable=False, default="activo")
     fecha_ingreso = Column(Date, nullable=False)
     hoja_vida_url = Column(String(500), nullable=True)
     foto_url = Column(String(500), nullable=True)
     observaciones = Column(Text, nullable=True)
-    datos_personales = Column(MutableDict.as_mutable(JSONEncodedDict), default=dict)
-    datos_laborales = Column(MutableDict.as_mutable(JSONEncodedDict), default=dict)
-    informacion_familiar = Column(MutableDict.as_mutable(JSONEncodedDict), default=dict)
-    informacion_financiera = Column(MutableDict.as_mutable(JSONEncodedDict), default=dict)
-    informacion_academica = Column(MutableDict.as_mutable(JSONEncodedDict), default=dict)
-    informacion_vivienda = Column(MutableDict.as_mutable(JSONEncodedDict), default=dict)
+    # Campos de los datos JSON que se consultan y filtran; se copian al guardar
+    ciudad = Column(String(100), nullable=True, index=True)
+    fecha_nacimiento = Column(Date, nullable=True, index=True)
+    empresa = Column(String(200), nullable=True, index=True)
+    salario_basico = Column(Numeric(15, 2), nullable=True, index=True)
+    datos_personales = deferred(Column(MutableDict.as_mutable(JSONEncodedDict), default=dict), group=GRUPO_DATOS_JSON)
+    datos_laborales = deferred(Column(MutableDict.as_mutable(JSONEncodedDict), default=dict), group=GRUPO_DATOS_JSON)
+    informacion_familiar = deferred(
+        Column(MutableDict.as_mutable(JSONEncodedDict), default=dict), group=GRUPO_DATOS_JSON
+    )
+    informacion_financiera = deferred(
+        Column(MutableDict.as_mutable(JSONEncodedDict), default=dict), group=GRUPO_DATOS_JSON
+    )
+    informacion_academica = deferred(
+        Column(MutableDict.as_mutable(JSONEncodedDict), default=dict), group=GRUPO_DATOS_JSON
+    )
+    informacion_vivienda = deferred(
+        Column(MutableDict.as_mutable(JSONEncodedDict), default=dict), group=GRUPO_DATOS_JSON
+    )
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(
         DateTime,
@@ -64,3 +133,58 @@ class Asociado(Base):
     documentos = relationship("Documento", back_populates="asociado")
     creditos = relationship("Credito", back_populates="asociado")
     cuentas_ahorro = relationship("CuentaAhorro", back_populates="asociado")
+
+
+def _como_fecha(valor: Any) -> Optional[date]:
+    if isinstance(valor, date):
+        return valor
+    try:
+        return date.fromisoformat(valor) if valor else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _como_decimal(valor: Any) -> Optional[Decimal]:
+    try:
+        return Decimal(str(valor)) if valor not in (None, "") else None
+    except InvalidOperation:
+        return None
+
+
+def campos_promovidos(datos_personales: Optional[dict], datos_laborales: Optional[dict]) -> dict:
+    """Valores de las columnas copiadas de los datos JSON."""
+    personales = datos_personales or {}
+    laborales = datos_laborales or {}
+    return {
+        "ciudad": personales.get("ciudad") or None,
+        "fecha_nacimiento": _como_fecha(personales.get("fecha_nacimiento")),
+        "empresa": laborales.get("empresa") or laborales.get("institucion_educativa") or None,
+        "salario_basico": _como_decimal(laborales.get("salario_basico")),
+    }
+
+
+@event.listens_for(Asociado, "before_insert")
+@event.listens_for(Asociado, "before_update")
+def _actualizar_nombre_busqueda(mapper, connection, target):
+    target.nombre_busqueda = normalizar_texto(f"{target.nombres or ''} {target.apellidos or ''}")
+
+
+@event.listens_for(Asociado, "before_insert")
+@event.listens_for(Asociado, "before_update")
+def _actualizar_campos_promovidos(mapper, connection, target):
+    estado = inspect(target)
+    # Si los JSON no se cargaron no cambiaron: no leerlos durante el flush
+    if estado.persistent and not (
+        estado.attrs.datos_personales.history.has_changes()
+        or estado.attrs.datos_laborales.history.has_changes()
+    ):
+        return
+    for campo, valor in campos_promovidos(target.datos_personales, target.datos_laborales).items():
+        setattr(target, campo, valor)
+
+
+for _sentencia in DDL_BUSQUEDA_SQLITE:
+    event.listen(Asociado.__table__, "after_create", DDL(_sentencia).execute_if(dialect="sqlite"))
+event.listen(
+    Asociado.__table__, "before_drop", DDL("DROP TABLE IF EXISTS asociados_fts").execute_if(dialect="sqlite")
+)
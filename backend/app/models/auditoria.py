@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -7,6 +7,10 @@ from app.database import Base
 class RegistroAuditoria(Base):
     """Modelo para almacenar registros de auditoría de todas las operaciones"""
     __tablename__ = "registros_auditoria"
+    __table_args__ = (
+        # Paginación por cursor del listado
+        Index("ix_registros_auditoria_fecha_hora_id", "fecha_hora", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -35,3 +39,29 @@ class RegistroAuditoria(Base):
     
     def __repr__(self):
         return f"<RegistroAuditoria(id={self.id}, usuario_id={self.usuario_id}, accion={self.accion}, entidad={self.entidad})>"
+
+
+class ArchivoAuditoria(Base):
+    """
+    Mes de auditoría archivado fuera de `registros_auditoria`.
+
+    Los registros de un mes cerrado se mueven a un archivo JSON Lines
+    comprimido (del más reciente al más antiguo) y la tabla guarda dónde
+    está y qué rango de fechas e ids cubre, para que el listado y la
+    consulta por id sepan qué archivos leer sin abrirlos.
+    """
+    __tablename__ = "archivos_auditoria"
+
+    id = Column(Integer, primary_key=True, index=True)
+    periodo = Column(String(7), nullable=False, index=True)  # AAAA-MM
+    ruta_archivo = Column(String(500), nullable=False)
+    registros = Column(Integer, nullable=False)
+    id_minimo = Column(Integer, nullable=False)
+    id_maximo = Column(Integer, nullable=False)
+    fecha_desde = Column(DateTime, nullable=False)
+    fecha_hasta = Column(DateTime, nullable=False, index=True)
+    tamano_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ArchivoAuditoria(periodo={self.periodo}, registros={self.registros})>"
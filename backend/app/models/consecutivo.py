@@ -0,0 +1,31 @@
+"""
+Modelo para consecutivos de numeración (créditos, recibos, asientos, cuentas, movimientos).
+"""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String, UniqueConstraint
+
+from app.database import Base
+
+
+class Consecutivo(Base):
+    """
+    Último número asignado por prefijo y período.
+    
+    Ejemplo: prefijo "CR" y período "202412" generan CR-202412-000001,
+    CR-202412-000002, ... La fila se actualiza dentro de la misma transacción
+    que crea el registro numerado, por lo que no quedan huecos ni duplicados.
+    """
+    __tablename__ = "consecutivos"
+    __table_args__ = (
+        UniqueConstraint("prefijo", "periodo", name="uq_consecutivos_prefijo_periodo"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    prefijo = Column(String(20), nullable=False)
+    periodo = Column(String(8), nullable=False)  # YYYYMM o YYYYMMDD
+    ultimo_valor = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<Consecutivo {self.prefijo}-{self.periodo}: {self.ultimo_valor}>"
@@ -15,7 +15,8 @@ from sqlalchemy import (
     Boolean,
     Date,
     Enum,
-    Text
+    Text,
+    UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 
@@ -164,6 +165,37 @@ class MovimientoContable(Base):
         return f"<MovimientoContable Asiento:{self.asiento_id} Cuenta:{self.cuenta_id}>"
 
 
+class SaldoMensual(Base):
+    """
+    Modelo para saldos mensuales acumulados por cuenta.
+    
+    Se actualiza al crear y anular asientos, de modo que los reportes sumen
+    meses completos desde aquí y solo recorran los movimientos del mes parcial.
+    """
+    __tablename__ = "saldos_mensuales"
+    __table_args__ = (
+        UniqueConstraint("cuenta_id", "anio", "mes", name="uq_saldos_mensuales_cuenta_periodo"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    cuenta_id = Column(Integer, ForeignKey("cuentas_contables.id"), nullable=False, index=True)
+    anio = Column(Integer, nullable=False, index=True)
+    mes = Column(Integer, nullable=False)
+    
+    # Totales del mes (solo asientos no anulados)
+    total_debito = Column(Numeric(15, 2), nullable=False, default=0)
+    total_credito = Column(Numeric(15, 2), nullable=False, default=0)
+    
+    # Metadata
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    # Relaciones
+    cuenta = relationship("CuentaContable")
+
+    def __repr__(self):
+        return f"<SaldoMensual Cuenta:{self.cuenta_id} {self.anio}-{self.mes:02d}>"
+
+
 class Aporte(Base):
     """
     Modelo para aportes de asociados a la cooperativa.
@@ -7,7 +7,7 @@ from enum import Enum
 
 from sqlalchemy import (
     Boolean, Column, Date, DateTime, Enum as SQLEnum,
-    ForeignKey, Integer, Numeric, String, Text
+    ForeignKey, Index, Integer, Numeric, String, Text
 )
 from sqlalchemy.orm import relationship
 
@@ -62,6 +62,12 @@ class EstadoCuota(str, Enum):
 class Credito(Base):
     """Modelo para créditos otorgados a asociados."""
     __tablename__ = "creditos"
+    __table_args__ = (
+        # Feed de actividad del dashboard paginado por (fecha, id)
+        Index("ix_creditos_fecha_desembolso_id", "fecha_desembolso", "id"),
+        # Paginación por cursor del listado
+        Index("ix_creditos_fecha_solicitud_id", "fecha_solicitud", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     numero_credito = Column(String(50), unique=True, nullable=False, index=True)
@@ -2,7 +2,7 @@
 Modelo de base de datos para gestión de documentos.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -31,6 +31,10 @@ class Documento(Base):
         activo: Si el documento está activo (soft delete)
     """
     __tablename__ = "documentos"
+    __table_args__ = (
+        # Paginación por cursor del listado
+        Index("ix_documentos_fecha_subida_id", "fecha_subida", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     asociado_id = Column(Integer, ForeignKey("asociados.id"), nullable=False, index=True)
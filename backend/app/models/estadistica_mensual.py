@@ -0,0 +1,46 @@
+"""
+Modelo para las estadísticas mensuales pre-agregadas del dashboard.
+"""
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import Column, DateTime, Integer, Numeric, String, UniqueConstraint
+
+from app.database import Base
+
+
+class MetricaMensual(str, Enum):
+    """Métricas acumuladas por mes."""
+    CONSIGNACIONES = "consignaciones"
+    DESEMBOLSOS = "desembolsos"
+    ASOCIADOS_NUEVOS = "asociados_nuevos"
+
+
+class EstadisticaMensual(Base):
+    """
+    Cantidad y valor acumulados de una métrica en un mes.
+
+    Se actualiza en las mismas transacciones que registran consignaciones,
+    desembolsos y asociados, de modo que los gráficos del dashboard lean unas
+    pocas filas en lugar de agrupar las tablas de movimientos. La tabla se
+    puede reconstruir por completo desde las tablas de origen.
+    """
+    __tablename__ = "estadisticas_mensuales"
+    __table_args__ = (
+        UniqueConstraint("anio", "mes", "metrica", name="uq_estadisticas_mensuales_periodo_metrica"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    anio = Column(Integer, nullable=False)
+    mes = Column(Integer, nullable=False)
+    metrica = Column(String(30), nullable=False)
+
+    # Acumulados del mes
+    cantidad = Column(Integer, nullable=False, default=0)
+    total = Column(Numeric(15, 2), nullable=False, default=0)
+
+    # Metadata
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<EstadisticaMensual {self.metrica} {self.anio}-{self.mes:02d}>"
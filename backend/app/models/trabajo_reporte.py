@@ -0,0 +1,54 @@
+"""
+Modelo para la cola de trabajos de reportes en segundo plano.
+"""
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String, Text
+
+from app.database import Base
+
+
+class EstadoTrabajoReporte(str, Enum):
+    """Estados de un trabajo de reporte."""
+    PENDIENTE = "pendiente"
+    EN_PROCESO = "en_proceso"
+    COMPLETADO = "completado"
+    ERROR = "error"
+    EXPIRADO = "expirado"
+
+
+class TrabajoReporte(Base):
+    """
+    Solicitud de generación de un reporte en segundo plano.
+
+    La tabla funciona como cola: los workers toman el trabajo pendiente más
+    antiguo cambiando su estado con un UPDATE condicional, generan el archivo
+    en disco y registran su ubicación hasta que expira.
+    """
+    __tablename__ = "trabajos_reporte"
+    __table_args__ = (
+        Index("ix_trabajos_reporte_estado_id", "estado", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String(50), nullable=False)
+    parametros = Column(JSON, nullable=False, default=dict)
+    estado = Column(String(20), nullable=False, default=EstadoTrabajoReporte.PENDIENTE.value)
+
+    # Resultado
+    ruta_archivo = Column(String(500), nullable=True)
+    nombre_archivo = Column(String(255), nullable=True)
+    tipo_contenido = Column(String(100), nullable=True)
+    tamano_bytes = Column(Integer, nullable=True)
+    mensaje_error = Column(Text, nullable=True)
+
+    # Control
+    solicitado_por_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    iniciado_at = Column(DateTime, nullable=True)
+    finalizado_at = Column(DateTime, nullable=True)
+    expira_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<TrabajoReporte {self.id} {self.tipo}: {self.estado}>"
@@ -3,6 +3,7 @@ from .asociado import (
     AsociadoBase,
     AsociadoCrear,
     AsociadoDetalle,
+    AsociadoDirectorio,
     AsociadoEnDB,
     AsociadosListResponse,
     ContactoEmergencia,
@@ -21,6 +22,7 @@ __all__ = [
     "AsociadoBase",
     "AsociadoCrear",
     "AsociadoDetalle",
+    "AsociadoDirectorio",
     "AsociadoEnDB",
     "AsociadosListResponse",
     "ContactoEmergencia",
@@ -231,6 +231,10 @@ class AsociadoDetalle(BaseModel):
     hoja_vida_url: Optional[str] = None
     foto_url: Optional[str] = None
     observaciones: Optional[str] = None
+    ciudad: Optional[str] = None
+    fecha_nacimiento: Optional[date] = None
+    empresa: Optional[str] = None
+    salario_basico: Optional[float] = None
     datos_personales: Optional[dict] = None
     datos_laborales: Optional[dict] = None
     informacion_familiar: Optional[dict] = None
@@ -255,6 +259,8 @@ class AsociadoSimple(BaseModel):
     telefono_principal: Optional[str] = None
     estado: str
     fecha_ingreso: date
+    ciudad: Optional[str] = None
+    empresa: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -262,14 +268,24 @@ class AsociadoSimple(BaseModel):
         orm_mode = True
 
 
+class AsociadoDirectorio(BaseModel):
+    """Entrada del directorio en memoria usado en ventanilla"""
+    id: int
+    numero_documento: str
+    nombre: str = Field(description="Nombres y apellidos normalizados (minúsculas, sin tildes)")
+    estado: str
+
+
 class InfoPaginacion(BaseModel):
     """Información de paginación para listados"""
-    total: int = Field(description="Total de registros")
-    pagina_actual: int = Field(description="Página actual")
+    total: Optional[int] = Field(description="Total de registros (con cursor, solo si se solicita)")
+    pagina_actual: Optional[int] = Field(None, description="Página actual (solo con skip/limit)")
     por_pagina: int = Field(description="Registros por página")
-    total_paginas: int = Field(description="Total de páginas")
+    total_paginas: Optional[int] = Field(None, description="Total de páginas (solo con skip/limit)")
     tiene_siguiente: bool = Field(description="Existe página siguiente")
     tiene_anterior: bool = Field(description="Existe página anterior")
+    siguiente_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (paginación por cursor)")
+    total_exacto: bool = Field(True, description="False si el total es una cota estimada")
 
 
 class AsociadosListResponse(BaseModel):
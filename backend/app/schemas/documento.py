@@ -99,8 +99,11 @@ class DocumentoConNombres(DocumentoEnDB):
 
 class DocumentoListaResponse(BaseModel):
     """Response para lista de documentos."""
-    total: int
+    total: Optional[int]
     documentos: list[DocumentoEnDB]
+    # Solo con paginación por cursor
+    siguiente_cursor: Optional[str] = None
+    total_exacto: bool = True
 
 
 class DocumentoUploadResponse(BaseModel):
@@ -1,9 +1,9 @@
 """
 Schemas para reportes financieros.
 """
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -66,6 +66,34 @@ class EstadoResultadosResponse(BaseModel):
     margen_utilidad: Decimal  # (Utilidad / Ingresos) * 100
 
 
+class CuentaResultadosComparativo(BaseModel):
+    """Cuenta en el estado de resultados comparativo."""
+    codigo: str
+    nombre: str
+    valores: List[Decimal]  # Un valor por período, en el orden de `periodos`
+    total: Decimal
+
+
+class PeriodoResultados(BaseModel):
+    """Totales de un período del estado de resultados comparativo."""
+    fecha_inicio: date
+    fecha_fin: date
+    total_ingresos: Decimal
+    total_gastos: Decimal
+    utilidad_neta: Decimal
+    margen_utilidad: Decimal
+
+
+class EstadoResultadosComparativoResponse(BaseModel):
+    """Response del Estado de Resultados comparativo por períodos."""
+    fecha_inicio: date
+    fecha_fin: date
+    agrupacion: str  # mensual, trimestral, anual
+    periodos: List[PeriodoResultados]
+    ingresos: List[CuentaResultadosComparativo]
+    gastos: List[CuentaResultadosComparativo]
+
+
 # ============================================================================
 # REPORTE DE CARTERA
 # ============================================================================
@@ -224,3 +252,33 @@ class EstadisticasGeneralesResponse(BaseModel):
     ahorros: EstadisticasAhorros
     aportes_totales: Decimal
     operaciones_mes: int
+
+
+# ============================================================================
+# TRABAJOS EN SEGUNDO PLANO
+# ============================================================================
+
+class TrabajoReporteCrear(BaseModel):
+    """Solicitud de un reporte en segundo plano."""
+    tipo: str = Field(..., description="Tipo de reporte (ej: balance_pdf, estado_cuenta_pdf)")
+    parametros: Dict[str, Any] = Field(default_factory=dict, description="Parámetros del reporte")
+
+
+class TrabajoReporteResponse(BaseModel):
+    """Estado de un trabajo de reporte."""
+    id: int
+    tipo: str
+    parametros: Dict[str, Any]
+    estado: str
+    nombre_archivo: Optional[str] = None
+    tipo_contenido: Optional[str] = None
+    tamano_bytes: Optional[int] = None
+    mensaje_error: Optional[str] = None
+    created_at: datetime
+    iniciado_at: Optional[datetime] = None
+    finalizado_at: Optional[datetime] = None
+    expira_at: Optional[datetime] = None
+    
+    class Config:
+        orm_mode = True
+        from_attributes = True
@@ -3,11 +3,13 @@ Servicios para el sistema de ahorros.
 """
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
 
-from sqlalchemy import and_, func
+from sqlalchemy import and_, bindparam, func, insert, select
 from sqlalchemy.orm import Session
 
+from app.core.paginacion import PaginaCursor, paginar_por_cursor
+from app.core.proyeccion import columnas_proyeccion
 from app.models.ahorro import (
     ConfiguracionAhorro,
     CuentaAhorro,
@@ -17,6 +19,7 @@ from app.models.ahorro import (
     TipoMovimientoAhorro,
 )
 from app.models.asociado import Asociado
+from app.models.estadistica_mensual import MetricaMensual
 from app.schemas.ahorro import (
     ConfiguracionAhorroActualizar,
     ConsignacionCrear,
@@ -25,6 +28,25 @@ from app.schemas.ahorro import (
     RetiroCrear,
     TransferenciaCrear,
 )
+from app.services.consecutivos import ConsecutivoService
+from app.services.dashboard import DashboardService
+
+# Cuentas por transacción en la liquidación masiva de intereses
+TAMANO_LOTE_INTERESES = 500
+
+# Campos que el listado de cuentas puede responder con `campos=` (ver app.core.proyeccion)
+CAMPOS_LISTADO_CUENTAS = {
+    nombre: getattr(CuentaAhorro, nombre)
+    for nombre in (
+        "id", "numero_cuenta", "asociado_id", "tipo_ahorro", "estado", "saldo_disponible",
+        "saldo_bloqueado", "tasa_interes_anual", "cuota_manejo", "meta_ahorro", "cuota_mensual",
+        "fecha_inicio_programado", "fecha_fin_programado", "plazo_dias", "fecha_apertura_cdat",
+        "fecha_vencimiento_cdat", "renovacion_automatica", "fecha_apertura", "fecha_cancelacion",
+    )
+}
+CAMPOS_RESUMEN_CUENTAS = (
+    "id", "numero_cuenta", "asociado_id", "tipo_ahorro", "estado", "saldo_disponible", "fecha_apertura",
+)
 
 
 class AhorroService:
@@ -47,23 +69,12 @@ class AhorroService:
             TipoAhorro.APORTES.value: "APOR",
         }
         
-        prefijo = f"AH-{codigo_tipo.get(tipo_ahorro, 'OTRO')}-{datetime.now().strftime('%Y%m')}"
-        
-        # Buscar el último número
-        ultima_cuenta = (
-            db.query(CuentaAhorro)
-            .filter(CuentaAhorro.numero_cuenta.like(f"{prefijo}-%"))
-            .order_by(CuentaAhorro.numero_cuenta.desc())
-            .first()
+        return ConsecutivoService.generar_numero(
+            db,
+            f"AH-{codigo_tipo.get(tipo_ahorro, 'OTRO')}",
+            datetime.now().strftime('%Y%m'),
+            CuentaAhorro.numero_cuenta
         )
-        
-        if ultima_cuenta:
-            ultimo_numero = int(ultima_cuenta.numero_cuenta.split("-")[-1])
-            nuevo_numero = ultimo_numero + 1
-        else:
-            nuevo_numero = 1
-        
-        return f"{prefijo}-{str(nuevo_numero).zfill(6)}"
 
     @staticmethod
     def generar_numero_movimiento(db: Session) -> str:
@@ -72,22 +83,12 @@ class AhorroService:
         
         Formato: MOV-YYYYMMDD-000001
         """
-        prefijo = f"MOV-{datetime.now().strftime('%Y%m%d')}"
-        
-        ultimo_movimiento = (
-            db.query(MovimientoAhorro)
-            .filter(MovimientoAhorro.numero_movimiento.like(f"{prefijo}-%"))
-            .order_by(MovimientoAhorro.numero_movimiento.desc())
-            .first()
+        return ConsecutivoService.generar_numero(
+            db,
+            "MOV",
+            datetime.now().strftime('%Y%m%d'),
+            MovimientoAhorro.numero_movimiento
         )
-        
-        if ultimo_movimiento:
-            ultimo_numero = int(ultimo_movimiento.numero_movimiento.split("-")[-1])
-            nuevo_numero = ultimo_numero + 1
-        else:
-            nuevo_numero = 1
-        
-        return f"{prefijo}-{str(nuevo_numero).zfill(6)}"
 
     @staticmethod
     def obtener_configuracion(db: Session) -> ConfiguracionAhorro:
@@ -190,6 +191,7 @@ class AhorroService:
         )
         
         db.commit()
+        DashboardService.invalidar_cache()
         db.refresh(cuenta)
         
         return cuenta
@@ -229,7 +231,12 @@ class AhorroService:
         # Actualizar saldo
         cuenta.saldo_disponible += datos.valor
         
+        DashboardService.acumular_estadistica_mensual(
+            db, MetricaMensual.CONSIGNACIONES, movimiento.fecha_movimiento, datos.valor
+        )
+        
         db.commit()
+        DashboardService.invalidar_cache()
         db.refresh(movimiento)
         
         return movimiento
@@ -283,6 +290,7 @@ class AhorroService:
                 cuenta.saldo_disponible -= gmf
         
         db.commit()
+        DashboardService.invalidar_cache()
         db.refresh(movimiento)
         
         return movimiento
@@ -338,6 +346,7 @@ class AhorroService:
         cuenta_destino.saldo_disponible += datos.valor
         
         db.commit()
+        DashboardService.invalidar_cache()
         db.refresh(mov_salida)
         db.refresh(mov_entrada)
         
@@ -392,15 +401,13 @@ class AhorroService:
         return db.query(CuentaAhorro).filter(CuentaAhorro.id == cuenta_id).first()
 
     @staticmethod
-    def listar_cuentas(
+    def _consulta_cuentas(
         db: Session,
-        skip: int = 0,
-        limit: int = 100,
         asociado_id: Optional[int] = None,
         tipo_ahorro: Optional[str] = None,
         estado: Optional[str] = None
-    ) -> tuple[list[CuentaAhorro], int]:
-        """Listar cuentas de ahorro con filtros."""
+    ):
+        """Consulta de cuentas de ahorro con los filtros del listado aplicados."""
         query = db.query(CuentaAhorro)
         
         if asociado_id:
@@ -410,11 +417,56 @@ class AhorroService:
         if estado:
             query = query.filter(CuentaAhorro.estado == estado)
         
+        return query
+
+    @staticmethod
+    def listar_cuentas(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        asociado_id: Optional[int] = None,
+        tipo_ahorro: Optional[str] = None,
+        estado: Optional[str] = None,
+        campos: Optional[List[str]] = None
+    ) -> tuple[list[CuentaAhorro], int]:
+        """
+        Listar cuentas de ahorro con filtros.
+
+        Con `campos` devuelve filas con solo esas columnas en lugar de cuentas.
+        """
+        query = AhorroService._consulta_cuentas(db, asociado_id, tipo_ahorro, estado)
+        
         total = query.count()
+        if campos:
+            query = query.with_entities(*columnas_proyeccion(campos, CAMPOS_LISTADO_CUENTAS))
         cuentas = query.order_by(CuentaAhorro.fecha_apertura.desc()).offset(skip).limit(limit).all()
         
         return cuentas, total
 
+    @staticmethod
+    def listar_cuentas_por_cursor(
+        db: Session,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        asociado_id: Optional[int] = None,
+        tipo_ahorro: Optional[str] = None,
+        estado: Optional[str] = None,
+        total: Optional[str] = None,
+        campos: Optional[List[str]] = None
+    ) -> PaginaCursor:
+        """Listar cuentas de ahorro con filtros paginando por cursor; `campos` como en `listar_cuentas`."""
+        query = AhorroService._consulta_cuentas(db, asociado_id, tipo_ahorro, estado)
+        llave = [CuentaAhorro.fecha_apertura, CuentaAhorro.id]
+        if campos:
+            query = query.with_entities(*columnas_proyeccion(campos, CAMPOS_LISTADO_CUENTAS, llave))
+        return paginar_por_cursor(
+            query,
+            llave,
+            limit,
+            cursor=cursor,
+            total=total
+        )
+
     @staticmethod
     def obtener_movimientos(
         db: Session,
@@ -497,6 +549,7 @@ class AhorroService:
             cuenta.observaciones = datos.observaciones
         
         db.commit()
+        DashboardService.invalidar_cache()
         db.refresh(cuenta)
         
         return cuenta
@@ -529,6 +582,7 @@ class AhorroService:
         cuenta.fecha_cancelacion = datetime.utcnow()
         
         db.commit()
+        DashboardService.invalidar_cache()
         db.refresh(cuenta)
         
         return cuenta
@@ -606,17 +660,9 @@ class AhorroService:
         else:
             fecha_desde = cuenta.fecha_apertura.date() if isinstance(cuenta.fecha_apertura, datetime) else cuenta.fecha_apertura
         
-        # Calcular días transcurridos
-        dias = (fecha_calculo - fecha_desde).days
-        
-        if dias <= 0:
-            return None
-        
-        # Calcular interés
-        # Interés = Saldo * (Tasa Anual / 360) * Días
-        tasa_diaria = cuenta.tasa_interes_anual / Decimal("360") / Decimal("100")
-        interes = (cuenta.saldo_disponible * tasa_diaria * Decimal(dias)).quantize(Decimal("0.01"))
-        
+        dias, interes = AhorroService._calcular_interes(
+            cuenta.saldo_disponible, cuenta.tasa_interes_anual, fecha_desde, fecha_calculo
+        )
         if interes <= Decimal("0"):
             return None
         
@@ -636,29 +682,80 @@ class AhorroService:
         cuenta.fecha_ultimo_interes = datetime.now()
         
         db.commit()
+        DashboardService.invalidar_cache()
         db.refresh(movimiento)
         
         return movimiento
 
+    @staticmethod
+    def _calcular_interes(
+        saldo: Decimal,
+        tasa_interes_anual: Decimal,
+        fecha_desde: date,
+        fecha_calculo: date
+    ) -> Tuple[int, Decimal]:
+        """
+        Calcular días e interés causado entre dos fechas.
+        
+        Fórmula: Interés = Saldo * (Tasa Anual / 360) * Días
+        """
+        dias = (fecha_calculo - fecha_desde).days
+        if dias <= 0:
+            return dias, Decimal("0")
+        
+        tasa_diaria = tasa_interes_anual / Decimal("360") / Decimal("100")
+        interes = (saldo * tasa_diaria * Decimal(dias)).quantize(Decimal("0.01"))
+        return dias, interes
+
     @staticmethod
     def calcular_intereses_masivo(
         db: Session,
         fecha_calculo: date,
         usuario_id: int,
-        tipo_ahorro: Optional[str] = None
+        tipo_ahorro: Optional[str] = None,
+        dry_run: bool = False,
+        tamano_lote: int = TAMANO_LOTE_INTERESES,
+        progreso: Optional[Callable[[dict], None]] = None
     ) -> dict:
         """
         Calcular intereses para todas las cuentas activas.
         
+        Las cuentas se procesan por lotes ordenados por id. Cada lote se carga
+        con su fecha de último interés en una sola consulta, el interés se
+        calcula en memoria y los movimientos y saldos se escriben en bloque en
+        una transacción por lote. Si un lote falla se revierte solo ese lote.
+        
         Args:
             fecha_calculo: Fecha para el cálculo de intereses
             usuario_id: Usuario que ejecuta el cálculo
             tipo_ahorro: Filtrar por tipo de ahorro (opcional)
+            dry_run: Calcular sin registrar movimientos ni modificar saldos
+            tamano_lote: Cantidad de cuentas por lote
+            progreso: Función llamada con el resumen de cada lote procesado
         
         Returns:
             dict: Resumen del proceso
         """
-        query = db.query(CuentaAhorro).filter(
+        if tamano_lote < 1:
+            raise ValueError("El tamaño de lote debe ser mayor a cero")
+        
+        ultimo_interes = (
+            select(func.max(MovimientoAhorro.fecha_movimiento))
+            .where(
+                MovimientoAhorro.cuenta_id == CuentaAhorro.id,
+                MovimientoAhorro.tipo_movimiento == TipoMovimientoAhorro.INTERES.value
+            )
+            .correlate(CuentaAhorro)
+            .scalar_subquery()
+        )
+        query = db.query(
+            CuentaAhorro.id,
+            CuentaAhorro.numero_cuenta,
+            CuentaAhorro.saldo_disponible,
+            CuentaAhorro.tasa_interes_anual,
+            CuentaAhorro.fecha_apertura,
+            ultimo_interes.label("fecha_ultimo_interes")
+        ).filter(
             CuentaAhorro.estado == EstadoCuentaAhorro.ACTIVA.value,
             CuentaAhorro.tasa_interes_anual > Decimal("0")
         )
@@ -666,32 +763,128 @@ class AhorroService:
         if tipo_ahorro:
             query = query.filter(CuentaAhorro.tipo_ahorro == tipo_ahorro)
         
-        cuentas = query.all()
-        
         resultado = {
-            "total_cuentas": len(cuentas),
+            "total_cuentas": 0,
             "cuentas_procesadas": 0,
             "total_intereses": Decimal("0"),
+            "dry_run": dry_run,
+            "lotes": [],
             "errores": []
         }
         
-        for cuenta in cuentas:
-            try:
-                movimiento = AhorroService.calcular_intereses_cuenta(
-                    db, cuenta.id, fecha_calculo, usuario_id
+        # Las cuentas del lote quedan bloqueadas hasta su commit: una
+        # consignación o retiro concurrente espera y no desalinea los saldos
+        # anterior y nuevo de los movimientos de interés
+        if not dry_run:
+            query = query.with_for_update(of=CuentaAhorro)
+        
+        ultimo_id = 0
+        numero_lote = 0
+        while True:
+            cuentas = (
+                query.filter(CuentaAhorro.id > ultimo_id)
+                .order_by(CuentaAhorro.id)
+                .limit(tamano_lote)
+                .all()
+            )
+            if not cuentas:
+                break
+            
+            numero_lote += 1
+            ultimo_id = cuentas[-1].id
+            
+            liquidaciones = []
+            for cuenta in cuentas:
+                fecha_desde = cuenta.fecha_ultimo_interes or cuenta.fecha_apertura
+                if isinstance(fecha_desde, datetime):
+                    fecha_desde = fecha_desde.date()
+                dias, interes = AhorroService._calcular_interes(
+                    cuenta.saldo_disponible, cuenta.tasa_interes_anual, fecha_desde, fecha_calculo
                 )
-                if movimiento:
-                    resultado["cuentas_procesadas"] += 1
-                    resultado["total_intereses"] += movimiento.valor
+                if interes > Decimal("0"):
+                    liquidaciones.append((cuenta, dias, interes))
+            
+            intereses_lote = sum((interes for _, _, interes in liquidaciones), Decimal("0"))
+            resumen_lote = {
+                "lote": numero_lote,
+                "cuentas": len(cuentas),
+                "cuentas_con_interes": len(liquidaciones),
+                "total_intereses": intereses_lote
+            }
+            resultado["total_cuentas"] += len(cuentas)
+            
+            try:
+                if liquidaciones and not dry_run:
+                    AhorroService._registrar_intereses_lote(db, liquidaciones, usuario_id)
+                    db.commit()
+                elif not dry_run:
+                    # Sin intereses que registrar: liberar los bloqueos del lote
+                    db.rollback()
             except Exception as e:
+                db.rollback()
                 resultado["errores"].append({
-                    "cuenta_id": cuenta.id,
-                    "numero_cuenta": cuenta.numero_cuenta,
+                    "lote": numero_lote,
+                    "cuenta_id_desde": cuentas[0].id,
+                    "cuenta_id_hasta": ultimo_id,
                     "error": str(e)
                 })
-        
+                resumen_lote["error"] = str(e)
+            else:
+                resultado["cuentas_procesadas"] += len(liquidaciones)
+                resultado["total_intereses"] += intereses_lote
+            
+            resultado["lotes"].append(resumen_lote)
+            if progreso:
+                progreso(resumen_lote)
+        
+        if resultado["cuentas_procesadas"]:
+            DashboardService.invalidar_cache()
         return resultado
 
+    @staticmethod
+    def _registrar_intereses_lote(db: Session, liquidaciones: list, usuario_id: int) -> None:
+        """
+        Registrar en bloque los movimientos de interés y los nuevos saldos de un lote.
+        
+        `liquidaciones` es una lista de tuplas (cuenta, dias, interes) con las
+        columnas cargadas por `calcular_intereses_masivo`, que bloquea esas
+        cuentas en la misma transacción: el saldo leído es el vigente.
+        """
+        ahora = datetime.now()
+        numeros = ConsecutivoService.generar_numeros(
+            db,
+            "MOV",
+            ahora.strftime('%Y%m%d'),
+            len(liquidaciones),
+            MovimientoAhorro.numero_movimiento
+        )
+        
+        db.execute(insert(MovimientoAhorro), [
+            {
+                "numero_movimiento": numero,
+                "cuenta_id": cuenta.id,
+                "tipo_movimiento": TipoMovimientoAhorro.INTERES.value,
+                "valor": interes,
+                "saldo_anterior": cuenta.saldo_disponible,
+                "saldo_nuevo": cuenta.saldo_disponible + interes,
+                "descripcion": f"Intereses {dias} días al {cuenta.tasa_interes_anual}% E.A.",
+                "realizado_por_id": usuario_id,
+            }
+            for numero, (cuenta, dias, interes) in zip(numeros, liquidaciones)
+        ])
+        
+        tabla = CuentaAhorro.__table__
+        db.execute(
+            tabla.update()
+            .where(tabla.c.id == bindparam("b_id"))
+            .values(
+                saldo_disponible=tabla.c.saldo_disponible + bindparam("b_interes"),
+                fecha_ultimo_interes=ahora,
+                updated_at=ahora
+            ),
+            [{"b_id": cuenta.id, "b_interes": interes} for cuenta, _, interes in liquidaciones]
+        )
+
     @staticmethod
     def aplicar_cuota_manejo(
         db: Session,
@@ -728,6 +921,7 @@ class AhorroService:
         cuenta.saldo_disponible -= cuenta.cuota_manejo
         
         db.commit()
+        DashboardService.invalidar_cache()
         db.refresh(movimiento)
         
         return movimiento
@@ -782,6 +976,7 @@ class AhorroService:
         cuenta.fecha_vencimiento_cdat = nuevo_vencimiento
         
         db.commit()
+        DashboardService.invalidar_cache()
         db.refresh(cuenta)
         
         return cuenta
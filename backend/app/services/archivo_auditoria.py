@@ -0,0 +1,342 @@
+"""
+Archivo de los meses cerrados de auditoría.
+
+`registros_auditoria` conserva solo los meses recientes
+(`AUDITORIA_MESES_EN_LINEA`, incluido el actual). `archivar` mueve cada mes
+anterior a un archivo JSON Lines comprimido con gzip, ordenado del registro
+más reciente al más antiguo, y lo cataloga en `archivos_auditoria`. La tabla
+en línea no crece con la historia: las consultas del mes en curso cuestan lo
+mismo con mil que con decenas de millones de registros históricos.
+
+Los archivos siguen siendo consultables: `AuditoriaService` completa con
+ellos las páginas que la tabla no alcanza a llenar, leyendo solo los meses
+que cruzan el rango de fechas pedido. Cada mes tiene un solo archivo, así que
+los archivos no se cruzan entre sí; los registros que llegan tarde a un mes
+ya archivado quedan en la tabla hasta el siguiente archivo y el listado los
+intercala con los archivados (ver `fecha_mas_reciente`).
+"""
+import gzip
+import heapq
+import json
+import logging
+import os
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.auditoria import ArchivoAuditoria, RegistroAuditoria
+
+logger = logging.getLogger(__name__)
+
+# Filas leídas de la base por vez al escribir un archivo
+TAMANO_LECTURA = 5000
+
+
+class MesArchivado(NamedTuple):
+    """Resultado de archivar un mes."""
+    periodo: str
+    registros: int
+    ruta_archivo: Optional[str]  # None si no había registros o en simulación
+
+
+def _mes_siguiente(inicio: datetime) -> datetime:
+    return datetime(inicio.year + inicio.month // 12, inicio.month % 12 + 1, 1)
+
+
+def _sin_zona(fecha: Optional[datetime]) -> Optional[datetime]:
+    """Las fechas de auditoría se guardan en UTC sin zona horaria."""
+    if fecha is None or fecha.tzinfo is None:
+        return fecha
+    return fecha.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def limite_en_linea(meses_en_linea: Optional[int] = None, hoy: Optional[date] = None) -> datetime:
+    """Inicio del mes más antiguo que se conserva en la tabla."""
+    meses_en_linea = max(meses_en_linea or settings.auditoria_meses_en_linea, 1)
+    hoy = hoy or date.today()
+    indice = hoy.year * 12 + hoy.month - meses_en_linea
+    return datetime(indice // 12, indice % 12 + 1, 1)
+
+
+def meses_por_archivar(db: Session, limite: datetime) -> List[datetime]:
+    """Inicio de cada mes desde el registro más antiguo hasta `limite` (exclusivo)."""
+    primero = db.query(func.min(RegistroAuditoria.fecha_hora)).filter(
+        RegistroAuditoria.fecha_hora < limite
+    ).scalar()
+    meses = []
+    if primero is not None:
+        inicio = datetime(primero.year, primero.month, 1)
+        while inicio < limite:
+            meses.append(inicio)
+            inicio = _mes_siguiente(inicio)
+    return meses
+
+
+def _llave(valores: dict) -> Tuple[datetime, int]:
+    return valores["fecha_hora"], valores["id"]
+
+
+def archivar_mes(
+    db: Session,
+    inicio: datetime,
+    directorio: Optional[str] = None,
+    simular: bool = False
+) -> MesArchivado:
+    """
+    Mover los registros del mes que empieza en `inicio` a un archivo comprimido.
+
+    El archivo se escribe completo antes de borrar los registros, y el borrado
+    y el alta en el catálogo van en una sola transacción: si algo falla, los
+    registros siguen en la tabla y el archivo se elimina. Un mes se puede
+    archivar varias veces (p. ej. con registros que llegaron tarde): los
+    registros nuevos se intercalan con el archivo anterior del mes en un solo
+    archivo que lo reemplaza, para que cada mes tenga un único archivo ordenado.
+    """
+    fin = _mes_siguiente(inicio)
+    periodo = f"{inicio:%Y-%m}"
+    en_el_mes = (RegistroAuditoria.fecha_hora >= inicio, RegistroAuditoria.fecha_hora < fin)
+
+    if simular:
+        registros = db.query(func.count(RegistroAuditoria.id)).filter(*en_el_mes).scalar()
+        return MesArchivado(periodo, registros, None)
+
+    directorio = Path(directorio or settings.auditoria_archivo_dir)
+    directorio.mkdir(parents=True, exist_ok=True)
+    temporal = directorio / f"auditoria_{periodo}.jsonl.gz.tmp"
+    anteriores = db.query(ArchivoAuditoria).filter(ArchivoAuditoria.periodo == periodo).all()
+
+    nuevos, id_maximo_nuevos = 0, None
+
+    def filas_en_linea() -> Iterator[dict]:
+        nonlocal nuevos, id_maximo_nuevos
+        filas = db.execute(
+            select(RegistroAuditoria.__table__)
+            .where(*en_el_mes)
+            .order_by(RegistroAuditoria.fecha_hora.desc(), RegistroAuditoria.id.desc())
+            .execution_options(yield_per=TAMANO_LECTURA)
+        )
+        for fila in filas:
+            nuevos += 1
+            id_maximo_nuevos = max(id_maximo_nuevos or fila.id, fila.id)
+            yield dict(fila._mapping)
+
+    registros, id_minimo, id_maximo, fecha_desde, fecha_hasta = 0, None, None, None, None
+    todas = heapq.merge(
+        filas_en_linea(), *(_leer(archivo) for archivo in anteriores), key=_llave, reverse=True
+    )
+    with gzip.open(temporal, "wt", encoding="utf-8") as archivo:
+        for valores in todas:
+            registros += 1
+            id_minimo = valores["id"] if id_minimo is None else min(id_minimo, valores["id"])
+            id_maximo = valores["id"] if id_maximo is None else max(id_maximo, valores["id"])
+            fecha_hasta = fecha_hasta or valores["fecha_hora"]
+            fecha_desde = valores["fecha_hora"]
+            valores["fecha_hora"] = valores["fecha_hora"].isoformat()
+            archivo.write(json.dumps(valores, ensure_ascii=False) + "\n")
+
+    if nuevos == 0:
+        temporal.unlink()
+        return MesArchivado(periodo, 0, None)
+
+    rutas_anteriores = {Path(archivo.ruta_archivo) for archivo in anteriores}
+    ruta = directorio / f"auditoria_{periodo}_{id_minimo}-{id_maximo}.jsonl.gz"
+    version = 1
+    while ruta in rutas_anteriores:
+        version += 1
+        ruta = directorio / f"auditoria_{periodo}_{id_minimo}-{id_maximo}_{version}.jsonl.gz"
+    os.replace(temporal, ruta)
+    try:
+        borrados = db.execute(
+            delete(RegistroAuditoria)
+            .where(*en_el_mes, RegistroAuditoria.id <= id_maximo_nuevos)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if borrados != nuevos:
+            raise RuntimeError(
+                f"Se archivaron {nuevos} registros de {periodo} pero se iban a borrar {borrados}"
+            )
+        for anterior in anteriores:
+            db.delete(anterior)
+        db.add(ArchivoAuditoria(
+            periodo=periodo,
+            ruta_archivo=str(ruta),
+            registros=registros,
+            id_minimo=id_minimo,
+            id_maximo=id_maximo,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            tamano_bytes=ruta.stat().st_size
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        ruta.unlink(missing_ok=True)
+        raise
+
+    # El archivo nuevo ya contiene los anteriores del mes
+    for anterior in rutas_anteriores:
+        anterior.unlink(missing_ok=True)
+
+    logger.info("Auditoría de %s archivada: %s registros nuevos en %s", periodo, nuevos, ruta)
+    return MesArchivado(periodo, nuevos, str(ruta))
+
+
+def archivar(
+    db: Session,
+    meses_en_linea: Optional[int] = None,
+    hoy: Optional[date] = None,
+    directorio: Optional[str] = None,
+    simular: bool = False,
+    progreso: Optional[Callable[[MesArchivado], None]] = None
+) -> List[MesArchivado]:
+    """Archivar todos los meses anteriores a los `meses_en_linea` más recientes."""
+    resultado = []
+    for inicio in meses_por_archivar(db, limite_en_linea(meses_en_linea, hoy)):
+        mes = archivar_mes(db, inicio, directorio, simular)
+        resultado.append(mes)
+        if progreso:
+            progreso(mes)
+    return resultado
+
+
+def fecha_mas_reciente(db: Session) -> Optional[datetime]:
+    """
+    Fecha del registro archivado más reciente, o None si no hay archivos.
+
+    Los registros de la tabla posteriores a ella van antes que todos los
+    archivados; los demás (llegados tarde) se intercalan con los archivos.
+    """
+    return db.query(func.max(ArchivoAuditoria.fecha_hasta)).scalar()
+
+
+def archivos_en_rango(
+    db: Session,
+    fecha_desde: Optional[datetime] = None,
+    fecha_hasta: Optional[datetime] = None
+) -> List[ArchivoAuditoria]:
+    """Archivos con registros en el rango de fechas, del más reciente al más antiguo."""
+    consulta = db.query(ArchivoAuditoria)
+    if fecha_desde:
+        consulta = consulta.filter(ArchivoAuditoria.fecha_hasta >= _sin_zona(fecha_desde))
+    if fecha_hasta:
+        consulta = consulta.filter(ArchivoAuditoria.fecha_desde <= _sin_zona(fecha_hasta))
+    return consulta.order_by(ArchivoAuditoria.fecha_hasta.desc(), ArchivoAuditoria.id_maximo.desc()).all()
+
+
+def _leer(archivo: ArchivoAuditoria) -> Iterator[dict]:
+    with gzip.open(archivo.ruta_archivo, "rt", encoding="utf-8") as contenido:
+        for linea in contenido:
+            valores = json.loads(linea)
+            valores["fecha_hora"] = datetime.fromisoformat(valores["fecha_hora"])
+            yield valores
+
+
+def _filtros_iguales(usuario_id, accion, entidad, entidad_id) -> dict:
+    return {
+        columna: valor
+        for columna, valor in (
+            ("usuario_id", usuario_id), ("accion", accion), ("entidad", entidad), ("entidad_id", entidad_id)
+        )
+        if valor
+    }
+
+
+def _filtrar(
+    archivo: ArchivoAuditoria,
+    iguales: dict,
+    fecha_desde: Optional[datetime],
+    fecha_hasta: Optional[datetime],
+    antes_de: Optional[Tuple[datetime, int]] = None
+) -> Iterator[dict]:
+    if antes_de and (archivo.fecha_desde, archivo.id_minimo) >= antes_de:
+        return
+    for valores in _leer(archivo):
+        if fecha_desde and valores["fecha_hora"] < fecha_desde:
+            return  # El archivo va del más reciente al más antiguo
+        if fecha_hasta and valores["fecha_hora"] > fecha_hasta:
+            continue
+        if antes_de and (valores["fecha_hora"], valores["id"]) >= antes_de:
+            continue
+        if any(valores[columna] != valor for columna, valor in iguales.items()):
+            continue
+        yield valores
+
+
+def registros_archivados(
+    db: Session,
+    usuario_id: Optional[int] = None,
+    accion: Optional[str] = None,
+    entidad: Optional[str] = None,
+    entidad_id: Optional[int] = None,
+    fecha_desde: Optional[datetime] = None,
+    fecha_hasta: Optional[datetime] = None,
+    antes_de: Optional[Tuple[datetime, int]] = None
+) -> Iterator[RegistroAuditoria]:
+    """
+    Registros archivados que cumplen los filtros del listado, del más reciente al más antiguo.
+
+    Args:
+        antes_de: Llave (fecha_hora, id) de un cursor; solo se devuelven registros anteriores
+
+    Los registros no están en la sesión: no tienen relaciones cargables.
+    """
+    iguales = _filtros_iguales(usuario_id, accion, entidad, entidad_id)
+    fecha_desde, fecha_hasta = _sin_zona(fecha_desde), _sin_zona(fecha_hasta)
+    if antes_de:
+        antes_de = (_sin_zona(antes_de[0]), antes_de[1])
+
+    for archivo in archivos_en_rango(db, fecha_desde, fecha_hasta):
+        for valores in _filtrar(archivo, iguales, fecha_desde, fecha_hasta, antes_de):
+            yield RegistroAuditoria(**valores)
+
+
+def contar_archivados(
+    db: Session,
+    limite: Optional[int] = None,
+    usuario_id: Optional[int] = None,
+    accion: Optional[str] = None,
+    entidad: Optional[str] = None,
+    entidad_id: Optional[int] = None,
+    fecha_desde: Optional[datetime] = None,
+    fecha_hasta: Optional[datetime] = None
+) -> int:
+    """
+    Registros archivados que cumplen los filtros, contando como máximo hasta `limite`.
+
+    Los archivos que caen completos dentro del rango y sin otros filtros se
+    cuentan con el catálogo; solo se leen los demás.
+    """
+    iguales = _filtros_iguales(usuario_id, accion, entidad, entidad_id)
+    fecha_desde, fecha_hasta = _sin_zona(fecha_desde), _sin_zona(fecha_hasta)
+
+    total = 0
+    for archivo in archivos_en_rango(db, fecha_desde, fecha_hasta):
+        completo = (
+            not iguales
+            and (fecha_desde is None or archivo.fecha_desde >= fecha_desde)
+            and (fecha_hasta is None or archivo.fecha_hasta <= fecha_hasta)
+        )
+        if completo:
+            total += archivo.registros
+        else:
+            total += sum(1 for _ in _filtrar(archivo, iguales, fecha_desde, fecha_hasta))
+        if limite is not None and total >= limite:
+            break
+    return total
+
+
+def obtener_archivado(db: Session, registro_id: int) -> Optional[RegistroAuditoria]:
+    """Buscar un registro por id en los archivos cuyo rango de ids lo contiene."""
+    archivos = db.query(ArchivoAuditoria).filter(
+        ArchivoAuditoria.id_minimo <= registro_id,
+        ArchivoAuditoria.id_maximo >= registro_id
+    ).all()
+    for archivo in archivos:
+        for valores in _leer(archivo):
+            if valores["id"] == registro_id:
+                return RegistroAuditoria(**valores)
+    return None
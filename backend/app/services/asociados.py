@@ -1,13 +1,19 @@
-import math
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from sqlalchemy import and_, desc, func, or_
+from sqlalchemy import and_, desc, func
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer_group
 
+from app.core.paginacion import PaginaCursor, paginar_por_cursor
+from app.core.proyeccion import columnas_proyeccion
 from app.models import Asociado
-from app.schemas import AsociadoActualizar, AsociadoCrear, AsociadosListResponse, InfoPaginacion
+from app.models.asociado import GRUPO_DATOS_JSON
+from app.models.estadistica_mensual import MetricaMensual
+from app.schemas import AsociadoActualizar, AsociadoCrear
+from app.services import busqueda_asociados
+from app.services.directorio_asociados import directorio
+from app.services.dashboard import DashboardService
 
 
 class DocumentoDuplicadoError(Exception):
@@ -18,39 +24,70 @@ class EmailDuplicadoError(Exception):
     """Se lanza cuando el email ya existe."""
 
 
-def listar_asociados(
+# Campos que el listado puede responder con `campos=` (ver app.core.proyeccion)
+CAMPOS_LISTADO = {
+    nombre: getattr(Asociado, nombre)
+    for nombre in (
+        "id", "tipo_documento", "numero_documento", "nombres", "apellidos", "correo_electronico",
+        "telefono_principal", "estado", "fecha_ingreso", "ciudad", "fecha_nacimiento", "empresa",
+        "created_at", "updated_at",
+    )
+}
+CAMPOS_RESUMEN = ("id", "numero_documento", "nombres", "apellidos", "estado")
+
+
+def _consulta_asociados(
     db: Session,
-    skip: int = 0,
-    limit: int = 100,
     estado: Optional[str] = None,
     numero_documento: Optional[str] = None,
     nombre: Optional[str] = None,
     correo: Optional[str] = None,
-    ordenar_por: str = "fecha_ingreso",
-    orden: str = "desc",
-) -> AsociadosListResponse:
-    """
-    Listar asociados con paginación y filtros avanzados.
-    """
+    ciudad: Optional[str] = None,
+    empresa: Optional[str] = None,
+):
+    """Consulta de asociados con los filtros del listado aplicados."""
     consulta = db.query(Asociado)
     
-    # Aplicar filtros
     if estado:
         consulta = consulta.filter(Asociado.estado == estado)
     if numero_documento:
         consulta = consulta.filter(Asociado.numero_documento.contains(numero_documento))
     if nombre:
-        consulta = consulta.filter(
-            or_(
-                Asociado.nombres.ilike(f"%{nombre}%"),
-                Asociado.apellidos.ilike(f"%{nombre}%")
-            )
-        )
+        condicion = busqueda_asociados.filtro_nombre(db, nombre)
+        if condicion is not None:
+            consulta = consulta.filter(condicion)
     if correo:
         consulta = consulta.filter(Asociado.correo_electronico.ilike(f"%{correo}%"))
+    if ciudad:
+        consulta = consulta.filter(Asociado.ciudad == ciudad)
+    if empresa:
+        consulta = consulta.filter(Asociado.empresa == empresa)
+    return consulta
+
+
+def listar_asociados(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    estado: Optional[str] = None,
+    numero_documento: Optional[str] = None,
+    nombre: Optional[str] = None,
+    correo: Optional[str] = None,
+    ciudad: Optional[str] = None,
+    empresa: Optional[str] = None,
+    ordenar_por: str = "fecha_ingreso",
+    orden: str = "desc",
+    campos: Optional[List[str]] = None,
+) -> Tuple[List[Asociado], int]:
+    """
+    Listar asociados con paginación y filtros avanzados.
+
+    Con `campos` devuelve filas con solo esas columnas en lugar de asociados.
+    """
+    consulta = _consulta_asociados(db, estado, numero_documento, nombre, correo, ciudad, empresa)
     
-    # Obtener total de registros
-    total = consulta.count()
+    # Obtener total de registros (sin arrastrar las columnas JSON a la subconsulta)
+    total = consulta.with_entities(func.count(Asociado.id)).scalar()
     
     # Aplicar ordenamiento
     campo_orden = getattr(Asociado, ordenar_por, Asociado.fecha_ingreso)
@@ -58,32 +95,56 @@ def listar_asociados(
         consulta = consulta.order_by(desc(campo_orden))
     else:
         consulta = consulta.order_by(campo_orden)
+    if campos:
+        consulta = consulta.with_entities(*columnas_proyeccion(campos, CAMPOS_LISTADO))
     
     # Aplicar paginación
     asociados = consulta.offset(skip).limit(limit).all()
     
-    # Calcular información de paginación
-    pagina_actual = (skip // limit) + 1
-    total_paginas = math.ceil(total / limit) if total > 0 else 1
-    
-    paginacion = InfoPaginacion(
-        total=total,
-        pagina_actual=pagina_actual,
-        por_pagina=limit,
-        total_paginas=total_paginas,
-        tiene_siguiente=pagina_actual < total_paginas,
-        tiene_anterior=pagina_actual > 1
-    )
-    
-    return AsociadosListResponse(
-        datos=asociados,
-        paginacion=paginacion
+    return asociados, total
+
+
+def listar_asociados_por_cursor(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    total: Optional[str] = None,
+    estado: Optional[str] = None,
+    numero_documento: Optional[str] = None,
+    nombre: Optional[str] = None,
+    correo: Optional[str] = None,
+    ciudad: Optional[str] = None,
+    empresa: Optional[str] = None,
+    ordenar_por: str = "fecha_ingreso",
+    orden: str = "desc",
+    campos: Optional[List[str]] = None,
+) -> PaginaCursor:
+    """
+    Listar asociados paginando por cursor; `campos` como en `listar_asociados`.
+
+    Raises:
+        ValueError: Si el cursor no es válido o el campo de orden admite nulos.
+    """
+    consulta = _consulta_asociados(db, estado, numero_documento, nombre, correo, ciudad, empresa)
+    if ordenar_por not in Asociado.__table__.columns:
+        ordenar_por = "fecha_ingreso"
+    llave = [getattr(Asociado, ordenar_por), Asociado.id]
+    if campos:
+        # La llave de orden se selecciona aunque no se pida, para armar el cursor
+        consulta = consulta.with_entities(*columnas_proyeccion(campos, CAMPOS_LISTADO, llave))
+    return paginar_por_cursor(
+        consulta,
+        llave,
+        limit,
+        cursor=cursor,
+        descendente=orden == "desc",
+        total=total
     )
 
 
 def obtener_asociado(db: Session, asociado_id: int) -> Optional[Asociado]:
-    """Obtener un asociado por su ID."""
-    return db.query(Asociado).filter(Asociado.id == asociado_id).first()
+    """Obtener un asociado por su ID, con sus datos JSON."""
+    return db.query(Asociado).options(undefer_group(GRUPO_DATOS_JSON)).filter(Asociado.id == asociado_id).first()
 
 
 def obtener_por_documento(db: Session, numero_documento: str) -> Optional[Asociado]:
@@ -102,17 +163,23 @@ def obtener_por_email(db: Session, email: str, excluir_id: Optional[int] = None)
 def buscar_asociados(db: Session, termino: str, limite: int = 20) -> List[Asociado]:
     """
     Búsqueda de texto libre en asociados.
-    Busca en nombres, apellidos, número de documento y correo.
+    Busca por prefijo de palabra en nombres, apellidos, número de documento y
+    correo, sin distinguir mayúsculas ni tildes, y ordena por relevancia.
+    Si no hay coincidencias, tolera un error de digitación por palabra
+    usando el directorio en memoria.
     """
-    termino_busqueda = f"%{termino}%"
-    return db.query(Asociado).filter(
-        or_(
-            Asociado.nombres.ilike(termino_busqueda),
-            Asociado.apellidos.ilike(termino_busqueda),
-            Asociado.numero_documento.ilike(termino_busqueda),
-            Asociado.correo_electronico.ilike(termino_busqueda)
-        )
-    ).limit(limite).all()
+    resultado = busqueda_asociados.buscar(db, termino, limite)
+    if resultado:
+        return resultado
+
+    directorio.asegurar_cargado(db)
+    ids = [miembro.id for miembro in directorio.buscar(termino, limite)]
+    if not ids:
+        return []
+    por_id = {
+        a.id: a for a in db.query(Asociado).options(undefer_group(GRUPO_DATOS_JSON)).filter(Asociado.id.in_(ids))
+    }
+    return [por_id[asociado_id] for asociado_id in ids if asociado_id in por_id]
 
 
 def obtener_estadisticas(db: Session) -> dict:
@@ -187,12 +254,15 @@ def crear_asociado(db: Session, asociado_in: AsociadoCrear) -> Asociado:
     
     db.add(db_asociado)
     try:
+        DashboardService.acumular_estadistica_mensual(db, MetricaMensual.ASOCIADOS_NUEVOS, db_asociado.fecha_ingreso)
         db.commit()
     except IntegrityError as exc:
         db.rollback()
         raise DocumentoDuplicadoError("Error de integridad en base de datos.") from exc
     
+    DashboardService.invalidar_cache()
     db.refresh(db_asociado)
+    directorio.registrar(db_asociado)
     return db_asociado
 
 
@@ -209,6 +279,8 @@ def actualizar_asociado(db: Session, db_obj: Asociado, asociado_in: AsociadoActu
         if email_existente:
             raise EmailDuplicadoError("El correo electrónico ya está registrado por otro asociado.")
 
+    fecha_ingreso_anterior = db_obj.fecha_ingreso
+
     for campo, valor in datos_actualizados.items():
         if campo in {
             "datos_personales",
@@ -227,12 +299,19 @@ def actualizar_asociado(db: Session, db_obj: Asociado, asociado_in: AsociadoActu
 
     db.add(db_obj)
     try:
+        if db_obj.fecha_ingreso is not None and db_obj.fecha_ingreso != fecha_ingreso_anterior:
+            DashboardService.acumular_estadistica_mensual(
+                db, MetricaMensual.ASOCIADOS_NUEVOS, fecha_ingreso_anterior, signo=-1
+            )
+            DashboardService.acumular_estadistica_mensual(db, MetricaMensual.ASOCIADOS_NUEVOS, db_obj.fecha_ingreso)
         db.commit()
     except IntegrityError as exc:
         db.rollback()
         raise EmailDuplicadoError("Error de integridad en base de datos.") from exc
     
+    DashboardService.invalidar_cache()
     db.refresh(db_obj)
+    directorio.registrar(db_obj)
     return db_obj
 
 
@@ -244,4 +323,6 @@ def eliminar_asociado(db: Session, db_obj: Asociado) -> None:
     db_obj.estado = "inactivo"
     db.add(db_obj)
     db.commit()
+    DashboardService.invalidar_cache()
     db.refresh(db_obj)
+    directorio.registrar(db_obj)
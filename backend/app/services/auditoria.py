@@ -1,10 +1,17 @@
+import heapq
 import json
-from typing import Optional, Any
+from itertools import islice
+from typing import Any, Iterator, List, Optional, Tuple
 from datetime import datetime
 from fastapi import Request
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
+from app.core import paginacion
+from app.core.paginacion import PaginaCursor, codificar_cursor, decodificar_cursor, paginar_por_cursor
 from app.models.auditoria import RegistroAuditoria
 from app.models.usuario import Usuario
+from app.services import archivo_auditoria
+from app.services.escritor_auditoria import escritor
 
 
 class AuditoriaService:
@@ -25,6 +32,10 @@ class AuditoriaService:
         """
         Registra una operación en el log de auditoría
         
+        Con el escritor de auditoría activo el registro se encola y se inserta
+        en segundo plano, sin tocar la sesión `db`; si no, se guarda en `db`
+        con commit.
+        
         Args:
             db: Sesión de base de datos
             usuario: Usuario que realiza la acción
@@ -37,7 +48,7 @@ class AuditoriaService:
             request: Request de FastAPI para obtener IP y User-Agent
         
         Returns:
-            RegistroAuditoria creado
+            RegistroAuditoria creado (sin id si se escribe en segundo plano)
         """
         ip_address = None
         user_agent = None
@@ -46,7 +57,7 @@ class AuditoriaService:
             ip_address = request.client.host if request.client else None
             user_agent = request.headers.get("user-agent")
         
-        registro = RegistroAuditoria(
+        fila = dict(
             usuario_id=usuario.id,
             accion=accion,
             entidad=entidad,
@@ -55,9 +66,15 @@ class AuditoriaService:
             datos_anteriores=json.dumps(datos_anteriores, ensure_ascii=False) if datos_anteriores else None,
             datos_nuevos=json.dumps(datos_nuevos, ensure_ascii=False) if datos_nuevos else None,
             ip_address=ip_address,
-            user_agent=user_agent
+            user_agent=user_agent,
+            fecha_hora=datetime.utcnow()
         )
         
+        if escritor.activo:
+            escritor.encolar(fila)
+            return RegistroAuditoria(**fila)
+        
+        registro = RegistroAuditoria(**fila)
         db.add(registro)
         db.commit()
         db.refresh(registro)
@@ -174,3 +191,155 @@ class AuditoriaService:
             datos_anteriores=datos,
             request=request
         )
+    
+    @staticmethod
+    def _consulta_registros(
+        db: Session,
+        usuario_id: Optional[int] = None,
+        accion: Optional[str] = None,
+        entidad: Optional[str] = None,
+        entidad_id: Optional[int] = None,
+        fecha_desde: Optional[datetime] = None,
+        fecha_hasta: Optional[datetime] = None
+    ):
+        """Consulta de registros de auditoría con los filtros del listado aplicados."""
+        filtros = []
+        if usuario_id:
+            filtros.append(RegistroAuditoria.usuario_id == usuario_id)
+        if accion:
+            filtros.append(RegistroAuditoria.accion == accion)
+        if entidad:
+            filtros.append(RegistroAuditoria.entidad == entidad)
+        if entidad_id:
+            filtros.append(RegistroAuditoria.entidad_id == entidad_id)
+        if fecha_desde:
+            filtros.append(RegistroAuditoria.fecha_hora >= fecha_desde)
+        if fecha_hasta:
+            filtros.append(RegistroAuditoria.fecha_hora <= fecha_hasta)
+        
+        return db.query(RegistroAuditoria).filter(*filtros)
+    
+    @staticmethod
+    def _tardios_y_archivados(
+        db: Session,
+        consulta,
+        frontera: Optional[datetime],
+        antes_de: Optional[Tuple[datetime, int]] = None,
+        **filtros
+    ) -> Iterator[RegistroAuditoria]:
+        """
+        Registros archivados intercalados con los de la tabla que no son
+        posteriores al archivo más reciente (`frontera`), del más reciente al
+        más antiguo. Un registro que llegó tarde a un mes ya archivado sigue en
+        la tabla hasta el siguiente archivo, y su lugar está entre los archivados.
+        """
+        archivados = archivo_auditoria.registros_archivados(db, antes_de=antes_de, **filtros)
+        if frontera is None:
+            return archivados
+        tardios = consulta.filter(RegistroAuditoria.fecha_hora <= frontera)
+        if antes_de:
+            tardios = tardios.filter(or_(
+                RegistroAuditoria.fecha_hora < antes_de[0],
+                and_(RegistroAuditoria.fecha_hora == antes_de[0], RegistroAuditoria.id < antes_de[1])
+            ))
+        tardios = tardios.order_by(
+            RegistroAuditoria.fecha_hora.desc(), RegistroAuditoria.id.desc()
+        ).yield_per(archivo_auditoria.TAMANO_LECTURA)
+        return heapq.merge(tardios, archivados, key=lambda r: (r.fecha_hora, r.id), reverse=True)
+    
+    @staticmethod
+    def listar_registros(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        incluir_archivados: bool = False,
+        **filtros
+    ) -> List[RegistroAuditoria]:
+        """
+        Listar registros de auditoría, del más reciente al más antiguo.
+        
+        Con `incluir_archivados`, si la tabla no alcanza a llenar la página
+        se continúa con los meses archivados que cruzan el rango de fechas.
+        """
+        consulta = AuditoriaService._consulta_registros(db, **filtros)
+        frontera = archivo_auditoria.fecha_mas_reciente(db) if incluir_archivados else None
+        # Los registros posteriores al archivo más reciente van antes que todos los archivados
+        recientes = consulta if frontera is None else consulta.filter(RegistroAuditoria.fecha_hora > frontera)
+        registros = recientes.order_by(
+            RegistroAuditoria.fecha_hora.desc(), RegistroAuditoria.id.desc()
+        ).offset(skip).limit(limit).all()
+        
+        if incluir_archivados and len(registros) < limit:
+            omitir = 0
+            if not registros and skip:
+                omitir = max(skip - recientes.with_entities(func.count(RegistroAuditoria.id)).scalar(), 0)
+            faltan = limit - len(registros)
+            registros += islice(
+                AuditoriaService._tardios_y_archivados(db, consulta, frontera, **filtros),
+                omitir,
+                omitir + faltan
+            )
+        
+        return registros
+    
+    @staticmethod
+    def listar_registros_por_cursor(
+        db: Session,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        total: Optional[str] = None,
+        incluir_archivados: bool = False,
+        **filtros
+    ) -> PaginaCursor:
+        """
+        Listar registros de auditoría paginando por cursor.
+        
+        Recorrer cientos de miles de registros cuesta lo mismo en cualquier
+        página: cada una continúa desde (fecha_hora, id) de la anterior.
+        Con `incluir_archivados` el recorrido sigue por los meses archivados
+        al terminar la tabla, y el total los incluye.
+        """
+        columnas = [RegistroAuditoria.fecha_hora, RegistroAuditoria.id]
+        consulta = AuditoriaService._consulta_registros(db, **filtros)
+        frontera = archivo_auditoria.fecha_mas_reciente(db) if incluir_archivados else None
+        recientes = consulta if frontera is None else consulta.filter(RegistroAuditoria.fecha_hora > frontera)
+        pagina = paginar_por_cursor(
+            recientes,
+            columnas,
+            limit,
+            cursor=cursor,
+            total=total
+        )
+        if not incluir_archivados:
+            return pagina
+        
+        conteo, exacto = pagina.total, pagina.total_exacto
+        if conteo is not None and exacto:
+            if frontera is not None:
+                conteo += consulta.filter(RegistroAuditoria.fecha_hora <= frontera).with_entities(
+                    func.count(RegistroAuditoria.id)
+                ).scalar()
+            tope = None if total == "exacto" else paginacion.LIMITE_CONTEO_ESTIMADO - conteo + 1
+            conteo += archivo_auditoria.contar_archivados(db, tope, **filtros)
+            if tope is not None and conteo > paginacion.LIMITE_CONTEO_ESTIMADO:
+                conteo, exacto = paginacion.LIMITE_CONTEO_ESTIMADO, False
+        if pagina.siguiente_cursor:
+            return pagina._replace(total=conteo, total_exacto=exacto)
+        
+        if pagina.items:
+            antes_de = (pagina.items[-1].fecha_hora, pagina.items[-1].id)
+        else:
+            antes_de = tuple(decodificar_cursor(cursor, columnas, True)) if cursor else None
+        faltan = limit - len(pagina.items)
+        siguientes = list(islice(
+            AuditoriaService._tardios_y_archivados(db, consulta, frontera, antes_de, **filtros), faltan + 1
+        ))
+        items = pagina.items + siguientes[:faltan]
+        siguiente = codificar_cursor(columnas, True, items[-1]) if len(siguientes) > faltan else None
+        return PaginaCursor(items, siguiente, conteo, exacto)
+    
+    @staticmethod
+    def obtener_registro(db: Session, registro_id: int) -> Optional[RegistroAuditoria]:
+        """Obtener un registro por ID, en la tabla o en los meses archivados."""
+        registro = db.query(RegistroAuditoria).filter(RegistroAuditoria.id == registro_id).first()
+        return registro or archivo_auditoria.obtener_archivado(db, registro_id)
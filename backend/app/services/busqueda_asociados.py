@@ -0,0 +1,119 @@
+"""
+Búsqueda de texto de asociados.
+
+Los términos se normalizan (minúsculas, sin tildes) y cada palabra se busca
+como prefijo: "garc lop" encuentra a "García López". La implementación
+depende del motor:
+
+- SQLite: tabla FTS5 `asociados_fts` ordenada por bm25, dando más peso al
+  nombre que al documento y al correo.
+- PostgreSQL: índice de trigramas sobre `nombre_busqueda`, ordenado por
+  similitud con el término.
+- Otros motores: LIKE sobre la columna normalizada.
+"""
+from typing import List, Optional
+
+from sqlalchemy import case, column, func, literal_column, or_, select, table, text, update
+from sqlalchemy.orm import Session, undefer_group
+
+from app.core.texto import normalizar_texto, tokens_busqueda
+from app.models.asociado import DDL_BUSQUEDA_SQLITE, GRUPO_DATOS_JSON, Asociado
+
+# Peso de cada columna de asociados_fts en el ranking (nombre, documento, correo)
+PESOS_FTS = (10.0, 5.0, 1.0)
+
+asociados_fts = table("asociados_fts", column("rowid"))
+_fts = literal_column("asociados_fts")
+
+
+def _expresion_fts(tokens: List[str], columna: Optional[str] = None) -> str:
+    """Consulta MATCH de FTS5: todas las palabras como prefijo, opcionalmente en una sola columna."""
+    # Los tokens normalizados solo tienen [0-9a-z], no necesitan escape
+    expresion = " ".join(f'"{token}"*' for token in tokens)
+    return f"{columna} : ({expresion})" if columna else expresion
+
+
+def _motor(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def filtro_nombre(db: Session, nombre: str):
+    """
+    Condición para filtrar asociados por nombre o apellido.
+
+    Returns:
+        Expresión para `Query.filter`, o None si el término no tiene palabras.
+    """
+    tokens = tokens_busqueda(nombre)
+    if not tokens:
+        return None
+    if _motor(db) == "sqlite":
+        return Asociado.id.in_(
+            select(asociados_fts.c.rowid).where(_fts.op("MATCH")(_expresion_fts(tokens, "nombre_busqueda")))
+        )
+    return Asociado.nombre_busqueda.like("%" + "%".join(tokens) + "%")
+
+
+def buscar(db: Session, termino: str, limite: int = 20) -> List[Asociado]:
+    """
+    Asociados que coinciden con `termino` en nombre, documento o correo, del más al menos relevante.
+
+    Se devuelven con sus datos JSON cargados (la búsqueda responde el perfil completo).
+    """
+    tokens = tokens_busqueda(termino)
+    if not tokens:
+        return []
+
+    if _motor(db) == "sqlite":
+        # Rankear y cortar dentro del índice antes de unir con asociados: con
+        # términos frecuentes evita leer miles de filas que no se devuelven
+        relevancia = func.bm25(_fts, *PESOS_FTS).label("relevancia")
+        mejores = select(asociados_fts.c.rowid, relevancia).where(
+            _fts.op("MATCH")(_expresion_fts(tokens))
+        ).order_by(relevancia, asociados_fts.c.rowid).limit(limite).subquery()
+        return db.query(Asociado).options(undefer_group(GRUPO_DATOS_JSON)).join(
+            mejores, mejores.c.rowid == Asociado.id
+        ).order_by(mejores.c.relevancia, Asociado.id).all()
+
+    consulta = db.query(Asociado).options(undefer_group(GRUPO_DATOS_JSON))
+
+    correo = func.lower(Asociado.correo_electronico)
+    for token in tokens:
+        consulta = consulta.filter(or_(
+            Asociado.nombre_busqueda.like(f"%{token}%"),
+            Asociado.numero_documento.like(f"{token}%"),
+            correo.like(f"{token}%"),
+        ))
+
+    normalizado = " ".join(tokens)
+    if _motor(db) == "postgresql":
+        relevancia = func.similarity(Asociado.nombre_busqueda, normalizado).desc()
+    else:
+        relevancia = case((Asociado.nombre_busqueda.like(f"{normalizado}%"), 0), else_=1)
+    return consulta.order_by(relevancia, Asociado.id).limit(limite).all()
+
+
+def reconstruir_indice(db: Session) -> int:
+    """
+    Recalcular `nombre_busqueda` de todos los asociados y reconstruir el índice FTS.
+
+    Para cargas masivas que no pasan por el ORM (p. ej. inserciones directas en SQL).
+
+    Returns:
+        Número de asociados indexados.
+    """
+    filas = db.query(Asociado.id, Asociado.nombres, Asociado.apellidos).all()
+    if filas:
+        db.execute(
+            update(Asociado),
+            [
+                {"id": fila.id, "nombre_busqueda": normalizar_texto(f"{fila.nombres} {fila.apellidos}")}
+                for fila in filas
+            ]
+        )
+    if _motor(db) == "sqlite":
+        for sentencia in DDL_BUSQUEDA_SQLITE:
+            db.execute(text(sentencia))
+        db.execute(text("INSERT INTO asociados_fts(asociados_fts) VALUES ('rebuild')"))
+    db.commit()
+    return len(filas)
@@ -0,0 +1,257 @@
+"""
+Generación masiva de certificados (aportes y paz y salvo) para los asociados activos.
+
+Los datos se leen por lotes de asociados con pocas consultas agrupadas y los
+PDF se renderizan en paralelo en un pool de procesos. El resultado es un ZIP
+con un certificado por asociado y un `manifiesto.csv`.
+"""
+import csv
+import multiprocessing
+import os
+import tempfile
+import time
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.asociado import Asociado
+from app.models.contabilidad import Aporte
+from app.models.credito import Credito
+from app.services import reportes
+from app.services.reportes import DatosCertificadoAportes, DatosCertificadoPazSalvo
+
+# Asociados cuyos datos se cargan y renderizan juntos
+TAMANO_LOTE_CERTIFICADOS = 500
+
+TIPOS_CERTIFICADO = ("aportes", "paz_salvo")
+
+COLUMNAS_MANIFIESTO = {
+    "aportes": ["numero_documento", "nombres", "apellidos", "archivo", "total_aportes", "numero_aportes", "bytes"],
+    "paz_salvo": ["numero_documento", "nombres", "apellidos", "archivo", "paz_y_salvo", "total_deuda", "bytes"],
+}
+
+DatosCertificado = Union[DatosCertificadoAportes, DatosCertificadoPazSalvo]
+
+
+def validar_tipo_certificado(tipo: str) -> str:
+    """
+    Validar el tipo de certificado masivo.
+
+    Raises:
+        ValueError: Si el tipo no es soportado.
+    """
+    if tipo not in TIPOS_CERTIFICADO:
+        raise ValueError(f"Tipo de certificado '{tipo}' no soportado. Use uno de: {', '.join(TIPOS_CERTIFICADO)}")
+    return tipo
+
+
+def _datos_aportes(db: Session, asociados: List, ano: Optional[int]) -> List[DatosCertificadoAportes]:
+    """Cargar totales y últimos aportes de un lote de asociados con dos consultas."""
+    ids = [asociado.id for asociado in asociados]
+    filtros = [Aporte.asociado_id.in_(ids)]
+    if ano:
+        filtros.append(Aporte.fecha.between(date(ano, 1, 1), date(ano, 12, 31)))
+
+    totales = {
+        fila.asociado_id: (Decimal(str(fila.total)), fila.cantidad)
+        for fila in db.query(
+            Aporte.asociado_id,
+            func.sum(Aporte.valor).label("total"),
+            func.count(Aporte.id).label("cantidad")
+        ).filter(*filtros).group_by(Aporte.asociado_id)
+    }
+
+    posicion = func.row_number().over(
+        partition_by=Aporte.asociado_id,
+        order_by=(Aporte.fecha.desc(), Aporte.id.desc())
+    ).label("posicion")
+    recientes = db.query(
+        Aporte.asociado_id, Aporte.fecha, Aporte.valor, Aporte.tipo_aporte, Aporte.numero_recibo, posicion
+    ).filter(*filtros).subquery()
+
+    ultimos = defaultdict(list)
+    for fila in db.query(recientes).filter(
+        recientes.c.posicion <= reportes.APORTES_DETALLE_CERTIFICADO
+    ).order_by(recientes.c.asociado_id, recientes.c.posicion.desc()):
+        ultimos[fila.asociado_id].append((fila.fecha, fila.valor, fila.tipo_aporte, fila.numero_recibo))
+
+    datos = []
+    for asociado in asociados:
+        total, cantidad = totales.get(asociado.id, (Decimal("0.00"), 0))
+        datos.append(DatosCertificadoAportes(
+            nombres=asociado.nombres,
+            apellidos=asociado.apellidos,
+            numero_documento=asociado.numero_documento,
+            ano=ano,
+            total_aportes=total,
+            numero_aportes=cantidad,
+            ultimos_aportes=ultimos[asociado.id]
+        ))
+    return datos
+
+
+def _datos_paz_salvo(db: Session, asociados: List) -> List[DatosCertificadoPazSalvo]:
+    """Cargar las obligaciones con saldo de un lote de asociados con una consulta."""
+    obligaciones = defaultdict(list)
+    for credito in db.query(
+        Credito.asociado_id,
+        Credito.numero_credito,
+        Credito.tipo_credito,
+        Credito.saldo_capital,
+        Credito.saldo_interes,
+        Credito.saldo_mora,
+        Credito.estado
+    ).filter(
+        Credito.asociado_id.in_([asociado.id for asociado in asociados]),
+        Credito.estado.in_(["desembolsado", "al_dia", "mora"]),
+        Credito.saldo_capital > 0
+    ).order_by(Credito.id):
+        obligaciones[credito.asociado_id].append(reportes.obligacion_certificado(credito))
+
+    return [
+        DatosCertificadoPazSalvo(
+            nombres=asociado.nombres,
+            apellidos=asociado.apellidos,
+            numero_documento=asociado.numero_documento,
+            obligaciones=obligaciones[asociado.id]
+        )
+        for asociado in asociados
+    ]
+
+
+def _renderizar(datos: DatosCertificado) -> bytes:
+    """Renderizar un certificado; se ejecuta en los procesos del pool."""
+    if isinstance(datos, DatosCertificadoAportes):
+        return reportes.renderizar_certificado_aportes(datos).getvalue()
+    return reportes.renderizar_certificado_paz_salvo(datos).getvalue()
+
+
+def _fila_manifiesto(tipo: str, datos: DatosCertificado, archivo: str, tamano: int) -> list:
+    if tipo == "aportes":
+        detalle = [datos.total_aportes, datos.numero_aportes]
+    else:
+        total_deuda = sum((obligacion[3] for obligacion in datos.obligaciones), Decimal("0.00"))
+        detalle = ["si" if not datos.obligaciones else "no", total_deuda]
+    return [datos.numero_documento, datos.nombres, datos.apellidos, archivo, *detalle, tamano]
+
+
+@contextmanager
+def _renderizador(workers: int):
+    """Función map que renderiza en el proceso actual (1 worker) o en un pool de procesos."""
+    if workers <= 1:
+        yield map
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        def mapear(funcion, datos):
+            return pool.map(funcion, datos, chunksize=max(1, len(datos) // (workers * 4)))
+        yield mapear
+
+
+def generar_certificados_masivos(
+    db: Session,
+    tipo: str,
+    destino: BinaryIO,
+    ano: Optional[int] = None,
+    workers: Optional[int] = None,
+    tamano_lote: int = TAMANO_LOTE_CERTIFICADOS,
+    progreso: Optional[Callable[[dict], None]] = None
+) -> Dict:
+    """
+    Generar el certificado de todos los asociados activos en un ZIP.
+
+    Por cada lote de `tamano_lote` asociados se hacen a lo sumo tres consultas
+    (asociados, totales y detalle), sin importar cuántos asociados tenga el lote.
+
+    Args:
+        tipo: "aportes" o "paz_salvo"
+        destino: Archivo binario donde se escribe el ZIP
+        ano: Año de los aportes (solo para tipo "aportes"; None = histórico)
+        workers: Procesos de renderizado (default: núcleos disponibles)
+        progreso: Función llamada con el resumen de cada lote
+
+    Returns:
+        dict: Certificados generados, duración y certificados por segundo
+    """
+    validar_tipo_certificado(tipo)
+    workers = workers or os.cpu_count() or 1
+    inicio = time.perf_counter()
+
+    manifiesto = StringIO()
+    escritor = csv.writer(manifiesto)
+    escritor.writerow(COLUMNAS_MANIFIESTO[tipo])
+
+    total = 0
+    ultimo_id = 0
+    numero_lote = 0
+
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED) as zip_salida, \
+            _renderizador(workers) as mapear:
+        while True:
+            asociados = db.query(
+                Asociado.id, Asociado.nombres, Asociado.apellidos, Asociado.numero_documento
+            ).filter(
+                Asociado.estado == "activo",
+                Asociado.id > ultimo_id
+            ).order_by(Asociado.id).limit(tamano_lote).all()
+
+            if not asociados:
+                break
+
+            if tipo == "aportes":
+                datos = _datos_aportes(db, asociados, ano)
+            else:
+                datos = _datos_paz_salvo(db, asociados)
+
+            for datos_asociado, pdf in zip(datos, mapear(_renderizar, datos)):
+                archivo = f"certificado_{tipo}_{datos_asociado.numero_documento}.pdf"
+                zip_salida.writestr(archivo, pdf)
+                escritor.writerow(_fila_manifiesto(tipo, datos_asociado, archivo, len(pdf)))
+
+            total += len(datos)
+            numero_lote += 1
+            ultimo_id = asociados[-1].id
+
+            if progreso:
+                progreso({
+                    "lote": numero_lote,
+                    "certificados": len(datos),
+                    "acumulado": total,
+                    "segundos": round(time.perf_counter() - inicio, 2)
+                })
+
+        zip_salida.writestr("manifiesto.csv", manifiesto.getvalue())
+
+    duracion = time.perf_counter() - inicio
+    return {
+        "tipo": tipo,
+        "ano": ano,
+        "certificados": total,
+        "lotes": numero_lote,
+        "workers": workers,
+        "segundos": round(duracion, 2),
+        "certificados_por_segundo": round(total / duracion, 2) if duracion > 0 else 0.0,
+    }
+
+
+def exportar_certificados_masivos(db: Session, tipo: str, ano: Optional[int] = None) -> BinaryIO:
+    """
+    Generar los certificados masivos en un archivo temporal posicionado al inicio.
+
+    Se ejecuta como trabajo de la cola, ya dentro de un proceso worker: por
+    defecto renderiza en ese mismo proceso en lugar de abrir otro pool por
+    cada worker (`REPORTES_CERTIFICADOS_WORKERS`).
+    """
+    archivo = tempfile.SpooledTemporaryFile(max_size=reportes.LIMITE_MEMORIA_EXPORTACION)
+    generar_certificados_masivos(db, tipo, archivo, ano=ano, workers=settings.reportes_certificados_workers)
+    archivo.seek(0)
+    return archivo
@@ -0,0 +1,116 @@
+"""
+Servicio de consecutivos - Numeración secuencial sin huecos ni duplicados.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.consecutivo import Consecutivo
+
+
+class ConsecutivoService:
+    """Servicio para asignar números consecutivos por prefijo y período."""
+
+    @staticmethod
+    def siguiente_valor(db: Session, prefijo: str, periodo: str, columna=None) -> int:
+        """
+        Incrementar y retornar el consecutivo de un prefijo y período.
+        
+        Ver `reservar_valores` para el manejo de bloqueo y de la primera vez del período.
+        """
+        return ConsecutivoService.reservar_valores(db, prefijo, periodo, 1, columna)
+
+    @staticmethod
+    def reservar_valores(
+        db: Session,
+        prefijo: str,
+        periodo: str,
+        cantidad: int,
+        columna=None
+    ) -> int:
+        """
+        Reservar un bloque de `cantidad` consecutivos y retornar el primero.
+        
+        El incremento es un UPDATE sobre la fila del consecutivo, que la deja
+        bloqueada hasta el commit de la transacción del llamador (bloqueo de fila
+        en PostgreSQL, bloqueo de escritura en SQLite). Si la transacción se
+        revierte, los números se liberan y no quedan huecos. En SQLite el
+        driver abre la transacción con el primer INSERT/UPDATE, así que las
+        consultas previas del llamador no dejan una lectura que deba pasar a
+        escritura (lo que en WAL falla con "database is locked").
+        
+        Args:
+            prefijo: Prefijo del número (ej: "CR", "AH-VISTA")
+            periodo: Período del consecutivo (ej: "202412", "20241215")
+            cantidad: Cantidad de números a reservar
+            columna: Columna con números ya emitidos, usada solo la primera vez
+                que se usa el período para continuar desde el último existente
+        """
+        if cantidad < 1:
+            raise ValueError("La cantidad de consecutivos a reservar debe ser mayor a cero")
+        
+        filtro = (Consecutivo.prefijo == prefijo, Consecutivo.periodo == periodo)
+        
+        for _ in range(2):
+            resultado = db.execute(
+                update(Consecutivo)
+                .where(*filtro)
+                .values(ultimo_valor=Consecutivo.ultimo_valor + cantidad, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            if resultado.rowcount:
+                ultimo = db.query(Consecutivo.ultimo_valor).filter(*filtro).scalar()
+                return ultimo - cantidad + 1
+            
+            # Primera vez del período: crear la fila partiendo del último número emitido
+            inicial = 0
+            if columna is not None:
+                inicial = ConsecutivoService.ultimo_numero_existente(db, columna, f"{prefijo}-{periodo}-")
+            try:
+                with db.begin_nested():
+                    db.add(Consecutivo(prefijo=prefijo, periodo=periodo, ultimo_valor=inicial))
+            except IntegrityError:
+                # Otra transacción creó la fila al mismo tiempo; reintentar el UPDATE
+                pass
+        
+        raise RuntimeError(f"No se pudo asignar consecutivo para {prefijo}-{periodo}")
+
+    @staticmethod
+    def generar_numero(db: Session, prefijo: str, periodo: str, columna=None) -> str:
+        """
+        Generar número con formato PREFIJO-PERIODO-000001.
+        
+        Ejemplo: generar_numero(db, "CR", "202412") -> "CR-202412-000001"
+        """
+        valor = ConsecutivoService.siguiente_valor(db, prefijo, periodo, columna)
+        return f"{prefijo}-{periodo}-{valor:06d}"
+
+    @staticmethod
+    def generar_numeros(
+        db: Session,
+        prefijo: str,
+        periodo: str,
+        cantidad: int,
+        columna=None
+    ) -> List[str]:
+        """Generar un bloque de números consecutivos con una sola actualización."""
+        primero = ConsecutivoService.reservar_valores(db, prefijo, periodo, cantidad, columna)
+        return [f"{prefijo}-{periodo}-{valor:06d}" for valor in range(primero, primero + cantidad)]
+
+    @staticmethod
+    def ultimo_numero_existente(db: Session, columna, prefijo_completo: str) -> int:
+        """Obtener el mayor consecutivo ya emitido en una columna para un prefijo."""
+        ultimo: Optional[str] = db.query(func.max(columna)).filter(
+            columna.like(f"{prefijo_completo}%")
+        ).scalar()
+        
+        if not ultimo:
+            return 0
+        
+        try:
+            return int(ultimo.split("-")[-1])
+        except ValueError:
+            return 0
@@ -1,19 +1,23 @@
 """
 Servicio de contabilidad - Lógica de negocio.
 """
+from calendar import monthrange
 from datetime import date, datetime
 from decimal import Decimal
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, func
+from sqlalchemy import and_, extract, func, or_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
+from app.core.paginacion import PaginaCursor, paginar_por_cursor
 from app.models.contabilidad import (
     CuentaContable,
     AsientoContable,
     MovimientoContable,
     Aporte,
+    SaldoMensual,
     TipoCuenta,
     NaturalezaCuenta
 )
@@ -25,6 +29,7 @@ from app.schemas.contabilidad import (
     AporteCrear,
     MovimientoContableCrear
 )
+from app.services.consecutivos import ConsecutivoService
 
 
 class ContabilidadService:
@@ -138,20 +143,9 @@ class ContabilidadService:
     def generar_numero_asiento(db: Session, fecha: date) -> str:
         """Generar número consecutivo de asiento."""
         # Formato: AS-YYYYMM-000001
-        prefijo = f"AS-{fecha.year}{fecha.month:02d}-"
-        
-        # Obtener último número del mes
-        ultimo = db.query(AsientoContable).filter(
-            AsientoContable.numero.like(f"{prefijo}%")
-        ).order_by(AsientoContable.numero.desc()).first()
-        
-        if ultimo:
-            ultimo_numero = int(ultimo.numero.split("-")[-1])
-            nuevo_numero = ultimo_numero + 1
-        else:
-            nuevo_numero = 1
-        
-        return f"{prefijo}{nuevo_numero:06d}"
+        return ConsecutivoService.generar_numero(
+            db, "AS", f"{fecha.year}{fecha.month:02d}", AsientoContable.numero
+        )
 
     @staticmethod
     def crear_asiento(
@@ -215,22 +209,26 @@ class ContabilidadService:
             )
             db.add(movimiento)
         
+        ContabilidadService.acumular_saldos_mensuales(
+            db,
+            data.fecha,
+            [(m.cuenta_id, m.debito, m.credito) for m in data.movimientos]
+        )
+        
         db.commit()
         db.refresh(asiento)
         
         return asiento
 
     @staticmethod
-    def listar_asientos(
+    def _consulta_asientos(
         db: Session,
         fecha_inicio: Optional[date] = None,
         fecha_fin: Optional[date] = None,
         tipo_movimiento: Optional[str] = None,
-        solo_activos: bool = True,
-        skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[List[AsientoContable], int]:
-        """Listar asientos con filtros."""
+        solo_activos: bool = True
+    ):
+        """Consulta de asientos con los filtros del listado aplicados."""
         query = db.query(AsientoContable)
         
         if fecha_inicio:
@@ -245,6 +243,21 @@ class ContabilidadService:
         if solo_activos:
             query = query.filter(AsientoContable.anulado == False)
         
+        return query
+
+    @staticmethod
+    def listar_asientos(
+        db: Session,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None,
+        tipo_movimiento: Optional[str] = None,
+        solo_activos: bool = True,
+        skip: int = 0,
+        limit: int = 100
+    ) -> Tuple[List[AsientoContable], int]:
+        """Listar asientos con filtros."""
+        query = ContabilidadService._consulta_asientos(db, fecha_inicio, fecha_fin, tipo_movimiento, solo_activos)
+        
         total = query.count()
         
         asientos = query.order_by(
@@ -254,6 +267,26 @@ class ContabilidadService:
         
         return asientos, total
 
+    @staticmethod
+    def listar_asientos_por_cursor(
+        db: Session,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None,
+        tipo_movimiento: Optional[str] = None,
+        solo_activos: bool = True,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        total: Optional[str] = None
+    ) -> PaginaCursor:
+        """Listar asientos con filtros paginando por cursor."""
+        return paginar_por_cursor(
+            ContabilidadService._consulta_asientos(db, fecha_inicio, fecha_fin, tipo_movimiento, solo_activos),
+            [AsientoContable.fecha, AsientoContable.numero, AsientoContable.id],
+            limit,
+            cursor=cursor,
+            total=total
+        )
+
     @staticmethod
     def obtener_asiento(db: Session, asiento_id: int) -> Optional[AsientoContable]:
         """Obtener asiento con sus movimientos."""
@@ -280,6 +313,14 @@ class ContabilidadService:
         asiento.anulado_por_id = usuario_id
         asiento.motivo_anulacion = motivo
         
+        # Revertir el efecto del asiento en los saldos mensuales
+        ContabilidadService.acumular_saldos_mensuales(
+            db,
+            asiento.fecha,
+            [(m.cuenta_id, m.debito, m.credito) for m in asiento.movimientos],
+            signo=-1
+        )
+        
         db.commit()
         db.refresh(asiento)
         
@@ -373,6 +414,15 @@ class ContabilidadService:
                 )
                 db.add(mov_credito)
                 
+                ContabilidadService.acumular_saldos_mensuales(
+                    db,
+                    data.fecha,
+                    [
+                        (cuenta_banco.id, data.valor, Decimal("0")),
+                        (cuenta_aportes.id, Decimal("0"), data.valor)
+                    ]
+                )
+                
                 aporte.asiento_id = asiento.id
         
         db.commit()
@@ -381,16 +431,14 @@ class ContabilidadService:
         return aporte
 
     @staticmethod
-    def listar_aportes(
+    def _consulta_aportes(
         db: Session,
         asociado_id: Optional[int] = None,
         fecha_inicio: Optional[date] = None,
         fecha_fin: Optional[date] = None,
-        estado: Optional[str] = None,
-        skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[List[Aporte], int]:
-        """Listar aportes con filtros."""
+        estado: Optional[str] = None
+    ):
+        """Consulta de aportes con los filtros del listado aplicados."""
         query = db.query(Aporte)
         
         if asociado_id:
@@ -405,12 +453,47 @@ class ContabilidadService:
         if estado:
             query = query.filter(Aporte.estado == estado)
         
+        return query
+
+    @staticmethod
+    def listar_aportes(
+        db: Session,
+        asociado_id: Optional[int] = None,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None,
+        estado: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> Tuple[List[Aporte], int]:
+        """Listar aportes con filtros."""
+        query = ContabilidadService._consulta_aportes(db, asociado_id, fecha_inicio, fecha_fin, estado)
+        
         total = query.count()
         
         aportes = query.order_by(Aporte.fecha.desc()).offset(skip).limit(limit).all()
         
         return aportes, total
 
+    @staticmethod
+    def listar_aportes_por_cursor(
+        db: Session,
+        asociado_id: Optional[int] = None,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None,
+        estado: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        total: Optional[str] = None
+    ) -> PaginaCursor:
+        """Listar aportes con filtros paginando por cursor."""
+        return paginar_por_cursor(
+            ContabilidadService._consulta_aportes(db, asociado_id, fecha_inicio, fecha_fin, estado),
+            [Aporte.fecha, Aporte.id],
+            limit,
+            cursor=cursor,
+            total=total
+        )
+
     @staticmethod
     def obtener_aporte(db: Session, aporte_id: int) -> Optional[Aporte]:
         """Obtener aporte por ID."""
@@ -443,24 +526,14 @@ class ContabilidadService:
         Returns:
             Tuple[total_debito, total_credito, saldo_neto]
         """
-        query = db.query(
-            func.sum(MovimientoContable.debito).label("total_debito"),
-            func.sum(MovimientoContable.credito).label("total_credito")
-        ).join(AsientoContable).filter(
-            MovimientoContable.cuenta_id == cuenta_id,
-            AsientoContable.anulado == False
+        saldos = ContabilidadService.calcular_saldos_cuentas(
+            db,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            cuenta_ids=[cuenta_id]
         )
         
-        if fecha_inicio:
-            query = query.filter(AsientoContable.fecha >= fecha_inicio)
-        
-        if fecha_fin:
-            query = query.filter(AsientoContable.fecha <= fecha_fin)
-        
-        resultado = query.first()
-        
-        total_debito = resultado.total_debito or Decimal("0")
-        total_credito = resultado.total_credito or Decimal("0")
+        total_debito, total_credito = saldos.get(cuenta_id, (Decimal("0"), Decimal("0")))
         saldo_neto = total_debito - total_credito
         
         return total_debito, total_credito, saldo_neto
@@ -501,3 +574,212 @@ class ContabilidadService:
             "ultimo_asiento": ultimo_asiento.numero if ultimo_asiento else None,
             "ultimo_asiento_fecha": ultimo_asiento.fecha if ultimo_asiento else None
         }
+
+    # ========================================================================
+    # SALDOS MENSUALES
+    # ========================================================================
+
+    @staticmethod
+    def acumular_saldos_mensuales(
+        db: Session,
+        fecha: date,
+        movimientos: Iterable[Tuple[int, Decimal, Decimal]],
+        signo: int = 1
+    ) -> None:
+        """
+        Sumar (o restar con signo=-1) movimientos al saldo mensual de cada cuenta.
+        
+        Args:
+            fecha: Fecha del asiento, determina el mes afectado
+            movimientos: Tuplas (cuenta_id, debito, credito)
+            signo: 1 al registrar un asiento, -1 al anularlo
+        """
+        totales: Dict[int, List[Decimal]] = {}
+        for cuenta_id, debito, credito in movimientos:
+            acumulado = totales.setdefault(cuenta_id, [Decimal("0"), Decimal("0")])
+            acumulado[0] += Decimal(debito or 0)
+            acumulado[1] += Decimal(credito or 0)
+        
+        if not totales:
+            return
+        
+        # UPDATE primero: bloquea la fila del mes hasta el commit. Si el mes
+        # aún no existe se inserta en un savepoint; si otra transacción la
+        # insertó al mismo tiempo, se reintenta el UPDATE (como en consecutivos)
+        for cuenta_id, (debito, credito) in totales.items():
+            filtro = (
+                SaldoMensual.cuenta_id == cuenta_id,
+                SaldoMensual.anio == fecha.year,
+                SaldoMensual.mes == fecha.month
+            )
+            for _ in range(2):
+                resultado = db.execute(
+                    update(SaldoMensual)
+                    .where(*filtro)
+                    .values(
+                        total_debito=SaldoMensual.total_debito + signo * debito,
+                        total_credito=SaldoMensual.total_credito + signo * credito,
+                        updated_at=datetime.utcnow()
+                    )
+                    .execution_options(synchronize_session="fetch")
+                )
+                if resultado.rowcount:
+                    break
+                try:
+                    with db.begin_nested():
+                        db.add(SaldoMensual(
+                            cuenta_id=cuenta_id,
+                            anio=fecha.year,
+                            mes=fecha.month,
+                            total_debito=signo * debito,
+                            total_credito=signo * credito
+                        ))
+                    break
+                except IntegrityError:
+                    pass
+            else:
+                raise RuntimeError(
+                    f"No se pudo acumular el saldo mensual de la cuenta {cuenta_id} en {fecha:%Y-%m}"
+                )
+        
+        db.flush()
+
+    @staticmethod
+    def reconstruir_saldos_mensuales(db: Session) -> int:
+        """
+        Recalcular la tabla de saldos mensuales desde los movimientos.
+        
+        Returns:
+            Número de saldos mensuales generados
+        """
+        anio = extract("year", AsientoContable.fecha)
+        mes = extract("month", AsientoContable.fecha)
+        
+        filas = db.query(
+            MovimientoContable.cuenta_id,
+            anio.label("anio"),
+            mes.label("mes"),
+            func.coalesce(func.sum(MovimientoContable.debito), 0).label("total_debito"),
+            func.coalesce(func.sum(MovimientoContable.credito), 0).label("total_credito")
+        ).join(AsientoContable).filter(
+            AsientoContable.anulado == False
+        ).group_by(MovimientoContable.cuenta_id, anio, mes).all()
+        
+        db.query(SaldoMensual).delete(synchronize_session=False)
+        db.bulk_insert_mappings(SaldoMensual, [
+            {
+                "cuenta_id": fila.cuenta_id,
+                "anio": int(fila.anio),
+                "mes": int(fila.mes),
+                "total_debito": Decimal(fila.total_debito),
+                "total_credito": Decimal(fila.total_credito),
+                "updated_at": datetime.utcnow()
+            }
+            for fila in filas
+        ])
+        db.commit()
+        
+        return len(filas)
+
+    @staticmethod
+    def _meses_completos(
+        fecha_inicio: Optional[date],
+        fecha_fin: Optional[date]
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Obtener el primer y último mes cubiertos completamente por el rango.
+        
+        Los meses se expresan como `anio * 12 + mes`; None indica rango abierto.
+        """
+        desde = None
+        if fecha_inicio:
+            desde = fecha_inicio.year * 12 + fecha_inicio.month
+            if fecha_inicio.day != 1:
+                desde += 1
+        
+        hasta = None
+        if fecha_fin:
+            hasta = fecha_fin.year * 12 + fecha_fin.month
+            if fecha_fin.day != monthrange(fecha_fin.year, fecha_fin.month)[1]:
+                hasta -= 1
+        
+        return desde, hasta
+
+    @staticmethod
+    def _inicio_de_mes(indice: int) -> date:
+        """Primer día del mes expresado como `anio * 12 + mes`."""
+        anio, mes = divmod(indice - 1, 12)
+        return date(anio, mes + 1, 1)
+
+    @staticmethod
+    def calcular_saldos_cuentas(
+        db: Session,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None,
+        cuenta_ids: Optional[List[int]] = None
+    ) -> Dict[int, Tuple[Decimal, Decimal]]:
+        """
+        Calcular débitos y créditos por cuenta en un rango de fechas.
+        
+        Los meses completos se toman de `saldos_mensuales` y solo los meses
+        parciales de los extremos se suman desde los movimientos.
+        
+        Returns:
+            dict: {cuenta_id: (total_debito, total_credito)}
+        """
+        desde, hasta = ContabilidadService._meses_completos(fecha_inicio, fecha_fin)
+        usar_saldos = desde is None or hasta is None or desde <= hasta
+        
+        totales: Dict[int, List[Decimal]] = {}
+        
+        def acumular(filas):
+            for fila in filas:
+                acumulado = totales.setdefault(fila.cuenta_id, [Decimal("0"), Decimal("0")])
+                acumulado[0] += Decimal(fila.total_debito)
+                acumulado[1] += Decimal(fila.total_credito)
+        
+        movimientos = db.query(
+            MovimientoContable.cuenta_id,
+            func.coalesce(func.sum(MovimientoContable.debito), 0).label("total_debito"),
+            func.coalesce(func.sum(MovimientoContable.credito), 0).label("total_credito")
+        ).join(AsientoContable).filter(AsientoContable.anulado == False)
+        
+        if fecha_inicio:
+            movimientos = movimientos.filter(AsientoContable.fecha >= fecha_inicio)
+        if fecha_fin:
+            movimientos = movimientos.filter(AsientoContable.fecha <= fecha_fin)
+        if cuenta_ids is not None:
+            movimientos = movimientos.filter(MovimientoContable.cuenta_id.in_(cuenta_ids))
+        
+        if usar_saldos:
+            periodo = SaldoMensual.anio * 12 + SaldoMensual.mes
+            saldos = db.query(
+                SaldoMensual.cuenta_id,
+                func.sum(SaldoMensual.total_debito).label("total_debito"),
+                func.sum(SaldoMensual.total_credito).label("total_credito")
+            )
+            if desde is not None:
+                saldos = saldos.filter(periodo >= desde)
+            if hasta is not None:
+                saldos = saldos.filter(periodo <= hasta)
+            if cuenta_ids is not None:
+                saldos = saldos.filter(SaldoMensual.cuenta_id.in_(cuenta_ids))
+            acumular(saldos.group_by(SaldoMensual.cuenta_id).all())
+            
+            # Solo los días fuera de los meses completos se leen de movimientos
+            fuera_de_saldos = []
+            if desde is not None:
+                fuera_de_saldos.append(
+                    AsientoContable.fecha < ContabilidadService._inicio_de_mes(desde)
+                )
+            if hasta is not None:
+                fuera_de_saldos.append(
+                    AsientoContable.fecha >= ContabilidadService._inicio_de_mes(hasta + 1)
+                )
+            if not fuera_de_saldos:
+                return {cuenta_id: tuple(valores) for cuenta_id, valores in totales.items()}
+            movimientos = movimientos.filter(or_(*fuera_de_saldos))
+        
+        acumular(movimientos.group_by(MovimientoContable.cuenta_id).all())
+        
+        return {cuenta_id: tuple(valores) for cuenta_id, valores in totales.items()}
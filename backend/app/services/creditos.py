@@ -1,22 +1,58 @@
 """
 Servicio de créditos - Lógica de negocio.
 """
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import List, Optional, Tuple
 import math
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, func, or_
+from sqlalchemy import Numeric, and_, bindparam, case, func, literal, or_, select
 from sqlalchemy.orm import Session, joinedload
 
+from app.core.paginacion import PaginaCursor, paginar_por_cursor
+from app.core.proyeccion import columnas_proyeccion
 from app.models.credito import (
     Credito, Cuota, Pago, AbonoCuota,
     EstadoCredito, EstadoCuota
 )
 from app.models.asociado import Asociado
+from app.models.estadistica_mensual import MetricaMensual
 from app.models.contabilidad import AsientoContable, MovimientoContable, CuentaContable
 from app.schemas.credito import CreditoSolicitar, CreditoAprobar, CreditoDesembolsar, PagoCrear
+from app.services.consecutivos import ConsecutivoService
+from app.services.dashboard import DashboardService
+
+# Tasa de mora sobre el valor de la cuota vencida (0.1% diario)
+TASA_MORA_DIARIA = Decimal("0.001")
+
+# Créditos sobre los que se calcula mora
+ESTADOS_CREDITO_ACTIVO = [EstadoCredito.AL_DIA, EstadoCredito.MORA, EstadoCredito.DESEMBOLSADO]
+
+# Campos del asociado que el listado de créditos puede responder (requieren unir con asociados)
+CAMPOS_ASOCIADO_CREDITO = {
+    "asociado_numero_documento": Asociado.numero_documento,
+    "asociado_nombres": Asociado.nombres,
+    "asociado_apellidos": Asociado.apellidos,
+}
+
+# Campos que el listado puede responder con `campos=` (ver app.core.proyeccion)
+CAMPOS_LISTADO_CREDITOS = {
+    **{
+        nombre: getattr(Credito, nombre)
+        for nombre in (
+            "id", "numero_credito", "asociado_id", "tipo_credito", "estado", "monto_solicitado",
+            "monto_aprobado", "monto_desembolsado", "tasa_interes", "plazo_meses", "valor_cuota",
+            "saldo_capital", "saldo_interes", "saldo_mora", "dias_mora", "fecha_solicitud",
+            "fecha_aprobacion", "fecha_desembolso", "fecha_primer_pago",
+        )
+    },
+    **CAMPOS_ASOCIADO_CREDITO,
+}
+CAMPOS_RESUMEN_CREDITOS = (
+    "id", "numero_credito", "asociado_id", "asociado_nombres", "asociado_apellidos",
+    "tipo_credito", "estado", "saldo_capital", "dias_mora", "fecha_solicitud",
+)
 
 
 class CreditoService:
@@ -33,20 +69,9 @@ class CreditoService:
             fecha = date.today()
         
         # Formato: CR-YYYYMM-000001
-        prefijo = f"CR-{fecha.year}{fecha.month:02d}-"
-        
-        # Obtener último número del mes
-        ultimo = db.query(Credito).filter(
-            Credito.numero_credito.like(f"{prefijo}%")
-        ).order_by(Credito.numero_credito.desc()).first()
-        
-        if ultimo:
-            ultimo_numero = int(ultimo.numero_credito.split("-")[-1])
-            nuevo_numero = ultimo_numero + 1
-        else:
-            nuevo_numero = 1
-        
-        return f"{prefijo}{nuevo_numero:06d}"
+        return ConsecutivoService.generar_numero(
+            db, "CR", f"{fecha.year}{fecha.month:02d}", Credito.numero_credito
+        )
 
     @staticmethod
     def calcular_cuota_fija(monto: Decimal, tasa_anual: Decimal, plazo_meses: int) -> Decimal:
@@ -330,21 +355,24 @@ class CreditoService:
                 asiento = ContabilidadService.crear_asiento(db, asiento_data, usuario_id)
                 credito.asiento_desembolso_id = asiento.id
         
+        DashboardService.acumular_estadistica_mensual(
+            db, MetricaMensual.DESEMBOLSOS, credito.fecha_desembolso, credito.monto_aprobado
+        )
+        
         db.commit()
+        DashboardService.invalidar_cache()
         db.refresh(credito)
         
         return credito
 
     @staticmethod
-    def listar_creditos(
+    def _consulta_creditos(
         db: Session,
         asociado_id: Optional[int] = None,
         estado: Optional[str] = None,
-        tipo_credito: Optional[str] = None,
-        skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[List[Credito], int]:
-        """Listar créditos con filtros."""
+        tipo_credito: Optional[str] = None
+    ):
+        """Consulta de créditos con los filtros del listado aplicados."""
         query = db.query(Credito).options(joinedload(Credito.asociado))
         
         if asociado_id:
@@ -356,7 +384,35 @@ class CreditoService:
         if tipo_credito:
             query = query.filter(Credito.tipo_credito == tipo_credito)
         
+        return query
+
+    @staticmethod
+    def _proyectar_creditos(query, campos: List[str], adicionales=()):
+        """Seleccionar solo `campos` (de CAMPOS_LISTADO_CREDITOS) en lugar de cargar los créditos."""
+        if any(campo in CAMPOS_ASOCIADO_CREDITO for campo in campos):
+            query = query.join(Credito.asociado)
+        return query.with_entities(*columnas_proyeccion(campos, CAMPOS_LISTADO_CREDITOS, adicionales))
+
+    @staticmethod
+    def listar_creditos(
+        db: Session,
+        asociado_id: Optional[int] = None,
+        estado: Optional[str] = None,
+        tipo_credito: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        campos: Optional[List[str]] = None
+    ) -> Tuple[List[Credito], int]:
+        """
+        Listar créditos con filtros.
+
+        Con `campos` devuelve filas con solo esas columnas en lugar de créditos.
+        """
+        query = CreditoService._consulta_creditos(db, asociado_id, estado, tipo_credito)
+        
         total = query.count()
+        if campos:
+            query = CreditoService._proyectar_creditos(query, campos)
         
         creditos = query.order_by(
             Credito.fecha_solicitud.desc()
@@ -364,6 +420,30 @@ class CreditoService:
         
         return creditos, total
 
+    @staticmethod
+    def listar_creditos_por_cursor(
+        db: Session,
+        asociado_id: Optional[int] = None,
+        estado: Optional[str] = None,
+        tipo_credito: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        total: Optional[str] = None,
+        campos: Optional[List[str]] = None
+    ) -> PaginaCursor:
+        """Listar créditos con filtros paginando por cursor; `campos` como en `listar_creditos`."""
+        query = CreditoService._consulta_creditos(db, asociado_id, estado, tipo_credito)
+        llave = [Credito.fecha_solicitud, Credito.id]
+        if campos:
+            query = CreditoService._proyectar_creditos(query, campos, llave)
+        return paginar_por_cursor(
+            query,
+            llave,
+            limit,
+            cursor=cursor,
+            total=total
+        )
+
     @staticmethod
     def obtener_credito(db: Session, credito_id: int) -> Optional[Credito]:
         """Obtener crédito con cuotas."""
@@ -382,19 +462,10 @@ class CreditoService:
         if fecha is None:
             fecha = date.today()
         
-        prefijo = f"REC-{fecha.year}{fecha.month:02d}-"
-        
-        ultimo = db.query(Pago).filter(
-            Pago.numero_recibo.like(f"{prefijo}%")
-        ).order_by(Pago.numero_recibo.desc()).first()
-        
-        if ultimo:
-            ultimo_numero = int(ultimo.numero_recibo.split("-")[-1])
-            nuevo_numero = ultimo_numero + 1
-        else:
-            nuevo_numero = 1
-        
-        return f"{prefijo}{nuevo_numero:06d}"
+        # Formato: REC-YYYYMM-000001
+        return ConsecutivoService.generar_numero(
+            db, "REC", f"{fecha.year}{fecha.month:02d}", Pago.numero_recibo
+        )
 
     @staticmethod
     def registrar_pago(
@@ -497,39 +568,127 @@ class CreditoService:
                 credito.dias_mora = 0
         
         db.commit()
+        DashboardService.invalidar_cache()
         db.refresh(pago)
         
         return pago
 
     @staticmethod
-    def calcular_mora(db: Session, fecha_corte: date = None):
-        """Calcular mora de todos los créditos activos."""
+    def calcular_mora(db: Session, fecha_corte: date = None) -> dict:
+        """
+        Recalcular la mora de todos los créditos activos a una fecha de corte.
+        
+        El cálculo es idempotente: los días y el valor de mora de cada cuota
+        se recalculan desde su fecha de vencimiento, y el estado, los días y el
+        saldo de mora del crédito se recalculan desde sus cuotas. Ejecutarlo
+        varias veces con la misma fecha produce el mismo resultado.
+        
+        Todo se hace con UPDATEs sobre conjuntos: uno por cada fecha de
+        vencimiento distinta (ejecutados en bloque) para las cuotas y uno para
+        todos los créditos.
+        
+        Returns:
+            dict: Resumen con cuotas y créditos en mora y total de mora
+        """
         if fecha_corte is None:
             fecha_corte = date.today()
         
-        # Obtener cuotas vencidas
-        cuotas_vencidas = db.query(Cuota).join(Credito).filter(
-            Cuota.fecha_vencimiento < fecha_corte,
-            Cuota.estado == EstadoCuota.PENDIENTE,
-            Credito.estado.in_([EstadoCredito.AL_DIA, EstadoCredito.MORA, EstadoCredito.DESEMBOLSADO])
-        ).all()
+        cuotas = Cuota.__table__
+        creditos = Credito.__table__
+        ahora = datetime.utcnow()
+        # Comparaciones con OR en lugar de IN: los parámetros expandidos de IN
+        # no se admiten en la actualización en bloque (executemany)
+        cuota_abierta = or_(cuotas.c.estado == EstadoCuota.PENDIENTE, cuotas.c.estado == EstadoCuota.MORA)
+        credito_activo = or_(*(creditos.c.estado == estado for estado in ESTADOS_CREDITO_ACTIVO))
+        creditos_activos = select(creditos.c.id).where(credito_activo)
+        
+        # Cuotas vencidas: días y valor de mora dependen solo de la fecha de vencimiento
+        fechas_vencidas = db.execute(
+            select(cuotas.c.fecha_vencimiento).distinct().where(
+                cuotas.c.fecha_vencimiento < fecha_corte,
+                cuota_abierta,
+                cuotas.c.credito_id.in_(creditos_activos)
+            )
+        ).scalars().all()
+        
+        if fechas_vencidas:
+            db.execute(
+                cuotas.update()
+                .where(
+                    cuotas.c.fecha_vencimiento == bindparam("b_fecha"),
+                    cuota_abierta,
+                    cuotas.c.credito_id.in_(creditos_activos)
+                )
+                .values(
+                    estado=EstadoCuota.MORA,
+                    dias_mora=bindparam("b_dias"),
+                    valor_mora=func.round(cuotas.c.valor_cuota * bindparam("b_factor", type_=Numeric(15, 6)), 2),
+                    updated_at=ahora
+                ),
+                [
+                    {
+                        "b_fecha": fecha,
+                        "b_dias": (fecha_corte - fecha).days,
+                        "b_factor": TASA_MORA_DIARIA * (fecha_corte - fecha).days
+                    }
+                    for fecha in fechas_vencidas
+                ]
+            )
         
-        tasa_mora_diaria = Decimal("0.001")  # 0.1% diario
+        # Cuotas marcadas en mora que a la fecha de corte aún no vencen
+        db.execute(
+            cuotas.update()
+            .where(
+                cuotas.c.fecha_vencimiento >= fecha_corte,
+                cuotas.c.estado == EstadoCuota.MORA,
+                cuotas.c.credito_id.in_(creditos_activos)
+            )
+            .values(estado=EstadoCuota.PENDIENTE, dias_mora=0, valor_mora=0, updated_at=ahora)
+        )
         
-        for cuota in cuotas_vencidas:
-            dias_vencido = (fecha_corte - cuota.fecha_vencimiento).days
-            if dias_vencido > 0:
-                cuota.dias_mora = dias_vencido
-                cuota.estado = EstadoCuota.MORA
-                cuota.valor_mora = cuota.valor_cuota * tasa_mora_diaria * dias_vencido
-                
-                # Actualizar crédito
-                credito = cuota.credito
-                credito.estado = EstadoCredito.MORA
-                credito.dias_mora = max(credito.dias_mora, dias_vencido)
-                credito.saldo_mora += cuota.valor_mora
+        # Créditos: recalcular desde sus cuotas en mora
+        cuotas_en_mora = select(cuotas.c.id).where(
+            cuotas.c.credito_id == creditos.c.id,
+            cuotas.c.estado == EstadoCuota.MORA
+        )
+        dias_mora = select(func.coalesce(func.max(cuotas.c.dias_mora), 0)).where(
+            cuotas.c.credito_id == creditos.c.id,
+            cuotas.c.estado == EstadoCuota.MORA
+        ).scalar_subquery()
+        saldo_mora = select(func.coalesce(func.sum(cuotas.c.valor_mora), 0)).where(
+            cuotas.c.credito_id == creditos.c.id,
+            cuotas.c.estado == EstadoCuota.MORA
+        ).scalar_subquery()
+        estado = case(
+            (cuotas_en_mora.exists(), literal(EstadoCredito.MORA, creditos.c.estado.type)),
+            (creditos.c.estado == EstadoCredito.MORA, literal(EstadoCredito.AL_DIA, creditos.c.estado.type)),
+            else_=creditos.c.estado
+        )
+        db.execute(
+            creditos.update()
+            .where(credito_activo)
+            .values(dias_mora=dias_mora, saldo_mora=saldo_mora, estado=estado, updated_at=ahora)
+        )
         
         db.commit()
+        DashboardService.invalidar_cache()
+        
+        total_cuotas_mora, total_mora = db.query(
+            func.count(Cuota.id), func.coalesce(func.sum(Cuota.valor_mora), 0)
+        ).join(Credito).filter(
+            Cuota.estado == EstadoCuota.MORA,
+            Credito.estado == EstadoCredito.MORA
+        ).one()
+        creditos_mora = db.query(func.count(Credito.id)).filter(
+            Credito.estado == EstadoCredito.MORA
+        ).scalar()
+        
+        return {
+            "fecha_corte": fecha_corte,
+            "cuotas_en_mora": total_cuotas_mora,
+            "creditos_en_mora": creditos_mora,
+            "total_mora": Decimal(str(total_mora)).quantize(Decimal("0.01"))
+        }
 
     @staticmethod
     def obtener_estadisticas(db: Session) -> dict:
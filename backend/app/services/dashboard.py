@@ -1,16 +1,171 @@
 """
 Servicio para el Dashboard con KPIs y estadísticas generales.
 """
-from datetime import datetime, timedelta
+import base64
+import json
+from datetime import date, datetime, time
 from decimal import Decimal
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
 
-from sqlalchemy import func, and_, extract
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, extract, func, literal, or_, true, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 
+from app.core.cache import CacheTTL
+from app.core.config import settings
 from app.models.ahorro import CuentaAhorro, MovimientoAhorro, EstadoCuentaAhorro, TipoMovimientoAhorro
 from app.models.asociado import Asociado
 from app.models.credito import Credito, EstadoCredito, Cuota, EstadoCuota
+from app.models.estadistica_mensual import EstadisticaMensual, MetricaMensual
+
+
+# KPIs del dashboard compartidos por todas las sesiones del proceso
+cache_kpis = CacheTTL(settings.dashboard_cache_ttl_segundos)
+
+CLAVE_KPIS = "kpis"
+
+ESTADOS_VIGENTES = (EstadoCredito.AL_DIA.value, EstadoCredito.MORA.value)
+
+
+def _crecimiento(actual, anterior) -> float:
+    """Variación porcentual frente al valor anterior (0 si no hay base)."""
+    if not anterior:
+        return 0.0
+    return round(float((actual - anterior) / anterior * 100), 2)
+
+
+# Eventos por página del feed de actividad
+LIMITE_ACTIVIDAD = 20
+
+
+def _antes_de(columna_fecha, columna_id, posicion: Optional[Tuple]):
+    """Condición de paginación por llave: filas anteriores a (fecha, id)."""
+    if posicion is None:
+        return true()
+    fecha, ultimo_id = posicion
+    return or_(columna_fecha < fecha, and_(columna_fecha == fecha, columna_id < ultimo_id))
+
+
+def _sumar_meses(fecha: date, meses: int) -> date:
+    """Primer día del mes que está `meses` meses antes o después de `fecha`."""
+    periodo = fecha.year * 12 + fecha.month - 1 + meses
+    return date(periodo // 12, periodo % 12 + 1, 1)
+
+
+def _nombre(nombres: str, apellidos: str) -> str:
+    return f"{nombres} {apellidos}"
+
+
+def _eventos_desembolsos(db: Session, posicion: Optional[Tuple], limite: int) -> List[Dict]:
+    filas = db.query(
+        Credito.id, Credito.numero_credito, Credito.monto_desembolsado, Credito.fecha_desembolso,
+        Asociado.id.label("asociado_id"), Asociado.nombres, Asociado.apellidos
+    ).join(
+        Asociado, Asociado.id == Credito.asociado_id
+    ).filter(
+        Credito.fecha_desembolso.isnot(None),
+        _antes_de(Credito.fecha_desembolso, Credito.id, posicion)
+    ).order_by(Credito.fecha_desembolso.desc(), Credito.id.desc()).limit(limite)
+
+    return [
+        {
+            "tipo": "desembolso",
+            "id": fila.id,
+            "fecha": fila.fecha_desembolso,
+            "referencia": fila.numero_credito,
+            "asociado_id": fila.asociado_id,
+            "asociado_nombre": _nombre(fila.nombres, fila.apellidos),
+            "valor": float(fila.monto_desembolsado) if fila.monto_desembolsado is not None else None
+        }
+        for fila in filas
+    ]
+
+
+def _eventos_movimientos(db: Session, posicion: Optional[Tuple], limite: int) -> List[Dict]:
+    filas = db.query(
+        MovimientoAhorro.id, MovimientoAhorro.numero_movimiento, MovimientoAhorro.tipo_movimiento,
+        MovimientoAhorro.valor, MovimientoAhorro.fecha_movimiento,
+        Asociado.id.label("asociado_id"), Asociado.nombres, Asociado.apellidos
+    ).join(
+        CuentaAhorro, CuentaAhorro.id == MovimientoAhorro.cuenta_id
+    ).join(
+        Asociado, Asociado.id == CuentaAhorro.asociado_id
+    ).filter(
+        MovimientoAhorro.tipo_movimiento.in_([
+            TipoMovimientoAhorro.CONSIGNACION.value, TipoMovimientoAhorro.RETIRO.value
+        ]),
+        _antes_de(MovimientoAhorro.fecha_movimiento, MovimientoAhorro.id, posicion)
+    ).order_by(MovimientoAhorro.fecha_movimiento.desc(), MovimientoAhorro.id.desc()).limit(limite)
+
+    return [
+        {
+            "tipo": fila.tipo_movimiento,
+            "id": fila.id,
+            "fecha": fila.fecha_movimiento,
+            "referencia": fila.numero_movimiento,
+            "asociado_id": fila.asociado_id,
+            "asociado_nombre": _nombre(fila.nombres, fila.apellidos),
+            "valor": float(fila.valor)
+        }
+        for fila in filas
+    ]
+
+
+def _eventos_asociados(db: Session, posicion: Optional[Tuple], limite: int) -> List[Dict]:
+    filas = db.query(
+        Asociado.id, Asociado.numero_documento, Asociado.nombres, Asociado.apellidos, Asociado.created_at
+    ).filter(
+        _antes_de(Asociado.created_at, Asociado.id, posicion)
+    ).order_by(Asociado.created_at.desc(), Asociado.id.desc()).limit(limite)
+
+    return [
+        {
+            "tipo": "nuevo_asociado",
+            "id": fila.id,
+            "fecha": fila.created_at,
+            "referencia": fila.numero_documento,
+            "asociado_id": fila.id,
+            "asociado_nombre": _nombre(fila.nombres, fila.apellidos),
+            "valor": None
+        }
+        for fila in filas
+    ]
+
+
+def _como_datetime(fecha) -> datetime:
+    """Llevar fechas y fechas con hora a una misma escala para ordenar el feed."""
+    if isinstance(fecha, datetime):
+        return fecha
+    return datetime.combine(fecha, time.min)
+
+
+# Fuentes del feed con su consulta paginada
+FUENTES_ACTIVIDAD: Dict[str, Callable[[Session, Optional[Tuple], int], List[Dict]]] = {
+    "desembolsos": _eventos_desembolsos,
+    "movimientos": _eventos_movimientos,
+    "asociados": _eventos_asociados,
+}
+
+# Tipo de la fecha con que pagina cada fuente
+TIPO_FECHA_FUENTE = {"desembolsos": date, "movimientos": datetime, "asociados": datetime}
+
+
+def _codificar_cursor(posiciones: Dict[str, Tuple]) -> str:
+    contenido = {fuente: [fecha.isoformat(), ultimo_id] for fuente, (fecha, ultimo_id) in posiciones.items()}
+    return base64.urlsafe_b64encode(json.dumps(contenido, separators=(",", ":")).encode()).decode()
+
+
+def _decodificar_cursor(cursor: Optional[str]) -> Dict[str, Tuple]:
+    if not cursor:
+        return {}
+    try:
+        contenido = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {
+            fuente: (TIPO_FECHA_FUENTE[fuente].fromisoformat(fecha), int(ultimo_id))
+            for fuente, (fecha, ultimo_id) in contenido.items()
+        }
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Cursor de actividad inválido")
 
 
 class DashboardService:
@@ -18,102 +173,94 @@ class DashboardService:
 
     @staticmethod
     def obtener_kpis(db: Session) -> Dict:
-        """Obtener KPIs principales del sistema."""
+        """
+        Obtener KPIs principales del sistema.
+
+        Los KPIs se sirven desde la caché del proceso; las operaciones que
+        modifican asociados, cuentas de ahorro o créditos la invalidan con
+        `invalidar_cache`.
+        """
+        return cache_kpis.obtener(CLAVE_KPIS, lambda: DashboardService.calcular_kpis(db))
+
+    @staticmethod
+    def invalidar_cache() -> None:
+        """Descartar los KPIs en caché tras una escritura que los afecta."""
+        cache_kpis.invalidar(CLAVE_KPIS)
+
+    @staticmethod
+    def estadisticas_cache() -> Dict:
+        """Aciertos, fallos e invalidaciones de la caché de KPIs."""
+        return cache_kpis.estadisticas()
+
+    @staticmethod
+    def calcular_kpis(db: Session) -> Dict:
+        """
+        Calcular los KPIs con agregación condicional.
+
+        Se hace una consulta por tabla (asociados, cuentas de ahorro y
+        créditos); los totales del mes actual y del anterior salen de la misma
+        lectura con SUM/COUNT sobre expresiones CASE.
+        """
         hoy = datetime.now()
-        primer_dia_mes = hoy.replace(day=1)
-        primer_dia_mes_anterior = (primer_dia_mes - timedelta(days=1)).replace(day=1)
-        
-        # Total asociados activos
-        total_asociados = db.query(func.count(Asociado.id)).filter(
-            Asociado.estado == "activo"
-        ).scalar() or 0
-        
-        # Total asociados mes anterior
-        total_asociados_mes_anterior = db.query(func.count(Asociado.id)).filter(
-            and_(
-                Asociado.estado == "activo",
-                Asociado.fecha_ingreso < primer_dia_mes
-            )
-        ).scalar() or 0
-        
-        # Nuevos asociados este mes
-        nuevos_asociados_mes = db.query(func.count(Asociado.id)).filter(
-            and_(
-                Asociado.fecha_ingreso >= primer_dia_mes,
-                Asociado.fecha_ingreso < hoy
-            )
-        ).scalar() or 0
-        
-        # Total ahorros (suma de saldos disponibles)
-        total_ahorros = db.query(func.sum(CuentaAhorro.saldo_disponible)).filter(
-            CuentaAhorro.estado == EstadoCuentaAhorro.ACTIVA.value
-        ).scalar() or Decimal("0")
-        
-        # Total ahorros mes anterior
-        total_ahorros_mes_anterior = db.query(func.sum(CuentaAhorro.saldo_disponible)).filter(
-            and_(
-                CuentaAhorro.estado == EstadoCuentaAhorro.ACTIVA.value,
-                CuentaAhorro.fecha_apertura < primer_dia_mes
-            )
-        ).scalar() or Decimal("0")
-        
-        # Total cartera de créditos (suma de saldos)
-        total_cartera = db.query(
-            func.sum(Credito.saldo_capital + Credito.saldo_interes + Credito.saldo_mora)
+        primer_dia_mes = hoy.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        asociado_activo = Asociado.estado == "activo"
+        asociados = db.query(
+            func.count(case((asociado_activo, Asociado.id))).label("total"),
+            func.count(case((
+                and_(asociado_activo, Asociado.fecha_ingreso < primer_dia_mes.date()),
+                Asociado.id
+            ))).label("total_mes_anterior"),
+            func.count(case((
+                and_(Asociado.fecha_ingreso >= primer_dia_mes.date(), Asociado.fecha_ingreso < hoy),
+                Asociado.id
+            ))).label("nuevos_mes")
+        ).one()
+
+        ahorros = db.query(
+            func.sum(CuentaAhorro.saldo_disponible).label("total"),
+            func.sum(case((
+                CuentaAhorro.fecha_apertura < primer_dia_mes, CuentaAhorro.saldo_disponible
+            ))).label("total_mes_anterior")
         ).filter(
-            Credito.estado.in_([EstadoCredito.AL_DIA.value, EstadoCredito.MORA.value])
-        ).scalar() or Decimal("0")
-        
-        # Total cartera mes anterior
-        total_cartera_mes_anterior = db.query(
-            func.sum(Credito.saldo_capital + Credito.saldo_interes + Credito.saldo_mora)
+            CuentaAhorro.estado == EstadoCuentaAhorro.ACTIVA.value
+        ).one()
+
+        saldo_credito = Credito.saldo_capital + Credito.saldo_interes + Credito.saldo_mora
+        cartera = db.query(
+            func.sum(saldo_credito).label("total"),
+            func.sum(case((
+                Credito.fecha_desembolso < primer_dia_mes.date(), saldo_credito
+            ))).label("total_mes_anterior"),
+            func.count(Credito.id).label("vigentes"),
+            func.count(case((Credito.estado == EstadoCredito.MORA.value, Credito.id))).label("mora")
         ).filter(
-            and_(
-                Credito.estado.in_([EstadoCredito.AL_DIA.value, EstadoCredito.MORA.value]),
-                Credito.fecha_desembolso < primer_dia_mes
-            )
-        ).scalar() or Decimal("0")
-        
-        # Créditos en mora
-        total_creditos_mora = db.query(func.count(Credito.id)).filter(
-            Credito.estado == EstadoCredito.MORA.value
-        ).scalar() or 0
-        
-        total_creditos_vigentes = db.query(func.count(Credito.id)).filter(
-            Credito.estado.in_([EstadoCredito.AL_DIA.value, EstadoCredito.MORA.value])
-        ).scalar() or 0
-        
+            Credito.estado.in_(ESTADOS_VIGENTES)
+        ).one()
+
+        total_ahorros = ahorros.total or Decimal("0")
+        total_cartera = cartera.total or Decimal("0")
+        total_creditos_vigentes = cartera.vigentes or 0
+        total_creditos_mora = cartera.mora or 0
+
         # Índice de morosidad (porcentaje de créditos en mora)
         indice_mora = (total_creditos_mora / total_creditos_vigentes * 100) if total_creditos_vigentes > 0 else 0
-        
-        # Calcular crecimientos
-        crecimiento_asociados = 0
-        if total_asociados_mes_anterior > 0:
-            crecimiento_asociados = ((total_asociados - total_asociados_mes_anterior) / total_asociados_mes_anterior) * 100
-        
-        crecimiento_ahorros = 0
-        if total_ahorros_mes_anterior > 0:
-            crecimiento_ahorros = ((total_ahorros - total_ahorros_mes_anterior) / total_ahorros_mes_anterior) * 100
-        
-        crecimiento_cartera = 0
-        if total_cartera_mes_anterior > 0:
-            crecimiento_cartera = ((total_cartera - total_cartera_mes_anterior) / total_cartera_mes_anterior) * 100
-        
+
         return {
             "asociados": {
-                "total": total_asociados,
-                "nuevos_mes": nuevos_asociados_mes,
-                "crecimiento_porcentaje": round(float(crecimiento_asociados), 2)
+                "total": asociados.total,
+                "nuevos_mes": asociados.nuevos_mes,
+                "crecimiento_porcentaje": _crecimiento(asociados.total, asociados.total_mes_anterior)
             },
             "ahorros": {
                 "total": float(total_ahorros),
-                "crecimiento_porcentaje": round(float(crecimiento_ahorros), 2)
+                "crecimiento_porcentaje": _crecimiento(total_ahorros, ahorros.total_mes_anterior)
             },
             "cartera": {
                 "total": float(total_cartera),
                 "creditos_vigentes": total_creditos_vigentes,
                 "creditos_mora": total_creditos_mora,
-                "crecimiento_porcentaje": round(float(crecimiento_cartera), 2)
+                "crecimiento_porcentaje": _crecimiento(total_cartera, cartera.total_mes_anterior)
             },
             "mora": {
                 "indice_porcentaje": round(float(indice_mora), 2),
@@ -123,21 +270,29 @@ class DashboardService:
 
     @staticmethod
     def obtener_actividad_reciente(db: Session) -> Dict:
-        """Obtener actividad reciente del sistema."""
+        """
+        Obtener actividad reciente del sistema.
+
+        Las relaciones se cargan en la misma consulta de cada listado, por lo
+        que el resultado se arma con cuatro consultas.
+        """
         # Últimos 10 créditos aprobados
-        creditos_recientes = db.query(Credito).filter(
+        creditos_recientes = db.query(Credito).options(
+            joinedload(Credito.asociado, innerjoin=True)
+        ).filter(
             Credito.estado != EstadoCredito.SOLICITADO.value
         ).order_by(Credito.fecha_desembolso.desc()).limit(10).all()
-        
-        # Últimas 10 consignaciones
-        consignaciones_recientes = db.query(MovimientoAhorro).filter(
-            MovimientoAhorro.tipo_movimiento == TipoMovimientoAhorro.CONSIGNACION.value
-        ).order_by(MovimientoAhorro.fecha_movimiento.desc()).limit(10).all()
-        
-        # Últimos 10 retiros
-        retiros_recientes = db.query(MovimientoAhorro).filter(
-            MovimientoAhorro.tipo_movimiento == TipoMovimientoAhorro.RETIRO.value
-        ).order_by(MovimientoAhorro.fecha_movimiento.desc()).limit(10).all()
+
+        def movimientos_recientes(tipo: str) -> List[MovimientoAhorro]:
+            return db.query(MovimientoAhorro).options(
+                joinedload(MovimientoAhorro.cuenta, innerjoin=True).joinedload(CuentaAhorro.asociado, innerjoin=True)
+            ).filter(
+                MovimientoAhorro.tipo_movimiento == tipo
+            ).order_by(MovimientoAhorro.fecha_movimiento.desc()).limit(10).all()
+
+        # Últimas 10 consignaciones y últimos 10 retiros
+        consignaciones_recientes = movimientos_recientes(TipoMovimientoAhorro.CONSIGNACION.value)
+        retiros_recientes = movimientos_recientes(TipoMovimientoAhorro.RETIRO.value)
         
         # Últimos 10 asociados ingresados (ordenar por fecha de creación en el sistema)
         asociados_recientes = db.query(Asociado).order_by(
@@ -150,7 +305,7 @@ class DashboardService:
                     "id": c.id,
                     "numero_credito": c.numero_credito,
                     "asociado_nombre": f"{c.asociado.nombres} {c.asociado.apellidos}",
-                    "monto": float(c.monto_aprobado),
+                    "monto": float(c.monto_aprobado) if c.monto_aprobado is not None else None,
                     "estado": c.estado,
                     "fecha": c.fecha_desembolso.isoformat() if c.fecha_desembolso else None
                 }
@@ -191,80 +346,232 @@ class DashboardService:
         }
 
     @staticmethod
-    def obtener_estadisticas_mensuales(db: Session) -> Dict:
-        """Obtener estadísticas de los últimos 12 meses para gráficos."""
-        hoy = datetime.now()
-        hace_12_meses = hoy - timedelta(days=365)
-        
-        # Ahorros mensuales (suma de consignaciones por mes)
-        ahorros_mensuales = db.query(
-            extract('year', MovimientoAhorro.fecha_movimiento).label('anio'),
-            extract('month', MovimientoAhorro.fecha_movimiento).label('mes'),
-            func.sum(MovimientoAhorro.valor).label('total')
-        ).filter(
-            and_(
-                MovimientoAhorro.tipo_movimiento == TipoMovimientoAhorro.CONSIGNACION.value,
-                MovimientoAhorro.fecha_movimiento >= hace_12_meses
-            )
-        ).group_by('anio', 'mes').order_by('anio', 'mes').all()
-        
-        # Créditos desembolsados por mes
-        creditos_mensuales = db.query(
-            extract('year', Credito.fecha_desembolso).label('anio'),
-            extract('month', Credito.fecha_desembolso).label('mes'),
-            func.count(Credito.id).label('cantidad'),
-            func.sum(Credito.monto_aprobado).label('total')
-        ).filter(
-            and_(
-                Credito.fecha_desembolso.isnot(None),
-                Credito.fecha_desembolso >= hace_12_meses
-            )
-        ).group_by('anio', 'mes').order_by('anio', 'mes').all()
-        
-        # Nuevos asociados por mes
-        asociados_mensuales = db.query(
-            extract('year', Asociado.fecha_ingreso).label('anio'),
-            extract('month', Asociado.fecha_ingreso).label('mes'),
-            func.count(Asociado.id).label('cantidad')
+    def obtener_actividad(db: Session, limite: int = LIMITE_ACTIVIDAD, cursor: Optional[str] = None) -> Dict:
+        """
+        Obtener el feed unificado de actividad, del evento más reciente al más antiguo.
+
+        Une desembolsos, consignaciones, retiros y nuevos asociados. Cada
+        fuente se lee con paginación por llave (fecha, id) a partir de la
+        posición guardada en el cursor, así que cada página cuesta una
+        consulta por fuente sin importar qué tan atrás se esté.
+
+        Args:
+            limite: Eventos por página
+            cursor: `siguiente_cursor` de la página anterior (None = primera página)
+
+        Returns:
+            dict: `eventos` y `siguiente_cursor` (None si no hay más eventos)
+
+        Raises:
+            ValueError: Si el cursor no es válido.
+        """
+        posiciones = _decodificar_cursor(cursor)
+        eventos = []
+        for fuente, consultar in FUENTES_ACTIVIDAD.items():
+            for evento in consultar(db, posiciones.get(fuente), limite + 1):
+                eventos.append((_como_datetime(evento["fecha"]), evento["id"], fuente, evento))
+
+        eventos.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        pagina = eventos[:limite]
+
+        for _, _, fuente, evento in pagina:
+            posiciones[fuente] = (evento["fecha"], evento["id"])
+
+        return {
+            "eventos": [
+                {**evento, "fecha": evento["fecha"].isoformat()}
+                for _, _, _, evento in pagina
+            ],
+            "siguiente_cursor": _codificar_cursor(posiciones) if len(eventos) > limite else None
+        }
+
+    @staticmethod
+    def obtener_estadisticas_mensuales(
+        db: Session,
+        fecha_inicio: Optional[date] = None,
+        fecha_fin: Optional[date] = None
+    ) -> Dict:
+        """
+        Obtener estadísticas mensuales para gráficos desde la tabla pre-agregada.
+
+        El rango se toma en meses completos: incluye el mes de `fecha_inicio`
+        y el de `fecha_fin`. Por defecto son los últimos 12 meses.
+
+        Raises:
+            ValueError: Si el rango está invertido.
+        """
+        fecha_fin = fecha_fin or date.today()
+        if fecha_inicio is None:
+            fecha_inicio = _sumar_meses(fecha_fin.replace(day=1), -11)
+        if fecha_inicio > fecha_fin:
+            raise ValueError("La fecha inicial no puede ser posterior a la fecha final")
+
+        periodo = EstadisticaMensual.anio * 12 + EstadisticaMensual.mes
+        filas = db.query(
+            EstadisticaMensual.anio,
+            EstadisticaMensual.mes,
+            EstadisticaMensual.metrica,
+            EstadisticaMensual.cantidad,
+            EstadisticaMensual.total
         ).filter(
-            Asociado.fecha_ingreso >= hace_12_meses
-        ).group_by('anio', 'mes').order_by('anio', 'mes').all()
-        
-        # Formatear datos para el frontend
+            periodo.between(
+                fecha_inicio.year * 12 + fecha_inicio.month,
+                fecha_fin.year * 12 + fecha_fin.month
+            ),
+            EstadisticaMensual.cantidad > 0
+        ).order_by(EstadisticaMensual.anio, EstadisticaMensual.mes).all()
+
+        por_metrica = {metrica.value: [] for metrica in MetricaMensual}
+        for fila in filas:
+            por_metrica[fila.metrica].append(fila)
+
         meses = []
-        for i in range(12):
-            fecha = hoy - timedelta(days=30 * (11 - i))
+        fecha = fecha_inicio.replace(day=1)
+        while fecha <= fecha_fin:
             meses.append({
                 "mes": fecha.strftime("%B"),
                 "anio": fecha.year,
                 "mes_num": fecha.month
             })
-        
+            fecha = _sumar_meses(fecha, 1)
+
         return {
             "ahorros_mensuales": [
                 {
-                    "anio": int(row.anio),
-                    "mes": int(row.mes),
+                    "anio": row.anio,
+                    "mes": row.mes,
                     "total": float(row.total)
                 }
-                for row in ahorros_mensuales
+                for row in por_metrica[MetricaMensual.CONSIGNACIONES.value]
             ],
             "creditos_mensuales": [
                 {
-                    "anio": int(row.anio),
-                    "mes": int(row.mes),
+                    "anio": row.anio,
+                    "mes": row.mes,
                     "cantidad": row.cantidad,
                     "total": float(row.total)
                 }
-                for row in creditos_mensuales
+                for row in por_metrica[MetricaMensual.DESEMBOLSOS.value]
             ],
             "asociados_mensuales": [
                 {
-                    "anio": int(row.anio),
-                    "mes": int(row.mes),
+                    "anio": row.anio,
+                    "mes": row.mes,
                     "cantidad": row.cantidad
                 }
-                for row in asociados_mensuales
+                for row in por_metrica[MetricaMensual.ASOCIADOS_NUEVOS.value]
             ],
             "meses": meses
         }
+
+    # ========================================================================
+    # ESTADÍSTICAS MENSUALES
+    # ========================================================================
+
+    @staticmethod
+    def acumular_estadistica_mensual(
+        db: Session,
+        metrica: MetricaMensual,
+        fecha: date,
+        total: Decimal = Decimal("0"),
+        signo: int = 1
+    ) -> None:
+        """
+        Sumar (o restar con signo=-1) un evento a la estadística de su mes.
+
+        Se llama dentro de la transacción que registra el evento; el commit
+        queda a cargo de quien llama.
+
+        Args:
+            metrica: Métrica afectada
+            fecha: Fecha del evento, determina el mes
+            total: Valor del evento (0 para métricas que solo cuentan)
+            signo: 1 al registrar el evento, -1 al revertirlo
+        """
+        # UPDATE primero; la primera vez del mes se inserta en un savepoint y,
+        # si otra transacción la insertó al mismo tiempo, se reintenta el UPDATE
+        total = signo * Decimal(total or 0)
+        for _ in range(2):
+            resultado = db.execute(
+                update(EstadisticaMensual)
+                .where(
+                    EstadisticaMensual.anio == fecha.year,
+                    EstadisticaMensual.mes == fecha.month,
+                    EstadisticaMensual.metrica == metrica.value
+                )
+                .values(
+                    cantidad=EstadisticaMensual.cantidad + signo,
+                    total=EstadisticaMensual.total + total,
+                    updated_at=datetime.utcnow()
+                )
+                .execution_options(synchronize_session="fetch")
+            )
+            if resultado.rowcount:
+                return
+            try:
+                with db.begin_nested():
+                    db.add(EstadisticaMensual(
+                        anio=fecha.year,
+                        mes=fecha.month,
+                        metrica=metrica.value,
+                        cantidad=signo,
+                        total=total
+                    ))
+                return
+            except IntegrityError:
+                pass
+
+        raise RuntimeError(f"No se pudo acumular la estadística {metrica.value} de {fecha:%Y-%m}")
+
+    @staticmethod
+    def reconstruir_estadisticas_mensuales(db: Session) -> int:
+        """
+        Recalcular la tabla de estadísticas mensuales desde las tablas de origen.
+
+        Pensado para el job nocturno de conciliación y para después de cargas
+        masivas que no pasan por los servicios.
+
+        Returns:
+            Número de estadísticas mensuales generadas
+        """
+        def agrupar(metrica: MetricaMensual, columna_fecha, columna_total, *filtros):
+            anio = extract("year", columna_fecha)
+            mes = extract("month", columna_fecha)
+            return [
+                {
+                    "anio": int(fila.anio),
+                    "mes": int(fila.mes),
+                    "metrica": metrica.value,
+                    "cantidad": fila.cantidad,
+                    "total": Decimal(fila.total),
+                    "updated_at": datetime.utcnow()
+                }
+                for fila in db.query(
+                    anio.label("anio"),
+                    mes.label("mes"),
+                    func.count().label("cantidad"),
+                    func.coalesce(func.sum(columna_total), 0).label("total")
+                ).filter(*filtros).group_by(anio, mes)
+            ]
+
+        estadisticas = (
+            agrupar(
+                MetricaMensual.CONSIGNACIONES,
+                MovimientoAhorro.fecha_movimiento,
+                MovimientoAhorro.valor,
+                MovimientoAhorro.tipo_movimiento == TipoMovimientoAhorro.CONSIGNACION.value
+            )
+            + agrupar(
+                MetricaMensual.DESEMBOLSOS,
+                Credito.fecha_desembolso,
+                Credito.monto_aprobado,
+                Credito.fecha_desembolso.isnot(None)
+            )
+            + agrupar(MetricaMensual.ASOCIADOS_NUEVOS, Asociado.fecha_ingreso, literal(0))
+        )
+
+        db.query(EstadisticaMensual).delete(synchronize_session=False)
+        db.bulk_insert_mappings(EstadisticaMensual, estadisticas)
+        db.commit()
+
+        return len(estadisticas)
@@ -0,0 +1,349 @@
+"""
+Directorio de asociados en memoria para la búsqueda desde ventanilla.
+
+Mantiene por asociado solo id, documento, nombre normalizado y estado en
+arreglos paralelos (`array`/`bytearray` y listas de cadenas), con índices
+para buscar por prefijo de documento, por prefijo de palabra del nombre y,
+si no hay coincidencias, por palabras a una edición de distancia (una letra
+de más, de menos, cambiada o dos letras vecinas intercambiadas).
+
+Igual que la caché de KPIs, el directorio vive en el proceso: se carga la
+primera vez que se usa (o al iniciar la aplicación) y `crear_asociado`,
+`actualizar_asociado` y `eliminar_asociado` lo actualizan en el proceso que
+hizo la escritura. `cargar` lo reconstruye desde la base de datos.
+"""
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from heapq import nsmallest
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.core.texto import normalizar_texto, tokens_busqueda
+from app.models.asociado import Asociado
+
+# Las palabras más cortas solo se buscan por prefijo: a una edición de
+# distancia, "ana" coincidiría con demasiados nombres
+LONGITUD_MINIMA_APROXIMADA = 4
+
+# Puntaje de una palabra según cómo coincide (menor es mejor)
+EXACTA, PREFIJO, APROXIMADA = 0, 1, 3
+
+_FIN_PREFIJO = "\uffff"
+
+
+class MiembroDirectorio(NamedTuple):
+    """Resultado de una búsqueda en el directorio."""
+    id: int
+    numero_documento: str
+    nombre: str
+    estado: str
+
+
+def _borrados(palabra: str) -> Set[str]:
+    """La palabra y sus variantes con una letra menos."""
+    return {palabra} | {palabra[:i] + palabra[i + 1:] for i in range(len(palabra))}
+
+
+def _a_una_edicion(a: str, b: str) -> bool:
+    """True si `a` y `b` difieren en a lo sumo una edición (incluida la transposición de vecinas)."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    if a[i + 1:] == b[i + 1:]:
+        return True
+    return a[i:i + 2] == b[i + 1::-1][:2] and a[i + 2:] == b[i + 2:]
+
+
+class DirectorioAsociados:
+    """
+    Índice compacto de asociados para búsqueda por documento y nombre.
+
+    Cada asociado ocupa una posición en los arreglos paralelos, ordenados por
+    id. Los asociados no se eliminan (eliminar_asociado solo los inactiva);
+    si llega un id menor que el último cargado, el directorio se marca para
+    recargarse en el siguiente uso.
+    """
+
+    __slots__ = (
+        "_candado", "cargado", "_ids", "_documentos", "_nombres", "_estados", "_codigos_estado",
+        "_documentos_ordenados", "_posiciones_documento", "_palabras", "_palabras_ordenadas", "_variantes",
+    )
+
+    def __init__(self):
+        self._candado = threading.RLock()
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        """Vaciar el directorio; se vuelve a cargar en el siguiente uso."""
+        with self._candado:
+            self.cargado = False
+            self._ids = array("q")
+            self._documentos: List[str] = []
+            self._nombres: List[str] = []
+            self._estados = bytearray()
+            self._codigos_estado: List[str] = []
+            # Documentos ordenados y la posición de cada uno, para buscar por prefijo
+            self._documentos_ordenados: List[str] = []
+            self._posiciones_documento = array("i")
+            # Palabra del nombre -> posiciones de los asociados que la tienen
+            self._palabras: Dict[str, array] = {}
+            self._palabras_ordenadas: List[str] = []
+            # Palabra con una letra menos -> palabras del vocabulario que la generan
+            self._variantes: Dict[str, List[str]] = {}
+
+    def cargar(self, db: Session) -> int:
+        """Reconstruir el directorio desde la base de datos. Devuelve el número de asociados."""
+        filas = db.query(
+            Asociado.id, Asociado.numero_documento, Asociado.nombre_busqueda, Asociado.estado
+        ).order_by(Asociado.id).all()
+        with self._candado:
+            self.reiniciar()
+            for fila in filas:
+                self._agregar(*fila, indexar_documento=False)
+            orden = sorted(range(len(self._documentos)), key=self._documentos.__getitem__)
+            self._documentos_ordenados = [self._documentos[posicion] for posicion in orden]
+            self._posiciones_documento = array("i", orden)
+            self.cargado = True
+        return len(filas)
+
+    def asegurar_cargado(self, db: Session) -> None:
+        if not self.cargado:
+            self.cargar(db)
+
+    def registrar(self, asociado: Asociado) -> None:
+        """Agregar o actualizar un asociado después de guardarlo."""
+        nombre = normalizar_texto(f"{asociado.nombres} {asociado.apellidos}")
+        with self._candado:
+            if not self.cargado:
+                return
+            posicion = self._posicion(asociado.id)
+            if posicion is None:
+                if self._ids and asociado.id < self._ids[-1]:
+                    self.cargado = False
+                    return
+                self._agregar(asociado.id, asociado.numero_documento, nombre, asociado.estado)
+                return
+
+            if asociado.numero_documento != self._documentos[posicion]:
+                self._quitar_documento(posicion)
+                self._documentos[posicion] = asociado.numero_documento
+                self._indexar_documento(posicion)
+            if nombre != self._nombres[posicion]:
+                self._quitar_nombre(posicion)
+                self._nombres[posicion] = nombre
+                self._indexar_nombre(posicion)
+            self._estados[posicion] = self._codigo_estado(asociado.estado)
+
+    def buscar(self, termino: str, limite: int = 20, estado: Optional[str] = None) -> List[MiembroDirectorio]:
+        """
+        Buscar por prefijo de documento o por palabras del nombre.
+
+        Un término de solo dígitos se busca como documento. En los nombres
+        cada palabra debe coincidir exacta, como prefijo o, si ninguna palabra
+        del directorio empieza así, a una edición de distancia. Los resultados
+        se ordenan por la calidad de la coincidencia.
+        """
+        tokens = tokens_busqueda(termino)
+        if not tokens:
+            return []
+        with self._candado:
+            codigo = self._codigos_estado.index(estado) if estado in self._codigos_estado else None
+            if estado is not None and codigo is None:
+                return []
+            if len(tokens) == 1 and tokens[0].isdigit():
+                posiciones = self._buscar_documento(tokens[0], limite, codigo)
+            else:
+                posiciones = self._buscar_nombre(tokens, limite, codigo)
+            return [self._miembro(posicion) for posicion in posiciones]
+
+    def estadisticas(self) -> Dict:
+        """Tamaño del directorio y memoria aproximada de sus estructuras en bytes."""
+        with self._candado:
+            cadenas = sum(sys.getsizeof(s) for s in self._documentos) + sum(sys.getsizeof(s) for s in self._nombres)
+            indices = (
+                sys.getsizeof(self._documentos_ordenados) + sys.getsizeof(self._posiciones_documento)
+                + sys.getsizeof(self._palabras) + sys.getsizeof(self._palabras_ordenadas)
+                + sum(sys.getsizeof(p) + sys.getsizeof(v) for p, v in self._palabras.items())
+                + sys.getsizeof(self._variantes)
+                + sum(sys.getsizeof(v) + sys.getsizeof(p) for v, p in self._variantes.items())
+            )
+            arreglos = (
+                sys.getsizeof(self._ids) + sys.getsizeof(self._documentos)
+                + sys.getsizeof(self._nombres) + sys.getsizeof(self._estados)
+            )
+            return {
+                "cargado": self.cargado,
+                "asociados": len(self._ids),
+                "palabras": len(self._palabras),
+                "bytes": cadenas + indices + arreglos,
+            }
+
+    # Estructura interna
+
+    def _agregar(
+        self, asociado_id: int, documento: str, nombre: str, estado: str, indexar_documento: bool = True
+    ) -> None:
+        posicion = len(self._ids)
+        self._ids.append(asociado_id)
+        self._documentos.append(documento)
+        self._nombres.append(nombre)
+        self._estados.append(self._codigo_estado(estado))
+        if indexar_documento:
+            self._indexar_documento(posicion)
+        self._indexar_nombre(posicion)
+
+    def _codigo_estado(self, estado: str) -> int:
+        if estado not in self._codigos_estado:
+            self._codigos_estado.append(estado)
+        return self._codigos_estado.index(estado)
+
+    def _posicion(self, asociado_id: int) -> Optional[int]:
+        posicion = bisect_left(self._ids, asociado_id)
+        if posicion < len(self._ids) and self._ids[posicion] == asociado_id:
+            return posicion
+        return None
+
+    def _indexar_documento(self, posicion: int) -> None:
+        indice = bisect_right(self._documentos_ordenados, self._documentos[posicion])
+        self._documentos_ordenados.insert(indice, self._documentos[posicion])
+        self._posiciones_documento.insert(indice, posicion)
+
+    def _quitar_documento(self, posicion: int) -> None:
+        documento = self._documentos[posicion]
+        indice = bisect_left(self._documentos_ordenados, documento)
+        while self._posiciones_documento[indice] != posicion:
+            indice += 1
+        del self._documentos_ordenados[indice]
+        del self._posiciones_documento[indice]
+
+    def _indexar_nombre(self, posicion: int) -> None:
+        for palabra in set(self._nombres[posicion].split()):
+            posiciones = self._palabras.get(palabra)
+            if posiciones is None:
+                posiciones = self._palabras[palabra] = array("i")
+                insort(self._palabras_ordenadas, palabra)
+                if len(palabra) >= LONGITUD_MINIMA_APROXIMADA:
+                    for variante in _borrados(palabra):
+                        self._variantes.setdefault(variante, []).append(palabra)
+            posiciones.append(posicion)
+
+    def _quitar_nombre(self, posicion: int) -> None:
+        """Quitar las palabras del nombre actual; las que quedan sin asociados salen del vocabulario."""
+        for palabra in set(self._nombres[posicion].split()):
+            posiciones = self._palabras[palabra]
+            posiciones.remove(posicion)
+            if posiciones:
+                continue
+            del self._palabras[palabra]
+            del self._palabras_ordenadas[bisect_left(self._palabras_ordenadas, palabra)]
+            if len(palabra) >= LONGITUD_MINIMA_APROXIMADA:
+                for variante in _borrados(palabra):
+                    palabras = self._variantes[variante]
+                    palabras.remove(palabra)
+                    if not palabras:
+                        del self._variantes[variante]
+
+    def _miembro(self, posicion: int) -> MiembroDirectorio:
+        return MiembroDirectorio(
+            self._ids[posicion],
+            self._documentos[posicion],
+            self._nombres[posicion],
+            self._codigos_estado[self._estados[posicion]],
+        )
+
+    # Búsquedas
+
+    def _buscar_documento(self, prefijo: str, limite: int, codigo: Optional[int]) -> List[int]:
+        inicio = bisect_left(self._documentos_ordenados, prefijo)
+        fin = bisect_left(self._documentos_ordenados, prefijo + _FIN_PREFIJO, inicio)
+        resultado = []
+        for indice in range(inicio, fin):
+            posicion = self._posiciones_documento[indice]
+            if codigo is None or self._estados[posicion] == codigo:
+                resultado.append(posicion)
+                if len(resultado) == limite:
+                    break
+        return resultado
+
+    def _coincidencias(self, token: str) -> Dict[str, int]:
+        """Palabras del vocabulario que coinciden con `token` y su puntaje."""
+        inicio = bisect_left(self._palabras_ordenadas, token)
+        fin = bisect_left(self._palabras_ordenadas, token + _FIN_PREFIJO, inicio)
+        coincidencias = {
+            palabra: EXACTA if palabra == token else PREFIJO
+            for palabra in self._palabras_ordenadas[inicio:fin]
+        }
+        if coincidencias or len(token) < LONGITUD_MINIMA_APROXIMADA:
+            return coincidencias
+        for variante in _borrados(token):
+            for palabra in self._variantes.get(variante, ()):
+                if _a_una_edicion(token, palabra):
+                    coincidencias[palabra] = APROXIMADA
+        return coincidencias
+
+    def _buscar_nombre(self, tokens: List[str], limite: int, codigo: Optional[int]) -> List[int]:
+        por_token = [self._coincidencias(token) for token in tokens]
+        if not all(por_token):
+            return []
+
+        # Empezar por la palabra del término con menos posiciones
+        tamanos = [sum(len(self._palabras[p]) for p in coincidencias) for coincidencias in por_token]
+        guia = tamanos.index(min(tamanos))
+        resto = por_token[:guia] + por_token[guia + 1:]
+
+        if not resto:
+            # Una sola palabra: tomar por orden de puntaje hasta completar el límite
+            resultado: Dict[int, None] = {}
+            for palabra, _ in sorted(por_token[guia].items(), key=lambda item: (item[1], item[0])):
+                for posicion in self._palabras[palabra]:
+                    if codigo is None or self._estados[posicion] == codigo:
+                        resultado.setdefault(posicion)
+                        if len(resultado) == limite:
+                            return list(resultado)
+            return list(resultado)
+
+        # Varias palabras: intersecar las posiciones, empezando por la más selectiva
+        candidatos: Set[int] = set()
+        for palabra in por_token[guia]:
+            candidatos.update(self._palabras[palabra])
+        for coincidencias in resto:
+            siguientes: Set[int] = set()
+            for palabra in coincidencias:
+                siguientes.update(candidatos.intersection(self._palabras[palabra]))
+            candidatos = siguientes
+        if codigo is not None:
+            candidatos = {posicion for posicion in candidatos if self._estados[posicion] == codigo}
+
+        # Cada palabra suma 0 si coincide exacta; si no, el puntaje de sus demás coincidencias
+        # (todas prefijos o todas aproximadas, nunca mezcladas)
+        penalizaciones = []
+        for token, coincidencias in zip(tokens, por_token):
+            exactas = candidatos.intersection(self._palabras[token]) if token in coincidencias else set()
+            otra = max(coincidencias.values())
+            penalizaciones.append((exactas, otra))
+
+        return nsmallest(
+            limite,
+            candidatos,
+            key=lambda posicion: (sum(0 if posicion in exactas else otra for exactas, otra in penalizaciones), posicion)
+        )
+
+
+directorio = DirectorioAsociados()
+
+
+def buscar(db: Session, termino: str, limite: int = 20, estado: Optional[str] = None) -> List[MiembroDirectorio]:
+    """Buscar en el directorio, cargándolo si aún no está en memoria."""
+    directorio.asegurar_cargado(db)
+    return directorio.buscar(termino, limite, estado)
@@ -13,6 +13,7 @@ from app.models.asociado import Asociado
 from app.models.usuario import Usuario
 from app.schemas.documento import DocumentoSubir, DocumentoActualizar, DocumentoValidar
 from app.core.file_storage import FileStorageManager
+from app.core.paginacion import PaginaCursor, paginar_por_cursor
 
 
 class DocumentoService:
@@ -96,6 +97,32 @@ class DocumentoService:
             Documento.activo == True
         ).first()
     
+    @staticmethod
+    def _consulta_documentos(
+        db: Session,
+        asociado_id: Optional[int] = None,
+        credito_id: Optional[int] = None,
+        tipo_documento: Optional[str] = None,
+        es_valido: Optional[bool] = None
+    ):
+        """Consulta de documentos activos con los filtros del listado aplicados."""
+        query = db.query(Documento).filter(Documento.activo == True)
+        
+        # Aplicar filtros
+        if asociado_id is not None:
+            query = query.filter(Documento.asociado_id == asociado_id)
+        
+        if credito_id is not None:
+            query = query.filter(Documento.credito_id == credito_id)
+        
+        if tipo_documento is not None:
+            query = query.filter(Documento.tipo_documento == tipo_documento)
+        
+        if es_valido is not None:
+            query = query.filter(Documento.es_valido == es_valido)
+        
+        return query
+    
     @staticmethod
     def listar_documentos(
         db: Session,
@@ -121,20 +148,7 @@ class DocumentoService:
         Returns:
             Tupla con (lista de documentos, total de registros)
         """
-        query = db.query(Documento).filter(Documento.activo == True)
-        
-        # Aplicar filtros
-        if asociado_id is not None:
-            query = query.filter(Documento.asociado_id == asociado_id)
-        
-        if credito_id is not None:
-            query = query.filter(Documento.credito_id == credito_id)
-        
-        if tipo_documento is not None:
-            query = query.filter(Documento.tipo_documento == tipo_documento)
-        
-        if es_valido is not None:
-            query = query.filter(Documento.es_valido == es_valido)
+        query = DocumentoService._consulta_documentos(db, asociado_id, credito_id, tipo_documento, es_valido)
         
         # Contar total
         total = query.count()
@@ -144,6 +158,35 @@ class DocumentoService:
         
         return documentos, total
     
+    @staticmethod
+    def listar_documentos_por_cursor(
+        db: Session,
+        asociado_id: Optional[int] = None,
+        credito_id: Optional[int] = None,
+        tipo_documento: Optional[str] = None,
+        es_valido: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        total: Optional[str] = None
+    ) -> PaginaCursor:
+        """
+        Listar documentos con filtros opcionales paginando por cursor.
+        
+        Args:
+            cursor: siguiente_cursor de la página anterior (None = primera página)
+            total: None, "exacto" o "estimado"
+            
+        Raises:
+            ValueError: Si el cursor no es válido
+        """
+        return paginar_por_cursor(
+            DocumentoService._consulta_documentos(db, asociado_id, credito_id, tipo_documento, es_valido),
+            [Documento.fecha_subida, Documento.id],
+            limit,
+            cursor=cursor,
+            total=total
+        )
+    
     @staticmethod
     def actualizar_documento(
         db: Session,
@@ -0,0 +1,213 @@
+"""
+Escritura de la auditoría en segundo plano.
+
+Con el escritor activo, `AuditoriaService.registrar` deja cada registro en
+una cola acotada en memoria y vuelve de inmediato: la petición no paga un
+commit extra y una falla de la auditoría no afecta su transacción. Un hilo
+con su propia sesión toma los registros en lotes y los inserta con un solo
+INSERT por lote, cuando el lote se llena o cada `intervalo` segundos.
+
+Si la cola se llena (la base no da abasto), la política decide qué hacer
+con el registro nuevo:
+
+- `bloquear`: esperar hasta `espera_maxima` segundos a que haya espacio y,
+  si no lo hay, escribirlo en la petición, con una sesión propia.
+- `descartar`: descartarlo de inmediato.
+- `sincrono`: escribirlo en la petición, con una sesión propia.
+
+Si el INSERT de un lote falla, sus registros se reintentan uno por uno para
+que solo se pierdan los que fallan por sí mismos. Los descartes y las fallas
+de escritura quedan en el log y en `estadisticas()`. Al apagar la API se escriben los registros pendientes.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.auditoria import RegistroAuditoria
+
+logger = logging.getLogger(__name__)
+
+POLITICAS_COLA_LLENA = ("bloquear", "descartar", "sincrono")
+
+# Marca que despierta al hilo cuando se pide detenerlo
+_DESPERTAR = object()
+
+
+class EscritorAuditoria:
+    """Cola acotada de registros de auditoría que un hilo inserta por lotes."""
+
+    def __init__(
+        self,
+        capacidad: int = 10000,
+        tamano_lote: int = 500,
+        intervalo: float = 1.0,
+        politica: str = "bloquear",
+        espera_maxima: float = 1.0,
+        fabrica_sesiones: Callable[[], Session] = SessionLocal
+    ):
+        if politica not in POLITICAS_COLA_LLENA:
+            raise ValueError(
+                f"Política '{politica}' no soportada. Use una de: {', '.join(POLITICAS_COLA_LLENA)}"
+            )
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.politica = politica
+        self.espera_maxima = espera_maxima
+        self._fabrica_sesiones = fabrica_sesiones
+        self._cola: queue.Queue = queue.Queue(maxsize=capacidad)
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self._lock = threading.Lock()
+        self._escritos = 0
+        self._descartados = 0
+        self._fallidos = 0
+
+    @property
+    def activo(self) -> bool:
+        """True si el hilo escritor está corriendo."""
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self):
+        """Iniciar el hilo escritor."""
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._ejecutar, name="escritor-auditoria", daemon=True)
+        self._hilo.start()
+        logger.info("Escritor de auditoría iniciado (lotes de %s cada %ss)", self.tamano_lote, self.intervalo)
+
+    def detener(self, timeout: float = 30.0):
+        """Detener el hilo después de escribir los registros pendientes."""
+        if not self.activo:
+            return
+        self._detener.set()
+        try:
+            self._cola.put_nowait(_DESPERTAR)
+        except queue.Full:
+            pass  # El hilo no está esperando: tiene registros por escribir
+        self._hilo.join(timeout)
+        if self._hilo.is_alive():
+            logger.error("El escritor de auditoría no terminó en %ss; quedan %s registros", timeout, self._cola.qsize())
+        else:
+            logger.info("Escritor de auditoría detenido")
+        self._hilo = None
+
+    def encolar(self, fila: dict) -> bool:
+        """
+        Agregar un registro (valores de columnas de RegistroAuditoria) a la cola.
+
+        Returns:
+            False si el registro se descartó por tener la cola llena o no se
+            pudo escribir en la petición.
+        """
+        try:
+            if self.politica == "bloquear":
+                self._cola.put(fila, timeout=self.espera_maxima)
+            else:
+                self._cola.put_nowait(fila)
+            return True
+        except queue.Full:
+            pass
+
+        if self.politica != "descartar":
+            return self._insertar([fila])
+        with self._lock:
+            self._descartados += 1
+        logger.warning(
+            "Cola de auditoría llena: se descartó %s de %s %s",
+            fila.get("accion"), fila.get("entidad"), fila.get("entidad_id")
+        )
+        return False
+
+    def vaciar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Esperar a que se escriban los registros encolados hasta ahora.
+
+        Returns:
+            False si se cumplió el timeout antes.
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._cola.all_tasks_done:
+            while self._cola.unfinished_tasks:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._cola.all_tasks_done.wait(restante)
+        return True
+
+    def estadisticas(self) -> dict:
+        """Registros pendientes, escritos, descartados y perdidos por fallas de escritura."""
+        with self._lock:
+            return {
+                "activo": self.activo,
+                "pendientes": self._cola.qsize(),
+                "escritos": self._escritos,
+                "descartados": self._descartados,
+                "fallidos": self._fallidos,
+            }
+
+    def _ejecutar(self):
+        while True:
+            lote = self._tomar_lote()
+            if lote:
+                try:
+                    self._insertar(lote)
+                finally:
+                    for _ in lote:
+                        self._cola.task_done()
+            elif self._detener.is_set() and self._cola.empty():
+                break
+
+    def _tomar_lote(self) -> List[dict]:
+        """Registros hasta llenar un lote o hasta que pase `intervalo` desde el inicio."""
+        lote = []
+        limite = time.monotonic() + self.intervalo
+        while len(lote) < self.tamano_lote:
+            espera = limite - time.monotonic()
+            try:
+                if espera > 0 and not self._detener.is_set():
+                    fila = self._cola.get(timeout=espera)
+                else:
+                    fila = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if fila is _DESPERTAR:
+                self._cola.task_done()
+                continue
+            lote.append(fila)
+        return lote
+
+    def _insertar(self, filas: List[dict]) -> bool:
+        """Insertar un lote; si falla, reintentar cada registro por separado."""
+        try:
+            with self._fabrica_sesiones() as db:
+                db.execute(insert(RegistroAuditoria), filas)
+                db.commit()
+        except Exception:
+            if len(filas) == 1:
+                logger.exception(
+                    "No se pudo escribir el registro de auditoría %s de %s %s",
+                    filas[0].get("accion"), filas[0].get("entidad"), filas[0].get("entidad_id")
+                )
+                with self._lock:
+                    self._fallidos += 1
+                return False
+            logger.warning("Falló el lote de %s registros de auditoría; se reintenta uno por uno", len(filas))
+            escritos = [self._insertar([fila]) for fila in filas]
+            return all(escritos)
+        with self._lock:
+            self._escritos += len(filas)
+        return True
+
+
+escritor = EscritorAuditoria(
+    capacidad=settings.auditoria_cola_capacidad,
+    tamano_lote=settings.auditoria_tamano_lote,
+    intervalo=settings.auditoria_intervalo_segundos,
+    politica=settings.auditoria_cola_llena,
+)
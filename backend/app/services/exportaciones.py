@@ -0,0 +1,416 @@
+"""
+Exportación de reportes a formatos tabulares (CSV y Parquet).
+
+Cada reporte se describe como un `ReporteTabular`: sus columnas y un generador
+que lee las filas directamente de la base de datos por lotes, sin construir los
+esquemas de respuesta. Los escritores consumen ese generador y producen el
+archivo por bloques, listos para un StreamingResponse.
+"""
+import csv
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy.orm import Session
+
+from app.models.asociado import Asociado
+from app.models.ahorro import CuentaAhorro
+from app.models.contabilidad import Aporte, CuentaContable
+from app.models.credito import Credito
+from app.services import reportes
+from app.services.contabilidad import ContabilidadService
+
+
+class ColumnaExportacion(NamedTuple):
+    """Columna de un reporte tabular: nombre y tipo (texto, entero, decimal, fecha)."""
+    nombre: str
+    tipo: str
+
+
+class ReporteTabular(NamedTuple):
+    """Reporte listo para exportar: columnas y filas leídas de forma perezosa."""
+    nombre: str
+    columnas: List[ColumnaExportacion]
+    filas: Iterator[tuple]
+
+
+TIPOS_PARQUET = {
+    "texto": pa.string(),
+    "entero": pa.int64(),
+    "decimal": pa.decimal128(18, 2),
+    "fecha": pa.date32(),
+}
+
+CENTAVO = Decimal("0.01")
+
+
+def _texto(nombre: str) -> ColumnaExportacion:
+    return ColumnaExportacion(nombre, "texto")
+
+
+def _entero(nombre: str) -> ColumnaExportacion:
+    return ColumnaExportacion(nombre, "entero")
+
+
+def _decimal(nombre: str) -> ColumnaExportacion:
+    return ColumnaExportacion(nombre, "decimal")
+
+
+def _fecha(nombre: str) -> ColumnaExportacion:
+    return ColumnaExportacion(nombre, "fecha")
+
+
+# ============================================================================
+# REPORTES TABULARES
+# ============================================================================
+
+def tabla_cartera(
+    db: Session,
+    tipo_credito: Optional[str] = None,
+    estado: Optional[str] = None
+) -> ReporteTabular:
+    """Detalle de la cartera de créditos, una fila por crédito."""
+    columnas = [
+        _texto("numero_credito"), _texto("asociado_nombre"), _texto("asociado_documento"),
+        _texto("tipo_credito"), _decimal("monto_desembolsado"), _decimal("saldo_capital"),
+        _decimal("saldo_interes"), _decimal("saldo_mora"), _entero("dias_mora"),
+        _texto("estado"), _fecha("fecha_desembolso"), _fecha("fecha_ultimo_pago"),
+    ]
+
+    query = db.query(
+        Credito.numero_credito,
+        Asociado.nombres,
+        Asociado.apellidos,
+        Asociado.numero_documento,
+        Credito.tipo_credito,
+        Credito.monto_desembolsado,
+        Credito.saldo_capital,
+        Credito.saldo_interes,
+        Credito.saldo_mora,
+        Credito.dias_mora,
+        Credito.estado,
+        Credito.fecha_desembolso,
+        Credito.fecha_ultimo_pago
+    ).join(Asociado).filter(
+        Credito.estado.in_(["desembolsado", "al_dia", "mora", "castigado"])
+    )
+
+    if tipo_credito:
+        query = query.filter(Credito.tipo_credito == tipo_credito)
+
+    if estado:
+        query = query.filter(Credito.estado == estado)
+
+    def filas():
+        for c in query.order_by(Credito.id).yield_per(reportes.FILAS_POR_LOTE_EXPORTACION):
+            yield (
+                c.numero_credito,
+                f"{c.nombres} {c.apellidos}",
+                c.numero_documento,
+                reportes.valor_enum(c.tipo_credito),
+                c.monto_desembolsado or Decimal("0.00"),
+                c.saldo_capital or Decimal("0.00"),
+                c.saldo_interes or Decimal("0.00"),
+                c.saldo_mora or Decimal("0.00"),
+                c.dias_mora or 0,
+                reportes.valor_enum(c.estado),
+                c.fecha_desembolso,
+                c.fecha_ultimo_pago,
+            )
+
+    return ReporteTabular("cartera", columnas, filas())
+
+
+def tabla_mora(db: Session, dias_mora_minimo: int) -> ReporteTabular:
+    """Créditos en mora con al menos `dias_mora_minimo` días, una fila por crédito."""
+    columnas = [
+        _texto("numero_credito"), _entero("asociado_id"), _texto("asociado_nombre"),
+        _texto("asociado_documento"), _texto("asociado_telefono"), _texto("tipo_credito"),
+        _decimal("saldo_capital"), _decimal("saldo_mora"), _entero("dias_mora"),
+        _texto("rango_mora"), _fecha("fecha_ultimo_pago"),
+    ]
+
+    query = db.query(
+        Credito.numero_credito,
+        Credito.asociado_id,
+        Asociado.nombres,
+        Asociado.apellidos,
+        Asociado.numero_documento,
+        Asociado.telefono_principal,
+        Credito.tipo_credito,
+        Credito.saldo_capital,
+        Credito.saldo_mora,
+        Credito.dias_mora,
+        Credito.fecha_ultimo_pago
+    ).join(Asociado).filter(
+        Credito.estado == "mora",
+        Credito.dias_mora >= dias_mora_minimo
+    )
+
+    def filas():
+        for c in query.order_by(Credito.id).yield_per(reportes.FILAS_POR_LOTE_EXPORTACION):
+            dias = c.dias_mora or 0
+            yield (
+                c.numero_credito,
+                c.asociado_id,
+                f"{c.nombres} {c.apellidos}",
+                c.numero_documento,
+                c.telefono_principal,
+                reportes.valor_enum(c.tipo_credito),
+                c.saldo_capital or Decimal("0.00"),
+                c.saldo_mora or Decimal("0.00"),
+                dias,
+                reportes.rango_mora(dias),
+                c.fecha_ultimo_pago,
+            )
+
+    return ReporteTabular("mora", columnas, filas())
+
+
+def tabla_balance_general(db: Session, fecha_corte: date) -> ReporteTabular:
+    """Balance General por cuenta, con su grupo (nivel 2) y saldo a la fecha de corte."""
+    columnas = [
+        _texto("tipo"), _texto("grupo_codigo"), _texto("grupo_nombre"),
+        _texto("codigo"), _texto("nombre"), _texto("naturaleza"),
+        _decimal("total_debito"), _decimal("total_credito"), _decimal("saldo"),
+    ]
+
+    def filas():
+        cuentas = db.query(CuentaContable).order_by(CuentaContable.codigo).all()
+        cuentas_por_id = {cuenta.id: cuenta for cuenta in cuentas}
+        sumas = ContabilidadService.calcular_saldos_cuentas(db, fecha_fin=fecha_corte)
+
+        for cuenta in cuentas:
+            if not cuenta.activa or cuenta.tipo not in ("activo", "pasivo", "patrimonio"):
+                continue
+            if cuenta.id not in sumas:
+                continue
+
+            total_debito, total_credito = sumas[cuenta.id]
+            saldo = reportes.saldo_segun_naturaleza(cuenta, total_debito, total_credito)
+            if saldo == 0:
+                continue
+
+            grupo = reportes.grupo_de_cuenta(cuenta, cuentas_por_id)
+            yield (
+                cuenta.tipo, grupo.codigo, grupo.nombre,
+                cuenta.codigo, cuenta.nombre, cuenta.naturaleza,
+                total_debito, total_credito, saldo,
+            )
+
+    return ReporteTabular("balance_general", columnas, filas())
+
+
+def tabla_estado_resultados(db: Session, fecha_inicio: date, fecha_fin: date) -> ReporteTabular:
+    """Estado de Resultados por cuenta de ingreso o gasto con movimiento en el período."""
+    columnas = [
+        _texto("tipo"), _texto("codigo"), _texto("nombre"),
+        _decimal("total_debito"), _decimal("total_credito"), _decimal("valor"),
+    ]
+
+    def filas():
+        cuentas = db.query(CuentaContable).filter(
+            CuentaContable.tipo.in_(["ingreso", "gasto"]),
+            CuentaContable.activa == True
+        ).order_by(CuentaContable.codigo).all()
+
+        sumas = ContabilidadService.calcular_saldos_cuentas(
+            db,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            cuenta_ids=[cuenta.id for cuenta in cuentas]
+        )
+
+        for cuenta in cuentas:
+            if cuenta.id not in sumas:
+                continue
+
+            total_debito, total_credito = sumas[cuenta.id]
+            if cuenta.tipo == "ingreso":
+                valor = total_credito - total_debito
+            else:
+                valor = total_debito - total_credito
+
+            if valor > 0:
+                yield (cuenta.tipo, cuenta.codigo, cuenta.nombre, total_debito, total_credito, valor)
+
+    return ReporteTabular("estado_resultados", columnas, filas())
+
+
+def tabla_estado_cuenta(
+    db: Session,
+    numero_documento: str,
+    fecha_inicio: Optional[date],
+    fecha_fin: date
+) -> ReporteTabular:
+    """
+    Estado de cuenta de un asociado en formato largo.
+
+    Cada fila es un aporte del período, un crédito activo o una cuenta de ahorro
+    activa, identificada por la columna `seccion`. El asociado se valida antes de
+    leer las filas, para poder responder 404 antes de iniciar la descarga.
+
+    Raises:
+        ValueError: Si no existe un asociado con ese documento.
+    """
+    if fecha_inicio is None:
+        fecha_inicio = fecha_fin - timedelta(days=180)  # 6 meses atrás
+
+    asociado_id = db.query(Asociado.id).filter(
+        Asociado.numero_documento == numero_documento
+    ).scalar()
+    if asociado_id is None:
+        raise ValueError(f"Asociado con documento {numero_documento} no encontrado")
+
+    columnas = [
+        _texto("seccion"), _texto("referencia"), _texto("tipo"), _fecha("fecha"),
+        _decimal("valor"), _decimal("saldo"), _texto("estado"), _entero("dias_mora"),
+    ]
+
+    def filas():
+        aportes = db.query(
+            Aporte.id, Aporte.numero_recibo, Aporte.tipo_aporte, Aporte.fecha, Aporte.valor, Aporte.estado
+        ).filter(
+            Aporte.asociado_id == asociado_id,
+            Aporte.fecha.between(fecha_inicio, fecha_fin)
+        ).order_by(Aporte.fecha, Aporte.id)
+
+        for a in aportes.yield_per(reportes.FILAS_POR_LOTE_EXPORTACION):
+            yield ("aporte", a.numero_recibo or str(a.id), a.tipo_aporte, a.fecha, a.valor, None, a.estado, None)
+
+        creditos = db.query(
+            Credito.numero_credito, Credito.tipo_credito, Credito.fecha_desembolso,
+            Credito.monto_desembolsado, Credito.saldo_capital, Credito.estado, Credito.dias_mora
+        ).filter(
+            Credito.asociado_id == asociado_id,
+            Credito.estado.in_(["desembolsado", "al_dia", "mora"])
+        ).order_by(Credito.id)
+
+        for c in creditos:
+            yield (
+                "credito", c.numero_credito, reportes.valor_enum(c.tipo_credito), c.fecha_desembolso,
+                c.monto_desembolsado or Decimal("0.00"), c.saldo_capital or Decimal("0.00"),
+                reportes.valor_enum(c.estado), c.dias_mora or 0,
+            )
+
+        cuentas = db.query(
+            CuentaAhorro.numero_cuenta, CuentaAhorro.tipo_ahorro, CuentaAhorro.saldo_disponible,
+            CuentaAhorro.saldo_bloqueado, CuentaAhorro.estado
+        ).filter(
+            CuentaAhorro.asociado_id == asociado_id,
+            CuentaAhorro.estado == "activa"
+        ).order_by(CuentaAhorro.id)
+
+        for cuenta in cuentas:
+            yield (
+                "ahorro", cuenta.numero_cuenta, cuenta.tipo_ahorro, None, None,
+                cuenta.saldo_disponible + cuenta.saldo_bloqueado, cuenta.estado, None,
+            )
+
+    return ReporteTabular(f"estado_cuenta_{numero_documento}", columnas, filas())
+
+
+# ============================================================================
+# ESCRITORES
+# ============================================================================
+
+def _lotes(filas: Iterable[tuple], tamano: int) -> Iterator[List[tuple]]:
+    """Agrupar un iterable de filas en listas de a lo sumo `tamano` filas."""
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def escribir_csv(reporte: ReporteTabular, filas_por_bloque: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Escribir un reporte como CSV (UTF-8, separador coma).
+
+    Emite un bloque de bytes cada `filas_por_bloque` filas, de modo que la
+    descarga empieza con el primer lote leído de la base de datos.
+    """
+    filas_por_bloque = filas_por_bloque or reportes.FILAS_POR_LOTE_EXPORTACION
+    buffer = StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow([columna.nombre for columna in reporte.columnas])
+
+    for lote in _lotes(reporte.filas, filas_por_bloque):
+        escritor.writerows(lote)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _columna_parquet(valores: tuple, tipo: str) -> pa.Array:
+    if tipo == "decimal":
+        valores = [None if v is None else Decimal(str(v)).quantize(CENTAVO) for v in valores]
+    return pa.array(valores, type=TIPOS_PARQUET[tipo])
+
+
+def escribir_parquet(reporte: ReporteTabular, filas_por_grupo: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Escribir un reporte como Parquet (columnar, comprimido con snappy).
+
+    Cada lote de filas se convierte en un row group, así que en memoria solo
+    vive un lote a la vez. El archivo se arma en un temporal (Parquet escribe
+    su índice al final) y luego se envía por bloques.
+    """
+    filas_por_grupo = filas_por_grupo or reportes.FILAS_POR_LOTE_EXPORTACION
+    esquema = pa.schema([(columna.nombre, TIPOS_PARQUET[columna.tipo]) for columna in reporte.columnas])
+    archivo = tempfile.SpooledTemporaryFile(max_size=reportes.LIMITE_MEMORIA_EXPORTACION)
+
+    with pq.ParquetWriter(archivo, esquema, compression="snappy") as escritor:
+        for lote in _lotes(reporte.filas, filas_por_grupo):
+            valores_por_columna = list(zip(*lote))
+            escritor.write_table(pa.Table.from_arrays(
+                [
+                    _columna_parquet(valores, columna.tipo)
+                    for valores, columna in zip(valores_por_columna, reporte.columnas)
+                ],
+                schema=esquema
+            ))
+
+    archivo.seek(0)
+    yield from reportes.iterar_archivo(archivo)
+
+
+FORMATOS_EXPORTACION: Dict[str, Callable[[ReporteTabular], Iterator[bytes]]] = {
+    "csv": escribir_csv,
+    "parquet": escribir_parquet,
+}
+
+TIPOS_CONTENIDO = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def validar_formato(formato: str) -> str:
+    """
+    Validar y normalizar el formato de exportación.
+
+    Raises:
+        ValueError: Si el formato no es soportado.
+    """
+    formato = formato.lower()
+    if formato not in FORMATOS_EXPORTACION:
+        raise ValueError(
+            f"Formato '{formato}' no soportado. Use uno de: {', '.join(FORMATOS_EXPORTACION)}"
+        )
+    return formato
+
+
+def exportar_reporte(reporte: ReporteTabular, formato: str) -> Iterator[bytes]:
+    """Generar el archivo de un reporte tabular en el formato pedido, por bloques."""
+    return FORMATOS_EXPORTACION[validar_formato(formato)](reporte)
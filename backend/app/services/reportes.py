@@ -1,12 +1,14 @@
 """
 Servicio para generación de reportes financieros.
 """
+from calendar import monthrange
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Optional, List
+from typing import BinaryIO, Iterator, NamedTuple, Optional, List, Tuple
 from io import BytesIO
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+import tempfile
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import func, and_, case
 
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -16,19 +18,24 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 
 from app.models.asociado import Asociado
-from app.models.contabilidad import CuentaContable, MovimientoContable, Aporte, AsientoContable
+from app.models.contabilidad import CuentaContable, MovimientoContable, Aporte, AsientoContable, SaldoMensual
 from app.models.credito import Credito
 from app.models.ahorro import CuentaAhorro, MovimientoAhorro
+from app.services.contabilidad import ContabilidadService
 from app.schemas.reportes import (
     BalanceGeneralResponse,
     GrupoBalance,
     CuentaBalance,
     EstadoResultadosResponse,
     CuentaResultados,
+    EstadoResultadosComparativoResponse,
+    CuentaResultadosComparativo,
+    PeriodoResultados,
     ReporteCarteraResponse,
     CreditoCartera,
     EstadisticasCartera,
@@ -45,87 +52,68 @@ from app.schemas.reportes import (
 )
 
 
+def saldo_segun_naturaleza(cuenta: CuentaContable, total_debito: Decimal, total_credito: Decimal) -> Decimal:
+    """Calcular el saldo de una cuenta según su naturaleza."""
+    if cuenta.naturaleza == "debito":
+        return total_debito - total_credito
+    return total_credito - total_debito
+
+
+def grupo_de_cuenta(cuenta: CuentaContable, cuentas_por_id: dict) -> CuentaContable:
+    """
+    Obtener la cuenta de nivel grupo (nivel 2) que contiene a la cuenta.
+    
+    Si la cuenta no tiene ancestro de nivel 2 se retorna la más alta encontrada.
+    """
+    actual = cuenta
+    while actual.nivel > 2 and actual.cuenta_padre_id in cuentas_por_id:
+        actual = cuentas_por_id[actual.cuenta_padre_id]
+    return actual
+
+
 def generar_balance_general(db: Session, fecha_corte: date) -> BalanceGeneralResponse:
     """
     Generar Balance General a una fecha específica.
+    
+    Los saldos de todas las cuentas se obtienen con consultas agregadas
+    (saldos mensuales cerrados más movimientos del mes de corte) en lugar
+    de una consulta por cuenta. Cada sección tiene un único grupo con sus
+    cuentas, aunque no tenga ninguna con saldo.
     """
-    # Obtener todas las cuentas con movimientos hasta la fecha de corte
     cuentas = db.query(CuentaContable).filter(
         CuentaContable.activa == True
-    ).all()
+    ).order_by(CuentaContable.codigo).all()
+    sumas = ContabilidadService.calcular_saldos_cuentas(db, fecha_fin=fecha_corte)
     
-    activos = []
-    pasivos = []
-    patrimonio = []
-    
-    total_activos = Decimal("0.00")
-    total_pasivos = Decimal("0.00")
-    total_patrimonio = Decimal("0.00")
+    secciones = {"activo": [], "pasivo": [], "patrimonio": []}
+    totales = {tipo: Decimal("0.00") for tipo in secciones}
     
     for cuenta in cuentas:
-        # Calcular saldo de la cuenta hasta la fecha de corte
-        movimientos = db.query(MovimientoContable).join(
-            AsientoContable, MovimientoContable.asiento_id == AsientoContable.id
-        ).filter(
-            MovimientoContable.cuenta_id == cuenta.id,
-            AsientoContable.fecha <= fecha_corte,
-            AsientoContable.anulado == False
-        ).all()
-        
-        total_debito = sum(m.debito for m in movimientos)
-        total_credito = sum(m.credito for m in movimientos)
-        
-        if cuenta.naturaleza == "debito":
-            saldo = total_debito - total_credito
-        else:
-            saldo = total_credito - total_debito
+        if cuenta.tipo not in secciones or cuenta.id not in sumas:
+            continue
         
+        saldo = saldo_segun_naturaleza(cuenta, *sumas[cuenta.id])
         if saldo == 0:
             continue
         
-        cuenta_balance = CuentaBalance(
+        secciones[cuenta.tipo].append(CuentaBalance(
             codigo=cuenta.codigo,
             nombre=cuenta.nombre,
             saldo=saldo
-        )
-        
-        # Clasificar por tipo
-        if cuenta.tipo == "activo":
-            activos.append(cuenta_balance)
-            total_activos += saldo
-        elif cuenta.tipo == "pasivo":
-            pasivos.append(cuenta_balance)
-            total_pasivos += saldo
-        elif cuenta.tipo == "patrimonio":
-            patrimonio.append(cuenta_balance)
-            total_patrimonio += saldo
-    
-    # Agrupar cuentas
-    grupo_activos = [GrupoBalance(
-        nombre="Activos",
-        total=total_activos,
-        cuentas=activos
-    )]
-    
-    grupo_pasivos = [GrupoBalance(
-        nombre="Pasivos",
-        total=total_pasivos,
-        cuentas=pasivos
-    )]
-    
-    grupo_patrimonio = [GrupoBalance(
-        nombre="Patrimonio",
-        total=total_patrimonio,
-        cuentas=patrimonio
-    )]
+        ))
+        totales[cuenta.tipo] += saldo
+    
+    total_activos = totales["activo"]
+    total_pasivos = totales["pasivo"]
+    total_patrimonio = totales["patrimonio"]
     
     cuadrado = abs(total_activos - (total_pasivos + total_patrimonio)) < Decimal("0.01")
     
     return BalanceGeneralResponse(
         fecha_corte=fecha_corte,
-        activos=grupo_activos,
-        pasivos=grupo_pasivos,
-        patrimonio=grupo_patrimonio,
+        activos=[GrupoBalance(nombre="Activos", total=total_activos, cuentas=secciones["activo"])],
+        pasivos=[GrupoBalance(nombre="Pasivos", total=total_pasivos, cuentas=secciones["pasivo"])],
+        patrimonio=[GrupoBalance(nombre="Patrimonio", total=total_patrimonio, cuentas=secciones["patrimonio"])],
         total_activos=total_activos,
         total_pasivos=total_pasivos,
         total_patrimonio=total_patrimonio,
@@ -142,66 +130,47 @@ def generar_estado_resultados(
     Generar Estado de Resultados para un período.
     """
     # Obtener cuentas de ingresos y gastos
-    cuentas_ingresos = db.query(CuentaContable).filter(
-        CuentaContable.tipo == "ingreso",
+    cuentas = db.query(CuentaContable).filter(
+        CuentaContable.tipo.in_(["ingreso", "gasto"]),
         CuentaContable.activa == True
-    ).all()
+    ).order_by(CuentaContable.codigo).all()
     
-    cuentas_gastos = db.query(CuentaContable).filter(
-        CuentaContable.tipo == "gasto",
-        CuentaContable.activa == True
-    ).all()
+    sumas = ContabilidadService.calcular_saldos_cuentas(
+        db,
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        cuenta_ids=[cuenta.id for cuenta in cuentas]
+    )
     
     ingresos = []
     gastos = []
     total_ingresos = Decimal("0.00")
     total_gastos = Decimal("0.00")
     
-    # Calcular ingresos
-    for cuenta in cuentas_ingresos:
-        movimientos = db.query(MovimientoContable).join(
-            AsientoContable, MovimientoContable.asiento_id == AsientoContable.id
-        ).filter(
-            MovimientoContable.cuenta_id == cuenta.id,
-            AsientoContable.fecha >= fecha_inicio,
-            AsientoContable.fecha <= fecha_fin,
-            AsientoContable.anulado == False
-        ).all()
-        
-        total_credito = sum(m.credito for m in movimientos)
-        total_debito = sum(m.debito for m in movimientos)
-        valor = total_credito - total_debito
-        
-        if valor > 0:
-            ingresos.append(CuentaResultados(
-                codigo=cuenta.codigo,
-                nombre=cuenta.nombre,
-                valor=valor
-            ))
-            total_ingresos += valor
-    
-    # Calcular gastos
-    for cuenta in cuentas_gastos:
-        movimientos = db.query(MovimientoContable).join(
-            AsientoContable, MovimientoContable.asiento_id == AsientoContable.id
-        ).filter(
-            MovimientoContable.cuenta_id == cuenta.id,
-            AsientoContable.fecha >= fecha_inicio,
-            AsientoContable.fecha <= fecha_fin,
-            AsientoContable.anulado == False
-        ).all()
+    for cuenta in cuentas:
+        if cuenta.id not in sumas:
+            continue
         
-        total_debito = sum(m.debito for m in movimientos)
-        total_credito = sum(m.credito for m in movimientos)
-        valor = total_debito - total_credito
+        total_debito, total_credito = sumas[cuenta.id]
         
-        if valor > 0:
-            gastos.append(CuentaResultados(
-                codigo=cuenta.codigo,
-                nombre=cuenta.nombre,
-                valor=valor
-            ))
-            total_gastos += valor
+        if cuenta.tipo == "ingreso":
+            valor = total_credito - total_debito
+            if valor > 0:
+                ingresos.append(CuentaResultados(
+                    codigo=cuenta.codigo,
+                    nombre=cuenta.nombre,
+                    valor=valor
+                ))
+                total_ingresos += valor
+        else:
+            valor = total_debito - total_credito
+            if valor > 0:
+                gastos.append(CuentaResultados(
+                    codigo=cuenta.codigo,
+                    nombre=cuenta.nombre,
+                    valor=valor
+                ))
+                total_gastos += valor
     
     utilidad_neta = total_ingresos - total_gastos
     margen_utilidad = (utilidad_neta / total_ingresos * 100) if total_ingresos > 0 else Decimal("0.00")
@@ -218,6 +187,192 @@ def generar_estado_resultados(
     )
 
 
+MAX_PERIODOS_COMPARATIVO = 36
+
+MESES_POR_AGRUPACION = {
+    "mensual": 1,
+    "trimestral": 3,
+    "anual": 12,
+}
+
+
+def _periodos_comparativos(
+    fecha_inicio: date,
+    fecha_fin: date,
+    agrupacion: str
+) -> List[Tuple[date, date]]:
+    """
+    Dividir un rango de fechas en períodos calendario (meses, trimestres o años).
+    
+    El primer y último período se recortan al rango solicitado.
+    """
+    if agrupacion not in MESES_POR_AGRUPACION:
+        raise ValueError(f"Agrupación debe ser una de: {', '.join(MESES_POR_AGRUPACION)}")
+    
+    meses = MESES_POR_AGRUPACION[agrupacion]
+    periodos = []
+    
+    # Inicio del bloque calendario que contiene la fecha inicial
+    mes_bloque = (fecha_inicio.month - 1) // meses * meses + 1
+    inicio = date(fecha_inicio.year, mes_bloque, 1)
+    
+    while inicio <= fecha_fin:
+        indice_fin = inicio.year * 12 + inicio.month - 1 + meses - 1
+        anio_fin, mes_fin = divmod(indice_fin, 12)
+        mes_fin += 1
+        fin = date(anio_fin, mes_fin, monthrange(anio_fin, mes_fin)[1])
+        
+        periodos.append((max(inicio, fecha_inicio), min(fin, fecha_fin)))
+        if len(periodos) > MAX_PERIODOS_COMPARATIVO:
+            raise ValueError(f"El rango no puede superar {MAX_PERIODOS_COMPARATIVO} períodos")
+        
+        inicio = fin + timedelta(days=1)
+    
+    return periodos
+
+
+def _es_mes_completo(fecha_inicio: date, fecha_fin: date) -> bool:
+    """Indicar si el rango empieza el primer día de un mes y termina el último día de otro."""
+    return fecha_inicio.day == 1 and fecha_fin.day == monthrange(fecha_fin.year, fecha_fin.month)[1]
+
+
+def _sumas_por_periodo(
+    db: Session,
+    periodos: List[Tuple[date, date]],
+    cuenta_ids: List[int]
+) -> dict:
+    """
+    Sumar débitos y créditos por cuenta y período en una sola consulta agrupada.
+    
+    Si todos los períodos son meses completos se agregan los saldos mensuales;
+    de lo contrario se agregan los movimientos contables.
+    
+    Returns:
+        dict: {(cuenta_id, indice_periodo): (total_debito, total_credito)}
+    """
+    if all(_es_mes_completo(inicio, fin) for inicio, fin in periodos):
+        mes = SaldoMensual.anio * 12 + SaldoMensual.mes
+        periodo = case(*[
+            (
+                mes.between(inicio.year * 12 + inicio.month, fin.year * 12 + fin.month),
+                indice
+            )
+            for indice, (inicio, fin) in enumerate(periodos)
+        ])
+        consulta = db.query(
+            SaldoMensual.cuenta_id.label("cuenta_id"),
+            periodo.label("periodo"),
+            func.sum(SaldoMensual.total_debito).label("total_debito"),
+            func.sum(SaldoMensual.total_credito).label("total_credito")
+        ).filter(
+            SaldoMensual.cuenta_id.in_(cuenta_ids),
+            mes.between(
+                periodos[0][0].year * 12 + periodos[0][0].month,
+                periodos[-1][1].year * 12 + periodos[-1][1].month
+            )
+        ).group_by(SaldoMensual.cuenta_id, periodo)
+    else:
+        periodo = case(*[
+            (AsientoContable.fecha.between(inicio, fin), indice)
+            for indice, (inicio, fin) in enumerate(periodos)
+        ])
+        consulta = db.query(
+            MovimientoContable.cuenta_id.label("cuenta_id"),
+            periodo.label("periodo"),
+            func.sum(MovimientoContable.debito).label("total_debito"),
+            func.sum(MovimientoContable.credito).label("total_credito")
+        ).join(
+            AsientoContable, MovimientoContable.asiento_id == AsientoContable.id
+        ).filter(
+            MovimientoContable.cuenta_id.in_(cuenta_ids),
+            AsientoContable.fecha.between(periodos[0][0], periodos[-1][1]),
+            AsientoContable.anulado == False
+        ).group_by(MovimientoContable.cuenta_id, periodo)
+    
+    return {
+        (fila.cuenta_id, int(fila.periodo)): (
+            Decimal(fila.total_debito or 0),
+            Decimal(fila.total_credito or 0)
+        )
+        for fila in consulta.all()
+    }
+
+
+def generar_estado_resultados_comparativo(
+    db: Session,
+    fecha_inicio: date,
+    fecha_fin: date,
+    agrupacion: str = "mensual"
+) -> EstadoResultadosComparativoResponse:
+    """
+    Generar Estado de Resultados comparativo por períodos.
+    
+    Divide el rango en meses, trimestres o años y obtiene los totales de
+    todas las cuentas de ingresos y gastos para todos los períodos con una
+    sola consulta agrupada por cuenta y período.
+    """
+    periodos = _periodos_comparativos(fecha_inicio, fecha_fin, agrupacion)
+    
+    cuentas = db.query(CuentaContable).filter(
+        CuentaContable.tipo.in_(["ingreso", "gasto"]),
+        CuentaContable.activa == True
+    ).order_by(CuentaContable.codigo).all()
+    
+    sumas = _sumas_por_periodo(db, periodos, [cuenta.id for cuenta in cuentas]) if cuentas else {}
+    
+    total_ingresos = [Decimal("0.00")] * len(periodos)
+    total_gastos = [Decimal("0.00")] * len(periodos)
+    ingresos = []
+    gastos = []
+    
+    for cuenta in cuentas:
+        es_ingreso = cuenta.tipo == "ingreso"
+        valores = []
+        for indice in range(len(periodos)):
+            total_debito, total_credito = sumas.get((cuenta.id, indice), (Decimal("0"), Decimal("0")))
+            valor = total_credito - total_debito if es_ingreso else total_debito - total_credito
+            # Igual que en el estado de resultados simple, solo cuentan valores positivos
+            valores.append(valor if valor > 0 else Decimal("0.00"))
+        
+        if not any(valores):
+            continue
+        
+        fila = CuentaResultadosComparativo(
+            codigo=cuenta.codigo,
+            nombre=cuenta.nombre,
+            valores=valores,
+            total=sum(valores, Decimal("0.00"))
+        )
+        totales = total_ingresos if es_ingreso else total_gastos
+        for indice, valor in enumerate(valores):
+            totales[indice] += valor
+        (ingresos if es_ingreso else gastos).append(fila)
+    
+    resumen_periodos = []
+    for indice, (inicio, fin) in enumerate(periodos):
+        utilidad_neta = total_ingresos[indice] - total_gastos[indice]
+        resumen_periodos.append(PeriodoResultados(
+            fecha_inicio=inicio,
+            fecha_fin=fin,
+            total_ingresos=total_ingresos[indice],
+            total_gastos=total_gastos[indice],
+            utilidad_neta=utilidad_neta,
+            margen_utilidad=(
+                utilidad_neta / total_ingresos[indice] * 100
+                if total_ingresos[indice] > 0 else Decimal("0.00")
+            )
+        ))
+    
+    return EstadoResultadosComparativoResponse(
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        agrupacion=agrupacion,
+        periodos=resumen_periodos,
+        ingresos=ingresos,
+        gastos=gastos
+    )
+
+
 def generar_reporte_cartera(
     db: Session,
     fecha_corte: date,
@@ -309,11 +464,27 @@ def generar_reporte_cartera(
     )
 
 
+def rango_mora(dias: int) -> str:
+    """Determinar el rango de mora según los días de atraso."""
+    if dias <= 30:
+        return "1-30"
+    elif dias <= 60:
+        return "31-60"
+    elif dias <= 90:
+        return "61-90"
+    return "90+"
+
+
+def valor_enum(valor) -> str:
+    """Texto de un valor que puede venir como Enum o como cadena."""
+    return getattr(valor, "value", valor)
+
+
 def generar_reporte_mora(db: Session, dias_mora_minimo: int) -> ReporteMoraResponse:
     """
     Generar reporte de créditos en mora.
     """
-    creditos_db = db.query(Credito).join(Asociado).filter(
+    creditos_db = db.query(Credito).join(Asociado).options(contains_eager(Credito.asociado)).filter(
         Credito.estado == "mora",
         Credito.dias_mora >= dias_mora_minimo
     ).all()
@@ -330,15 +501,7 @@ def generar_reporte_mora(db: Session, dias_mora_minimo: int) -> ReporteMoraRespo
     for c in creditos_db:
         dias = c.dias_mora or 0
         
-        # Determinar rango
-        if dias <= 30:
-            rango = "1-30"
-        elif dias <= 60:
-            rango = "31-60"
-        elif dias <= 90:
-            rango = "61-90"
-        else:
-            rango = "90+"
+        rango = rango_mora(dias)
         
         saldo_mora = c.saldo_mora or Decimal("0.00")
         monto_total_mora += saldo_mora
@@ -350,7 +513,7 @@ def generar_reporte_mora(db: Session, dias_mora_minimo: int) -> ReporteMoraRespo
             asociado_id=c.asociado_id,
             asociado_nombre=f"{c.asociado.nombres} {c.asociado.apellidos}",
             asociado_documento=c.asociado.numero_documento,
-            asociado_telefono=c.asociado.datos_personales.get("telefono"),
+            asociado_telefono=c.asociado.telefono_principal,
             tipo_credito=c.tipo_credito,
             saldo_capital=c.saldo_capital or Decimal("0.00"),
             saldo_mora=saldo_mora,
@@ -716,17 +879,81 @@ def exportar_balance_pdf(db: Session, fecha_corte: date) -> BytesIO:
     return buffer
 
 
-def exportar_cartera_excel(db: Session, fecha_corte: date) -> BytesIO:
+# Filas leídas por lote del cursor en las exportaciones a Excel
+FILAS_POR_LOTE_EXPORTACION = 1000
+
+# Bytes que un archivo exportado mantiene en memoria antes de pasar a disco
+LIMITE_MEMORIA_EXPORTACION = 8 * 1024 * 1024
+
+# Tamaño de cada bloque enviado al cliente al descargar un archivo
+TAMANO_BLOQUE_DESCARGA = 64 * 1024
+
+
+def iterar_archivo(archivo: BinaryIO, tamano_bloque: int = TAMANO_BLOQUE_DESCARGA) -> Iterator[bytes]:
+    """
+    Leer un archivo por bloques para enviarlo en un StreamingResponse.
+    
+    El archivo se cierra (y se elimina si es temporal) al terminar la descarga.
+    """
+    try:
+        while True:
+            bloque = archivo.read(tamano_bloque)
+            if not bloque:
+                break
+            yield bloque
+    finally:
+        archivo.close()
+
+
+def _celda(ws, valor, estilo: dict):
+    """Crear una celda de hoja de solo escritura con los estilos dados."""
+    celda = WriteOnlyCell(ws, value=valor)
+    for atributo, valor_estilo in estilo.items():
+        setattr(celda, atributo, valor_estilo)
+    return celda
+
+
+def _guardar_libro_temporal(wb: Workbook) -> BinaryIO:
+    """
+    Guardar un libro en un archivo temporal y dejarlo listo para lectura.
+    
+    El archivo queda en memoria hasta LIMITE_MEMORIA_EXPORTACION y luego pasa a
+    disco, por lo que el consumo de memoria no crece con el tamaño del reporte.
+    """
+    archivo = tempfile.SpooledTemporaryFile(max_size=LIMITE_MEMORIA_EXPORTACION)
+    wb.save(archivo)
+    archivo.seek(0)
+    return archivo
+
+
+def exportar_cartera_excel(db: Session, fecha_corte: date) -> BinaryIO:
     """
     Exportar reporte de cartera a Excel.
+    
+    Las estadísticas se calculan con una consulta agregada y el detalle se lee
+    por lotes y se escribe en una hoja de solo escritura, sin cargar la cartera
+    completa en memoria. Retorna un archivo temporal posicionado al inicio.
     """
-    # Generar datos de cartera
-    reporte = generar_reporte_cartera(db, fecha_corte)
+    estados_cartera = ["desembolsado", "al_dia", "mora", "castigado"]
+    
+    def saldo_si(estado_credito: str):
+        return func.coalesce(func.sum(case(
+            (Credito.estado == estado_credito, Credito.saldo_capital), else_=0
+        )), 0)
+    
+    total_creditos, cartera_total, cartera_al_dia, cartera_mora = db.query(
+        func.count(Credito.id),
+        func.coalesce(func.sum(Credito.saldo_capital), 0),
+        saldo_si("al_dia"),
+        saldo_si("mora")
+    ).join(Asociado).filter(Credito.estado.in_(estados_cartera)).one()
+    
+    cartera_total = Decimal(str(cartera_total))
+    cartera_mora = Decimal(str(cartera_mora))
+    tasa_mora = (cartera_mora / cartera_total * 100) if cartera_total > 0 else Decimal("0.00")
     
-    # Crear workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Cartera"
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Cartera")
     
     # Estilos
     header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
@@ -737,79 +964,62 @@ def exportar_cartera_excel(db: Session, fecha_corte: date) -> BytesIO:
         top=Side(style='thin'),
         bottom=Side(style='thin')
     )
+    texto = {"border": border}
+    moneda = {"border": border, "number_format": '$#,##0.00'}
+    encabezado = {"fill": header_fill, "font": header_font, "border": border,
+                  "alignment": Alignment(horizontal='center')}
     
-    # Título
-    ws.merge_cells('A1:H1')
-    ws['A1'] = f"REPORTE DE CARTERA AL {fecha_corte.strftime('%d/%m/%Y')}"
-    ws['A1'].font = Font(bold=True, size=14)
-    ws['A1'].alignment = Alignment(horizontal='center')
+    # Ajustar anchos (en hojas de solo escritura debe hacerse antes de las filas)
+    for col, width in [(1, 10), (2, 30), (3, 20), (4, 15), (5, 15), (6, 15), (7, 12), (8, 12)]:
+        ws.column_dimensions[get_column_letter(col)].width = width
+    
+    # Título (las hojas de solo escritura aceptan el rango combinado en merged_cells)
+    ws.merged_cells.add('A1:H1')
+    ws.append([_celda(ws, f"REPORTE DE CARTERA AL {fecha_corte.strftime('%d/%m/%Y')}",
+                      {"font": Font(bold=True, size=14), "alignment": Alignment(horizontal='center')})])
+    ws.append([])
     
     # Estadísticas
-    ws['A3'] = "ESTADÍSTICAS"
-    ws['A3'].font = Font(bold=True, size=12)
-    ws['A4'] = "Total Créditos:"
-    ws['B4'] = reporte.estadisticas.total_creditos
-    ws['A5'] = "Cartera Total:"
-    ws['B5'] = reporte.estadisticas.cartera_total
-    ws['B5'].number_format = '$#,##0.00'
-    ws['A6'] = "Cartera al Día:"
-    ws['B6'] = reporte.estadisticas.cartera_al_dia
-    ws['B6'].number_format = '$#,##0.00'
-    ws['A7'] = "Cartera en Mora:"
-    ws['B7'] = reporte.estadisticas.cartera_mora
-    ws['B7'].number_format = '$#,##0.00'
-    ws['A8'] = "Tasa de Mora:"
-    ws['B8'] = float(reporte.estadisticas.tasa_mora)
-    ws['B8'].number_format = '0.00%'
+    ws.append([_celda(ws, "ESTADÍSTICAS", {"font": Font(bold=True, size=12)})])
+    ws.append(["Total Créditos:", total_creditos])
+    ws.append(["Cartera Total:", _celda(ws, float(cartera_total), {"number_format": '$#,##0.00'})])
+    ws.append(["Cartera al Día:", _celda(ws, float(cartera_al_dia), {"number_format": '$#,##0.00'})])
+    ws.append(["Cartera en Mora:", _celda(ws, float(cartera_mora), {"number_format": '$#,##0.00'})])
+    ws.append(["Tasa de Mora:", _celda(ws, float(tasa_mora), {"number_format": '0.00%'})])
+    ws.append([])
+    ws.append([])
     
     # Encabezados de tabla
-    row = 11
     headers = ['ID', 'Asociado', 'Tipo', 'Monto Original', 'Saldo Actual', 'Cuota', 'Estado', 'Días Mora']
-    for col, header in enumerate(headers, start=1):
-        cell = ws.cell(row=row, column=col, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.border = border
-        cell.alignment = Alignment(horizontal='center')
+    ws.append([_celda(ws, header, encabezado) for header in headers])
     
     # Datos
-    row += 1
-    for credito in reporte.creditos:
-        ws.cell(row=row, column=1, value=credito.numero_credito).border = border
-        ws.cell(row=row, column=2, value=credito.asociado_nombre).border = border
-        ws.cell(row=row, column=3, value=credito.tipo_credito).border = border
-        
-        cell = ws.cell(row=row, column=4, value=float(credito.monto_desembolsado))
-        cell.number_format = '$#,##0.00'
-        cell.border = border
-        
-        cell = ws.cell(row=row, column=5, value=float(credito.saldo_capital))
-        cell.number_format = '$#,##0.00'
-        cell.border = border
-        
-        cell = ws.cell(row=row, column=6, value=0)  # No hay cuota en el schema
-        cell.number_format = '$#,##0.00'
-        cell.border = border
-        
-        ws.cell(row=row, column=7, value=credito.estado).border = border
-        ws.cell(row=row, column=8, value=credito.dias_mora).border = border
-        row += 1
-    
-    # Ajustar anchos
-    ws.column_dimensions['A'].width = 10
-    ws.column_dimensions['B'].width = 30
-    ws.column_dimensions['C'].width = 20
-    ws.column_dimensions['D'].width = 15
-    ws.column_dimensions['E'].width = 15
-    ws.column_dimensions['F'].width = 15
-    ws.column_dimensions['G'].width = 12
-    ws.column_dimensions['H'].width = 12
-    
-    # Guardar en buffer
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    return buffer
+    filas = db.query(
+        Credito.numero_credito,
+        Asociado.nombres,
+        Asociado.apellidos,
+        Credito.tipo_credito,
+        Credito.monto_desembolsado,
+        Credito.saldo_capital,
+        Credito.estado,
+        Credito.dias_mora
+    ).join(Asociado).filter(
+        Credito.estado.in_(estados_cartera)
+    ).order_by(Credito.id).yield_per(FILAS_POR_LOTE_EXPORTACION)
+    
+    for fila in filas:
+        ws.append([
+            _celda(ws, fila.numero_credito, texto),
+            _celda(ws, f"{fila.nombres} {fila.apellidos}", texto),
+            _celda(ws, valor_enum(fila.tipo_credito), texto),
+            _celda(ws, float(fila.monto_desembolsado or 0), moneda),
+            _celda(ws, float(fila.saldo_capital or 0), moneda),
+            _celda(ws, 0, moneda),  # No hay cuota en el schema
+            _celda(ws, valor_enum(fila.estado), texto),
+            _celda(ws, fila.dias_mora or 0, texto),
+        ])
+    
+    return _guardar_libro_temporal(wb)
 
 
 def exportar_estado_resultados_pdf(db: Session, fecha_inicio: date, fecha_fin: date) -> BytesIO:
@@ -946,16 +1156,22 @@ def exportar_estado_resultados_pdf(db: Session, fecha_inicio: date, fecha_fin: d
     return buffer
 
 
-def exportar_mora_excel(db: Session, dias_mora_minimo: int = 1) -> BytesIO:
+def exportar_mora_excel(db: Session, dias_mora_minimo: int = 1) -> BinaryIO:
     """
     Exportar Reporte de Mora a Excel.
+    
+    Igual que la cartera, el detalle se lee por lotes y se escribe en una hoja
+    de solo escritura. Retorna un archivo temporal posicionado al inicio.
     """
-    # Generar datos de mora
-    reporte = generar_reporte_mora(db, dias_mora_minimo)
+    filtros = (Credito.estado == "mora", Credito.dias_mora >= dias_mora_minimo)
     
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Reporte Mora"
+    total_creditos_mora, monto_total_mora = db.query(
+        func.count(Credito.id),
+        func.coalesce(func.sum(Credito.saldo_mora), 0)
+    ).join(Asociado).filter(*filtros).one()
+    
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Reporte Mora")
     
     # Estilos
     header_fill = PatternFill(start_color="DC2626", end_color="DC2626", fill_type="solid")
@@ -966,63 +1182,61 @@ def exportar_mora_excel(db: Session, dias_mora_minimo: int = 1) -> BytesIO:
         top=Side(style='thin'),
         bottom=Side(style='thin')
     )
+    texto = {"border": border}
+    moneda = {"border": border, "number_format": '$#,##0.00'}
+    encabezado = {"fill": header_fill, "font": header_font, "border": border,
+                  "alignment": Alignment(horizontal='center')}
+    
+    # Ajustar anchos (en hojas de solo escritura debe hacerse antes de las filas)
+    for col, width in [(1, 12), (2, 30), (3, 15), (4, 25), (5, 15), (6, 12), (7, 15), (8, 15), (9, 15)]:
+        ws.column_dimensions[get_column_letter(col)].width = width
     
     # Título
-    ws.merge_cells('A1:I1')
-    ws['A1'] = f"REPORTE DE MOROSIDAD - {reporte.fecha_generacion.strftime('%d/%m/%Y')}"
-    ws['A1'].font = Font(bold=True, size=14)
-    ws['A1'].alignment = Alignment(horizontal='center')
+    ws.merged_cells.add('A1:I1')
+    ws.append([_celda(ws, f"REPORTE DE MOROSIDAD - {date.today().strftime('%d/%m/%Y')}",
+                      {"font": Font(bold=True, size=14), "alignment": Alignment(horizontal='center')})])
+    ws.append([])
     
     # Estadísticas
-    ws['A3'] = "Total Créditos en Mora:"
-    ws['B3'] = reporte.total_creditos_mora
-    ws['A4'] = "Monto Total Mora:"
-    ws['B4'] = float(reporte.monto_total_mora)
-    ws['B4'].number_format = '$#,##0.00'
-    ws['A5'] = "Días Mínimos:"
-    ws['B5'] = reporte.dias_mora_minimo
+    ws.append(["Total Créditos en Mora:", total_creditos_mora])
+    ws.append(["Monto Total Mora:", _celda(ws, float(monto_total_mora), {"number_format": '$#,##0.00'})])
+    ws.append(["Días Mínimos:", dias_mora_minimo])
+    ws.append([])
+    ws.append([])
     
     # Encabezados
-    row = 8
     headers = ['Número Crédito', 'Asociado', 'Documento', 'Teléfono', 'Tipo Crédito', 
                'Saldo Capital', 'Saldo Mora', 'Días Mora', 'Rango']
-    for col, header in enumerate(headers, start=1):
-        cell = ws.cell(row=row, column=col, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.border = border
-        cell.alignment = Alignment(horizontal='center')
+    ws.append([_celda(ws, header, encabezado) for header in headers])
     
     # Datos
-    row += 1
-    for credito in reporte.creditos:
-        ws.cell(row=row, column=1, value=credito.numero_credito).border = border
-        ws.cell(row=row, column=2, value=credito.asociado_nombre).border = border
-        ws.cell(row=row, column=3, value=credito.asociado_documento).border = border
-        ws.cell(row=row, column=4, value=credito.asociado_telefono or '').border = border
-        ws.cell(row=row, column=5, value=credito.tipo_credito).border = border
-        
-        cell = ws.cell(row=row, column=6, value=float(credito.saldo_capital))
-        cell.number_format = '$#,##0.00'
-        cell.border = border
-        
-        cell = ws.cell(row=row, column=7, value=float(credito.saldo_mora))
-        cell.number_format = '$#,##0.00'
-        cell.border = border
-        
-        ws.cell(row=row, column=8, value=credito.dias_mora).border = border
-        ws.cell(row=row, column=9, value=credito.rango_mora).border = border
-        
-        row += 1
-    
-    # Ajustar anchos
-    for col, width in [(1, 12), (2, 30), (3, 15), (4, 25), (5, 15), (6, 12), (7, 15), (8, 15), (9, 15)]:
-        ws.column_dimensions[get_column_letter(col)].width = width
-    
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    return buffer
+    filas = db.query(
+        Credito.numero_credito,
+        Asociado.nombres,
+        Asociado.apellidos,
+        Asociado.numero_documento,
+        Asociado.telefono_principal,
+        Credito.tipo_credito,
+        Credito.saldo_capital,
+        Credito.saldo_mora,
+        Credito.dias_mora
+    ).join(Asociado).filter(*filtros).order_by(Credito.id).yield_per(FILAS_POR_LOTE_EXPORTACION)
+    
+    for fila in filas:
+        dias = fila.dias_mora or 0
+        ws.append([
+            _celda(ws, fila.numero_credito, texto),
+            _celda(ws, f"{fila.nombres} {fila.apellidos}", texto),
+            _celda(ws, fila.numero_documento, texto),
+            _celda(ws, fila.telefono_principal or '', texto),
+            _celda(ws, valor_enum(fila.tipo_credito), texto),
+            _celda(ws, float(fila.saldo_capital or 0), moneda),
+            _celda(ws, float(fila.saldo_mora or 0), moneda),
+            _celda(ws, dias, texto),
+            _celda(ws, rango_mora(dias), texto),
+        ])
+    
+    return _guardar_libro_temporal(wb)
 
 
 def exportar_estado_cuenta_excel(db: Session, asociado_id: int, fecha_inicio: Optional[date], 
@@ -1463,6 +1677,45 @@ def exportar_estado_cuenta_pdf_por_documento(
     return exportar_estado_cuenta_pdf(db, asociado.id, fecha_inicio, fecha_fin)
 
 
+class DatosCertificadoPazSalvo(NamedTuple):
+    """Datos para renderizar un certificado de paz y salvo."""
+    nombres: str
+    apellidos: str
+    numero_documento: str
+    # (numero_credito, tipo_credito, saldo_capital, saldo_total, estado) de los créditos con saldo
+    obligaciones: List[tuple]
+
+
+class DatosCertificadoAportes(NamedTuple):
+    """Datos para renderizar un certificado de aportes."""
+    nombres: str
+    apellidos: str
+    numero_documento: str
+    ano: Optional[int]
+    total_aportes: Decimal
+    numero_aportes: int
+    # (fecha, valor, tipo_aporte, referencia) de los últimos aportes, del más antiguo al más reciente
+    ultimos_aportes: List[tuple]
+
+
+# Aportes que se detallan en el certificado de aportes
+APORTES_DETALLE_CERTIFICADO = 10
+
+
+def obligacion_certificado(credito) -> tuple:
+    """Fila de obligación pendiente para el certificado de paz y salvo."""
+    saldo_total = (credito.saldo_capital or Decimal("0.00")) + \
+                 (credito.saldo_interes or Decimal("0.00")) + \
+                 (credito.saldo_mora or Decimal("0.00"))
+    return (
+        credito.numero_credito,
+        valor_enum(credito.tipo_credito),
+        credito.saldo_capital,
+        saldo_total,
+        valor_enum(credito.estado)
+    )
+
+
 def generar_certificado_paz_salvo(
     db: Session,
     numero_documento: str
@@ -1486,7 +1739,21 @@ def generar_certificado_paz_salvo(
         Credito.estado.in_(["desembolsado", "al_dia", "mora"])
     ).all()
     
-    tiene_deudas = any(c.saldo_capital > 0 for c in creditos_activos)
+    return renderizar_certificado_paz_salvo(DatosCertificadoPazSalvo(
+        nombres=asociado.nombres,
+        apellidos=asociado.apellidos,
+        numero_documento=asociado.numero_documento,
+        obligaciones=[obligacion_certificado(c) for c in creditos_activos if c.saldo_capital > 0]
+    ))
+
+
+def renderizar_certificado_paz_salvo(datos: DatosCertificadoPazSalvo) -> BytesIO:
+    """
+    Renderizar el PDF de un certificado de paz y salvo.
+    
+    No consulta la base de datos, por lo que puede ejecutarse en otro proceso.
+    """
+    tiene_deudas = bool(datos.obligaciones)
     
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch)
@@ -1542,8 +1809,8 @@ def generar_certificado_paz_salvo(
     texto = f"""
     <para align=justify>
     La Cooperativa COOPEENORTOL certifica que el(la) asociado(a) 
-    <b>{asociado.nombres} {asociado.apellidos}</b>, identificado(a) con 
-    cédula de ciudadanía No. <b>{asociado.numero_documento}</b>, 
+    <b>{datos.nombres} {datos.apellidos}</b>, identificado(a) con 
+    cédula de ciudadanía No. <b>{datos.numero_documento}</b>, 
     {'' if tiene_deudas else 'se encuentra a <b>PAZ Y SALVO</b> por todo concepto con esta cooperativa.'}
     </para>
     """
@@ -1559,20 +1826,15 @@ def generar_certificado_paz_salvo(
         deudas_data = [['Número Crédito', 'Tipo', 'Saldo Capital', 'Saldo Total', 'Estado']]
         total_deuda = Decimal("0.00")
         
-        for credito in creditos_activos:
-            if credito.saldo_capital > 0:
-                saldo_total = (credito.saldo_capital or Decimal("0.00")) + \
-                             (credito.saldo_interes or Decimal("0.00")) + \
-                             (credito.saldo_mora or Decimal("0.00"))
-                total_deuda += saldo_total
-                
-                deudas_data.append([
-                    credito.numero_credito,
-                    credito.tipo_credito,
-                    f"${credito.saldo_capital:,.2f}",
-                    f"${saldo_total:,.2f}",
-                    credito.estado
-                ])
+        for numero_credito, tipo_credito, saldo_capital, saldo_total, estado in datos.obligaciones:
+            total_deuda += saldo_total
+            deudas_data.append([
+                numero_credito,
+                tipo_credito,
+                f"${saldo_capital:,.2f}",
+                f"${saldo_total:,.2f}",
+                estado
+            ])
         
         deudas_data.append(['', '', '', f"<b>${total_deuda:,.2f}</b>", ''])
         
@@ -1644,15 +1906,31 @@ def generar_certificado_aportes(
     query = db.query(Aporte).filter(Aporte.asociado_id == asociado.id)
     
     if ano:
-        fecha_inicio = date(ano, 1, 1)
-        fecha_fin = date(ano, 12, 31)
-        query = query.filter(
-            Aporte.fecha_aporte >= fecha_inicio,
-            Aporte.fecha_aporte <= fecha_fin
-        )
+        query = query.filter(Aporte.fecha.between(date(ano, 1, 1), date(ano, 12, 31)))
+    
+    aportes = query.order_by(Aporte.fecha, Aporte.id).all()
     
-    aportes = query.all()
-    total_aportes = sum(a.valor for a in aportes)
+    return renderizar_certificado_aportes(DatosCertificadoAportes(
+        nombres=asociado.nombres,
+        apellidos=asociado.apellidos,
+        numero_documento=asociado.numero_documento,
+        ano=ano,
+        total_aportes=sum((a.valor for a in aportes), Decimal("0.00")),
+        numero_aportes=len(aportes),
+        ultimos_aportes=[
+            (a.fecha, a.valor, a.tipo_aporte, a.numero_recibo)
+            for a in aportes[-APORTES_DETALLE_CERTIFICADO:]
+        ]
+    ))
+
+
+def renderizar_certificado_aportes(datos: DatosCertificadoAportes) -> BytesIO:
+    """
+    Renderizar el PDF de un certificado de aportes.
+    
+    No consulta la base de datos, por lo que puede ejecutarse en otro proceso.
+    """
+    ano = datos.ano
     
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch)
@@ -1705,8 +1983,8 @@ def generar_certificado_aportes(
     texto = f"""
     <para align=justify>
     La Cooperativa COOPEENORTOL certifica que el(la) asociado(a) 
-    <b>{asociado.nombres} {asociado.apellidos}</b>, identificado(a) con 
-    cédula de ciudadanía No. <b>{asociado.numero_documento}</b>, ha realizado 
+    <b>{datos.nombres} {datos.apellidos}</b>, identificado(a) con 
+    cédula de ciudadanía No. <b>{datos.numero_documento}</b>, ha realizado 
     aportes a la cooperativa {f'durante el año {ano}' if ano else 'desde su ingreso'} 
     por un valor total de:
     </para>
@@ -1725,24 +2003,24 @@ def generar_certificado_aportes(
         fontName='Helvetica-Bold'
     )
     
-    elements.append(Paragraph(f"${total_aportes:,.2f}", total_style))
+    elements.append(Paragraph(f"${datos.total_aportes:,.2f}", total_style))
     elements.append(Spacer(1, 0.3*inch))
     
     # Detalle si hay aportes
-    if aportes:
+    if datos.numero_aportes:
         elements.append(Paragraph("<b>Detalle de Aportes:</b>", content_style))
         elements.append(Spacer(1, 0.1*inch))
         
         aportes_data = [['Fecha', 'Valor', 'Tipo', 'Referencia']]
-        for aporte in aportes[-10:]:  # Últimos 10 aportes
+        for fecha, valor, tipo_aporte, referencia in datos.ultimos_aportes:
             aportes_data.append([
-                aporte.fecha_aporte.strftime("%Y-%m-%d"),
-                f"${aporte.valor:,.2f}",
-                aporte.tipo_aporte,
-                aporte.referencia or "N/A"
+                fecha.strftime("%Y-%m-%d"),
+                f"${valor:,.2f}",
+                tipo_aporte,
+                referencia or "N/A"
             ])
         
-        if len(aportes) > 10:
+        if datos.numero_aportes > APORTES_DETALLE_CERTIFICADO:
             aportes_data.append(['...', '...', '...', '...'])
         
         aportes_table = Table(aportes_data, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 2*inch])
@@ -1758,9 +2036,9 @@ def generar_certificado_aportes(
         elements.append(aportes_table)
         elements.append(Spacer(1, 0.2*inch))
         
-        if len(aportes) > 10:
+        if datos.numero_aportes > APORTES_DETALLE_CERTIFICADO:
             elements.append(Paragraph(
-                f"(Mostrando los últimos 10 de {len(aportes)} aportes registrados)",
+                f"(Mostrando los últimos {APORTES_DETALLE_CERTIFICADO} de {datos.numero_aportes} aportes registrados)",
                 content_style
             ))
     
@@ -0,0 +1,410 @@
+"""
+Servicio de trabajos de reportes - Generación en segundo plano con cola en base de datos.
+
+Los endpoints registran el trabajo en `trabajos_reporte` y responden de
+inmediato. `ColaReportes` toma los trabajos pendientes y los ejecuta en un pool
+de procesos (ReportLab y openpyxl consumen CPU y no liberan el GIL); el archivo
+queda en disco hasta que vence su TTL.
+"""
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import SessionLecturaLocal, SessionLocal
+from app.models.trabajo_reporte import EstadoTrabajoReporte, TrabajoReporte
+from app.services import certificados, reportes
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre consultas de la cola cuando no hay trabajos pendientes
+INTERVALO_SONDEO_SEGUNDOS = 2.0
+
+# Segundos entre limpiezas de archivos expirados y trabajos abandonados
+INTERVALO_LIMPIEZA_SEGUNDOS = 300
+
+# Tiempo tras el cual un trabajo en proceso se considera abandonado (worker caído)
+TIEMPO_MAXIMO_TRABAJO = timedelta(hours=1)
+
+REQUERIDO = object()
+
+TIPO_PDF = "application/pdf"
+TIPO_EXCEL = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+TIPO_ZIP = "application/zip"
+
+
+def _a_fecha(valor: Any) -> date:
+    if isinstance(valor, date):
+        return valor
+    try:
+        return date.fromisoformat(str(valor))
+    except ValueError:
+        raise ValueError(f"Fecha inválida: {valor}. Use el formato AAAA-MM-DD")
+
+
+def _a_entero(valor: Any) -> int:
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"Número entero inválido: {valor}")
+
+
+class TipoTrabajo(NamedTuple):
+    """
+    Reporte que se puede generar en segundo plano.
+
+    `parametros` asocia cada parámetro con su conversor y su valor por defecto
+    (REQUERIDO, un valor fijo o una función que lo calcula al crear el trabajo).
+    """
+    generar: Callable[..., BinaryIO]
+    parametros: Dict[str, Tuple[Callable[[Any], Any], Any]]
+    tipo_contenido: str
+    extension: str
+
+
+_PARAMETROS_ESTADO_CUENTA = {
+    "numero_documento": (str, REQUERIDO),
+    "fecha_inicio": (_a_fecha, None),
+    "fecha_fin": (_a_fecha, date.today),
+}
+
+TIPOS_TRABAJO: Dict[str, TipoTrabajo] = {
+    "balance_pdf": TipoTrabajo(
+        reportes.exportar_balance_pdf,
+        {"fecha_corte": (_a_fecha, REQUERIDO)},
+        TIPO_PDF, "pdf"
+    ),
+    "estado_resultados_pdf": TipoTrabajo(
+        reportes.exportar_estado_resultados_pdf,
+        {"fecha_inicio": (_a_fecha, REQUERIDO), "fecha_fin": (_a_fecha, REQUERIDO)},
+        TIPO_PDF, "pdf"
+    ),
+    "cartera_excel": TipoTrabajo(
+        reportes.exportar_cartera_excel,
+        {"fecha_corte": (_a_fecha, date.today)},
+        TIPO_EXCEL, "xlsx"
+    ),
+    "mora_excel": TipoTrabajo(
+        reportes.exportar_mora_excel,
+        {"dias_mora_minimo": (_a_entero, 1)},
+        TIPO_EXCEL, "xlsx"
+    ),
+    "estado_cuenta_pdf": TipoTrabajo(
+        reportes.exportar_estado_cuenta_pdf_por_documento,
+        _PARAMETROS_ESTADO_CUENTA,
+        TIPO_PDF, "pdf"
+    ),
+    "estado_cuenta_excel": TipoTrabajo(
+        reportes.exportar_estado_cuenta_excel_por_documento,
+        _PARAMETROS_ESTADO_CUENTA,
+        TIPO_EXCEL, "xlsx"
+    ),
+    "certificado_paz_salvo": TipoTrabajo(
+        reportes.generar_certificado_paz_salvo,
+        {"numero_documento": (str, REQUERIDO)},
+        TIPO_PDF, "pdf"
+    ),
+    "certificado_aportes": TipoTrabajo(
+        reportes.generar_certificado_aportes,
+        {"numero_documento": (str, REQUERIDO), "ano": (_a_entero, None)},
+        TIPO_PDF, "pdf"
+    ),
+    "certificados_masivos": TipoTrabajo(
+        certificados.exportar_certificados_masivos,
+        {"tipo": (certificados.validar_tipo_certificado, REQUERIDO), "ano": (_a_entero, None)},
+        TIPO_ZIP, "zip"
+    ),
+}
+
+
+def _a_json(valor: Any) -> Any:
+    return valor.isoformat() if isinstance(valor, date) else valor
+
+
+class TrabajoReporteService:
+    """Servicio para encolar, ejecutar y limpiar trabajos de reportes."""
+
+    @staticmethod
+    def normalizar_parametros(tipo: str, parametros: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validar los parámetros de un tipo de trabajo y completar los valores por defecto.
+
+        Returns:
+            dict: Parámetros serializables a JSON (fechas en formato ISO)
+
+        Raises:
+            ValueError: Si el tipo no existe, falta un parámetro requerido o
+                hay parámetros desconocidos o inválidos
+        """
+        if tipo not in TIPOS_TRABAJO:
+            raise ValueError(
+                f"Tipo de reporte '{tipo}' no soportado. Use uno de: {', '.join(TIPOS_TRABAJO)}"
+            )
+
+        especificacion = TIPOS_TRABAJO[tipo].parametros
+        desconocidos = set(parametros) - set(especificacion)
+        if desconocidos:
+            raise ValueError(f"Parámetros no soportados para '{tipo}': {', '.join(sorted(desconocidos))}")
+
+        normalizados = {}
+        for nombre, (conversor, por_defecto) in especificacion.items():
+            valor = parametros.get(nombre)
+            if valor is None:
+                if por_defecto is REQUERIDO:
+                    raise ValueError(f"El parámetro '{nombre}' es requerido para '{tipo}'")
+                valor = por_defecto() if callable(por_defecto) else por_defecto
+            else:
+                valor = conversor(valor)
+            normalizados[nombre] = _a_json(valor)
+
+        return normalizados
+
+    @staticmethod
+    def crear_trabajo(
+        db: Session,
+        tipo: str,
+        parametros: Dict[str, Any],
+        usuario_id: int
+    ) -> TrabajoReporte:
+        """Registrar un trabajo pendiente en la cola."""
+        trabajo = TrabajoReporte(
+            tipo=tipo,
+            parametros=TrabajoReporteService.normalizar_parametros(tipo, parametros),
+            estado=EstadoTrabajoReporte.PENDIENTE.value,
+            solicitado_por_id=usuario_id
+        )
+        db.add(trabajo)
+        db.commit()
+        db.refresh(trabajo)
+        return trabajo
+
+    @staticmethod
+    def obtener_trabajo(db: Session, trabajo_id: int) -> Optional[TrabajoReporte]:
+        """Obtener un trabajo por ID."""
+        return db.query(TrabajoReporte).filter(TrabajoReporte.id == trabajo_id).first()
+
+    @staticmethod
+    def esta_expirado(trabajo: TrabajoReporte, ahora: Optional[datetime] = None) -> bool:
+        """True si el archivo del trabajo venció, aunque la limpieza aún no lo haya eliminado."""
+        if trabajo.estado == EstadoTrabajoReporte.EXPIRADO.value:
+            return True
+        return trabajo.expira_at is not None and trabajo.expira_at < (ahora or datetime.utcnow())
+
+    @staticmethod
+    def reclamar_siguiente(db: Session) -> Optional[int]:
+        """
+        Tomar el trabajo pendiente más antiguo y marcarlo en proceso.
+
+        El UPDATE solo aplica si el trabajo sigue pendiente, así que si otro
+        worker lo tomó primero se intenta con el siguiente.
+
+        Returns:
+            int: ID del trabajo reclamado, o None si la cola está vacía
+        """
+        while True:
+            candidato = db.query(TrabajoReporte.id).filter(
+                TrabajoReporte.estado == EstadoTrabajoReporte.PENDIENTE.value
+            ).order_by(TrabajoReporte.id).first()
+
+            if candidato is None:
+                db.commit()
+                return None
+
+            resultado = db.execute(
+                update(TrabajoReporte)
+                .where(
+                    TrabajoReporte.id == candidato.id,
+                    TrabajoReporte.estado == EstadoTrabajoReporte.PENDIENTE.value
+                )
+                .values(estado=EstadoTrabajoReporte.EN_PROCESO.value, iniciado_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+            if resultado.rowcount == 1:
+                return candidato.id
+
+    @staticmethod
+    def ejecutar(
+        db: Session,
+        trabajo_id: int,
+        directorio: Optional[str] = None,
+        db_lectura: Optional[Session] = None
+    ) -> TrabajoReporte:
+        """
+        Generar el archivo de un trabajo y registrar el resultado.
+
+        El reporte se genera con `db_lectura` (la réplica) si se indica; el
+        estado del trabajo siempre se registra con `db`.
+
+        Cualquier error del reporte (ej: asociado no encontrado) deja el
+        trabajo en estado error con su mensaje, sin propagar la excepción.
+        """
+        trabajo = TrabajoReporteService.obtener_trabajo(db, trabajo_id)
+        if trabajo is None:
+            raise ValueError(f"Trabajo {trabajo_id} no encontrado")
+
+        tipo = TIPOS_TRABAJO[trabajo.tipo]
+        directorio = Path(directorio or settings.reportes_dir)
+        ruta = directorio / f"{trabajo.id}_{uuid.uuid4().hex}.{tipo.extension}"
+
+        try:
+            kwargs = {
+                nombre: None if valor is None else tipo.parametros[nombre][0](valor)
+                for nombre, valor in trabajo.parametros.items()
+            }
+            contenido = tipo.generar(db_lectura or db, **kwargs)
+
+            directorio.mkdir(parents=True, exist_ok=True)
+            try:
+                with open(ruta, "wb") as archivo:
+                    shutil.copyfileobj(contenido, archivo)
+            finally:
+                contenido.close()
+        except Exception as e:
+            logger.exception("Error generando el trabajo de reporte %s", trabajo_id)
+            if db_lectura is not None:
+                db_lectura.rollback()
+            db.rollback()
+            if ruta.exists():
+                ruta.unlink()
+            trabajo.estado = EstadoTrabajoReporte.ERROR.value
+            trabajo.mensaje_error = str(e) or e.__class__.__name__
+            trabajo.finalizado_at = datetime.utcnow()
+            db.commit()
+            return trabajo
+
+        ahora = datetime.utcnow()
+        trabajo.estado = EstadoTrabajoReporte.COMPLETADO.value
+        trabajo.ruta_archivo = str(ruta)
+        trabajo.nombre_archivo = f"{trabajo.tipo}_{trabajo.id}_{ahora:%Y%m%d}.{tipo.extension}"
+        trabajo.tipo_contenido = tipo.tipo_contenido
+        trabajo.tamano_bytes = ruta.stat().st_size
+        trabajo.finalizado_at = ahora
+        trabajo.expira_at = ahora + timedelta(hours=settings.reportes_ttl_horas)
+        db.commit()
+        return trabajo
+
+    @staticmethod
+    def liberar_abandonados(db: Session, ahora: Optional[datetime] = None) -> int:
+        """
+        Devolver a la cola los trabajos en proceso por más de TIEMPO_MAXIMO_TRABAJO.
+
+        Cubre los trabajos de un worker que se detuvo antes de terminarlos.
+        """
+        ahora = ahora or datetime.utcnow()
+        resultado = db.execute(
+            update(TrabajoReporte)
+            .where(
+                TrabajoReporte.estado == EstadoTrabajoReporte.EN_PROCESO.value,
+                TrabajoReporte.iniciado_at < ahora - TIEMPO_MAXIMO_TRABAJO
+            )
+            .values(estado=EstadoTrabajoReporte.PENDIENTE.value, iniciado_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return resultado.rowcount
+
+    @staticmethod
+    def limpiar_expirados(db: Session, ahora: Optional[datetime] = None) -> int:
+        """Eliminar del disco los archivos vencidos y marcar sus trabajos como expirados."""
+        ahora = ahora or datetime.utcnow()
+        trabajos = db.query(TrabajoReporte).filter(
+            TrabajoReporte.estado == EstadoTrabajoReporte.COMPLETADO.value,
+            TrabajoReporte.expira_at < ahora
+        ).all()
+
+        for trabajo in trabajos:
+            if trabajo.ruta_archivo and os.path.exists(trabajo.ruta_archivo):
+                os.remove(trabajo.ruta_archivo)
+            trabajo.estado = EstadoTrabajoReporte.EXPIRADO.value
+            trabajo.ruta_archivo = None
+
+        db.commit()
+        return len(trabajos)
+
+
+def procesar_trabajo(trabajo_id: int) -> str:
+    """Ejecutar un trabajo dentro de un proceso del pool con su propia sesión."""
+    db, db_lectura = SessionLocal(), SessionLecturaLocal()
+    try:
+        return TrabajoReporteService.ejecutar(db, trabajo_id, db_lectura=db_lectura).estado
+    finally:
+        db_lectura.close()
+        db.close()
+
+
+class ColaReportes:
+    """
+    Despachador de la cola de reportes.
+
+    Un hilo consulta la tabla `trabajos_reporte`, reclama trabajos mientras
+    haya workers libres y los envía a un ProcessPoolExecutor. Varias
+    instancias de la API pueden compartir la cola: el reclamo es atómico.
+    """
+
+    def __init__(self, workers: int, intervalo: float = INTERVALO_SONDEO_SEGUNDOS):
+        self.workers = workers
+        self.intervalo = intervalo
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self._en_curso: Set[Future] = set()
+
+    def iniciar(self):
+        """Iniciar el pool de procesos y el hilo despachador."""
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._despachar, name="cola-reportes", daemon=True)
+        self._hilo.start()
+        logger.info("Cola de reportes iniciada con %s workers", self.workers)
+
+    def detener(self):
+        """
+        Detener el despachador y el pool.
+
+        Los trabajos reclamados que no alcanzaron a ejecutarse vuelven a la
+        cola cuando `liberar_abandonados` los detecta.
+        """
+        self._detener.set()
+        if self._hilo:
+            self._hilo.join()
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        logger.info("Cola de reportes detenida")
+
+    def _despachar(self):
+        ultima_limpieza = 0.0
+        while not self._detener.is_set():
+            try:
+                if time.monotonic() - ultima_limpieza >= INTERVALO_LIMPIEZA_SEGUNDOS:
+                    with SessionLocal() as db:
+                        TrabajoReporteService.liberar_abandonados(db)
+                        TrabajoReporteService.limpiar_expirados(db)
+                    ultima_limpieza = time.monotonic()
+
+                self._en_curso = {futuro for futuro in self._en_curso if not futuro.done()}
+                while len(self._en_curso) < self.workers and not self._detener.is_set():
+                    with SessionLocal() as db:
+                        trabajo_id = TrabajoReporteService.reclamar_siguiente(db)
+                    if trabajo_id is None:
+                        break
+                    self._en_curso.add(self._pool.submit(procesar_trabajo, trabajo_id))
+            except Exception:
+                logger.exception("Error en el despachador de la cola de reportes")
+
+            self._detener.wait(self.intervalo)
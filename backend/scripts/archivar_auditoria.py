@@ -0,0 +1,65 @@
+"""
+Script para archivar los meses cerrados de auditoría.
+
+Mueve los registros de `registros_auditoria` anteriores a los meses en línea
+a archivos JSON Lines comprimidos (uno por mes), consultables desde el
+listado de auditoría con `incluir_archivados=true`. Pensado para correr al
+inicio de cada mes.
+
+Uso:
+    python scripts/archivar_auditoria.py [--meses-en-linea 3] [--directorio data/auditoria] [--dry-run]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar el directorio backend al path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.usuario import Usuario  # noqa: F401
+from app.services import archivo_auditoria
+
+
+def mostrar_progreso(mes: archivo_auditoria.MesArchivado):
+    """Imprimir el resumen de un mes."""
+    destino = mes.ruta_archivo or "(sin archivo)"
+    print(f"  {mes.periodo}: {mes.registros} registros -> {destino}")
+
+
+def main():
+    """Ejecutar archivo."""
+    parser = argparse.ArgumentParser(description="Archivar los meses cerrados de auditoría")
+    parser.add_argument(
+        "--meses-en-linea", type=int, default=settings.auditoria_meses_en_linea,
+        help="Meses (incluido el actual) que se conservan en la tabla"
+    )
+    parser.add_argument("--directorio", default=settings.auditoria_archivo_dir, help="Directorio de los archivos")
+    parser.add_argument("--dry-run", action="store_true", help="Contar los registros sin archivarlos")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        limite = archivo_auditoria.limite_en_linea(args.meses_en_linea)
+        modo = " (simulación)" if args.dry_run else ""
+        print(f"Archivando auditoría anterior a {limite:%Y-%m-%d}{modo}...")
+        meses = archivo_auditoria.archivar(
+            db,
+            meses_en_linea=args.meses_en_linea,
+            directorio=args.directorio,
+            simular=args.dry_run,
+            progreso=mostrar_progreso
+        )
+        print(f"✓ Meses procesados: {len(meses)}")
+        print(f"✓ Registros archivados: {sum(mes.registros for mes in meses)}")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark de la búsqueda de asociados sobre un conjunto sintético.
+
+Crea una base SQLite temporal con N asociados y compara la búsqueda anterior
+(ILIKE '%término%' en cuatro columnas) con la búsqueda por índice FTS5.
+
+Uso:
+    python scripts/benchmark_busqueda_asociados.py [--cantidad 100000] [--repeticiones 20]
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+# Agregar el directorio backend al path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, insert, or_
+from sqlalchemy.orm import sessionmaker
+
+from app.core.texto import normalizar_texto
+from app.database import Base
+from app.models import Asociado
+from app.models.usuario import Usuario  # noqa: F401
+from app.services import busqueda_asociados
+
+NOMBRES = ["José", "María", "Ana", "Luis", "Andrés", "Sofía", "Camilo", "Valentina", "Julián", "Lucía",
+           "Sebastián", "Natalia", "Óscar", "Ángela", "Martín", "Daniela", "Nicolás", "Paula", "Tomás", "Inés"]
+APELLIDOS = ["García", "Rodríguez", "Martínez", "López", "González", "Pérez", "Sánchez", "Ramírez", "Núñez",
+             "Gómez", "Díaz", "Hernández", "Muñoz", "Rojas", "Vargas", "Castaño", "Ospina", "Zuluaga", "Peña", "Ríos"]
+TERMINOS = ["garcia", "García Núñez", "nunez", "jose mar", "peña rios", "sofia zul", "1002", "valentina.ramirez"]
+
+
+def generar_asociados(cantidad: int, semilla: int = 42):
+    """Filas para insertar directamente en la tabla asociados."""
+    aleatorio = random.Random(semilla)
+    ahora = datetime.utcnow()
+    for i in range(cantidad):
+        nombres = f"{aleatorio.choice(NOMBRES)} {aleatorio.choice(NOMBRES)}"
+        apellidos = f"{aleatorio.choice(APELLIDOS)} {aleatorio.choice(APELLIDOS)}"
+        usuario = normalizar_texto(f"{nombres.split()[0]} {apellidos.split()[0]}").replace(" ", ".")
+        yield {
+            "tipo_documento": "CC",
+            "numero_documento": str(1000000 + i),
+            "nombres": nombres,
+            "apellidos": apellidos,
+            "nombre_busqueda": normalizar_texto(f"{nombres} {apellidos}"),
+            "correo_electronico": f"{usuario}{i}@correo.com",
+            "estado": "activo",
+            "fecha_ingreso": date(2015 + i % 10, 1 + i % 12, 1),
+            "created_at": ahora,
+            "updated_at": ahora,
+        }
+
+
+def buscar_ilike(db, termino: str, limite: int = 20):
+    """Búsqueda anterior a la tabla FTS, como referencia."""
+    patron = f"%{termino}%"
+    return db.query(Asociado).filter(
+        or_(
+            Asociado.nombres.ilike(patron),
+            Asociado.apellidos.ilike(patron),
+            Asociado.numero_documento.ilike(patron),
+            Asociado.correo_electronico.ilike(patron)
+        )
+    ).limit(limite).all()
+
+
+def medir(funcion, db, repeticiones: int) -> dict:
+    """Latencias en milisegundos de buscar cada término `repeticiones` veces."""
+    tiempos = []
+    for _ in range(repeticiones):
+        for termino in TERMINOS:
+            inicio = time.perf_counter()
+            funcion(db, termino)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {
+        "p50": statistics.median(tiempos),
+        "p95": tiempos[int(len(tiempos) * 0.95) - 1],
+        "max": tiempos[-1],
+    }
+
+
+def main():
+    """Ejecutar benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda de asociados")
+    parser.add_argument("--cantidad", type=int, default=100000, help="Asociados a generar")
+    parser.add_argument("--repeticiones", type=int, default=20, help="Repeticiones por término")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        engine = create_engine(f"sqlite:///{directorio}/benchmark.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            print(f"Generando {args.cantidad} asociados...")
+            inicio = time.perf_counter()
+            filas = list(generar_asociados(args.cantidad))
+            for desde in range(0, len(filas), 10000):
+                db.execute(insert(Asociado.__table__), filas[desde:desde + 10000])
+            db.commit()
+            print(f"✓ Carga e indexación: {time.perf_counter() - inicio:.1f}s")
+
+            referencia = medir(buscar_ilike, db, args.repeticiones)
+            fts = medir(busqueda_asociados.buscar, db, args.repeticiones)
+            for nombre, resultado in (("ILIKE", referencia), ("FTS5", fts)):
+                print(f"  {nombre:6} p50 {resultado['p50']:8.2f} ms   p95 {resultado['p95']:8.2f} ms"
+                      f"   max {resultado['max']:8.2f} ms")
+            print(f"✓ Mejora p95: {referencia['p95'] / fts['p95']:.1f}x")
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
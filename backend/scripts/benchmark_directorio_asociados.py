@@ -0,0 +1,96 @@
+"""
+Benchmark del directorio de asociados en memoria.
+
+Carga N asociados sintéticos en una base SQLite temporal, construye el
+directorio y mide su memoria y la latencia de búsquedas por documento,
+prefijo de nombre y con errores de digitación.
+
+Uso:
+    python scripts/benchmark_directorio_asociados.py [--cantidad 100000] [--repeticiones 200]
+"""
+import argparse
+import gc
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Agregar el directorio backend al path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Asociado
+from app.models.usuario import Usuario  # noqa: F401
+from app.services.directorio_asociados import DirectorioAsociados
+from scripts.benchmark_busqueda_asociados import generar_asociados
+
+TERMINOS = {
+    "documento": ["1000042", "10500", "1099999"],
+    "prefijo": ["garc nun", "jose mar", "valentina ram", "peña"],
+    "aproximado": ["gracia nunes", "valentian", "sebastain rojas", "zuloaga"],
+}
+
+
+def main():
+    """Ejecutar benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark del directorio de asociados")
+    parser.add_argument("--cantidad", type=int, default=100000, help="Asociados a generar")
+    parser.add_argument("--repeticiones", type=int, default=200, help="Repeticiones por término")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio_temporal:
+        engine = create_engine(f"sqlite:///{directorio_temporal}/benchmark.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            print(f"Generando {args.cantidad} asociados...")
+            filas = list(generar_asociados(args.cantidad))
+            for desde in range(0, len(filas), 10000):
+                db.execute(insert(Asociado.__table__), filas[desde:desde + 10000])
+            db.commit()
+            del filas
+
+            inicio = time.perf_counter()
+            DirectorioAsociados().cargar(db)
+            duracion = time.perf_counter() - inicio
+
+            # tracemalloc hace más lenta la carga: la memoria se mide en una segunda carga
+            gc.collect()
+            tracemalloc.start()
+            antes = tracemalloc.get_traced_memory()[0]
+            directorio = DirectorioAsociados()
+            directorio.cargar(db)
+            gc.collect()
+            memoria = tracemalloc.get_traced_memory()[0] - antes
+            tracemalloc.stop()
+
+            estadisticas = directorio.estadisticas()
+            print(f"✓ Carga: {duracion:.2f}s, {estadisticas['asociados']} asociados, "
+                  f"{estadisticas['palabras']} palabras")
+            print(f"✓ Memoria: {memoria / 1024 / 1024:.1f} MB medidos "
+                  f"({memoria / estadisticas['asociados']:.0f} bytes/asociado), "
+                  f"{estadisticas['bytes'] / 1024 / 1024:.1f} MB estimados")
+
+            for tipo, terminos in TERMINOS.items():
+                tiempos = []
+                for _ in range(args.repeticiones):
+                    for termino in terminos:
+                        inicio = time.perf_counter()
+                        directorio.buscar(termino)
+                        tiempos.append((time.perf_counter() - inicio) * 1_000_000)
+                tiempos.sort()
+                print(f"  {tipo:10} p50 {statistics.median(tiempos):9.1f} µs   "
+                      f"p95 {tiempos[int(len(tiempos) * 0.95) - 1]:9.1f} µs")
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
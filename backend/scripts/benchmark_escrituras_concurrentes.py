@@ -0,0 +1,148 @@
+"""
+Prueba de carga de escrituras concurrentes contra SQLite.
+
+Varios cajeros registran consignaciones (`AhorroService.realizar_consignacion`)
+al mismo tiempo que otros hilos consultan cuentas, primero con el motor por
+defecto de SQLAlchemy (diario de rollback, `synchronous` FULL) y luego con
+`crear_motor` (WAL, NORMAL, busy_timeout, pool dimensionado). Cada motor usa
+su propia base, generada con el conjunto sintético de la suite de
+benchmarks, y se reportan transacciones por segundo, latencias y errores
+"database is locked".
+
+Uso:
+    python scripts/benchmark_escrituras_concurrentes.py [--cajeros 8] [--lectores 4] [--segundos 10]
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+# Agregar el directorio backend al path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.database import Base, crear_motor
+from app.models.usuario import Usuario
+from app.schemas.ahorro import ConsignacionCrear
+from app.services.ahorros import AhorroService
+from scripts.benchmarks import datos
+
+ESCALA = datos.Escala(asociados=500, creditos=0, movimientos_ahorro=2000, movimientos_contables=0)
+
+
+def preparar(engine) -> int:
+    """Crear las tablas y los datos; devuelve la cantidad de cuentas."""
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        insertadas = datos.generar(db, ESCALA)
+        AhorroService.obtener_configuracion(db)
+    return insertadas["cuentas_ahorro"]
+
+
+def cargar(engine, cajeros: int, lectores: int, segundos: float, cuentas: int) -> dict:
+    """Ejecutar la carga durante `segundos` y resumir los resultados."""
+    fabrica_sesiones = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with fabrica_sesiones() as db:
+        usuario_id = db.query(Usuario.id).filter(Usuario.username == datos.USUARIO_BENCHMARK).scalar()
+
+    latencias, lecturas, errores = [], [0], [0]
+    lock = threading.Lock()
+    fin = time.perf_counter() + segundos
+
+    def cajero(semilla: int):
+        aleatorio = random.Random(semilla)
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            with fabrica_sesiones() as db:
+                try:
+                    AhorroService.realizar_consignacion(
+                        db,
+                        ConsignacionCrear(cuenta_id=aleatorio.randint(1, cuentas), valor=Decimal("50000")),
+                        usuario_id
+                    )
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        errores[0] += 1
+                    continue
+            with lock:
+                latencias.append((time.perf_counter() - inicio) * 1000)
+
+    def lector(semilla: int):
+        aleatorio = random.Random(semilla)
+        while time.perf_counter() < fin:
+            with fabrica_sesiones() as db:
+                try:
+                    AhorroService.obtener_movimientos(db, aleatorio.randint(1, cuentas))
+                except OperationalError:
+                    with lock:
+                        errores[0] += 1
+                    continue
+            with lock:
+                lecturas[0] += 1
+
+    hilos = [threading.Thread(target=cajero, args=(i,)) for i in range(cajeros)]
+    hilos += [threading.Thread(target=lector, args=(1000 + i,)) for i in range(lectores)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "escrituras_por_segundo": len(latencias) / transcurrido,
+        "lecturas_por_segundo": lecturas[0] / transcurrido,
+        "p50": statistics.median(latencias) if latencias else 0.0,
+        "p95": latencias[int(len(latencias) * 0.95)] if latencias else 0.0,
+        "errores": errores[0],
+    }
+
+
+def main():
+    """Ejecutar la prueba de carga."""
+    parser = argparse.ArgumentParser(description="Escrituras concurrentes con y sin ajustes de SQLite")
+    parser.add_argument("--cajeros", type=int, default=8, help="Hilos que registran consignaciones")
+    parser.add_argument("--lectores", type=int, default=4, help="Hilos que consultan movimientos")
+    parser.add_argument("--segundos", type=float, default=10, help="Duración de cada carga")
+    args = parser.parse_args()
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        motores = (
+            ("Por defecto", lambda url: create_engine(url, connect_args={"check_same_thread": False})),
+            ("Ajustado", crear_motor),
+        )
+        for nombre, fabrica in motores:
+            engine = fabrica(f"sqlite:///{directorio}/{nombre.replace(' ', '_').lower()}.db")
+            try:
+                print(f"Preparando la base ({nombre})...")
+                cuentas = preparar(engine)
+                resultados[nombre] = cargar(engine, args.cajeros, args.lectores, args.segundos, cuentas)
+            finally:
+                engine.dispose()
+
+    for nombre, resultado in resultados.items():
+        print(
+            f"  {nombre:12} {resultado['escrituras_por_segundo']:8.1f} escrituras/s"
+            f"   {resultado['lecturas_por_segundo']:8.1f} lecturas/s"
+            f"   p50 {resultado['p50']:7.2f} ms   p95 {resultado['p95']:8.2f} ms"
+            f"   {resultado['errores']} errores"
+        )
+    antes, despues = resultados["Por defecto"], resultados["Ajustado"]
+    print(f"✓ Escrituras: {despues['escrituras_por_segundo'] / max(antes['escrituras_por_segundo'], 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark del listado de asociados con y sin carga de los datos JSON.
+
+Crea una base SQLite temporal con N asociados con todos sus datos JSON y
+mide `listar_asociados` (consulta + serialización de la respuesta) cargando
+las columnas JSON, como antes de diferirlas, con la carga diferida actual y
+con la proyección `campos=resumen`.
+
+Uso:
+    python scripts/benchmark_listado_asociados.py [--cantidad 50000] [--por-pagina 100] [--repeticiones 50]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+# Agregar el directorio backend al path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker, undefer_group
+
+from app.core.proyeccion import filas_a_diccionarios
+from app.database import Base
+from app.models import Asociado
+from app.models.asociado import GRUPO_DATOS_JSON, campos_promovidos
+from app.models.usuario import Usuario  # noqa: F401
+from app.schemas import AsociadosListResponse, InfoPaginacion
+from app.services import asociados as service
+from scripts.benchmark_busqueda_asociados import generar_asociados
+
+CIUDADES = ["Honda", "Mariquita", "Ibagué", "Guaduas", "La Dorada"]
+
+
+def agregar_datos_json(fila: dict, indice: int) -> dict:
+    """Completar una fila sintética con datos JSON de tamaño realista."""
+    fila["datos_personales"] = {
+        "fecha_nacimiento": f"{1960 + indice % 40}-0{1 + indice % 9}-15",
+        "direccion": f"Calle {indice % 100} #{indice % 50}-{indice % 90}",
+        "ciudad": CIUDADES[indice % len(CIUDADES)],
+        "departamento": "Tolima",
+        "pais": "Colombia",
+        "estado_civil": "casado",
+        "genero": "F" if indice % 2 else "M",
+        "eps": "Nueva EPS",
+        "telefono_alternativo": f"31{indice:08d}",
+        "numero_hijos": indice % 4,
+    }
+    fila["datos_laborales"] = {
+        "institucion_educativa": f"Institución Educativa {indice % 30}",
+        "cargo": "Docente",
+        "tipo_contrato": "Indefinido",
+        "fecha_vinculacion": "2010-02-01",
+        "salario_basico": 2500000 + (indice % 20) * 150000,
+    }
+    fila["informacion_familiar"] = {
+        "familiares": [
+            {"nombre": f"Familiar {i}", "parentesco": "hijo", "fecha_nacimiento": "2010-01-01", "convive": True}
+            for i in range(indice % 4)
+        ],
+        "contactos_emergencia": [{"nombre": "Contacto", "parentesco": "esposo", "telefono": "3100000000"}],
+    }
+    fila["informacion_financiera"] = {
+        "ingresos_mensuales": 3500000, "egresos_mensuales": 2000000,
+        "obligaciones": [{"entidad": "Banco", "tipo": "consumo", "saldo": 5000000, "cuota_mensual": 350000}],
+    }
+    fila["informacion_academica"] = {"nivel_educativo": "Especialización", "titulo_obtenido": "Licenciado"}
+    fila["informacion_vivienda"] = {"tipo_vivienda": "casa", "tenencia": "propia", "estrato": 3}
+    fila.update(campos_promovidos(fila["datos_personales"], fila["datos_laborales"]))
+    return fila
+
+
+def medir(db, por_pagina: int, repeticiones: int, total: int, campos: List[str] = None) -> dict:
+    """Latencias en milisegundos de pedir páginas al azar del listado."""
+    aleatorio = random.Random(7)
+    tiempos = []
+    for _ in range(repeticiones):
+        skip = aleatorio.randrange(0, max(total - por_pagina, 1))
+        db.expunge_all()
+        inicio = time.perf_counter()
+        asociados, total_filtrado = service.listar_asociados(db, skip=skip, limit=por_pagina, campos=campos)
+        # Misma serialización que el endpoint
+        paginacion = InfoPaginacion(
+            total=total_filtrado, por_pagina=por_pagina, tiene_siguiente=True, tiene_anterior=skip > 0
+        )
+        if campos:
+            cuerpo = json.dumps({"datos": filas_a_diccionarios(asociados, campos), "paginacion": paginacion.dict()})
+        else:
+            cuerpo = AsociadosListResponse(datos=asociados, paginacion=paginacion).json()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {
+        "p50": statistics.median(tiempos),
+        "p95": tiempos[int(len(tiempos) * 0.95) - 1],
+        "bytes": len(cuerpo),
+    }
+
+
+def main():
+    """Ejecutar benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark del listado de asociados")
+    parser.add_argument("--cantidad", type=int, default=50000, help="Asociados a generar")
+    parser.add_argument("--por-pagina", type=int, default=100, help="Asociados por página")
+    parser.add_argument("--repeticiones", type=int, default=50, help="Páginas a pedir")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        engine = create_engine(f"sqlite:///{directorio}/benchmark.db")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            print(f"Generando {args.cantidad} asociados con datos JSON...")
+            filas = [agregar_datos_json(fila, i) for i, fila in enumerate(generar_asociados(args.cantidad))]
+            for desde in range(0, len(filas), 5000):
+                db.execute(insert(Asociado.__table__), filas[desde:desde + 5000])
+            db.commit()
+            del filas
+
+            consulta_original = service._consulta_asociados
+            service._consulta_asociados = lambda *a, **k: consulta_original(*a, **k).options(
+                undefer_group(GRUPO_DATOS_JSON)
+            )
+            try:
+                antes = medir(db, args.por_pagina, args.repeticiones, args.cantidad)
+            finally:
+                service._consulta_asociados = consulta_original
+            despues = medir(db, args.por_pagina, args.repeticiones, args.cantidad)
+            resumen = medir(db, args.por_pagina, args.repeticiones, args.cantidad, campos=list(service.CAMPOS_RESUMEN))
+
+            for nombre, resultado in (("Con JSON", antes), ("Diferido", despues), ("Resumen", resumen)):
+                print(
+                    f"  {nombre:9} p50 {resultado['p50']:8.2f} ms   p95 {resultado['p95']:8.2f} ms"
+                    f"   {resultado['bytes'] / 1024:6.1f} KB/página"
+                )
+            print(f"✓ Mejora p50: {antes['p50'] / despues['p50']:.1f}x (diferido), "
+                  f"{antes['p50'] / resumen['p50']:.1f}x (resumen)")
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+Suite de benchmarks de las rutas críticas sobre un conjunto de datos sintético.
+
+    python -m scripts.benchmarks medir --escala completa
+    python -m scripts.benchmarks comparar base.json nuevo.json --umbral 0.10
+
+`medir` genera la base de la escala pedida si no existe (ver `datos`), mide
+cada escenario (ver `escenarios`) y escribe los resultados en JSON;
+`comparar` señala las regresiones entre dos corridas y termina con código 1
+si hay alguna.
+"""
@@ -0,0 +1,122 @@
+"""
+Línea de comandos de la suite de benchmarks.
+
+Uso:
+    python -m scripts.benchmarks medir [--escala pequena|mediana|completa] [--semilla 42] [--url URL]
+                                       [--escenarios a,b] [--repeticiones N] [--salida resultados.json]
+    python -m scripts.benchmarks comparar BASE.json NUEVO.json [--umbral 0.10] [--minimo-ms 1.0]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Agregar el directorio backend al path
+backend_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.database import Base
+from app.models import Asociado
+from scripts.benchmarks import datos, resultados
+from scripts.benchmarks.escenarios import ESCENARIOS, medir
+
+DIRECTORIO = backend_dir / "data" / "benchmark"
+
+
+def _medir(args) -> int:
+    escala = datos.ESCALAS[args.escala]
+    elegidos = set(args.escenarios.split(",")) if args.escenarios else None
+    desconocidos = (elegidos or set()) - {escenario.nombre for escenario in ESCENARIOS}
+    if desconocidos:
+        print(f"Error: escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+        return 2
+
+    url = args.url or f"sqlite:///{DIRECTORIO / f'coop_{args.escala}_{args.semilla}.db'}"
+    if url.startswith("sqlite:///"):
+        Path(url[len("sqlite:///"):]).parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    fabrica_sesiones = sessionmaker(bind=engine)
+
+    try:
+        with fabrica_sesiones() as db:
+            if not db.query(func.count(Asociado.id)).scalar():
+                print(f"Generando el conjunto de datos '{args.escala}' ({escala})...")
+                inicio = time.perf_counter()
+                insertadas = datos.generar(db, escala, args.semilla, progreso=lambda m: print(f"  {m}"))
+                print(f"✓ {sum(insertadas.values())} filas en {time.perf_counter() - inicio:.0f}s: {insertadas}")
+
+        medidos = {}
+        for escenario in ESCENARIOS:
+            if elegidos and escenario.nombre not in elegidos:
+                continue
+            resultado = medir(fabrica_sesiones, escenario, args.semilla, args.repeticiones)
+            medidos[escenario.nombre] = resultado
+            print(f"  {escenario.nombre:26} p50 {resultado['p50_ms']:10.2f} ms   p95 {resultado['p95_ms']:10.2f} ms")
+    finally:
+        engine.dispose()
+
+    corrida = resultados.armar_resultados(args.escala, args.semilla, engine.dialect.name, medidos)
+    salida = Path(args.salida) if args.salida else (
+        DIRECTORIO / f"resultados_{args.escala}_{corrida['commit'] or corrida['fecha']}.json"
+    )
+    resultados.guardar(corrida, salida)
+    print(f"✓ Resultados en {salida}")
+    return 0
+
+
+def _comparar(args) -> int:
+    try:
+        comparaciones = resultados.comparar(
+            resultados.cargar(args.base), resultados.cargar(args.nuevo), args.umbral, args.minimo_ms
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 2
+
+    for c in comparaciones:
+        if c.cambio is None:
+            print(f"  {c.escenario:26} solo en una de las corridas")
+            continue
+        marca = "REGRESIÓN" if c.regresion else ""
+        print(f"  {c.escenario:26} {c.base_ms:10.2f} → {c.nuevo_ms:10.2f} ms  {c.cambio:+7.1%}  {marca}")
+
+    regresiones = [c.escenario for c in comparaciones if c.regresion]
+    if regresiones:
+        print(f"✗ {len(regresiones)} regresiones sobre el umbral de {args.umbral:.0%}: {', '.join(regresiones)}")
+        return 1
+    print("✓ Sin regresiones")
+    return 0
+
+
+def main() -> int:
+    """Ejecutar el comando pedido."""
+    parser = argparse.ArgumentParser(description="Benchmarks de las rutas críticas")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    medir_parser = comandos.add_parser("medir", help="Generar la base si hace falta y medir los escenarios")
+    medir_parser.add_argument("--escala", choices=sorted(datos.ESCALAS), default="pequena")
+    medir_parser.add_argument("--semilla", type=int, default=42)
+    medir_parser.add_argument("--url", help="Base a usar (por defecto una SQLite por escala y semilla)")
+    medir_parser.add_argument("--escenarios", help="Nombres separados por coma (por defecto todos)")
+    medir_parser.add_argument("--repeticiones", type=int, help="Repeticiones por escenario")
+    medir_parser.add_argument("--salida", help="Archivo JSON de resultados")
+    medir_parser.set_defaults(funcion=_medir)
+
+    comparar_parser = comandos.add_parser("comparar", help="Comparar dos archivos de resultados")
+    comparar_parser.add_argument("base")
+    comparar_parser.add_argument("nuevo")
+    comparar_parser.add_argument("--umbral", type=float, default=0.10, help="Empeoramiento relativo tolerado")
+    comparar_parser.add_argument("--minimo-ms", type=float, default=1.0, help="Empeoramiento absoluto tolerado")
+    comparar_parser.set_defaults(funcion=_comparar)
+
+    args = parser.parse_args()
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
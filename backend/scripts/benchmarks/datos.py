@@ -0,0 +1,371 @@
+"""
+Conjunto de datos sintético y determinista de la cooperativa.
+
+Con la misma escala y semilla se generan exactamente los mismos registros,
+con fechas fijas respecto a `FECHA_CORTE`: los resultados de dos corridas
+se pueden comparar entre commits. Todo se inserta con INSERT en bloque de
+`TAMANO_LOTE` filas y con ids explícitos, sin pasar por el ORM.
+
+Incluye asociados con sus datos JSON, créditos con la tabla de amortización
+completa (las cuotas vencidas pagadas, salvo en los créditos morosos),
+cuentas de ahorro con sus movimientos y asientos contables de dos
+movimientos. Al final se calcula la mora a la fecha de corte y se
+reconstruyen los saldos y estadísticas mensuales, como tras una carga
+masiva real. No genera pagos, aportes ni documentos.
+"""
+import random
+from datetime import date, datetime, time as hora, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.orm import Session
+
+from app.models import Asociado
+from app.models.ahorro import CuentaAhorro, MovimientoAhorro, TipoAhorro, TipoMovimientoAhorro
+from app.models.contabilidad import AsientoContable, CuentaContable, MovimientoContable, TipoMovimiento
+from app.models.credito import Credito, Cuota, EstadoCredito, EstadoCuota, TipoCredito
+from app.models.usuario import RolUsuario, Usuario
+from app.services.contabilidad import ContabilidadService
+from app.services.creditos import CreditoService
+from app.services.dashboard import DashboardService
+from scripts.benchmark_busqueda_asociados import generar_asociados
+from scripts.benchmark_listado_asociados import agregar_datos_json
+from scripts.init_plan_cuentas import init_plan_cuentas
+
+FECHA_CORTE = date(2024, 6, 30)
+INICIO_HISTORIA = date(2022, 7, 1)
+TAMANO_LOTE = 10000
+USUARIO_BENCHMARK = "benchmark"
+
+# Proporción de créditos solicitados sin desembolsar y de créditos con cuotas vencidas sin pagar
+PROPORCION_SOLICITADOS = 0.03
+PROPORCION_MOROSOS = 0.08
+
+
+class Escala(NamedTuple):
+    """Cantidad de registros de cada tabla principal."""
+    asociados: int
+    creditos: int
+    movimientos_ahorro: int
+    movimientos_contables: int
+
+
+ESCALAS = {
+    "pequena": Escala(1_000, 3_000, 10_000, 20_000),
+    "mediana": Escala(10_000, 30_000, 100_000, 200_000),
+    "completa": Escala(100_000, 300_000, 1_000_000, 2_000_000),
+}
+
+# Asientos sintéticos: tipo, cuenta débito, cuenta crédito, concepto y rango del valor
+PLANTILLAS_ASIENTO = [
+    (TipoMovimiento.APORTE, "1105", "3105", "Aporte ordinario", (50_000, 500_000)),
+    (TipoMovimiento.PRESTAMO, "1305", "1110", "Desembolso de crédito", (1_000_000, 30_000_000)),
+    (TipoMovimiento.PAGO_PRESTAMO, "1110", "1305", "Abono a crédito", (100_000, 2_000_000)),
+    (TipoMovimiento.INTERES, "1110", "4135", "Intereses de crédito", (10_000, 400_000)),
+    (TipoMovimiento.OTRO, "5105", "1110", "Nómina", (1_500_000, 6_000_000)),
+    (TipoMovimiento.OTRO, "5120", "1105", "Servicios públicos", (80_000, 900_000)),
+]
+
+
+class _Cargador:
+    """
+    Acumula filas por tabla y las inserta en bloque.
+
+    Al llenarse cualquier tabla se vacían todas en el orden dado, de modo que
+    las llaves foráneas siempre apuntan a filas ya insertadas.
+    """
+
+    def __init__(self, db: Session, tablas: List):
+        self.db = db
+        self._pendientes = {tabla: [] for tabla in tablas}
+        self.insertadas: Dict[str, int] = {tabla.name: 0 for tabla in tablas}
+
+    def agregar(self, tabla, fila: dict):
+        pendientes = self._pendientes[tabla]
+        pendientes.append(fila)
+        if len(pendientes) >= TAMANO_LOTE:
+            self.vaciar()
+
+    def vaciar(self):
+        for tabla, filas in self._pendientes.items():
+            if filas:
+                self.db.execute(insert(tabla), filas)
+                self.insertadas[tabla.name] += len(filas)
+                filas.clear()
+        self.db.commit()
+
+
+def _fecha_entre(aleatorio: random.Random, desde: date, hasta: date) -> date:
+    return desde + timedelta(days=aleatorio.randrange(max((hasta - desde).days, 1)))
+
+
+def _momento(fecha: date, aleatorio: random.Random) -> datetime:
+    return datetime.combine(fecha, hora(8 + aleatorio.randrange(10), aleatorio.randrange(60)))
+
+
+def _repartir(total: int, partes: int) -> Iterable[int]:
+    """`total` repartido en `partes` cantidades que difieren a lo sumo en uno."""
+    base, resto = divmod(total, max(partes, 1))
+    for indice in range(partes):
+        yield base + (indice < resto)
+
+
+def _usuario(db: Session) -> int:
+    db.execute(insert(Usuario.__table__), [{
+        "username": USUARIO_BENCHMARK,
+        "email": "benchmark@coopeenortol.local",
+        "nombre_completo": "Usuario de benchmark",
+        "hashed_password": "!",
+        "rol": RolUsuario.ADMIN.value,
+        "is_superuser": True,
+    }])
+    return db.query(Usuario.id).filter(Usuario.username == USUARIO_BENCHMARK).scalar()
+
+
+def _asociados(cargador: _Cargador, escala: Escala, semilla: int):
+    tabla = Asociado.__table__
+    for indice, fila in enumerate(generar_asociados(escala.asociados, semilla)):
+        fila["id"] = indice + 1
+        fila["fecha_ingreso"] = min(fila["fecha_ingreso"], FECHA_CORTE)
+        fila["created_at"] = fila["updated_at"] = datetime.combine(fila["fecha_ingreso"], hora(9))
+        cargador.agregar(tabla, agregar_datos_json(fila, indice))
+
+
+def _creditos(cargador: _Cargador, escala: Escala, aleatorio: random.Random, usuario_id: int):
+    creditos, cuotas = Credito.__table__, Cuota.__table__
+    tipos = list(TipoCredito)
+    for indice in range(escala.creditos):
+        credito_id = indice + 1
+        monto = Decimal(aleatorio.randrange(10, 500) * 100_000)
+        tasa = Decimal(aleatorio.choice(["12.00", "14.50", "16.80", "19.20", "22.00"]))
+        plazo = aleatorio.choice([12, 24, 36, 48, 60])
+        fecha_solicitud = _fecha_entre(aleatorio, INICIO_HISTORIA - timedelta(days=365 * 3), FECHA_CORTE)
+        fila = {
+            "id": credito_id,
+            "numero_credito": f"CR-B{credito_id:07d}",
+            "asociado_id": indice % escala.asociados + 1,
+            "tipo_credito": tipos[indice % len(tipos)],
+            "monto_solicitado": monto,
+            "tasa_interes": tasa,
+            "plazo_meses": plazo,
+            "destino": "Crédito sintético de benchmark",
+            "fecha_solicitud": fecha_solicitud,
+            "estado": EstadoCredito.SOLICITADO,
+            "solicitado_por_id": usuario_id,
+            "created_at": datetime.combine(fecha_solicitud, hora(9)),
+            "updated_at": datetime.combine(fecha_solicitud, hora(9)),
+            # Todas las filas de un INSERT en bloque llevan las mismas columnas
+            **dict.fromkeys((
+                "monto_aprobado", "monto_desembolsado", "fecha_aprobacion", "fecha_desembolso",
+                "fecha_primer_pago", "fecha_ultimo_pago", "valor_cuota", "total_intereses",
+                "total_a_pagar", "aprobado_por_id", "desembolsado_por_id"
+            )),
+            "saldo_capital": Decimal("0"),
+        }
+        if fecha_solicitud > FECHA_CORTE - timedelta(days=30) or aleatorio.random() < PROPORCION_SOLICITADOS:
+            cargador.agregar(creditos, fila)
+            continue
+
+        fecha_desembolso = fecha_solicitud + timedelta(days=aleatorio.randrange(3, 15))
+        primer_pago = date(
+            fecha_desembolso.year + fecha_desembolso.month // 12, fecha_desembolso.month % 12 + 1,
+            min(fecha_desembolso.day, 28)
+        )
+        tabla = CreditoService.generar_tabla_amortizacion(monto, tasa, plazo, primer_pago)
+        # Las cuotas se pagan por fecha de vencimiento y no por número
+        vencidas = sorted(
+            (cuota for cuota in tabla if cuota["fecha_vencimiento"] < FECHA_CORTE),
+            key=lambda cuota: cuota["fecha_vencimiento"]
+        )
+        # Los morosos dejan de pagar de una a tres de sus últimas cuotas vencidas
+        if vencidas and aleatorio.random() < PROPORCION_MOROSOS:
+            vencidas = vencidas[:-aleatorio.randint(1, 3)]
+        numeros_pagados = {cuota["numero_cuota"] for cuota in vencidas}
+
+        for cuota in tabla:
+            pagada = cuota["numero_cuota"] in numeros_pagados
+            cuota.update(
+                credito_id=credito_id,
+                estado=EstadoCuota.PAGADA if pagada else EstadoCuota.PENDIENTE,
+                valor_pagado=cuota["valor_cuota"] if pagada else Decimal("0"),
+                fecha_pago=cuota["fecha_vencimiento"] if pagada else None,
+            )
+
+        pagadas = len(numeros_pagados)
+        saldo = max(monto - sum(cuota["capital"] for cuota in vencidas), Decimal("0"))
+        intereses = sum(cuota["interes"] for cuota in tabla)
+        fila.update(
+            monto_aprobado=monto,
+            monto_desembolsado=monto,
+            fecha_aprobacion=fecha_solicitud + timedelta(days=2),
+            fecha_desembolso=fecha_desembolso,
+            fecha_primer_pago=primer_pago,
+            fecha_ultimo_pago=vencidas[-1]["fecha_vencimiento"] if vencidas else None,
+            estado=EstadoCredito.CANCELADO if pagadas == len(tabla) else EstadoCredito.AL_DIA,
+            valor_cuota=tabla[0]["valor_cuota"],
+            total_intereses=intereses,
+            total_a_pagar=monto + intereses,
+            saldo_capital=Decimal("0") if pagadas == len(tabla) else saldo,
+            aprobado_por_id=usuario_id,
+            desembolsado_por_id=usuario_id,
+        )
+        cargador.agregar(creditos, fila)
+        for cuota in tabla:
+            cargador.agregar(cuotas, cuota)
+
+
+def _ahorros(cargador: _Cargador, escala: Escala, aleatorio: random.Random, usuario_id: int):
+    cuentas, movimientos = CuentaAhorro.__table__, MovimientoAhorro.__table__
+    # Una cuenta a la vista por asociado y una programada por cada cuatro
+    titulares = list(range(1, escala.asociados + 1)) + list(range(1, escala.asociados + 1, 4))
+    numero_movimiento = 0
+    por_cuenta = _repartir(escala.movimientos_ahorro, len(titulares))
+    for indice, (asociado_id, cantidad) in enumerate(zip(titulares, por_cuenta)):
+        cuenta_id = indice + 1
+        programada = indice >= escala.asociados
+        apertura = _fecha_entre(aleatorio, INICIO_HISTORIA, FECHA_CORTE - timedelta(days=60))
+        fechas = sorted(_fecha_entre(aleatorio, apertura, FECHA_CORTE) for _ in range(max(cantidad - 1, 0)))
+
+        saldo = Decimal(aleatorio.randrange(5, 50) * 10_000)
+        historia = [(TipoMovimientoAhorro.APERTURA, saldo, Decimal("0"), apertura)] if cantidad else []
+        for fecha in fechas:
+            valor = Decimal(aleatorio.randrange(1, 40) * 10_000)
+            if aleatorio.random() < 0.3 and valor <= saldo:
+                historia.append((TipoMovimientoAhorro.RETIRO, valor, saldo, fecha))
+                saldo -= valor
+            else:
+                historia.append((TipoMovimientoAhorro.CONSIGNACION, valor, saldo, fecha))
+                saldo += valor
+
+        momento_apertura = _momento(apertura, aleatorio)
+        cargador.agregar(cuentas, {
+            "id": cuenta_id,
+            "numero_cuenta": f"AH-B{cuenta_id:08d}",
+            "asociado_id": asociado_id,
+            "tipo_ahorro": (TipoAhorro.PROGRAMADO if programada else TipoAhorro.A_LA_VISTA).value,
+            "saldo_disponible": saldo if historia else Decimal("0"),
+            "tasa_interes_anual": Decimal("2.00") if programada else Decimal("0.50"),
+            "abierta_por_id": usuario_id,
+            "fecha_apertura": momento_apertura,
+            "fecha_ultimo_interes": datetime.combine(FECHA_CORTE.replace(day=1), hora(0)),
+            "created_at": momento_apertura,
+            "updated_at": momento_apertura,
+        })
+        for tipo, valor, saldo_anterior, fecha in historia:
+            numero_movimiento += 1
+            saldo_nuevo = saldo_anterior - valor if tipo == TipoMovimientoAhorro.RETIRO else saldo_anterior + valor
+            momento = _momento(fecha, aleatorio)
+            cargador.agregar(movimientos, {
+                "numero_movimiento": f"MA-B{numero_movimiento:09d}",
+                "cuenta_id": cuenta_id,
+                "tipo_movimiento": tipo.value,
+                "valor": valor,
+                "saldo_anterior": saldo_anterior,
+                "saldo_nuevo": saldo_nuevo,
+                "descripcion": tipo.value.capitalize(),
+                "realizado_por_id": usuario_id,
+                "fecha_movimiento": momento,
+                "created_at": momento,
+            })
+
+
+def _contabilidad(cargador: _Cargador, escala: Escala, aleatorio: random.Random, usuario_id: int):
+    asientos, movimientos = AsientoContable.__table__, MovimientoContable.__table__
+    cuentas = dict(cargador.db.query(CuentaContable.codigo, CuentaContable.id))
+    for indice in range(escala.movimientos_contables // 2):
+        asiento_id = indice + 1
+        tipo, debito, credito, concepto, (minimo, maximo) = aleatorio.choice(PLANTILLAS_ASIENTO)
+        fecha = _fecha_entre(aleatorio, INICIO_HISTORIA, FECHA_CORTE + timedelta(days=1))
+        valor = Decimal(aleatorio.randrange(minimo // 1000, maximo // 1000) * 1000)
+        tercero = aleatorio.randrange(escala.asociados) + 1
+        anulado = aleatorio.random() < 0.005
+        momento = _momento(fecha, aleatorio)
+        cargador.agregar(asientos, {
+            "id": asiento_id,
+            "numero": f"AS-{fecha:%Y%m}-{asiento_id:08d}",
+            "fecha": fecha,
+            "tipo_movimiento": tipo,
+            "concepto": concepto,
+            "total_debito": valor,
+            "total_credito": valor,
+            "cuadrado": True,
+            "registrado_por_id": usuario_id,
+            "fecha_registro": momento,
+            "anulado": anulado,
+            "fecha_anulacion": momento if anulado else None,
+            "anulado_por_id": usuario_id if anulado else None,
+            "motivo_anulacion": "Error de digitación" if anulado else None,
+        })
+        for codigo, valor_debito, valor_credito in ((debito, valor, 0), (credito, 0, valor)):
+            cargador.agregar(movimientos, {
+                "asiento_id": asiento_id,
+                "cuenta_id": cuentas[codigo],
+                "debito": Decimal(valor_debito),
+                "credito": Decimal(valor_credito),
+                "detalle": concepto,
+                "tercero_tipo": "asociado",
+                "tercero_id": tercero,
+                "created_at": momento,
+            })
+
+
+def _ajustar_secuencias(db: Session, tablas: List):
+    """En PostgreSQL las secuencias no avanzan con ids explícitos."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for tabla in tablas:
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabla.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {tabla.name}), 1))"
+        ))
+    db.commit()
+
+
+def generar(
+    db: Session,
+    escala: Escala,
+    semilla: int = 42,
+    progreso: Optional[Callable[[str], None]] = None
+) -> Dict[str, int]:
+    """
+    Cargar el conjunto de datos en una base vacía (con las tablas ya creadas).
+
+    Returns:
+        Filas insertadas por tabla
+
+    Raises:
+        ValueError: Si la base ya tiene asociados
+    """
+    if db.query(func.count(Asociado.id)).scalar():
+        raise ValueError("La base ya tiene asociados; el benchmark necesita una base vacía")
+    avisar = progreso or (lambda mensaje: None)
+    aleatorio = random.Random(semilla)
+
+    usuario_id = _usuario(db)
+    init_plan_cuentas(db)
+
+    tablas = [
+        Asociado.__table__, Credito.__table__, Cuota.__table__, CuentaAhorro.__table__,
+        MovimientoAhorro.__table__, AsientoContable.__table__, MovimientoContable.__table__,
+    ]
+    cargador = _Cargador(db, tablas)
+    for nombre, cargar in (
+        ("asociados", lambda: _asociados(cargador, escala, semilla)),
+        ("créditos y cuotas", lambda: _creditos(cargador, escala, aleatorio, usuario_id)),
+        ("cuentas y movimientos de ahorro", lambda: _ahorros(cargador, escala, aleatorio, usuario_id)),
+        ("asientos contables", lambda: _contabilidad(cargador, escala, aleatorio, usuario_id)),
+    ):
+        avisar(f"Generando {nombre}...")
+        cargar()
+        cargador.vaciar()
+    _ajustar_secuencias(db, [Asociado.__table__, Credito.__table__, CuentaAhorro.__table__,
+                             AsientoContable.__table__])
+
+    avisar("Calculando mora y reconstruyendo saldos y estadísticas mensuales...")
+    CreditoService.calcular_mora(db, FECHA_CORTE)
+    ContabilidadService.reconstruir_saldos_mensuales(db)
+    DashboardService.reconstruir_estadisticas_mensuales(db)
+    db.execute(text("ANALYZE"))
+    db.commit()
+    return cargador.insertadas
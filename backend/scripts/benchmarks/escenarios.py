@@ -0,0 +1,140 @@
+"""
+Rutas críticas medidas por el benchmark.
+
+Cada escenario llama al servicio que atiende el endpoint, con los mismos
+parámetros en todas las corridas. Los escenarios que modifican datos son
+idempotentes (`calcular_mora` a la misma fecha de corte) o corren en modo
+simulación (`intereses_masivo` con `dry_run`). Los listados piden páginas
+al azar con una semilla fija.
+"""
+import random
+import statistics
+import time
+from datetime import date
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Asociado
+from app.models.ahorro import CuentaAhorro
+from app.models.credito import Credito
+from app.models.usuario import Usuario
+from app.services import asociados as asociados_service
+from app.services import reportes
+from app.services.ahorros import AhorroService
+from app.services.contabilidad import ContabilidadService
+from app.services.creditos import CreditoService
+from app.services.dashboard import DashboardService
+from scripts.benchmarks.datos import FECHA_CORTE, USUARIO_BENCHMARK
+
+POR_PAGINA = 50
+
+
+class Contexto(NamedTuple):
+    """Datos que los escenarios necesitan de la base generada."""
+    usuario_id: int
+    aleatorio: random.Random
+    totales: Dict[str, int]  # Filas de las tablas listadas
+
+
+class Escenario(NamedTuple):
+    """Una ruta crítica y las veces que se mide por defecto."""
+    nombre: str
+    ejecutar: Callable[[Session, Contexto], object]
+    repeticiones: int = 10
+
+
+def _pagina_al_azar(contexto: Contexto, tabla: str) -> int:
+    return contexto.aleatorio.randrange(max(contexto.totales[tabla] // POR_PAGINA, 1)) * POR_PAGINA
+
+
+ESCENARIOS: List[Escenario] = [
+    Escenario("balance_general", lambda db, c: reportes.generar_balance_general(db, FECHA_CORTE)),
+    Escenario(
+        "estado_resultados",
+        lambda db, c: reportes.generar_estado_resultados(db, date(FECHA_CORTE.year, 1, 1), FECHA_CORTE)
+    ),
+    Escenario("reporte_cartera", lambda db, c: reportes.generar_reporte_cartera(db, FECHA_CORTE)),
+    Escenario("reporte_mora", lambda db, c: reportes.generar_reporte_mora(db, 1)),
+    Escenario("dashboard_kpis", lambda db, c: DashboardService.calcular_kpis(db)),
+    Escenario("calcular_mora", lambda db, c: CreditoService.calcular_mora(db, FECHA_CORTE), repeticiones=3),
+    Escenario(
+        "intereses_masivo",
+        lambda db, c: AhorroService.calcular_intereses_masivo(db, FECHA_CORTE, c.usuario_id, dry_run=True),
+        repeticiones=3
+    ),
+    Escenario(
+        "listado_asociados",
+        lambda db, c: asociados_service.listar_asociados(db, skip=_pagina_al_azar(c, "asociados"), limit=POR_PAGINA),
+        repeticiones=30
+    ),
+    Escenario(
+        "listado_asociados_cursor",
+        lambda db, c: asociados_service.listar_asociados_por_cursor(db, limit=POR_PAGINA),
+        repeticiones=30
+    ),
+    Escenario(
+        "listado_creditos",
+        lambda db, c: CreditoService.listar_creditos(db, skip=_pagina_al_azar(c, "creditos"), limit=POR_PAGINA),
+        repeticiones=30
+    ),
+    Escenario(
+        "listado_cuentas_ahorro",
+        lambda db, c: AhorroService.listar_cuentas(db, skip=_pagina_al_azar(c, "cuentas_ahorro"), limit=POR_PAGINA),
+        repeticiones=30
+    ),
+    Escenario(
+        "listado_asientos_cursor",
+        lambda db, c: ContabilidadService.listar_asientos_por_cursor(db, limit=POR_PAGINA),
+        repeticiones=30
+    ),
+]
+
+
+def _percentil(tiempos: List[float], percentil: float) -> float:
+    """Percentil por rango más cercano de una lista ordenada."""
+    return tiempos[max(int(round(percentil * len(tiempos) + 0.5)) - 1, 0)]
+
+
+def medir(
+    fabrica_sesiones: Callable[[], Session],
+    escenario: Escenario,
+    semilla: int = 42,
+    repeticiones: Optional[int] = None,
+    calentamiento: int = 1
+) -> Dict[str, float]:
+    """
+    Latencias en milisegundos de un escenario.
+
+    Cada repetición usa una sesión nueva, como una petición; las de
+    calentamiento no se cuentan.
+    """
+    with fabrica_sesiones() as db:
+        contexto = Contexto(
+            usuario_id=db.query(Usuario.id).filter(Usuario.username == USUARIO_BENCHMARK).scalar(),
+            aleatorio=random.Random(semilla),
+            totales={
+                modelo.__tablename__: db.query(func.count(modelo.id)).scalar()
+                for modelo in (Asociado, Credito, CuentaAhorro)
+            }
+        )
+
+    repeticiones = repeticiones or escenario.repeticiones
+    tiempos = []
+    for indice in range(calentamiento + repeticiones):
+        with fabrica_sesiones() as db:
+            inicio = time.perf_counter()
+            escenario.ejecutar(db, contexto)
+            transcurrido = (time.perf_counter() - inicio) * 1000
+        if indice >= calentamiento:
+            tiempos.append(transcurrido)
+
+    tiempos.sort()
+    return {
+        "repeticiones": repeticiones,
+        "p50_ms": round(statistics.median(tiempos), 3),
+        "p95_ms": round(_percentil(tiempos, 0.95), 3),
+        "min_ms": round(tiempos[0], 3),
+        "media_ms": round(statistics.fmean(tiempos), 3),
+    }
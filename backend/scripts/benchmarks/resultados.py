@@ -0,0 +1,93 @@
+"""
+Archivos de resultados del benchmark y comparación entre corridas.
+"""
+import json
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import sqlalchemy
+
+# Por defecto se compara la mediana, menos sensible al ruido que el p95
+METRICA = "p50_ms"
+
+
+class Comparacion(NamedTuple):
+    """Resultado de un escenario en la corrida base y en la nueva."""
+    escenario: str
+    base_ms: Optional[float]
+    nuevo_ms: Optional[float]
+    cambio: Optional[float]  # (nuevo - base) / base
+    regresion: bool
+
+
+def commit_actual() -> Optional[str]:
+    """Commit de git del árbol, si se puede obtener."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def armar_resultados(escala: str, semilla: int, motor: str, escenarios: Dict[str, dict]) -> dict:
+    """Resultados de una corrida con lo necesario para saber si dos son comparables."""
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_actual(),
+        "escala": escala,
+        "semilla": semilla,
+        "motor": motor,
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "escenarios": escenarios,
+    }
+
+
+def guardar(resultados: dict, ruta: Path):
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta.write_text(json.dumps(resultados, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def cargar(ruta: Path) -> dict:
+    return json.loads(Path(ruta).read_text(encoding="utf-8"))
+
+
+def comparar(
+    base: dict,
+    nuevo: dict,
+    umbral: float = 0.10,
+    minimo_ms: float = 1.0,
+    metrica: str = METRICA
+) -> List[Comparacion]:
+    """
+    Comparar dos corridas escenario por escenario.
+
+    Es regresión si la métrica empeora más del `umbral` relativo y más de
+    `minimo_ms` en términos absolutos (para no alertar por ruido en
+    escenarios de fracciones de milisegundo).
+
+    Raises:
+        ValueError: Si las corridas no usaron la misma escala y semilla
+    """
+    for campo in ("escala", "semilla"):
+        if base.get(campo) != nuevo.get(campo):
+            raise ValueError(
+                f"Las corridas no son comparables: {campo} {base.get(campo)} contra {nuevo.get(campo)}"
+            )
+
+    comparaciones = []
+    for escenario in sorted(set(base["escenarios"]) | set(nuevo["escenarios"])):
+        antes = base["escenarios"].get(escenario, {}).get(metrica)
+        despues = nuevo["escenarios"].get(escenario, {}).get(metrica)
+        if antes is None or despues is None:
+            comparaciones.append(Comparacion(escenario, antes, despues, None, False))
+            continue
+        cambio = (despues - antes) / antes if antes else 0.0
+        regresion = cambio > umbral and despues - antes > minimo_ms
+        comparaciones.append(Comparacion(escenario, antes, despues, cambio, regresion))
+    return comparaciones
@@ -10,6 +10,7 @@ from app.database import SessionLocal
 from app.models.credito import Credito, EstadoCredito, TipoCredito
 from app.models.asociado import Asociado
 from app.models.usuario import Usuario
+from app.services.creditos import CreditoService
 
 
 def crear_creditos_prueba(db, cantidad=3):
@@ -55,17 +56,7 @@ def crear_creditos_prueba(db, cantidad=3):
         tasa = random.choice(tasas)
         
         # Generar número de crédito
-        prefijo = f"CR-{date.today().year}{date.today().month:02d}-"
-        ultimo = db.query(Credito).filter(
-            Credito.numero_credito.like(f"{prefijo}%")
-        ).order_by(Credito.numero_credito.desc()).first()
-        
-        if ultimo:
-            numero = int(ultimo.numero_credito.split("-")[-1]) + 1
-        else:
-            numero = 1
-        
-        numero_credito = f"{prefijo}{numero:06d}"
+        numero_credito = CreditoService.generar_numero_credito(db)
         
         # Calcular cuota
         tasa_mensual = float(tasa) / 100
@@ -0,0 +1,62 @@
+"""
+Script para generar los certificados de todos los asociados activos en un ZIP.
+
+Uso:
+    python scripts/generar_certificados_masivos.py --tipo aportes --ano 2024
+        [--salida certificados_aportes_2024.zip] [--workers 4] [--lote 500]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar el directorio backend al path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.database import SessionLocal
+from app.models.usuario import Usuario  # noqa: F401
+from app.services.certificados import TAMANO_LOTE_CERTIFICADOS, TIPOS_CERTIFICADO, generar_certificados_masivos
+
+
+def mostrar_progreso(lote: dict):
+    """Imprimir el avance de un lote."""
+    print(f"  Lote {lote['lote']}: {lote['certificados']} certificados ({lote['acumulado']} en {lote['segundos']}s)")
+
+
+def main():
+    """Generar certificados."""
+    parser = argparse.ArgumentParser(description="Generación masiva de certificados")
+    parser.add_argument("--tipo", choices=TIPOS_CERTIFICADO, required=True, help="Tipo de certificado")
+    parser.add_argument("--ano", type=int, default=None, help="Año de los aportes (default: histórico)")
+    parser.add_argument("--salida", default=None, help="Archivo ZIP de salida")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos de renderizado (default: núcleos)")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE_CERTIFICADOS, help="Asociados por lote")
+    args = parser.parse_args()
+
+    sufijo = f"_{args.ano}" if args.ano else ""
+    salida = Path(args.salida or f"certificados_{args.tipo}{sufijo}.zip")
+
+    db = SessionLocal()
+    try:
+        print(f"Generando certificados de {args.tipo} en {salida}...")
+        with open(salida, "wb") as destino:
+            resultado = generar_certificados_masivos(
+                db,
+                args.tipo,
+                destino,
+                ano=args.ano,
+                workers=args.workers,
+                tamano_lote=args.lote,
+                progreso=mostrar_progreso
+            )
+        print(f"✓ Certificados: {resultado['certificados']} ({resultado['workers']} workers)")
+        print(f"✓ Duración: {resultado['segundos']}s")
+        print(f"✓ Rendimiento: {resultado['certificados_por_segundo']} certificados/segundo")
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Script para la liquidación masiva de intereses de ahorro (cierre de mes).
+
+Uso:
+    python scripts/liquidar_intereses_ahorro.py --usuario-id 1 [--fecha 2024-12-31]
+        [--tipo-ahorro a_la_vista] [--lote 500] [--dry-run]
+"""
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+# Agregar el directorio backend al path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.database import SessionLocal
+from app.models.usuario import Usuario  # noqa: F401
+from app.services.ahorros import AhorroService, TAMANO_LOTE_INTERESES
+
+
+def mostrar_progreso(lote: dict):
+    """Imprimir el resumen de un lote."""
+    estado = f"ERROR: {lote['error']}" if "error" in lote else "OK"
+    print(
+        f"  Lote {lote['lote']}: {lote['cuentas']} cuentas, "
+        f"{lote['cuentas_con_interes']} con interés, "
+        f"${lote['total_intereses']:,.2f} - {estado}"
+    )
+
+
+def main():
+    """Ejecutar liquidación."""
+    parser = argparse.ArgumentParser(description="Liquidación masiva de intereses de ahorro")
+    parser.add_argument("--usuario-id", type=int, required=True, help="Usuario que ejecuta la liquidación")
+    parser.add_argument("--fecha", type=date.fromisoformat, default=date.today(), help="Fecha de cálculo (YYYY-MM-DD)")
+    parser.add_argument("--tipo-ahorro", default=None, help="Filtrar por tipo de ahorro")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE_INTERESES, help="Cuentas por transacción")
+    parser.add_argument("--dry-run", action="store_true", help="Calcular sin registrar movimientos")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        modo = " (simulación)" if args.dry_run else ""
+        print(f"Liquidando intereses al {args.fecha}{modo}...")
+        resultado = AhorroService.calcular_intereses_masivo(
+            db,
+            args.fecha,
+            args.usuario_id,
+            args.tipo_ahorro,
+            dry_run=args.dry_run,
+            tamano_lote=args.lote,
+            progreso=mostrar_progreso
+        )
+        print(f"✓ Cuentas revisadas: {resultado['total_cuentas']}")
+        print(f"✓ Cuentas con interés: {resultado['cuentas_procesadas']}")
+        print(f"✓ Total intereses: ${resultado['total_intereses']:,.2f}")
+        if resultado["errores"]:
+            print(f"✗ Lotes con error: {len(resultado['errores'])}")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
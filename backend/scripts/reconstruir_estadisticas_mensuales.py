@@ -0,0 +1,34 @@
+"""
+Script para reconstruir la tabla de estadísticas mensuales del dashboard.
+
+Se ejecuta como job nocturno para conciliar los acumulados incrementales y
+después de cargas masivas o correcciones manuales en la base de datos.
+"""
+import sys
+from pathlib import Path
+
+# Agregar el directorio backend al path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.database import SessionLocal
+from app.models.usuario import Usuario  # noqa: F401
+from app.services.dashboard import DashboardService
+
+
+def main():
+    """Ejecutar reconstrucción."""
+    db = SessionLocal()
+    try:
+        print("Reconstruyendo estadísticas mensuales...")
+        total = DashboardService.reconstruir_estadisticas_mensuales(db)
+        print(f"✓ Estadísticas mensuales reconstruidas: {total}")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Script para reconstruir la tabla de saldos mensuales desde los movimientos contables.
+
+Útil después de cargas masivas o correcciones manuales en la base de datos.
+"""
+import sys
+from pathlib import Path
+
+# Agregar el directorio backend al path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.database import SessionLocal
+from app.models.usuario import Usuario  # noqa: F401
+from app.services.contabilidad import ContabilidadService
+
+
+def main():
+    """Ejecutar reconstrucción."""
+    db = SessionLocal()
+    try:
+        print("Reconstruyendo saldos mensuales...")
+        total = ContabilidadService.reconstruir_saldos_mensuales(db)
+        print(f"✓ Saldos mensuales reconstruidos: {total}")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,27 @@
 """
 Fixtures compartidos para las pruebas.
 """
+import os
+from contextlib import contextmanager
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
+# Las pruebas ejecutan los trabajos de reportes de forma síncrona
+os.environ.setdefault("REPORTES_WORKERS", "0")
+# y cargan el directorio de asociados desde la base de prueba en el primer uso
+os.environ.setdefault("DIRECTORIO_ASOCIADOS_PRECARGAR", "0")
+# La auditoría se escribe en la sesión de la prueba, no en segundo plano contra la base de la app
+os.environ.setdefault("AUDITORIA_ASINCRONA", "0")
+
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_db_readonly
 from app.core.security import SecurityManager
 from app.models.usuario import Usuario, RolUsuario
+from app.services.dashboard import cache_kpis
+from app.services.directorio_asociados import directorio
 
 # Base de datos de prueba en memoria
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -26,6 +38,8 @@ def db():
     Crea una base de datos de prueba y la limpia después de cada test.
     """
     Base.metadata.create_all(bind=engine)
+    cache_kpis.reiniciar()
+    directorio.reiniciar()
     db_session = TestingSessionLocal()
     try:
         yield db_session
@@ -46,11 +60,35 @@ def client(db):
             db.close()
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_db_readonly] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def contador_consultas():
+    """
+    Cuenta las sentencias SQL ejecutadas dentro de un bloque `with`.
+    
+    Uso: `with contador_consultas() as consultas: ...` y luego `consultas["total"]`.
+    """
+    @contextmanager
+    def contar():
+        consultas = {"total": 0}
+
+        def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+            consultas["total"] += 1
+
+        event.listen(engine, "before_cursor_execute", _antes_de_ejecutar)
+        try:
+            yield consultas
+        finally:
+            event.remove(engine, "before_cursor_execute", _antes_de_ejecutar)
+
+    return contar
+
+
 @pytest.fixture
 def admin_user(db):
     """
@@ -1,9 +1,13 @@
 """
 Tests para el módulo de ahorros.
 """
+import threading
+
 import pytest
 from datetime import date, datetime, timedelta
 from decimal import Decimal
+from sqlalchemy import event, update
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
 from app.models.asociado import Asociado
@@ -16,6 +20,7 @@ from app.schemas.ahorro import (
     CuentaAhorroCrear, ConsignacionCrear, RetiroCrear, TransferenciaCrear
 )
 from app.services.ahorros import AhorroService
+from tests.conftest import TestingSessionLocal
 
 
 # ============================================================================
@@ -463,3 +468,143 @@ def test_numeros_movimiento_unicos(db: Session, cuenta_vista: CuentaAhorro, admi
         numeros.add(movimiento.numero_movimiento)
     
     assert len(numeros) == 3  # Todos los números deben ser diferentes
+
+
+# ============================================================================
+# TESTS DE LIQUIDACIÓN MASIVA DE INTERESES
+# ============================================================================
+
+def test_intereses_masivo_registra_movimientos_y_saldos(db: Session, cuenta_vista: CuentaAhorro, cuenta_programado: CuentaAhorro, admin_user: Usuario):
+    """Test: La liquidación masiva registra un movimiento de interés por cuenta y actualiza saldos."""
+    fecha_calculo = date.today() + timedelta(days=90)
+    esperados = {}
+    for cuenta in (cuenta_vista, cuenta_programado):
+        _, interes = AhorroService._calcular_interes(
+            cuenta.saldo_disponible, cuenta.tasa_interes_anual, cuenta.fecha_apertura.date(), fecha_calculo
+        )
+        esperados[cuenta.id] = (cuenta.saldo_disponible, interes)
+    
+    resultado = AhorroService.calcular_intereses_masivo(db, fecha_calculo, admin_user.id)
+    
+    assert resultado["total_cuentas"] == 2
+    assert resultado["cuentas_procesadas"] == 2
+    assert resultado["total_intereses"] == sum(interes for _, interes in esperados.values())
+    assert resultado["errores"] == []
+    
+    db.expire_all()
+    for cuenta_id, (saldo_inicial, interes) in esperados.items():
+        cuenta = db.query(CuentaAhorro).filter(CuentaAhorro.id == cuenta_id).one()
+        assert cuenta.saldo_disponible == saldo_inicial + interes
+        assert cuenta.fecha_ultimo_interes is not None
+        
+        movimiento = db.query(MovimientoAhorro).filter(
+            MovimientoAhorro.cuenta_id == cuenta_id,
+            MovimientoAhorro.tipo_movimiento == TipoMovimientoAhorro.INTERES.value
+        ).one()
+        assert movimiento.valor == interes
+        assert movimiento.saldo_anterior == saldo_inicial
+        assert movimiento.saldo_nuevo == saldo_inicial + interes
+        assert movimiento.numero_movimiento.startswith("MOV-")
+
+
+def test_intereses_masivo_dry_run_no_modifica(db: Session, cuenta_vista: CuentaAhorro, admin_user: Usuario):
+    """Test: En modo simulación se calculan intereses sin registrar nada."""
+    saldo_inicial = cuenta_vista.saldo_disponible
+    
+    resultado = AhorroService.calcular_intereses_masivo(
+        db, date.today() + timedelta(days=30), admin_user.id, dry_run=True
+    )
+    
+    assert resultado["dry_run"] is True
+    assert resultado["cuentas_procesadas"] == 1
+    assert resultado["total_intereses"] > Decimal("0")
+    
+    db.expire_all()
+    assert db.query(CuentaAhorro).get(cuenta_vista.id).saldo_disponible == saldo_inicial
+    assert db.query(MovimientoAhorro).filter(
+        MovimientoAhorro.tipo_movimiento == TipoMovimientoAhorro.INTERES.value
+    ).count() == 0
+
+
+def test_intereses_masivo_bloquea_las_cuentas_del_lote(db: Session, cuenta_vista: CuentaAhorro, admin_user: Usuario):
+    """Test: Las cuentas del lote se leen con FOR UPDATE, salvo en simulación."""
+    consultas = []
+    
+    def registrar(estado):
+        if estado.is_select:
+            consultas.append(str(estado.statement.compile(dialect=postgresql.dialect())))
+    
+    event.listen(db, "do_orm_execute", registrar)
+    try:
+        fecha = date.today() + timedelta(days=30)
+        AhorroService.calcular_intereses_masivo(db, fecha, admin_user.id, dry_run=True)
+        assert not any("FOR UPDATE" in sql for sql in consultas)
+        
+        AhorroService.calcular_intereses_masivo(db, fecha, admin_user.id)
+        assert any("FOR UPDATE OF cuentas_ahorro" in sql for sql in consultas)
+    finally:
+        event.remove(db, "do_orm_execute", registrar)
+
+
+
+def test_intereses_masivo_libera_los_lotes_sin_intereses(db: Session, cuenta_vista: CuentaAhorro, cuenta_programado: CuentaAhorro, admin_user: Usuario):
+    """Test: Un lote sin intereses termina su transacción y no retiene bloqueos."""
+    cuenta_vista_id = cuenta_vista.id
+    # Sin saldo no causa intereses: el primer lote queda vacío
+    db.execute(
+        update(CuentaAhorro).where(CuentaAhorro.id == cuenta_vista_id).values(saldo_disponible=Decimal("0"))
+    )
+    db.commit()
+    en_transaccion = []
+    errores = []
+    
+    def escribir_concurrente():
+        try:
+            with TestingSessionLocal() as otra:
+                otra.execute(
+                    update(CuentaAhorro)
+                    .where(CuentaAhorro.id == cuenta_vista_id)
+                    .values(observaciones="Escritura concurrente")
+                )
+                otra.commit()
+        except Exception as e:
+            errores.append(e)
+    
+    def progreso(lote):
+        en_transaccion.append(db.in_transaction())
+        if lote["lote"] == 1:
+            hilo = threading.Thread(target=escribir_concurrente)
+            hilo.start()
+            hilo.join(timeout=5)
+            assert not hilo.is_alive()
+    
+    resultado = AhorroService.calcular_intereses_masivo(
+        db, date.today() + timedelta(days=30), admin_user.id, tamano_lote=1, progreso=progreso
+    )
+    
+    assert [lote["cuentas_con_interes"] for lote in resultado["lotes"]] == [0, 1]
+    assert en_transaccion == [False, False]
+    assert errores == []
+    db.expire_all()
+    assert db.get(CuentaAhorro, cuenta_vista_id).observaciones == "Escritura concurrente"
+
+def test_intereses_masivo_reporta_progreso_por_lote(db: Session, cuenta_vista: CuentaAhorro, cuenta_programado: CuentaAhorro, admin_user: Usuario):
+    """Test: Cada lote se reporta al callback de progreso."""
+    lotes = []
+    
+    resultado = AhorroService.calcular_intereses_masivo(
+        db, date.today() + timedelta(days=30), admin_user.id,
+        tamano_lote=1,
+        progreso=lotes.append
+    )
+    
+    assert [lote["lote"] for lote in lotes] == [1, 2]
+    assert all(lote["cuentas"] == 1 for lote in lotes)
+    assert resultado["lotes"] == lotes
+    
+    numeros = {
+        m.numero_movimiento for m in db.query(MovimientoAhorro).filter(
+            MovimientoAhorro.tipo_movimiento == TipoMovimientoAhorro.INTERES.value
+        )
+    }
+    assert len(numeros) == 2
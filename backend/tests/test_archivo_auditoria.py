@@ -0,0 +1,203 @@
+"""
+Tests para el archivo de los meses cerrados de auditoría.
+"""
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.auditoria import ArchivoAuditoria, RegistroAuditoria
+from app.services import archivo_auditoria
+from app.services.auditoria import AuditoriaService
+
+HOY = date(2024, 4, 15)
+
+
+@pytest.fixture
+def registros_meses(db: Session, admin_user):
+    """Seis registros por mes de enero a abril de 2024; cada par comparte fecha_hora."""
+    db.add_all([
+        RegistroAuditoria(
+            usuario_id=admin_user.id,
+            accion="UPDATE" if i % 2 else "CREATE",
+            entidad="Asociado",
+            entidad_id=i,
+            descripcion=f"Cambio {mes}-{i}",
+            fecha_hora=datetime(2024, mes, 3, 10, 0) + timedelta(hours=i // 2)
+        )
+        for mes in range(1, 5)
+        for i in range(6)
+    ])
+    db.commit()
+    return [
+        r.id for r in db.query(RegistroAuditoria).order_by(
+            RegistroAuditoria.fecha_hora.desc(), RegistroAuditoria.id.desc()
+        )
+    ]
+
+
+@pytest.fixture
+def archivado(db: Session, registros_meses, tmp_path):
+    """Deja en línea solo abril y archiva enero a marzo."""
+    meses = archivo_auditoria.archivar(db, meses_en_linea=1, hoy=HOY, directorio=str(tmp_path))
+    return registros_meses, meses
+
+
+@pytest.mark.parametrize("meses_en_linea, hoy, esperado", [
+    (1, date(2024, 4, 15), datetime(2024, 4, 1)),
+    (3, date(2024, 2, 10), datetime(2023, 12, 1)),
+    (12, date(2024, 12, 31), datetime(2024, 1, 1)),
+])
+def test_limite_en_linea(meses_en_linea, hoy, esperado):
+    assert archivo_auditoria.limite_en_linea(meses_en_linea, hoy) == esperado
+
+
+def test_archivar_mueve_los_meses_cerrados(db: Session, archivado, tmp_path):
+    _, meses = archivado
+
+    assert [(m.periodo, m.registros) for m in meses] == [("2024-01", 6), ("2024-02", 6), ("2024-03", 6)]
+    assert all(m.ruta_archivo and m.ruta_archivo.startswith(str(tmp_path)) for m in meses)
+    assert db.query(RegistroAuditoria).count() == 6
+    assert db.query(RegistroAuditoria).filter(RegistroAuditoria.fecha_hora < datetime(2024, 4, 1)).count() == 0
+
+    catalogo = db.query(ArchivoAuditoria).order_by(ArchivoAuditoria.periodo).all()
+    assert [a.registros for a in catalogo] == [6, 6, 6]
+    assert catalogo[0].fecha_desde == datetime(2024, 1, 3, 10, 0)
+    assert catalogo[0].fecha_hasta == datetime(2024, 1, 3, 12, 0)
+    assert not list(tmp_path.glob("*.tmp"))
+
+    # Volver a correr no encuentra nada más que archivar
+    assert archivo_auditoria.archivar(db, meses_en_linea=1, hoy=HOY, directorio=str(tmp_path)) == []
+
+
+def test_simulacion_no_modifica(db: Session, registros_meses, tmp_path):
+    meses = archivo_auditoria.archivar(db, meses_en_linea=2, hoy=HOY, directorio=str(tmp_path), simular=True)
+
+    assert [(m.periodo, m.registros, m.ruta_archivo) for m in meses] == [
+        ("2024-01", 6, None), ("2024-02", 6, None)
+    ]
+    assert db.query(RegistroAuditoria).count() == 24
+    assert not list(tmp_path.iterdir())
+
+
+def test_listado_continua_con_archivados(db: Session, archivado):
+    esperado, _ = archivado
+
+    # Sin pedirlos, el listado solo ve la tabla
+    assert [r.id for r in AuditoriaService.listar_registros(db, 0, 100)] == esperado[:6]
+
+    obtenidos = []
+    for skip in range(0, 24, 5):
+        obtenidos += [r.id for r in AuditoriaService.listar_registros(db, skip, 5, incluir_archivados=True)]
+    assert obtenidos == esperado
+
+    pagina = AuditoriaService.listar_registros(db, 20, 10, incluir_archivados=True)
+    assert [r.id for r in pagina] == esperado[20:]
+    assert pagina[-1].descripcion == "Cambio 1-0"
+
+
+def test_cursor_recorre_tabla_y_archivados(db: Session, archivado):
+    esperado, _ = archivado
+
+    obtenidos, cursor, paginas = [], None, 0
+    while True:
+        pagina = AuditoriaService.listar_registros_por_cursor(
+            db, cursor, limit=5, total="exacto", incluir_archivados=True
+        )
+        assert pagina.total == 24
+        obtenidos.extend(r.id for r in pagina.items)
+        paginas += 1
+        cursor = pagina.siguiente_cursor
+        if cursor is None:
+            break
+
+    assert paginas == 5
+    assert obtenidos == esperado
+
+
+
+def _recorrer(db: Session):
+    """Ids por offset y por cursor, incluidos los archivados."""
+    por_offset = []
+    for skip in range(0, 40, 4):
+        por_offset += [r.id for r in AuditoriaService.listar_registros(db, skip, 4, incluir_archivados=True)]
+
+    por_cursor, cursor = [], None
+    while True:
+        pagina = AuditoriaService.listar_registros_por_cursor(
+            db, cursor, limit=4, total="exacto", incluir_archivados=True
+        )
+        por_cursor.extend(r.id for r in pagina.items)
+        cursor = pagina.siguiente_cursor
+        if cursor is None:
+            break
+    return por_offset, por_cursor, pagina.total
+
+
+def test_mes_archivado_dos_veces(db: Session, archivado, admin_user, tmp_path):
+    """Los registros que llegan tarde a un mes archivado se intercalan y se vuelven a archivar en un solo archivo."""
+    # Tres registros tardíos de febrero, uno con la misma fecha_hora que registros ya archivados
+    db.add_all([
+        RegistroAuditoria(
+            usuario_id=admin_user.id,
+            accion="UPDATE",
+            entidad="Credito",
+            entidad_id=100 + i,
+            descripcion=f"Tardío {i}",
+            fecha_hora=fecha
+        )
+        for i, fecha in enumerate([
+            datetime(2024, 2, 3, 11, 0), datetime(2024, 2, 3, 11, 30), datetime(2024, 2, 28, 9, 0)
+        ])
+    ])
+    db.commit()
+    claves = [(r.fecha_hora, r.id) for r in db.query(RegistroAuditoria)]
+    claves += [(r.fecha_hora, r.id) for r in archivo_auditoria.registros_archivados(db)]
+    esperado = [registro_id for _, registro_id in sorted(claves, reverse=True)]
+
+    # Antes de volver a archivar, los tardíos siguen en la tabla entre abril y los archivados
+    assert _recorrer(db) == (esperado, esperado, 27)
+
+    meses = archivo_auditoria.archivar(db, meses_en_linea=1, hoy=HOY, directorio=str(tmp_path))
+
+    assert [(m.periodo, m.registros) for m in meses] == [("2024-02", 3), ("2024-03", 0)]
+    febrero = db.query(ArchivoAuditoria).filter(ArchivoAuditoria.periodo == "2024-02").one()
+    assert febrero.registros == 9
+    assert sorted(p.name for p in tmp_path.glob("auditoria_2024-02*")) == [Path(febrero.ruta_archivo).name]
+    assert db.query(RegistroAuditoria).count() == 6
+    assert _recorrer(db) == (esperado, esperado, 27)
+
+def test_filtros_en_archivados(db: Session, archivado):
+    filtros = dict(
+        accion="UPDATE",
+        fecha_desde=datetime(2024, 2, 1),
+        fecha_hasta=datetime(2024, 3, 3, 11, 0)
+    )
+    registros = AuditoriaService.listar_registros(db, 0, 100, incluir_archivados=True, **filtros)
+
+    assert [(r.fecha_hora.month, r.entidad_id) for r in registros] == [
+        (3, 3), (3, 1), (2, 5), (2, 3), (2, 1)
+    ]
+    assert archivo_auditoria.contar_archivados(db, **filtros) == 5
+    assert archivo_auditoria.contar_archivados(db, fecha_desde=datetime(2024, 2, 1)) == 12
+    assert archivo_auditoria.contar_archivados(db, limite=7) == 12
+
+
+def test_obtener_registro_archivado(client, db: Session, archivado, auth_headers_admin):
+    esperado, _ = archivado
+    mas_antiguo = esperado[-1]
+
+    registro = AuditoriaService.obtener_registro(db, mas_antiguo)
+    assert registro.id == mas_antiguo
+    assert registro.descripcion == "Cambio 1-0"
+    assert AuditoriaService.obtener_registro(db, 10_000) is None
+
+    response = client.get(f"/api/v1/auditoria/{mas_antiguo}", headers=auth_headers_admin)
+    assert response.status_code == 200
+    assert response.json()["fecha_hora"] == "2024-01-03T10:00:00"
+
+    response = client.get(
+        "/api/v1/auditoria/?incluir_archivados=true&skip=20&limit=10", headers=auth_headers_admin
+    )
+    assert [r["id"] for r in response.json()] == esperado[20:]
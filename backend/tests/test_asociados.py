@@ -146,3 +146,54 @@ def test_eliminar_asociado(client: TestClient, payload_base: dict, auth_headers_
     assert consulta.status_code == 200
     asociado = consulta.json()
     assert asociado["estado"] == "inactivo"
+
+
+def test_campos_promovidos_desde_datos_json(client: TestClient, payload_base: dict, auth_headers_admin: dict):
+    creado = crear_asociado(client, payload_base, auth_headers_admin)
+    assert creado["ciudad"] == "Honda"
+    assert creado["fecha_nacimiento"] == "1985-05-14"
+    assert creado["empresa"] == "Institución Educativa Honda"
+    assert creado["salario_basico"] == 4500000
+
+    cambios = {"datos_laborales": {"institucion_educativa": "Colegio Nuevo", "salario_basico": 5000000}}
+    respuesta = client.put(f"/api/v1/asociados/{creado['id']}", json=cambios, headers=auth_headers_admin)
+    assert respuesta.status_code == 200
+    assert respuesta.json()["empresa"] == "Colegio Nuevo"
+    assert respuesta.json()["salario_basico"] == 5000000
+
+    # Un cambio que no toca los datos JSON conserva los campos promovidos
+    respuesta = client.put(f"/api/v1/asociados/{creado['id']}", json={"estado": "inactivo"}, headers=auth_headers_admin)
+    assert respuesta.json()["ciudad"] == "Honda"
+    assert respuesta.json()["empresa"] == "Colegio Nuevo"
+
+    respuesta = client.get("/api/v1/asociados/?ciudad=Honda", headers=auth_headers_admin)
+    assert [a["id"] for a in respuesta.json()["datos"]] == [creado["id"]]
+    assert respuesta.json()["datos"][0]["empresa"] == "Colegio Nuevo"
+    respuesta = client.get("/api/v1/asociados/?ciudad=Ibagué", headers=auth_headers_admin)
+    assert respuesta.json()["datos"] == []
+
+
+def test_listado_no_carga_datos_json(db, client: TestClient, payload_base: dict, auth_headers_admin: dict):
+    from sqlalchemy import event
+
+    from app.services import asociados as service
+
+    creado = crear_asociado(client, payload_base, auth_headers_admin)
+    db.expunge_all()
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", registrar)
+    try:
+        respuesta = client.get("/api/v1/asociados/", headers=auth_headers_admin)
+        assert respuesta.status_code == 200
+        assert sentencias and not any("datos_personales" in sentencia for sentencia in sentencias)
+
+        db.expunge_all()
+        detalle = service.obtener_asociado(db, creado["id"])
+        assert "datos_personales" in sentencias[-1]
+        assert detalle.datos_personales["ciudad"] == "Honda"
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", registrar)
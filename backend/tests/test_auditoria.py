@@ -130,3 +130,121 @@ def test_sin_autenticacion_no_puede_acceder_auditoria(client: TestClient):
     response = client.get("/api/v1/auditoria/")
     # Puede devolver 401 (sin token) o 403 (sin permisos)
     assert response.status_code in [401, 403]
+
+
+def _fila_auditoria(usuario_id: int, i: int) -> dict:
+    from datetime import datetime
+
+    return dict(
+        usuario_id=usuario_id, accion="TEST_LOTE", entidad="TestEntity", entidad_id=i,
+        descripcion=f"Registro {i}", datos_anteriores=None, datos_nuevos=None,
+        ip_address=None, user_agent=None, fecha_hora=datetime.utcnow()
+    )
+
+
+@pytest.fixture
+def escritor_prueba(db: Session):
+    """Escritor de auditoría que escribe en la base de prueba con su propia sesión."""
+    from sqlalchemy.orm import sessionmaker
+    from app.services.escritor_auditoria import EscritorAuditoria
+
+    escritores = []
+
+    def crear(**opciones):
+        opciones.setdefault("intervalo", 0.05)
+        escritor = EscritorAuditoria(fabrica_sesiones=sessionmaker(bind=db.get_bind()), **opciones)
+        escritores.append(escritor)
+        return escritor
+
+    yield crear
+    for escritor in escritores:
+        escritor.detener()
+
+
+def test_escritor_inserta_por_lotes(db: Session, admin_user, escritor_prueba):
+    from app.models.auditoria import RegistroAuditoria
+
+    escritor = escritor_prueba(tamano_lote=10)
+    escritor.iniciar()
+    for i in range(25):
+        assert escritor.encolar(_fila_auditoria(admin_user.id, i))
+
+    assert escritor.vaciar(timeout=5)
+    assert db.query(RegistroAuditoria).filter(RegistroAuditoria.accion == "TEST_LOTE").count() == 25
+    assert escritor.estadisticas()["escritos"] == 25
+
+
+def test_escritor_escribe_pendientes_al_detenerse(db: Session, admin_user, escritor_prueba):
+    import time
+    from app.models.auditoria import RegistroAuditoria
+
+    escritor = escritor_prueba(intervalo=30)
+    escritor.iniciar()
+    for i in range(3):
+        escritor.encolar(_fila_auditoria(admin_user.id, i))
+
+    inicio = time.monotonic()
+    escritor.detener()
+    assert time.monotonic() - inicio < 5
+    assert not escritor.activo
+    assert db.query(RegistroAuditoria).filter(RegistroAuditoria.accion == "TEST_LOTE").count() == 3
+
+
+@pytest.mark.parametrize("politica, escritos", [("descartar", 0), ("sincrono", 1), ("bloquear", 1)])
+def test_escritor_cola_llena(db: Session, admin_user, escritor_prueba, politica, escritos):
+    """Sin hilo que la vacíe, el tercer registro encuentra la cola llena."""
+    from app.models.auditoria import RegistroAuditoria
+
+    escritor = escritor_prueba(capacidad=2, politica=politica, espera_maxima=0.01)
+    assert escritor.encolar(_fila_auditoria(admin_user.id, 1))
+    assert escritor.encolar(_fila_auditoria(admin_user.id, 2))
+
+    assert escritor.encolar(_fila_auditoria(admin_user.id, 3)) == (politica != "descartar")
+    assert db.query(RegistroAuditoria).count() == escritos
+    estadisticas = escritor.estadisticas()
+    assert (estadisticas["pendientes"], estadisticas["descartados"]) == (2, 1 - escritos)
+
+
+def test_escritor_lote_con_registro_invalido(db: Session, admin_user, escritor_prueba):
+    """Un registro que no se puede insertar no arrastra al resto de su lote."""
+    from app.models.auditoria import RegistroAuditoria
+
+    escritor = escritor_prueba(tamano_lote=10)
+    filas = [_fila_auditoria(admin_user.id, i) for i in range(5)]
+    filas[2]["accion"] = None  # accion es NOT NULL
+
+    assert escritor._insertar(filas) is False
+    guardados = db.query(RegistroAuditoria.entidad_id).filter(RegistroAuditoria.accion == "TEST_LOTE")
+    assert sorted(entidad_id for entidad_id, in guardados) == [0, 1, 3, 4]
+    estadisticas = escritor.estadisticas()
+    assert (estadisticas["escritos"], estadisticas["fallidos"]) == (4, 1)
+
+
+def test_escritor_politica_invalida():
+    from app.services.escritor_auditoria import EscritorAuditoria
+
+    with pytest.raises(ValueError, match="Política"):
+        EscritorAuditoria(politica="ignorar")
+
+
+def test_registrar_en_segundo_plano_no_toca_la_sesion(db: Session, admin_user, escritor_prueba, monkeypatch):
+    """Con el escritor activo, registrar no hace commit de los cambios pendientes de la petición."""
+    from app.models.auditoria import RegistroAuditoria
+    from app.services import auditoria
+    from app.services.auditoria import AuditoriaService
+
+    escritor = escritor_prueba()
+    escritor.iniciar()
+    monkeypatch.setattr(auditoria, "escritor", escritor)
+
+    admin_user.nombre_completo = "Cambio sin confirmar"
+    registro = AuditoriaService.registrar(
+        db=db, usuario=admin_user, accion="TEST_ASYNC", entidad="TestEntity", descripcion="En segundo plano"
+    )
+    assert registro.id is None
+    assert escritor.vaciar(timeout=5)
+
+    db.rollback()
+    assert admin_user.nombre_completo != "Cambio sin confirmar"
+    guardado = db.query(RegistroAuditoria).filter(RegistroAuditoria.accion == "TEST_ASYNC").one()
+    assert guardado.descripcion == "En segundo plano"
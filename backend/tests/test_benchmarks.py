@@ -0,0 +1,94 @@
+"""
+Tests para la suite de benchmarks: datos sintéticos y comparación de corridas.
+"""
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base
+from app.models import Asociado
+from app.models.ahorro import MovimientoAhorro
+from app.models.contabilidad import MovimientoContable
+from app.models.credito import Credito, Cuota, EstadoCredito
+from scripts.benchmarks import datos, resultados
+from scripts.benchmarks.escenarios import ESCENARIOS, medir
+
+ESCALA_PRUEBA = datos.Escala(asociados=40, creditos=60, movimientos_ahorro=100, movimientos_contables=80)
+
+
+def generar_en(ruta, semilla: int = 42):
+    """Generar el conjunto de prueba en una base SQLite nueva."""
+    engine = create_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        insertadas = datos.generar(db, ESCALA_PRUEBA, semilla)
+    return engine, insertadas
+
+
+def contenido(engine) -> list:
+    """Filas de las tablas generadas, sin las columnas que toman la hora del reloj."""
+    with Session(engine) as db:
+        return [
+            db.execute(
+                select(*(c for c in modelo.__table__.c if c.name not in ("created_at", "updated_at")))
+                .order_by(modelo.id)
+            ).all()
+            for modelo in (Asociado, Credito, Cuota, MovimientoAhorro, MovimientoContable)
+        ]
+
+
+def test_generacion_determinista(tmp_path):
+    motor_a, insertadas = generar_en(tmp_path / "a.db")
+    motor_b, _ = generar_en(tmp_path / "b.db")
+    motor_c, _ = generar_en(tmp_path / "c.db", semilla=7)
+
+    assert insertadas["asociados"] == ESCALA_PRUEBA.asociados
+    assert insertadas["creditos"] == ESCALA_PRUEBA.creditos
+    assert insertadas["movimientos_ahorro"] == ESCALA_PRUEBA.movimientos_ahorro
+    assert insertadas["movimientos_contables"] == ESCALA_PRUEBA.movimientos_contables
+
+    assert contenido(motor_a) == contenido(motor_b)
+    assert contenido(motor_a) != contenido(motor_c)
+
+    with Session(motor_a) as db:
+        assert db.query(Credito).filter(Credito.estado == EstadoCredito.MORA).count() > 0
+        with pytest.raises(ValueError):
+            datos.generar(db, ESCALA_PRUEBA)
+
+
+def test_escenarios_corren_sobre_los_datos(tmp_path):
+    engine, _ = generar_en(tmp_path / "bench.db")
+    fabrica_sesiones = sessionmaker(bind=engine)
+
+    for escenario in ESCENARIOS:
+        resultado = medir(fabrica_sesiones, escenario, repeticiones=2, calentamiento=0)
+        assert resultado["repeticiones"] == 2
+        assert 0 < resultado["min_ms"] <= resultado["p50_ms"] <= resultado["p95_ms"]
+
+
+def corrida(escala="pequena", semilla=42, **tiempos):
+    return resultados.armar_resultados(
+        escala, semilla, "sqlite", {nombre: {"p50_ms": ms} for nombre, ms in tiempos.items()}
+    )
+
+
+def test_comparar_detecta_regresiones():
+    base = corrida(reporte=100.0, listado=0.5, quitado=3.0)
+    nuevo = corrida(reporte=115.0, listado=0.9, agregado=2.0)
+
+    comparaciones = {c.escenario: c for c in resultados.comparar(base, nuevo, umbral=0.10, minimo_ms=1.0)}
+
+    assert comparaciones["reporte"].regresion
+    assert comparaciones["reporte"].cambio == pytest.approx(0.15)
+    # +80% pero por debajo del mínimo absoluto
+    assert not comparaciones["listado"].regresion
+    assert comparaciones["quitado"].cambio is None and not comparaciones["quitado"].regresion
+    assert comparaciones["agregado"].nuevo_ms == 2.0
+    assert not any(c.regresion for c in resultados.comparar(base, nuevo, umbral=0.20))
+
+
+def test_comparar_exige_misma_escala_y_semilla():
+    with pytest.raises(ValueError):
+        resultados.comparar(corrida(), corrida(escala="mediana"))
+    with pytest.raises(ValueError):
+        resultados.comparar(corrida(), corrida(semilla=1))
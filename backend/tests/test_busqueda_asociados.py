@@ -0,0 +1,119 @@
+"""
+Tests para la búsqueda de texto de asociados.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.texto import normalizar_texto, tokens_busqueda
+from app.models.asociado import Asociado
+from app.services import asociados as asociados_service
+from app.services import busqueda_asociados
+
+
+def _crear(db: Session, documento: str, nombres: str, apellidos: str, correo: str) -> Asociado:
+    asociado = Asociado(
+        tipo_documento="CC",
+        numero_documento=documento,
+        nombres=nombres,
+        apellidos=apellidos,
+        correo_electronico=correo,
+        estado="activo",
+        fecha_ingreso=date(2024, 1, 1)
+    )
+    db.add(asociado)
+    db.commit()
+    return asociado
+
+
+@pytest.fixture
+def asociados(db: Session):
+    return [
+        _crear(db, "1010", "José María", "García Núñez", "jm.garcia@test.com"),
+        _crear(db, "2020", "Ana", "Garzón Pérez", "ana@test.com"),
+        _crear(db, "3030", "Pedro", "López", "garcia.pedro@test.com"),
+    ]
+
+
+def test_normalizar_texto():
+    assert normalizar_texto("  José  MARÍA Núñez-Peña ") == "jose maria nunez pena"
+    assert normalizar_texto(None) == ""
+    assert tokens_busqueda("García, L.") == ["garcia", "l"]
+
+
+def test_nombre_busqueda_se_calcula_al_guardar(db: Session, asociados):
+    asociado = asociados[0]
+    assert asociado.nombre_busqueda == "jose maria garcia nunez"
+
+    asociado.apellidos = "Gutiérrez"
+    db.commit()
+    assert asociado.nombre_busqueda == "jose maria gutierrez"
+    assert busqueda_asociados.buscar(db, "gutierrez") == [asociado]
+    assert busqueda_asociados.buscar(db, "nunez") == []
+
+
+def test_buscar_sin_tildes_y_por_prefijo(db: Session, asociados):
+    jose, ana, _ = asociados
+
+    assert busqueda_asociados.buscar(db, "Garcia Nunez") == [jose]
+    assert busqueda_asociados.buscar(db, "GARCÍA") == [jose, asociados[2]]
+    assert busqueda_asociados.buscar(db, "garz pe") == [ana]
+    assert busqueda_asociados.buscar(db, "202") == [ana]
+    assert busqueda_asociados.buscar(db, "zzz") == []
+    assert busqueda_asociados.buscar(db, "  ¿?  ") == []
+
+
+def test_buscar_prioriza_coincidencias_en_nombre(db: Session, asociados):
+    """Quien se apellida García va antes que quien solo lo tiene en el correo."""
+    resultado = busqueda_asociados.buscar(db, "garcia")
+
+    assert resultado == [asociados[0], asociados[2]]
+    assert busqueda_asociados.buscar(db, "garcia", limite=1) == [asociados[0]]
+
+
+def test_filtro_nombre_ignora_documento_y_correo(db: Session, asociados):
+    resultado, total = asociados_service.listar_asociados(db, nombre="garcia")
+
+    assert [a.id for a in resultado] == [asociados[0].id]
+    assert total == 1
+
+
+def test_reconstruir_indice_tras_carga_directa(db: Session, asociados):
+    """Las inserciones que no pasan por el ORM quedan buscables al reconstruir."""
+    db.execute(insert(Asociado.__table__).values(
+        tipo_documento="CC",
+        numero_documento="4040",
+        nombres="Íngrid",
+        apellidos="Ramírez",
+        correo_electronico="ingrid@test.com",
+        estado="activo",
+        fecha_ingreso=date(2024, 1, 1),
+        created_at=date(2024, 1, 1),
+        updated_at=date(2024, 1, 1)
+    ))
+    db.commit()
+    assert busqueda_asociados.buscar(db, "ramirez") == []
+
+    assert busqueda_asociados.reconstruir_indice(db) == 4
+    assert [a.numero_documento for a in busqueda_asociados.buscar(db, "ramirez")] == ["4040"]
+    assert busqueda_asociados.buscar(db, "garcia nunez") == [asociados[0]]
+
+
+def test_endpoint_buscar(client, db: Session, asociados, auth_headers_admin):
+    response = client.get("/api/v1/asociados/buscar?q=jose garcia", headers=auth_headers_admin)
+    assert response.status_code == 200
+    assert [a["numero_documento"] for a in response.json()] == ["1010"]
+
+    response = client.get("/api/v1/asociados/?nombre=garzon", headers=auth_headers_admin)
+    assert [a["numero_documento"] for a in response.json()["datos"]] == ["2020"]
+
+
+def test_buscar_sin_fts(db: Session, asociados, monkeypatch):
+    """En motores sin FTS5 se busca con LIKE sobre la columna normalizada."""
+    monkeypatch.setattr(busqueda_asociados, "_motor", lambda db: "mysql")
+
+    assert busqueda_asociados.buscar(db, "garcia") == [asociados[0], asociados[2]]
+    assert busqueda_asociados.buscar(db, "pedro lopez") == [asociados[2]]
+    assert [a.id for a in asociados_service.listar_asociados(db, nombre="María")[0]] == [asociados[0].id]
@@ -0,0 +1,182 @@
+"""
+Tests para la generación masiva de certificados.
+"""
+import csv
+import os
+import time
+import zipfile
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.asociado import Asociado
+from app.models.contabilidad import Aporte
+from app.models.credito import Credito, EstadoCredito, TipoCredito
+from app.services import certificados, reportes
+
+
+def _crear_asociados(db: Session, usuario_id: int, cantidad: int, aportes_por_asociado: int = 3):
+    """Crear asociados activos con aportes mensuales en 2024 y uno inactivo."""
+    asociados = [
+        Asociado(
+            tipo_documento="CC",
+            numero_documento=f"{1000 + i}",
+            nombres=f"Nombre{i}",
+            apellidos=f"Apellido{i}",
+            correo_electronico=f"asociado{i}@test.com",
+            estado="activo",
+            fecha_ingreso=date(2020, 1, 1)
+        )
+        for i in range(cantidad)
+    ]
+    asociados.append(Asociado(
+        tipo_documento="CC",
+        numero_documento="999999",
+        nombres="Retirado",
+        apellidos="Inactivo",
+        correo_electronico="retirado@test.com",
+        estado="inactivo",
+        fecha_ingreso=date(2020, 1, 1)
+    ))
+    db.add_all(asociados)
+    db.flush()
+
+    db.add_all([
+        Aporte(
+            asociado_id=asociado.id,
+            fecha=date(2024, mes, 15),
+            valor=Decimal("50000"),
+            numero_recibo=f"RC-{asociado.id}-{mes}",
+            registrado_por_id=usuario_id
+        )
+        for asociado in asociados
+        for mes in range(1, aportes_por_asociado + 1)
+    ])
+    # Un aporte de otro año no entra en el certificado de 2024
+    db.add(Aporte(
+        asociado_id=asociados[0].id,
+        fecha=date(2023, 12, 15),
+        valor=Decimal("70000"),
+        registrado_por_id=usuario_id
+    ))
+    db.commit()
+    return asociados[:-1]
+
+
+def _leer_zip(destino: BytesIO):
+    destino.seek(0)
+    zip_entrada = zipfile.ZipFile(destino)
+    manifiesto = list(csv.DictReader(zip_entrada.read("manifiesto.csv").decode("utf-8").splitlines()))
+    return zip_entrada, manifiesto
+
+
+def test_certificado_aportes_individual_por_ano(db: Session, admin_user):
+    """El certificado individual filtra por año y detalla los últimos aportes."""
+    asociados = _crear_asociados(db, admin_user.id, 1, aportes_por_asociado=12)
+
+    pdf = reportes.generar_certificado_aportes(db, asociados[0].numero_documento, 2024)
+
+    assert pdf.read(4) == b"%PDF"
+
+
+def test_certificados_aportes_masivos(db: Session, admin_user):
+    asociados = _crear_asociados(db, admin_user.id, 5, aportes_por_asociado=12)
+    destino = BytesIO()
+    lotes = []
+
+    resumen = certificados.generar_certificados_masivos(
+        db, "aportes", destino, ano=2024, workers=1, tamano_lote=2, progreso=lotes.append
+    )
+
+    assert resumen["certificados"] == 5
+    assert resumen["lotes"] == 3
+    assert [lote["certificados"] for lote in lotes] == [2, 2, 1]
+
+    zip_entrada, manifiesto = _leer_zip(destino)
+    assert [fila["numero_documento"] for fila in manifiesto] == [a.numero_documento for a in asociados]
+    assert all(Decimal(fila["total_aportes"]) == Decimal("600000") for fila in manifiesto)
+    assert all(fila["numero_aportes"] == "12" for fila in manifiesto)
+
+    archivo = manifiesto[0]["archivo"]
+    assert archivo == "certificado_aportes_1000.pdf"
+    assert zip_entrada.read(archivo)[:4] == b"%PDF"
+    assert "certificado_aportes_999999.pdf" not in zip_entrada.namelist()
+
+
+def test_datos_aportes_ultimos_del_lote(db: Session, admin_user):
+    """Por asociado se cargan solo los últimos aportes, del más antiguo al más reciente."""
+    asociados = _crear_asociados(db, admin_user.id, 2, aportes_por_asociado=12)
+
+    datos = certificados._datos_aportes(db, asociados, None)
+
+    assert datos[0].numero_aportes == 13
+    assert datos[0].total_aportes == Decimal("670000")
+    fechas = [aporte[0] for aporte in datos[0].ultimos_aportes]
+    assert len(fechas) == reportes.APORTES_DETALLE_CERTIFICADO
+    assert fechas == sorted(fechas)
+    assert fechas[-1] == date(2024, 12, 15)
+
+
+def test_certificados_paz_salvo_masivos_en_paralelo(db: Session, admin_user):
+    asociados = _crear_asociados(db, admin_user.id, 3)
+    db.add(Credito(
+        numero_credito="CR-001",
+        asociado_id=asociados[1].id,
+        tipo_credito=TipoCredito.CONSUMO,
+        monto_solicitado=Decimal("1000000"),
+        tasa_interes=Decimal("1.5"),
+        plazo_meses=12,
+        destino="Prueba",
+        estado=EstadoCredito.AL_DIA,
+        saldo_capital=Decimal("800000"),
+        saldo_interes=Decimal("12000"),
+        saldo_mora=Decimal("0")
+    ))
+    db.commit()
+    destino = BytesIO()
+
+    resumen = certificados.generar_certificados_masivos(db, "paz_salvo", destino, workers=2)
+
+    assert resumen["certificados"] == 3
+    _, manifiesto = _leer_zip(destino)
+    assert [fila["paz_y_salvo"] for fila in manifiesto] == ["si", "no", "si"]
+    assert Decimal(manifiesto[1]["total_deuda"]) == Decimal("812000")
+
+
+def test_certificados_masivos_como_trabajo_renderizan_en_el_proceso(db: Session, admin_user, monkeypatch):
+    """El trabajo ya corre en un worker de la cola: no abre otro pool de procesos."""
+    _crear_asociados(db, admin_user.id, 2)
+
+    def sin_pool(*args, **kwargs):
+        raise AssertionError("No se debe crear un pool de procesos")
+
+    monkeypatch.setattr(certificados, "ProcessPoolExecutor", sin_pool)
+
+    archivo = certificados.exportar_certificados_masivos(db, "paz_salvo")
+
+    _, manifiesto = _leer_zip(archivo)
+    assert len(manifiesto) == 2
+
+
+def test_certificados_masivos_tipo_invalido(db: Session):
+    with pytest.raises(ValueError):
+        certificados.generar_certificados_masivos(db, "renta", BytesIO())
+
+
+@pytest.mark.slow
+def test_benchmark_certificados_aportes(db: Session, admin_user):
+    """Benchmark: certificados de aportes por segundo para 1.000 asociados."""
+    _crear_asociados(db, admin_user.id, 1000, aportes_por_asociado=12)
+    workers = os.cpu_count() or 1
+
+    inicio = time.perf_counter()
+    resumen = certificados.generar_certificados_masivos(db, "aportes", BytesIO(), ano=2024, workers=workers)
+    duracion = time.perf_counter() - inicio
+
+    print(f"\n{resumen['certificados']} certificados en {duracion:.2f}s "
+          f"({resumen['certificados_por_segundo']} certificados/segundo, {workers} workers)")
+    assert resumen["certificados"] == 1000
+    assert resumen["certificados_por_segundo"] > 20
@@ -0,0 +1,154 @@
+"""
+Tests para el servicio de consecutivos.
+"""
+import threading
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import Settings
+from app.database import Base, crear_motor
+from app.models.ahorro import ConfiguracionAhorro, CuentaAhorro, MovimientoAhorro, TipoAhorro
+from app.models.asociado import Asociado
+from app.models.consecutivo import Consecutivo
+from app.models.contabilidad import AsientoContable, TipoMovimiento
+from app.models.usuario import RolUsuario, Usuario
+from app.schemas.ahorro import ConsignacionCrear, CuentaAhorroCrear
+from app.services.ahorros import AhorroService
+from app.services.consecutivos import ConsecutivoService
+from app.services.contabilidad import ContabilidadService
+from tests.conftest import TestingSessionLocal
+
+
+def test_generar_numero_formato(db: Session):
+    """Los números se generan en secuencia con el formato PREFIJO-PERIODO-000001."""
+    assert ConsecutivoService.generar_numero(db, "CR", "202412") == "CR-202412-000001"
+    assert ConsecutivoService.generar_numero(db, "CR", "202412") == "CR-202412-000002"
+    # Cada período tiene su propia secuencia
+    assert ConsecutivoService.generar_numero(db, "CR", "202501") == "CR-202501-000001"
+    db.commit()
+
+
+def test_rollback_no_deja_huecos(db: Session):
+    """Un número asignado en una transacción revertida se vuelve a entregar."""
+    assert ConsecutivoService.siguiente_valor(db, "REC", "202412") == 1
+    db.commit()
+
+    assert ConsecutivoService.siguiente_valor(db, "REC", "202412") == 2
+    db.rollback()
+
+    assert ConsecutivoService.siguiente_valor(db, "REC", "202412") == 2
+    db.commit()
+
+
+def test_continua_desde_numeros_existentes(db: Session, admin_user):
+    """El primer uso de un período continúa desde el último número ya emitido."""
+    db.add(AsientoContable(
+        numero="AS-202412-000041",
+        fecha=date(2024, 12, 5),
+        tipo_movimiento=TipoMovimiento.AJUSTE,
+        concepto="Asiento histórico",
+        registrado_por_id=admin_user.id
+    ))
+    db.commit()
+
+    numero = ContabilidadService.generar_numero_asiento(db, date(2024, 12, 20))
+    assert numero == "AS-202412-000042"
+
+
+def test_asignacion_concurrente_sin_duplicados_ni_huecos(db: Session):
+    """Varias sesiones concurrentes obtienen números únicos y consecutivos."""
+    hilos_total = 8
+    por_hilo = 5
+    asignados = []
+    errores = []
+    candado = threading.Lock()
+
+    def trabajar():
+        sesion = TestingSessionLocal()
+        try:
+            for _ in range(por_hilo):
+                valor = ConsecutivoService.siguiente_valor(sesion, "MOV", "20241215")
+                sesion.commit()
+                with candado:
+                    asignados.append(valor)
+        except Exception as exc:  # pragma: no cover - se reporta abajo
+            errores.append(exc)
+        finally:
+            sesion.close()
+
+    hilos = [threading.Thread(target=trabajar) for _ in range(hilos_total)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert errores == []
+    assert sorted(asignados) == list(range(1, hilos_total * por_hilo + 1))
+
+    fila = db.query(Consecutivo).filter_by(prefijo="MOV", periodo="20241215").one()
+    assert fila.ultimo_valor == hilos_total * por_hilo
+
+
+def test_consignaciones_concurrentes_en_wal(tmp_path):
+    """Consignaciones simultáneas sobre SQLite en WAL numeran sus movimientos sin bloquearse."""
+    motor = crear_motor(f"sqlite:///{tmp_path}/consignaciones.db", Settings(db_pool_tamano=8))
+    Base.metadata.create_all(bind=motor)
+    fabrica_sesiones = sessionmaker(autocommit=False, autoflush=False, bind=motor)
+    hilos_total = 8
+    por_hilo = 5
+
+    with fabrica_sesiones() as sesion:
+        sesion.add(ConfiguracionAhorro(monto_minimo_apertura=Decimal("50000"), monto_minimo_consignacion=Decimal("10000")))
+        usuario = Usuario(
+            username="cajero", email="cajero@test.com", nombre_completo="Cajero",
+            hashed_password="x", rol=RolUsuario.ADMIN.value
+        )
+        sesion.add(usuario)
+        sesion.commit()
+        usuario_id = usuario.id
+        cuentas = []
+        for i in range(hilos_total):
+            asociado = Asociado(
+                numero_documento=f"80000{i}", tipo_documento="CC", nombres="Cliente", apellidos=f"Concurrente {i}",
+                correo_electronico=f"concurrente{i}@test.com", estado="activo", fecha_ingreso=date.today()
+            )
+            sesion.add(asociado)
+            sesion.commit()
+            cuenta = AhorroService.crear_cuenta(
+                sesion,
+                CuentaAhorroCrear(asociado_id=asociado.id, tipo_ahorro=TipoAhorro.A_LA_VISTA, monto_inicial=Decimal("50000")),
+                usuario_id
+            )
+            cuentas.append(cuenta.id)
+
+    errores = []
+
+    def cajero(cuenta_id: int):
+        try:
+            for _ in range(por_hilo):
+                with fabrica_sesiones() as sesion:
+                    AhorroService.realizar_consignacion(
+                        sesion, ConsignacionCrear(cuenta_id=cuenta_id, valor=Decimal("10000")), usuario_id
+                    )
+        except Exception as exc:  # pragma: no cover - se reporta abajo
+            errores.append(exc)
+
+    hilos = [threading.Thread(target=cajero, args=(cuenta_id,)) for cuenta_id in cuentas]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    try:
+        assert errores == []
+        with fabrica_sesiones() as sesion:
+            numeros = [numero for numero, in sesion.query(MovimientoAhorro.numero_movimiento)]
+            saldos = [saldo for saldo, in sesion.query(CuentaAhorro.saldo_disponible)]
+        # Aperturas más consignaciones, todas del mismo día
+        total = hilos_total * (por_hilo + 1)
+        assert sorted(int(numero.split("-")[-1]) for numero in numeros) == list(range(1, total + 1))
+        assert saldos == [Decimal("100000")] * hilos_total
+    finally:
+        motor.dispose()
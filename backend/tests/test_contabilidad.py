@@ -6,15 +6,19 @@ from decimal import Decimal
 
 import pytest
 from fastapi import status
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from app.models.contabilidad import (
     CuentaContable,
     AsientoContable,
     MovimientoContable,
-    Aporte
+    Aporte,
+    SaldoMensual
 )
+from app.schemas.contabilidad import AsientoContableCrear, MovimientoContableCrear
 from app.services.contabilidad import ContabilidadService
+from tests.conftest import engine
 
 
 # ============================================================================
@@ -610,6 +614,129 @@ def test_obtener_estadisticas(client, db: Session, auth_headers_admin, init_cuen
     assert stats["total_cuentas"] > 0
 
 
+# ============================================================================
+# TESTS DE SALDOS MENSUALES
+# ============================================================================
+
+def _asiento_simple(db: Session, usuario_id: int, fecha: date, debito_id: int, credito_id: int, valor: str):
+    """Crear asiento de dos movimientos directamente con el servicio."""
+    return ContabilidadService.crear_asiento(
+        db,
+        AsientoContableCrear(
+            fecha=fecha,
+            tipo_movimiento="ajuste",
+            concepto="Asiento de prueba",
+            movimientos=[
+                MovimientoContableCrear(cuenta_id=debito_id, debito=Decimal(valor), credito=Decimal("0")),
+                MovimientoContableCrear(cuenta_id=credito_id, debito=Decimal("0"), credito=Decimal(valor)),
+            ]
+        ),
+        usuario_id
+    )
+
+
+def test_saldos_mensuales_se_mantienen_al_crear_y_anular(db: Session, init_cuentas_contables, admin_user):
+    """Crear y anular asientos actualiza el saldo mensual de cada cuenta."""
+    bancos = db.query(CuentaContable).filter(CuentaContable.codigo == "1110").first()
+    aportes = db.query(CuentaContable).filter(CuentaContable.codigo == "3105").first()
+    
+    _asiento_simple(db, admin_user.id, date(2024, 3, 5), bancos.id, aportes.id, "100000")
+    anulado = _asiento_simple(db, admin_user.id, date(2024, 3, 20), bancos.id, aportes.id, "40000")
+    
+    saldo = db.query(SaldoMensual).filter(
+        SaldoMensual.cuenta_id == bancos.id,
+        SaldoMensual.anio == 2024,
+        SaldoMensual.mes == 3
+    ).one()
+    assert saldo.total_debito == Decimal("140000")
+    
+    ContabilidadService.anular_asiento(db, anulado, "Duplicado", admin_user.id)
+    db.refresh(saldo)
+    
+    assert saldo.total_debito == Decimal("100000")
+    assert saldo.total_credito == Decimal("0")
+
+
+
+def test_saldo_mensual_insertado_por_otra_transaccion_se_reintenta(db: Session, init_cuentas_contables):
+    """Si otra transacción crea el mes entre el UPDATE y el INSERT, se suma a esa fila."""
+    bancos = db.query(CuentaContable).filter(CuentaContable.codigo == "1110").first()
+    insertada = []
+
+    # Simular la transacción concurrente justo después de que el UPDATE no encuentre la fila
+    def insertar_concurrente(conn, cursor, statement, parameters, context, executemany):
+        if not insertada and statement.startswith("UPDATE saldos_mensuales") and cursor.rowcount == 0:
+            insertada.append(True)
+            cursor.connection.execute(
+                "INSERT INTO saldos_mensuales (cuenta_id, anio, mes, total_debito, total_credito, updated_at) "
+                "VALUES (?, 2024, 5, 30, 0, CURRENT_TIMESTAMP)",
+                (bancos.id,)
+            )
+
+    event.listen(engine, "after_cursor_execute", insertar_concurrente)
+    try:
+        ContabilidadService.acumular_saldos_mensuales(
+            db, date(2024, 5, 10), [(bancos.id, Decimal("10"), Decimal("0"))]
+        )
+    finally:
+        event.remove(engine, "after_cursor_execute", insertar_concurrente)
+
+    saldo = db.query(SaldoMensual).filter(
+        SaldoMensual.cuenta_id == bancos.id,
+        SaldoMensual.anio == 2024,
+        SaldoMensual.mes == 5
+    ).one()
+    assert insertada
+    assert saldo.total_debito == Decimal("40")
+
+def test_calcular_saldo_cuenta_combina_saldos_y_movimientos(db: Session, init_cuentas_contables, admin_user):
+    """El saldo por rango coincide con la suma directa de movimientos."""
+    bancos = db.query(CuentaContable).filter(CuentaContable.codigo == "1110").first()
+    aportes = db.query(CuentaContable).filter(CuentaContable.codigo == "3105").first()
+    
+    _asiento_simple(db, admin_user.id, date(2024, 1, 15), bancos.id, aportes.id, "1000")
+    _asiento_simple(db, admin_user.id, date(2024, 2, 1), bancos.id, aportes.id, "2000")
+    _asiento_simple(db, admin_user.id, date(2024, 2, 29), aportes.id, bancos.id, "500")
+    _asiento_simple(db, admin_user.id, date(2024, 3, 10), bancos.id, aportes.id, "4000")
+    _asiento_simple(db, admin_user.id, date(2024, 3, 25), bancos.id, aportes.id, "8000")
+    
+    assert ContabilidadService.calcular_saldo_cuenta(db, bancos.id) == (
+        Decimal("15000"), Decimal("500"), Decimal("14500")
+    )
+    assert ContabilidadService.calcular_saldo_cuenta(db, bancos.id, fecha_fin=date(2024, 3, 15)) == (
+        Decimal("7000"), Decimal("500"), Decimal("6500")
+    )
+    assert ContabilidadService.calcular_saldo_cuenta(
+        db, bancos.id, fecha_inicio=date(2024, 1, 20), fecha_fin=date(2024, 2, 29)
+    ) == (Decimal("2000"), Decimal("500"), Decimal("1500"))
+    assert ContabilidadService.calcular_saldo_cuenta(
+        db, bancos.id, fecha_inicio=date(2024, 3, 11), fecha_fin=date(2024, 3, 24)
+    ) == (Decimal("0"), Decimal("0"), Decimal("0"))
+
+
+def test_reconstruir_saldos_mensuales(db: Session, init_cuentas_contables, admin_user):
+    """La reconstrucción produce los mismos saldos que el mantenimiento incremental."""
+    bancos = db.query(CuentaContable).filter(CuentaContable.codigo == "1110").first()
+    aportes = db.query(CuentaContable).filter(CuentaContable.codigo == "3105").first()
+    
+    _asiento_simple(db, admin_user.id, date(2024, 1, 15), bancos.id, aportes.id, "1000")
+    _asiento_simple(db, admin_user.id, date(2024, 2, 10), bancos.id, aportes.id, "3000")
+    anulado = _asiento_simple(db, admin_user.id, date(2024, 2, 11), bancos.id, aportes.id, "700")
+    ContabilidadService.anular_asiento(db, anulado, "Error", admin_user.id)
+    
+    def leer_saldos():
+        return sorted(
+            (s.cuenta_id, s.anio, s.mes, Decimal(s.total_debito), Decimal(s.total_credito))
+            for s in db.query(SaldoMensual).all()
+        )
+    
+    incrementales = leer_saldos()
+    total = ContabilidadService.reconstruir_saldos_mensuales(db)
+    
+    assert total == 4
+    assert leer_saldos() == incrementales
+
+
 # ============================================================================
 # TESTS SIN AUTENTICACIÓN
 # ============================================================================
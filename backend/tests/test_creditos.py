@@ -1,9 +1,12 @@
 """
 Tests para el módulo de créditos.
 """
+import time
+
 import pytest
 from datetime import date, timedelta
 from decimal import Decimal
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.models.asociado import Asociado
@@ -500,6 +503,113 @@ def test_credito_sin_cuotas_vencidas_sin_mora(db: Session, credito_desembolsado:
     assert credito_desembolsado.estado == EstadoCredito.AL_DIA
 
 
+def test_calcular_mora_es_idempotente(db: Session, credito_desembolsado: Credito):
+    """Test: Recalcular la mora varias veces no acumula saldo de mora."""
+    cuotas = db.query(Cuota).filter(
+        Cuota.credito_id == credito_desembolsado.id
+    ).order_by(Cuota.numero_cuota).limit(2).all()
+    cuotas[0].fecha_vencimiento = date.today() - timedelta(days=40)
+    cuotas[1].fecha_vencimiento = date.today() - timedelta(days=10)
+    db.commit()
+    
+    CreditoService.calcular_mora(db)
+    db.refresh(credito_desembolsado)
+    saldo_mora = credito_desembolsado.saldo_mora
+    
+    resumen = CreditoService.calcular_mora(db)
+    db.refresh(credito_desembolsado)
+    
+    esperado = sum(
+        (c.valor_cuota * Decimal("0.001") * dias).quantize(Decimal("0.01"))
+        for c, dias in zip(cuotas, (40, 10))
+    )
+    assert credito_desembolsado.saldo_mora == saldo_mora == esperado
+    assert credito_desembolsado.dias_mora == 40
+    assert resumen["cuotas_en_mora"] == 2
+    assert resumen["creditos_en_mora"] == 1
+    assert resumen["total_mora"] == esperado
+
+
+def test_calcular_mora_credito_sale_de_mora(db: Session, credito_desembolsado: Credito):
+    """Test: Un crédito sin cuotas vencidas a la fecha de corte vuelve a estar al día."""
+    primera_cuota = db.query(Cuota).filter(
+        Cuota.credito_id == credito_desembolsado.id
+    ).order_by(Cuota.numero_cuota).first()
+    primera_cuota.fecha_vencimiento = date.today() - timedelta(days=5)
+    db.commit()
+    
+    CreditoService.calcular_mora(db)
+    db.refresh(credito_desembolsado)
+    assert credito_desembolsado.estado == EstadoCredito.MORA
+    
+    # Con un corte anterior al vencimiento la cuota deja de estar en mora
+    CreditoService.calcular_mora(db, date.today() - timedelta(days=10))
+    db.refresh(primera_cuota)
+    db.refresh(credito_desembolsado)
+    
+    assert primera_cuota.estado == EstadoCuota.PENDIENTE
+    assert primera_cuota.valor_mora == 0
+    assert credito_desembolsado.estado == EstadoCredito.AL_DIA
+    assert credito_desembolsado.dias_mora == 0
+    assert credito_desembolsado.saldo_mora == 0
+
+
+@pytest.fixture
+def cartera_masiva(db: Session, asociado_test: Asociado):
+    """Crear 5.000 créditos con 20 cuotas cada uno (100.000 cuotas), la mitad vencidas."""
+    total_creditos = 5000
+    cuotas_por_credito = 20
+    hoy = date.today()
+    
+    db.execute(insert(Credito), [
+        {
+            "numero_credito": f"BENCH-{i:06d}",
+            "asociado_id": asociado_test.id,
+            "tipo_credito": TipoCredito.CONSUMO,
+            "monto_solicitado": Decimal("2000000"),
+            "tasa_interes": Decimal("1.5"),
+            "plazo_meses": cuotas_por_credito,
+            "destino": "Benchmark",
+            "estado": EstadoCredito.AL_DIA,
+            "saldo_capital": Decimal("2000000"),
+        }
+        for i in range(total_creditos)
+    ])
+    credito_ids = [fila[0] for fila in db.query(Credito.id).filter(Credito.numero_credito.like("BENCH-%"))]
+    
+    db.execute(insert(Cuota), [
+        {
+            "credito_id": credito_id,
+            "numero_cuota": n,
+            "fecha_vencimiento": hoy + timedelta(days=30 * (n - cuotas_por_credito // 2) - 1),
+            "valor_cuota": Decimal("110000"),
+            "capital": Decimal("100000"),
+            "interes": Decimal("10000"),
+            "saldo_pendiente": Decimal("0"),
+            "estado": EstadoCuota.PENDIENTE,
+        }
+        for credito_id in credito_ids
+        for n in range(1, cuotas_por_credito + 1)
+    ])
+    db.commit()
+    return {"creditos": total_creditos, "cuotas": total_creditos * cuotas_por_credito}
+
+
+@pytest.mark.slow
+def test_benchmark_calcular_mora_100k_cuotas(db: Session, cartera_masiva: dict):
+    """Benchmark: Recalcular mora sobre 100.000 cuotas en menos de un minuto."""
+    inicio = time.perf_counter()
+    resumen = CreditoService.calcular_mora(db)
+    duracion = time.perf_counter() - inicio
+    
+    assert resumen["creditos_en_mora"] == cartera_masiva["creditos"]
+    assert resumen["cuotas_en_mora"] == cartera_masiva["cuotas"] // 2
+    assert duracion < 60
+    
+    # Una segunda corrida no cambia el resultado
+    assert CreditoService.calcular_mora(db) == resumen
+
+
 # ============================================================================
 # TESTS DE ESTADÍSTICAS
 # ============================================================================
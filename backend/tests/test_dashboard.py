@@ -0,0 +1,371 @@
+"""
+Tests para el dashboard: KPIs, caché, feed de actividad y estadísticas mensuales.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheTTL
+from app.models.ahorro import CuentaAhorro, MovimientoAhorro
+from app.models.asociado import Asociado
+from app.models.credito import Credito, EstadoCredito, TipoCredito
+from app.models.estadistica_mensual import EstadisticaMensual, MetricaMensual
+from app.schemas.ahorro import ConsignacionCrear
+from app.services.ahorros import AhorroService
+from app.services.dashboard import DashboardService
+from tests.conftest import engine
+
+
+@pytest.fixture
+def datos_dashboard(db: Session, admin_user):
+    """
+    Dos asociados activos antiguos, uno nuevo este mes y uno inactivo; una
+    cuenta antigua y una abierta este mes; un crédito al día y uno en mora.
+    """
+    hoy = date.today()
+    mes_anterior = hoy.replace(day=1) - timedelta(days=20)
+
+    asociados = [
+        Asociado(
+            tipo_documento="CC",
+            numero_documento=str(100 + i),
+            nombres=f"Nombre{i}",
+            apellidos=f"Apellido{i}",
+            correo_electronico=f"dashboard{i}@test.com",
+            estado=estado,
+            fecha_ingreso=fecha_ingreso
+        )
+        for i, (estado, fecha_ingreso) in enumerate([
+            ("activo", mes_anterior),
+            ("activo", mes_anterior),
+            ("activo", hoy.replace(day=1)),
+            ("inactivo", mes_anterior),
+        ])
+    ]
+    db.add_all(asociados)
+    db.flush()
+
+    db.add_all([
+        CuentaAhorro(
+            numero_cuenta="AH-1",
+            asociado_id=asociados[0].id,
+            tipo_ahorro="a_la_vista",
+            saldo_disponible=Decimal("200000"),
+            abierta_por_id=admin_user.id,
+            fecha_apertura=datetime.combine(mes_anterior, datetime.min.time())
+        ),
+        CuentaAhorro(
+            numero_cuenta="AH-2",
+            asociado_id=asociados[2].id,
+            tipo_ahorro="a_la_vista",
+            saldo_disponible=Decimal("100000"),
+            abierta_por_id=admin_user.id,
+            fecha_apertura=datetime.combine(hoy.replace(day=1), datetime.min.time())
+        ),
+    ])
+    db.add_all([
+        Credito(
+            numero_credito=f"CR-{i}",
+            asociado_id=asociados[i].id,
+            tipo_credito=TipoCredito.CONSUMO,
+            monto_solicitado=Decimal("1000000"),
+            tasa_interes=Decimal("1.5"),
+            plazo_meses=12,
+            destino="Prueba",
+            estado=estado,
+            fecha_desembolso=mes_anterior,
+            saldo_capital=Decimal("500000"),
+            saldo_interes=Decimal("0"),
+            saldo_mora=saldo_mora
+        )
+        for i, (estado, saldo_mora) in enumerate([
+            (EstadoCredito.AL_DIA, Decimal("0")),
+            (EstadoCredito.MORA, Decimal("20000")),
+        ])
+    ])
+    db.commit()
+    return asociados
+
+
+@pytest.fixture
+def datos_actividad(db: Session, datos_dashboard, admin_user):
+    """Consignaciones y retiros en fechas distintas sobre las cuentas de `datos_dashboard`."""
+    cuentas = db.query(CuentaAhorro).order_by(CuentaAhorro.id).all()
+    inicio = datetime.now() - timedelta(days=30)
+    db.add_all([
+        MovimientoAhorro(
+            numero_movimiento=f"MOV-{i}",
+            cuenta_id=cuentas[i % len(cuentas)].id,
+            tipo_movimiento="consignacion" if i % 3 else "retiro",
+            valor=Decimal(10000 + i),
+            saldo_anterior=Decimal("0"),
+            saldo_nuevo=Decimal(10000 + i),
+            descripcion="Movimiento de prueba",
+            realizado_por_id=admin_user.id,
+            fecha_movimiento=inicio + timedelta(hours=i * 7)
+        )
+        for i in range(30)
+    ])
+    db.commit()
+
+
+def test_calcular_kpis(db: Session, datos_dashboard, contador_consultas):
+    """Los KPIs se calculan con una consulta por tabla."""
+    with contador_consultas() as consultas:
+        kpis = DashboardService.calcular_kpis(db)
+
+    assert consultas["total"] == 3
+    assert kpis["asociados"] == {"total": 3, "nuevos_mes": 1, "crecimiento_porcentaje": 50.0}
+    assert kpis["ahorros"] == {"total": 300000.0, "crecimiento_porcentaje": 50.0}
+    assert kpis["cartera"] == {
+        "total": 1020000.0,
+        "creditos_vigentes": 2,
+        "creditos_mora": 1,
+        "crecimiento_porcentaje": 0.0
+    }
+    assert kpis["mora"] == {"indice_porcentaje": 50.0, "total_creditos_mora": 1}
+
+
+def test_calcular_kpis_sin_datos(db: Session):
+    kpis = DashboardService.calcular_kpis(db)
+
+    assert kpis["asociados"]["total"] == 0
+    assert kpis["ahorros"] == {"total": 0.0, "crecimiento_porcentaje": 0.0}
+    assert kpis["mora"]["indice_porcentaje"] == 0
+
+
+def test_kpis_cache_e_invalidacion(db: Session, datos_dashboard, admin_user, contador_consultas):
+    """Una escritura sobre ahorros descarta los KPIs en caché."""
+    primero = DashboardService.obtener_kpis(db)
+    with contador_consultas() as consultas:
+        segundo = DashboardService.obtener_kpis(db)
+
+    assert consultas["total"] == 0
+    assert segundo == primero
+    estadisticas = DashboardService.estadisticas_cache()
+    assert (estadisticas["aciertos"], estadisticas["fallos"]) == (1, 1)
+
+    cuenta = db.query(CuentaAhorro).filter(CuentaAhorro.numero_cuenta == "AH-1").one()
+    AhorroService.realizar_consignacion(
+        db, ConsignacionCrear(cuenta_id=cuenta.id, valor=Decimal("50000")), admin_user.id
+    )
+
+    assert DashboardService.obtener_kpis(db)["ahorros"]["total"] == 350000.0
+    estadisticas = DashboardService.estadisticas_cache()
+    assert estadisticas["fallos"] == 2
+    assert estadisticas["invalidaciones"] == 1
+
+
+def test_cache_ttl_expira():
+    ahora = [0.0]
+    cache = CacheTTL(10, reloj=lambda: ahora[0])
+    calculos = []
+
+    def calcular():
+        calculos.append(ahora[0])
+        return len(calculos)
+
+    assert cache.obtener("clave", calcular) == 1
+    ahora[0] = 9.9
+    assert cache.obtener("clave", calcular) == 1
+    ahora[0] = 10.0
+    assert cache.obtener("clave", calcular) == 2
+    assert cache.estadisticas()["tasa_aciertos"] == round(1 / 3, 4)
+
+
+def test_cache_no_guarda_valor_invalidado_durante_calculo():
+    """Un valor calculado antes de una invalidación no queda en caché."""
+    cache = CacheTTL(60)
+
+    def calcular_e_invalidar():
+        cache.invalidar("clave")
+        return "obsoleto"
+
+    assert cache.obtener("clave", calcular_e_invalidar) == "obsoleto"
+    assert cache.obtener("clave", lambda: "vigente") == "vigente"
+
+
+def test_cache_deshabilitada_con_ttl_cero():
+    cache = CacheTTL(0)
+    valores = iter([1, 2])
+
+    assert cache.obtener("clave", lambda: next(valores)) == 1
+    assert cache.obtener("clave", lambda: next(valores)) == 2
+    assert cache.estadisticas()["aciertos"] == 0
+
+
+def test_endpoints_kpis(client, datos_dashboard, auth_headers_admin, auth_headers_analista):
+    response = client.get("/api/v1/dashboard/kpis", headers=auth_headers_admin)
+    assert response.status_code == 200
+    assert response.json()["asociados"]["total"] == 3
+
+    response = client.get("/api/v1/dashboard/kpis/cache", headers=auth_headers_admin)
+    assert response.status_code == 200
+    assert response.json()["fallos"] == 1
+
+    response = client.get("/api/v1/dashboard/kpis/cache", headers=auth_headers_analista)
+    assert response.status_code == 403
+
+
+def test_actividad_reciente_sin_n_mas_1(db: Session, datos_actividad, contador_consultas):
+    """Las relaciones se cargan junto con cada listado: cuatro consultas en total."""
+    db.expire_all()
+    with contador_consultas() as consultas:
+        actividad = DashboardService.obtener_actividad_reciente(db)
+
+    assert consultas["total"] <= 4
+    assert len(actividad["consignaciones_recientes"]) == 10
+    assert len(actividad["retiros_recientes"]) == 10
+    assert actividad["retiros_recientes"][0]["numero_movimiento"] == "MOV-27"
+    assert actividad["retiros_recientes"][0]["asociado_nombre"] == "Nombre2 Apellido2"
+    assert {c["numero_credito"] for c in actividad["creditos_recientes"]} == {"CR-0", "CR-1"}
+    assert len(actividad["asociados_recientes"]) == 4
+
+
+def test_actividad_paginada_por_cursor(db: Session, datos_actividad, contador_consultas):
+    """Recorrer el feed por páginas devuelve cada evento una vez y en orden."""
+    completo = DashboardService.obtener_actividad(db, limite=100)
+    assert completo["siguiente_cursor"] is None
+    assert len(completo["eventos"]) == 30 + 2 + 4
+
+    eventos = []
+    cursor = None
+    while True:
+        with contador_consultas() as consultas:
+            pagina = DashboardService.obtener_actividad(db, limite=7, cursor=cursor)
+        assert consultas["total"] <= 4
+        eventos.extend(pagina["eventos"])
+        cursor = pagina["siguiente_cursor"]
+        if cursor is None:
+            break
+
+    assert eventos == completo["eventos"]
+    fechas = [evento["fecha"] for evento in eventos]
+    assert fechas == sorted(fechas, reverse=True)
+    assert {evento["tipo"] for evento in eventos} == {"desembolso", "consignacion", "retiro", "nuevo_asociado"}
+
+
+def test_endpoint_actividad(client, datos_actividad, auth_headers_admin):
+    response = client.get("/api/v1/dashboard/actividad?limite=5", headers=auth_headers_admin)
+    assert response.status_code == 200
+    datos = response.json()
+    assert len(datos["eventos"]) == 5
+
+    response = client.get(
+        "/api/v1/dashboard/actividad",
+        params={"limite": 5, "cursor": datos["siguiente_cursor"]},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == 200
+    assert response.json()["eventos"][0]["fecha"] <= datos["eventos"][-1]["fecha"]
+
+    response = client.get("/api/v1/dashboard/actividad?cursor=no-es-un-cursor", headers=auth_headers_admin)
+    assert response.status_code == 400
+
+
+def _estadisticas(db: Session, **rango):
+    datos = DashboardService.obtener_estadisticas_mensuales(db, **rango)
+    return {clave: valor for clave, valor in datos.items() if clave != "meses"}
+
+
+def test_estadisticas_mensuales_desde_tabla(db: Session, datos_actividad, contador_consultas):
+    """Los gráficos se leen de la tabla pre-agregada con una sola consulta."""
+    assert DashboardService.reconstruir_estadisticas_mensuales(db) > 0
+
+    with contador_consultas() as consultas:
+        datos = DashboardService.obtener_estadisticas_mensuales(db)
+
+    assert consultas["total"] == 1
+    assert len(datos["meses"]) == 12
+    assert sum(fila["cantidad"] for fila in datos["asociados_mensuales"]) == 4
+    assert sum(fila["cantidad"] for fila in datos["creditos_mensuales"]) == 2
+    consignaciones = db.query(MovimientoAhorro).filter(MovimientoAhorro.tipo_movimiento == "consignacion").all()
+    assert sum(fila["total"] for fila in datos["ahorros_mensuales"]) == float(sum(m.valor for m in consignaciones))
+
+
+def test_estadisticas_mensuales_rango(db: Session, datos_dashboard):
+    DashboardService.reconstruir_estadisticas_mensuales(db)
+    mes_actual = date.today().replace(day=1)
+
+    datos = DashboardService.obtener_estadisticas_mensuales(db, fecha_inicio=mes_actual, fecha_fin=date.today())
+
+    assert len(datos["meses"]) == 1
+    assert datos["creditos_mensuales"] == []
+    assert datos["asociados_mensuales"] == [{"anio": mes_actual.year, "mes": mes_actual.month, "cantidad": 1}]
+
+    with pytest.raises(ValueError):
+        DashboardService.obtener_estadisticas_mensuales(db, fecha_inicio=date.today(), fecha_fin=mes_actual - timedelta(days=1))
+
+
+def test_escrituras_actualizan_estadisticas(db: Session, datos_dashboard, admin_user):
+    """Los acumulados incrementales coinciden con una reconstrucción completa."""
+    from app.schemas import AsociadoActualizar
+    from app.services import asociados as asociados_service
+
+    DashboardService.reconstruir_estadisticas_mensuales(db)
+    cuenta = db.query(CuentaAhorro).filter(CuentaAhorro.numero_cuenta == "AH-1").one()
+    AhorroService.realizar_consignacion(
+        db, ConsignacionCrear(cuenta_id=cuenta.id, valor=Decimal("50000")), admin_user.id
+    )
+    asociados_service.actualizar_asociado(
+        db, datos_dashboard[0], AsociadoActualizar(fecha_ingreso=date.today().replace(day=1))
+    )
+
+    incremental = _estadisticas(db)
+    assert incremental["ahorros_mensuales"][-1]["total"] == 50000.0
+    assert incremental["asociados_mensuales"][-1]["cantidad"] == 2
+
+    DashboardService.reconstruir_estadisticas_mensuales(db)
+    assert _estadisticas(db) == incremental
+
+
+
+def test_estadistica_insertada_por_otra_transaccion_se_reintenta(db: Session):
+    """Si otra transacción crea el mes entre el UPDATE y el INSERT, se suma a esa fila."""
+    insertada = []
+
+    # Simular la transacción concurrente justo después de que el UPDATE no encuentre la fila
+    def insertar_concurrente(conn, cursor, statement, parameters, context, executemany):
+        if not insertada and statement.startswith("UPDATE estadisticas_mensuales") and cursor.rowcount == 0:
+            insertada.append(True)
+            cursor.connection.execute(
+                "INSERT INTO estadisticas_mensuales (anio, mes, metrica, cantidad, total, updated_at) "
+                "VALUES (2024, 5, 'consignaciones', 2, 70, CURRENT_TIMESTAMP)"
+            )
+
+    event.listen(engine, "after_cursor_execute", insertar_concurrente)
+    try:
+        DashboardService.acumular_estadistica_mensual(
+            db, MetricaMensual.CONSIGNACIONES, date(2024, 5, 10), Decimal("5")
+        )
+    finally:
+        event.remove(engine, "after_cursor_execute", insertar_concurrente)
+
+    estadistica = db.query(EstadisticaMensual).filter(
+        EstadisticaMensual.anio == 2024,
+        EstadisticaMensual.mes == 5,
+        EstadisticaMensual.metrica == MetricaMensual.CONSIGNACIONES.value
+    ).one()
+    assert insertada
+    assert (estadistica.cantidad, estadistica.total) == (3, Decimal("75"))
+
+def test_endpoint_estadisticas_mensuales_rango(client, db: Session, datos_dashboard, auth_headers_admin):
+    DashboardService.reconstruir_estadisticas_mensuales(db)
+
+    response = client.get(
+        "/api/v1/dashboard/estadisticas-mensuales",
+        params={"fecha_inicio": "2020-01-01", "fecha_fin": date.today().isoformat()},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == 200
+    assert sum(fila["cantidad"] for fila in response.json()["asociados_mensuales"]) == 4
+
+    response = client.get(
+        "/api/v1/dashboard/estadisticas-mensuales",
+        params={"fecha_inicio": "2024-02-01", "fecha_fin": "2024-01-01"},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == 400
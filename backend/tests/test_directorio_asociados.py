@@ -0,0 +1,166 @@
+"""
+Tests para el directorio de asociados en memoria.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.asociado import Asociado
+from app.schemas import AsociadoActualizar
+from app.services import asociados as asociados_service
+from app.services.directorio_asociados import DirectorioAsociados, _a_una_edicion, directorio
+
+
+def _crear(db: Session, documento: str, nombres: str, apellidos: str, estado: str = "activo") -> Asociado:
+    asociado = Asociado(
+        tipo_documento="CC",
+        numero_documento=documento,
+        nombres=nombres,
+        apellidos=apellidos,
+        correo_electronico=f"{documento}@test.com",
+        estado=estado,
+        fecha_ingreso=date(2024, 1, 1)
+    )
+    db.add(asociado)
+    db.commit()
+    return asociado
+
+
+@pytest.fixture
+def asociados(db: Session):
+    asociados = [
+        _crear(db, "1010", "José María", "García Núñez"),
+        _crear(db, "1011", "Ana", "Garzón Pérez"),
+        _crear(db, "2020", "Pedro", "López García", estado="retirado"),
+    ]
+    directorio.cargar(db)
+    return asociados
+
+
+def _ids(resultado):
+    return [miembro.id for miembro in resultado]
+
+
+@pytest.mark.parametrize("a, b, esperado", [
+    ("garcia", "garcia", True),
+    ("garcia", "garsia", True),
+    ("garcia", "gracia", True),
+    ("garcia", "garcai", True),
+    ("garcia", "garci", True),
+    ("garcia", "garcias", True),
+    ("garcia", "grcaia", False),
+    ("garcia", "gar", False),
+])
+def test_a_una_edicion(a, b, esperado):
+    assert _a_una_edicion(a, b) is esperado
+    assert _a_una_edicion(b, a) is esperado
+
+
+def test_buscar_por_documento(db: Session, asociados):
+    jose, ana, pedro = asociados
+
+    assert _ids(directorio.buscar("101")) == [jose.id, ana.id]
+    assert _ids(directorio.buscar("1011")) == [ana.id]
+    assert directorio.buscar("1011")[0].nombre == "ana garzon perez"
+    assert directorio.buscar("999") == []
+
+
+def test_buscar_por_nombre(db: Session, asociados):
+    jose, ana, pedro = asociados
+
+    assert _ids(directorio.buscar("GARCÍA")) == [jose.id, pedro.id]
+    assert _ids(directorio.buscar("garz pe")) == [ana.id]
+    assert _ids(directorio.buscar("lopez garcia")) == [pedro.id]
+    assert _ids(directorio.buscar("garcia", estado="activo")) == [jose.id]
+    assert directorio.buscar("garcia", estado="suspendido") == []
+
+
+def test_buscar_tolera_errores_de_digitacion(db: Session, asociados):
+    jose, ana, pedro = asociados
+
+    assert _ids(directorio.buscar("gracia nunez")) == [jose.id]
+    assert _ids(directorio.buscar("garzon perz")) == [ana.id]
+    assert _ids(directorio.buscar("lopes")) == [pedro.id]
+    # Las palabras cortas no se buscan aproximadas
+    assert directorio.buscar("anx") == []
+
+
+def test_exactas_antes_que_prefijos(db: Session, asociados):
+    jose, ana, pedro = asociados
+    maria = _crear(db, "3030", "Mariana", "García")
+    directorio.registrar(maria)
+
+    assert _ids(directorio.buscar("maria garcia")) == [jose.id, maria.id]
+    assert _ids(directorio.buscar("maria garcia", limite=1)) == [jose.id]
+
+
+def test_sincronizado_con_el_servicio(db: Session, asociados):
+    jose, ana, pedro = asociados
+
+    asociados_service.actualizar_asociado(
+        db, ana, AsociadoActualizar(apellidos="Quintero", numero_documento="5050")
+    )
+    assert directorio.buscar("garzon") == []
+    assert _ids(directorio.buscar("quintero")) == [ana.id]
+    assert _ids(directorio.buscar("505")) == [ana.id]
+    assert directorio.buscar("1011") == []
+
+    asociados_service.eliminar_asociado(db, jose)
+    assert directorio.buscar("1010")[0].estado == "inactivo"
+
+
+def test_renombrar_quita_las_palabras_anteriores(db: Session, asociados):
+    jose, ana, pedro = asociados
+    rosa = _crear(db, "4040", "Rosa", "Garzan")
+    directorio.registrar(rosa)
+    palabras = directorio.estadisticas()["palabras"]
+
+    asociados_service.actualizar_asociado(db, ana, AsociadoActualizar(apellidos="Quintero Pérez"))
+
+    # "garzon" ya no está en el vocabulario: no coincide con Ana y se busca aproximada
+    assert _ids(directorio.buscar("garzon")) == [rosa.id]
+    assert _ids(directorio.buscar("quintero")) == [ana.id]
+    assert directorio.estadisticas()["palabras"] == palabras
+    assert "garzon" not in directorio._variantes.get("garzn", [])
+
+
+def test_id_fuera_de_orden_fuerza_recarga(db: Session, asociados):
+    nuevo = Asociado(id=0, numero_documento="7070", nombres="Otro", apellidos="Id", estado="activo")
+    directorio.registrar(nuevo)
+
+    assert not directorio.cargado
+
+
+def test_estadisticas(db: Session, asociados):
+    estadisticas = directorio.estadisticas()
+
+    assert estadisticas["cargado"] is True
+    assert estadisticas["asociados"] == 3
+    assert estadisticas["palabras"] == 9
+    assert estadisticas["bytes"] > 0
+    assert DirectorioAsociados().estadisticas()["asociados"] == 0
+
+
+def test_buscar_asociados_usa_directorio_si_no_hay_coincidencias(db: Session, asociados):
+    resultado = asociados_service.buscar_asociados(db, "gracia nunez")
+
+    assert [a.numero_documento for a in resultado] == ["1010"]
+
+
+def test_endpoint_directorio(client, db: Session, asociados, auth_headers_admin):
+    jose_id = asociados[0].id
+    directorio.reiniciar()
+
+    response = client.get("/api/v1/asociados/directorio?q=garsia&estado=activo", headers=auth_headers_admin)
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": jose_id, "numero_documento": "1010", "nombre": "jose maria garcia nunez", "estado": "activo"}
+    ]
+
+
+def test_endpoint_directorio_requiere_autenticacion(client, db: Session, asociados):
+    response = client.get("/api/v1/asociados/directorio?q=garcia")
+
+    assert response.status_code == 403
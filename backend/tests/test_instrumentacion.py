@@ -0,0 +1,136 @@
+"""
+Tests para la instrumentación por petición (Server-Timing, /metrics y aviso de N+1).
+"""
+import logging
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.instrumentacion import MetricasRutas, MiddlewareInstrumentacion, metricas
+from app.database import get_db, get_db_readonly
+from app.main import create_app
+
+from tests.conftest import engine
+
+
+def _consultas_server_timing(response) -> int:
+    return int(re.search(r'db;dur=[\d.]+;desc="(\d+) consultas"', response.headers["server-timing"]).group(1))
+
+
+def test_metricas_rutas_formato_prometheus():
+    registro = MetricasRutas(buckets=(0.1, 1.0))
+    registro.registrar("GET", "/a/{id}", 200, 0.05, consultas=3, segundos_db=0.01)
+    registro.registrar("GET", "/a/{id}", 200, 0.5, consultas=40, segundos_db=0.2, excede_umbral=True)
+    registro.registrar("POST", 'con "comillas"', 500, 2.0)
+
+    texto = registro.exportar()
+
+    etiquetas = 'method="GET",route="/a/{id}",status="200"'
+    assert f'http_request_duration_seconds_bucket{{{etiquetas},le="0.1"}} 1' in texto
+    assert f'http_request_duration_seconds_bucket{{{etiquetas},le="1.0"}} 2' in texto
+    assert f'http_request_duration_seconds_bucket{{{etiquetas},le="+Inf"}} 2' in texto
+    assert f"http_request_duration_seconds_count{{{etiquetas}}} 2" in texto
+    assert f"http_db_queries_total{{{etiquetas}}} 43" in texto
+    assert f"http_requests_over_query_threshold_total{{{etiquetas}}} 1" in texto
+    assert 'route="con \\"comillas\\"",status="500",le="1.0"} 0' in texto
+
+    registro.reiniciar()
+    assert "_bucket" not in registro.exportar()
+
+
+@pytest.fixture
+def cliente_server_timing(db: Session, monkeypatch):
+    """Cliente de la aplicación completa con INSTRUMENTACION_SERVER_TIMING activo."""
+    monkeypatch.setattr(settings, "instrumentacion_server_timing", True)
+    app = create_app()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_db_readonly] = lambda: db
+    return TestClient(app)
+
+
+def test_server_timing_deshabilitado_por_defecto(client, asociado_test, auth_headers_admin):
+    response = client.get(f"/api/v1/asociados/{asociado_test.id}", headers=auth_headers_admin)
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+
+
+def test_server_timing_cuenta_las_consultas(
+    cliente_server_timing, db: Session, asociado_test, auth_headers_admin, contador_consultas
+):
+    url = f"/api/v1/asociados/{asociado_test.id}"
+    with contador_consultas() as consultas:
+        response = cliente_server_timing.get(url, headers=auth_headers_admin)
+
+    assert response.status_code == 200
+    assert consultas["total"] > 0
+    assert _consultas_server_timing(response) == consultas["total"]
+    assert re.search(r"app;dur=[\d.]+, total;dur=[\d.]+$", response.headers["server-timing"])
+
+
+def test_metrics_agrupa_por_plantilla_de_ruta(client, db: Session, asociado_test, auth_headers_admin):
+    metricas.reiniciar()
+    client.get(f"/api/v1/asociados/{asociado_test.id}", headers=auth_headers_admin)
+    client.get("/api/v1/asociados/999999", headers=auth_headers_admin)
+    client.get("/no-existe")
+
+    response = client.get("/metrics", headers=auth_headers_admin)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    texto = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/asociados/{asociado_id}",status="200"} 1' in texto
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/asociados/{asociado_id}",status="404"} 1' in texto
+    assert 'route="sin_ruta",status="404"' in texto
+    assert str(asociado_test.id) not in re.findall(r'route="([^"]*)"', texto)
+
+
+def test_metrics_requiere_superusuario_o_token(client, auth_headers_analista, monkeypatch):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers=auth_headers_analista).status_code == 403
+
+    monkeypatch.setattr(settings, "metricas_token", "token-de-prometheus")
+    assert client.get("/metrics", headers={"Authorization": "Bearer otro"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer token-de-prometheus"})
+    assert response.status_code == 200
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+
+
+@pytest.fixture
+def app_con_consultas(db: Session):
+    """App mínima con un endpoint síncrono que repite una consulta `n` veces."""
+    registro = MetricasRutas()
+    app = FastAPI()
+    app.add_middleware(MiddlewareInstrumentacion, metricas_rutas=registro, umbral_consultas=5, server_timing=True)
+
+    @app.get("/repetir/{n}")
+    def repetir(n: int):
+        with engine.connect() as conexion:
+            for i in range(n):
+                conexion.execute(text("SELECT :i"), {"i": i})
+        return {"n": n}
+
+    return TestClient(app), registro
+
+
+def test_aviso_de_n_mas_1(app_con_consultas, caplog):
+    cliente, registro = app_con_consultas
+
+    with caplog.at_level(logging.WARNING, logger="app.core.instrumentacion"):
+        response = cliente.get("/repetir/3")
+        assert _consultas_server_timing(response) == 3
+        assert not caplog.records
+
+        response = cliente.get("/repetir/8")
+        assert _consultas_server_timing(response) == 8
+
+    assert len(caplog.records) == 1
+    mensaje = caplog.records[0].getMessage()
+    assert "/repetir/{n} ejecutó 8 consultas" in mensaje
+    assert "(8 veces): SELECT ?" in mensaje
+    assert 'http_requests_over_query_threshold_total{method="GET",route="/repetir/{n}",status="200"} 1' in registro.exportar()
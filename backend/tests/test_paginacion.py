@@ -0,0 +1,180 @@
+"""
+Tests para la paginación por cursor (keyset) de los listados.
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core import paginacion
+from app.core.paginacion import paginar_por_cursor
+from app.models.asociado import Asociado
+from app.models.auditoria import RegistroAuditoria
+from app.services import asociados as asociados_service
+from app.services.auditoria import AuditoriaService
+
+
+def _crear_registros(db: Session, usuario_id: int, cantidad: int):
+    """Registros de auditoría; cada par comparte fecha_hora para forzar el desempate por id."""
+    inicio = datetime(2024, 1, 1, 8, 0, 0)
+    db.add_all([
+        RegistroAuditoria(
+            usuario_id=usuario_id,
+            accion="UPDATE",
+            entidad="Asociado",
+            entidad_id=i,
+            descripcion=f"Cambio {i}",
+            fecha_hora=inicio + timedelta(minutes=i // 2)
+        )
+        for i in range(cantidad)
+    ])
+    db.commit()
+
+
+def _crear_asociados(db: Session, cantidad: int):
+    db.add_all([
+        Asociado(
+            tipo_documento="CC",
+            numero_documento=f"{5000 + i}",
+            nombres=f"Nombre{i}",
+            apellidos=f"Apellido{i}",
+            correo_electronico=f"pagina{i}@test.com",
+            estado="activo",
+            fecha_ingreso=date(2024, 1, 1) + timedelta(days=i // 3)
+        )
+        for i in range(cantidad)
+    ])
+    db.commit()
+
+
+def test_recorrer_registros_por_cursor(db: Session, admin_user):
+    """Las páginas por cursor cubren todas las filas una sola vez y en el orden del listado."""
+    _crear_registros(db, admin_user.id, 25)
+    esperado = [
+        r.id for r in db.query(RegistroAuditoria).order_by(
+            RegistroAuditoria.fecha_hora.desc(), RegistroAuditoria.id.desc()
+        )
+    ]
+
+    obtenidos, cursor, paginas = [], None, 0
+    while True:
+        pagina = AuditoriaService.listar_registros_por_cursor(db, cursor, limit=7)
+        obtenidos.extend(r.id for r in pagina.items)
+        paginas += 1
+        cursor = pagina.siguiente_cursor
+        if cursor is None:
+            break
+
+    assert paginas == 4
+    assert obtenidos == esperado
+
+
+def test_cursor_respeta_filtros(db: Session, admin_user):
+    _crear_registros(db, admin_user.id, 10)
+    desde = datetime(2024, 1, 1, 8, 2, 0)
+
+    primera = AuditoriaService.listar_registros_por_cursor(db, limit=3, fecha_desde=desde)
+    segunda = AuditoriaService.listar_registros_por_cursor(
+        db, primera.siguiente_cursor, limit=3, fecha_desde=desde
+    )
+
+    registros = primera.items + segunda.items
+    assert len(registros) == 6
+    assert all(r.fecha_hora >= desde for r in registros)
+    assert segunda.siguiente_cursor is None
+
+
+def test_total_exacto_y_estimado(db: Session, admin_user, monkeypatch):
+    _crear_registros(db, admin_user.id, 12)
+
+    pagina = AuditoriaService.listar_registros_por_cursor(db, limit=5, total="exacto")
+    assert (pagina.total, pagina.total_exacto) == (12, True)
+
+    pagina = AuditoriaService.listar_registros_por_cursor(db, limit=5)
+    assert pagina.total is None
+
+    monkeypatch.setattr(paginacion, "LIMITE_CONTEO_ESTIMADO", 10)
+    pagina = AuditoriaService.listar_registros_por_cursor(db, limit=5, total="estimado")
+    assert (pagina.total, pagina.total_exacto) == (10, False)
+
+
+@pytest.mark.parametrize("cursor", ["no-es-base64", "eyJvIjpbXX0="])
+def test_cursor_invalido(db: Session, admin_user, cursor):
+    with pytest.raises(ValueError, match="Cursor de paginación inválido"):
+        AuditoriaService.listar_registros_por_cursor(db, cursor)
+
+
+def test_cursor_de_otro_orden_rechazado(db: Session):
+    _crear_asociados(db, 4)
+    pagina = asociados_service.listar_asociados_por_cursor(db, limit=2, orden="desc")
+
+    with pytest.raises(ValueError):
+        asociados_service.listar_asociados_por_cursor(db, limit=2, cursor=pagina.siguiente_cursor, orden="asc")
+
+
+def test_columna_con_nulos_rechazada(db: Session):
+    with pytest.raises(ValueError, match="sin valores nulos"):
+        paginar_por_cursor(db.query(Asociado), [Asociado.telefono_principal, Asociado.id], 10)
+
+
+def test_asociados_por_cursor_coincide_con_offset(db: Session):
+    """Con fechas repetidas, el cursor sigue el mismo orden que skip/limit sin saltos."""
+    _crear_asociados(db, 11)
+
+    ids, cursor = [], None
+    while True:
+        pagina = asociados_service.listar_asociados_por_cursor(
+            db, limit=4, cursor=cursor, ordenar_por="fecha_ingreso", orden="asc"
+        )
+        ids.extend(a.id for a in pagina.items)
+        cursor = pagina.siguiente_cursor
+        if cursor is None:
+            break
+
+    esperado = [
+        a.id for a in db.query(Asociado).order_by(Asociado.fecha_ingreso.asc(), Asociado.id.asc())
+    ]
+    assert ids == esperado
+    assert len(pagina.items) == 3
+
+
+def test_endpoint_asociados_por_cursor(client, db: Session, auth_headers_admin):
+    _crear_asociados(db, 5)
+
+    response = client.get(
+        "/api/v1/asociados/?paginacion=cursor&limit=3&total=exacto", headers=auth_headers_admin
+    )
+    assert response.status_code == 200
+    info = response.json()["paginacion"]
+    assert info["total"] == 5
+    assert info["siguiente_cursor"]
+    assert info["pagina_actual"] is None
+
+    response = client.get(
+        f"/api/v1/asociados/?limit=3&cursor={info['siguiente_cursor']}", headers=auth_headers_admin
+    )
+    assert response.status_code == 200
+    assert len(response.json()["datos"]) == 2
+    assert response.json()["paginacion"]["siguiente_cursor"] is None
+
+    response = client.get("/api/v1/asociados/?cursor=xyz", headers=auth_headers_admin)
+    assert response.status_code == 400
+
+
+def test_endpoint_auditoria_encabezados_cursor(client, db: Session, admin_user, auth_headers_admin):
+    _crear_registros(db, admin_user.id, 5)
+
+    response = client.get(
+        "/api/v1/auditoria/?paginacion=cursor&limit=3&total=estimado", headers=auth_headers_admin
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert response.headers["X-Total-Count"] == "5"
+    assert response.headers["X-Total-Exacto"] == "true"
+
+    response = client.get(
+        f"/api/v1/auditoria/?limit=3&cursor={response.headers['X-Siguiente-Cursor']}",
+        headers=auth_headers_admin
+    )
+    assert len(response.json()) == 2
+    assert "X-Siguiente-Cursor" not in response.headers
@@ -0,0 +1,134 @@
+"""
+Tests para el perfilador estadístico de peticiones.
+"""
+import sys
+import threading
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core import perfilador
+from app.core.perfilador import (
+    MiddlewarePerfilador,
+    Muestreador,
+    autorizar_perfil,
+    listar_perfiles,
+    plegar_pila,
+    ruta_perfil,
+)
+from app.database import get_db
+
+
+def calculo_pesado(segundos: float):
+    """Ocupa la CPU durante `segundos`."""
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        sum(range(1000))
+
+
+@pytest.fixture
+def muestreador_prueba(monkeypatch):
+    muestreador = Muestreador(intervalo=0.002, ventana=30)
+    # La dependencia usa el muestreador del módulo
+    monkeypatch.setattr(perfilador, "muestreador", muestreador)
+    yield muestreador
+    while muestreador.activo:
+        muestreador.liberar()
+
+
+@pytest.fixture
+def app_perfilada(db: Session, muestreador_prueba, tmp_path):
+    """App con un endpoint lento, el middleware y la dependencia del perfilador."""
+    def crear(umbral_lentas_ms: int = 0, lentas_por_ruta: int = 2):
+        app = FastAPI(dependencies=[Depends(autorizar_perfil)])
+        app.add_middleware(
+            MiddlewarePerfilador,
+            muestreador_pilas=muestreador_prueba,
+            directorio=str(tmp_path),
+            umbral_lentas_ms=umbral_lentas_ms,
+            lentas_por_ruta=lentas_por_ruta
+        )
+        app.dependency_overrides[get_db] = lambda: db
+
+        @app.get("/lento/{segundos}")
+        def lento(segundos: float):
+            calculo_pesado(segundos)
+            return {"ok": True}
+
+        return TestClient(app)
+
+    return crear
+
+
+def test_plegar_pila_omite_hilos_en_espera():
+    evento = threading.Event()
+    hilo = threading.Thread(target=evento.wait, name="esperando")
+    hilo.start()
+    try:
+        time.sleep(0.01)
+        assert plegar_pila("esperando", sys._current_frames()[hilo.ident]) is None
+    finally:
+        evento.set()
+        hilo.join()
+
+    marco = sys._getframe()
+    pila, linea = plegar_pila("principal", marco), marco.f_lineno
+    assert pila.startswith("principal;")
+    assert pila.endswith(f"test_plegar_pila_omite_hilos_en_espera (tests/test_perfilador.py:{linea})")
+
+
+def test_perfil_pedido_por_superusuario(app_perfilada, auth_headers_admin, tmp_path, muestreador_prueba):
+    cliente = app_perfilada()
+
+    response = cliente.get("/lento/0.1?perfilar=1", headers=auth_headers_admin)
+
+    assert response.status_code == 200
+    nombre = response.headers["x-perfil"]
+    assert nombre.startswith("pedido_") and "_GET_lento-segundos" in nombre
+    contenido = (tmp_path / nombre).read_text()
+    lineas = contenido.splitlines()
+    assert lineas and all(linea.rsplit(" ", 1)[1].isdigit() for linea in lineas)
+    assert any("calculo_pesado (tests/test_perfilador.py" in linea for linea in lineas)
+    # Sin otros perfiles en curso el muestreo se detiene
+    assert not muestreador_prueba.activo
+
+    assert [p["nombre"] for p in listar_perfiles(str(tmp_path))] == [nombre]
+    assert ruta_perfil(nombre, str(tmp_path)) == tmp_path / nombre
+    assert ruta_perfil("../secreto.folded", str(tmp_path)) is None
+
+
+def test_perfil_con_encabezado_y_sin_pedirlo(app_perfilada, auth_headers_admin, tmp_path):
+    cliente = app_perfilada()
+
+    response = cliente.get("/lento/0.02", headers={**auth_headers_admin, "X-Perfilar": "1"})
+    assert "x-perfil" in response.headers
+
+    response = cliente.get("/lento/0.02", headers=auth_headers_admin)
+    assert "x-perfil" not in response.headers
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_perfil_solo_para_superusuarios(app_perfilada, auth_headers_analista, tmp_path, muestreador_prueba):
+    cliente = app_perfilada()
+
+    assert cliente.get("/lento/0.01?perfilar=1", headers=auth_headers_analista).status_code == 403
+    assert cliente.get("/lento/0.01?perfilar=1").status_code == 401
+    # Sin pedir perfil no se exige autenticación adicional
+    assert cliente.get("/lento/0.01").status_code == 200
+    assert not list(tmp_path.iterdir())
+    assert not muestreador_prueba.activo
+
+
+def test_conserva_las_peticiones_mas_lentas_por_ruta(app_perfilada, tmp_path, muestreador_prueba):
+    cliente = app_perfilada(umbral_lentas_ms=30, lentas_por_ruta=2)
+    muestreador_prueba.adquirir()
+
+    for segundos in (0.05, 0.12, 0.005, 0.08, 0.04):
+        assert cliente.get(f"/lento/{segundos}").status_code == 200
+
+    guardados = sorted(int(a.name.rsplit("_", 1)[1][:-len("ms.folded")]) for a in tmp_path.iterdir())
+    assert len(guardados) == 2
+    assert guardados[0] >= 80 and guardados[1] >= 120
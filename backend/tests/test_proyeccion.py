@@ -0,0 +1,172 @@
+"""
+Tests para las respuestas con proyección de columnas (`campos=`) de los listados.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.proyeccion import filas_a_diccionarios, resolver_campos
+from app.models.ahorro import CuentaAhorro
+from app.models.asociado import Asociado
+from app.models.credito import Credito, EstadoCredito, TipoCredito
+from app.services import asociados as asociados_service
+
+
+@pytest.fixture
+def datos_listados(db: Session, admin_user):
+    """Cinco asociados, cada uno con un crédito y una cuenta de ahorro."""
+    asociados = [
+        Asociado(
+            tipo_documento="CC",
+            numero_documento=f"{7000 + i}",
+            nombres=f"Nombre{i}",
+            apellidos=f"Apellido{i}",
+            correo_electronico=f"proyeccion{i}@test.com",
+            estado="activo",
+            fecha_ingreso=date(2024, 1, 1) + timedelta(days=i),
+            datos_personales={"ciudad": "Honda"}
+        )
+        for i in range(5)
+    ]
+    db.add_all(asociados)
+    db.flush()
+    db.add_all([
+        Credito(
+            numero_credito=f"CR-P{i}",
+            asociado_id=asociado.id,
+            tipo_credito=TipoCredito.CONSUMO,
+            monto_solicitado=Decimal("1000000"),
+            tasa_interes=Decimal("1.5"),
+            plazo_meses=12,
+            destino="Prueba de proyección",
+            estado=EstadoCredito.AL_DIA,
+            fecha_solicitud=date(2024, 2, 1) + timedelta(days=i),
+            saldo_capital=Decimal("500000.50"),
+            saldo_interes=Decimal("0"),
+            saldo_mora=Decimal("0")
+        )
+        for i, asociado in enumerate(asociados)
+    ])
+    db.add_all([
+        CuentaAhorro(
+            numero_cuenta=f"AH-P{i}",
+            asociado_id=asociado.id,
+            tipo_ahorro="a_la_vista",
+            saldo_disponible=Decimal("1500.25"),
+            abierta_por_id=admin_user.id,
+            fecha_apertura=datetime(2024, 3, 1) + timedelta(days=i)
+        )
+        for i, asociado in enumerate(asociados)
+    ])
+    db.commit()
+    return asociados
+
+
+def test_resolver_campos():
+    disponibles = {"id": None, "nombres": None, "estado": None}
+
+    assert resolver_campos("resumen", disponibles, ("id", "estado")) == ["id", "estado"]
+    assert resolver_campos(" estado, nombres ,estado", disponibles, ()) == ["id", "estado", "nombres"]
+    with pytest.raises(ValueError, match="clave"):
+        resolver_campos("nombres,clave", disponibles, ())
+    with pytest.raises(ValueError):
+        resolver_campos(" , ", disponibles, ())
+
+
+def test_listar_asociados_proyectado(db: Session, datos_listados):
+    campos = ["id", "nombres", "fecha_ingreso", "ciudad"]
+    filas, total = asociados_service.listar_asociados(db, limit=2, campos=campos)
+
+    assert filas_a_diccionarios(filas, campos) == [
+        {"id": datos_listados[4].id, "nombres": "Nombre4", "fecha_ingreso": "2024-01-05", "ciudad": "Honda"},
+        {"id": datos_listados[3].id, "nombres": "Nombre3", "fecha_ingreso": "2024-01-04", "ciudad": "Honda"},
+    ]
+    assert total == 5
+
+
+def test_proyeccion_solo_selecciona_los_campos_pedidos(db: Session, datos_listados):
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", registrar)
+    try:
+        asociados_service.listar_asociados(db, campos=["id", "nombres"])
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", registrar)
+
+    listado = sentencias[-1]
+    assert "nombres" in listado
+    assert "correo_electronico" not in listado
+    assert "datos_personales" not in listado
+
+
+def test_endpoint_asociados_resumen_por_cursor(client, db: Session, datos_listados, auth_headers_admin):
+    response = client.get(
+        "/api/v1/asociados/?campos=resumen&paginacion=cursor&limit=3&orden=asc", headers=auth_headers_admin
+    )
+    assert response.status_code == 200
+    cuerpo = response.json()
+    assert list(cuerpo["datos"][0]) == list(asociados_service.CAMPOS_RESUMEN)
+    assert [a["numero_documento"] for a in cuerpo["datos"]] == ["7000", "7001", "7002"]
+
+    response = client.get(
+        f"/api/v1/asociados/?campos=resumen&orden=asc&limit=3&cursor={cuerpo['paginacion']['siguiente_cursor']}",
+        headers=auth_headers_admin
+    )
+    assert [a["numero_documento"] for a in response.json()["datos"]] == ["7003", "7004"]
+    assert response.json()["paginacion"]["siguiente_cursor"] is None
+
+
+def test_endpoint_asociados_campo_invalido(client, db: Session, auth_headers_admin):
+    response = client.get("/api/v1/asociados/?campos=nombres,datos_personales", headers=auth_headers_admin)
+
+    assert response.status_code == 400
+    assert "datos_personales" in response.json()["detail"]
+
+
+def test_endpoint_creditos_resumen(client, db: Session, datos_listados, auth_headers_admin):
+    response = client.get("/api/v1/creditos/?campos=resumen&limit=2", headers=auth_headers_admin)
+    assert response.status_code == 200
+    cuerpo = response.json()
+
+    assert cuerpo["total"] == 5
+    assert cuerpo["creditos"][0]["numero_credito"] == "CR-P4"
+    assert cuerpo["creditos"][0]["asociado_nombres"] == "Nombre4"
+    assert cuerpo["creditos"][0]["saldo_capital"] == 500000.5
+    assert cuerpo["creditos"][0]["fecha_solicitud"] == "2024-02-05"
+
+    # Sin `campos` la respuesta completa no cambia
+    completo = client.get("/api/v1/creditos/?limit=2", headers=auth_headers_admin).json()
+    assert completo["creditos"][0]["asociado"]["nombres"] == "Nombre4"
+
+
+def test_endpoint_creditos_campos_por_cursor(client, db: Session, datos_listados, auth_headers_admin):
+    response = client.get(
+        "/api/v1/creditos/?campos=numero_credito&paginacion=cursor&limit=4", headers=auth_headers_admin
+    )
+    cuerpo = response.json()
+    assert cuerpo["creditos"][0] == {"id": cuerpo["creditos"][0]["id"], "numero_credito": "CR-P4"}
+
+    response = client.get(
+        f"/api/v1/creditos/?campos=numero_credito&limit=4&cursor={cuerpo['siguiente_cursor']}",
+        headers=auth_headers_admin
+    )
+    assert [c["numero_credito"] for c in response.json()["creditos"]] == ["CR-P0"]
+
+
+def test_endpoint_ahorros_campos(client, db: Session, datos_listados, auth_headers_admin):
+    response = client.get(
+        "/api/v1/ahorros/?campos=numero_cuenta,saldo_disponible&limit=1", headers=auth_headers_admin
+    )
+    assert response.status_code == 200
+    cuenta = response.json()["cuentas"][0]
+    assert set(cuenta) == {"id", "numero_cuenta", "saldo_disponible"}
+    assert (cuenta["numero_cuenta"], cuenta["saldo_disponible"]) == ("AH-P4", 1500.25)
+
+    response = client.get("/api/v1/ahorros/?campos=abierta_por", headers=auth_headers_admin)
+    assert response.status_code == 400
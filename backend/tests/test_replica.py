@@ -0,0 +1,96 @@
+"""
+Tests para el enrutamiento de reportes y estadísticas a la réplica de lectura.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import Base, crear_motor, crear_sesiones_lectura, get_db_readonly
+from app.main import app
+from app.models.asociado import Asociado
+from app.models.trabajo_reporte import EstadoTrabajoReporte
+from app.services.trabajos_reporte import TrabajoReporteService
+from tests.conftest import engine
+
+
+def nuevo_asociado(documento: str) -> Asociado:
+    return Asociado(
+        numero_documento=documento,
+        tipo_documento="CC",
+        nombres="Réplica",
+        apellidos="Solo Lectura",
+        correo_electronico=f"{documento}@test.com",
+        estado="activo",
+        fecha_ingreso=date.today()
+    )
+
+
+@pytest.fixture
+def replica(db: Session, tmp_path):
+    """Segunda base SQLite con un asociado que no está en la principal de prueba."""
+    motor = crear_motor(f"sqlite:///{tmp_path}/replica.db")
+    Base.metadata.create_all(bind=motor)
+    with Session(motor) as sesion:
+        sesion.add(nuevo_asociado("7777777"))
+        sesion.commit()
+    fabrica = crear_sesiones_lectura(f"sqlite:///{tmp_path}/replica.db", engine)
+    yield fabrica
+    fabrica.kw["bind"].dispose()
+    motor.dispose()
+
+
+def test_sin_replica_se_lee_de_la_principal(db: Session, asociado_test):
+    fabrica = crear_sesiones_lectura("", engine)
+    assert fabrica.kw["bind"] is engine
+
+    with fabrica() as sesion:
+        assert sesion.query(Asociado).count() == 1
+
+        asociado = sesion.get(Asociado, asociado_test.id)
+        asociado.nombres = "Cambiado"
+        with pytest.raises(RuntimeError):
+            sesion.commit()
+        sesion.rollback()
+
+        with pytest.raises(RuntimeError):
+            sesion.execute(update(Asociado).values(nombres="Cambiado"))
+
+
+def test_estadisticas_y_reportes_leen_de_la_replica(client, db: Session, replica, auth_headers_admin):
+    def sesion_replica():
+        with replica() as sesion:
+            yield sesion
+
+    app.dependency_overrides[get_db_readonly] = sesion_replica
+
+    # La autenticación y los listados siguen en la principal
+    response = client.get("/api/v1/asociados/", headers=auth_headers_admin)
+    assert response.status_code == 200
+    assert response.json()["datos"] == []
+
+    response = client.get("/api/v1/asociados/estadisticas", headers=auth_headers_admin)
+    assert response.status_code == 200
+    assert response.json()["total_asociados"] == 1
+
+    response = client.get("/api/v1/reportes/estado-cuenta/7777777", headers=auth_headers_admin)
+    assert response.status_code == 200
+    assert response.json()["numero_documento"] == "7777777"
+
+    response = client.get("/api/v1/dashboard/kpis", headers=auth_headers_admin)
+    assert response.status_code == 200
+
+
+def test_trabajo_de_reporte_se_genera_en_la_replica(db: Session, admin_user, replica, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "reportes_dir", str(tmp_path))
+    trabajo = TrabajoReporteService.crear_trabajo(
+        db, "certificado_paz_salvo", {"numero_documento": "7777777"}, admin_user.id
+    )
+
+    with replica() as db_lectura:
+        trabajo = TrabajoReporteService.ejecutar(db, trabajo.id, db_lectura=db_lectura)
+
+    assert trabajo.estado == EstadoTrabajoReporte.COMPLETADO.value
+    assert (tmp_path / trabajo.ruta_archivo.rsplit("/", 1)[1]).exists()
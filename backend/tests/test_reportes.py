@@ -0,0 +1,372 @@
+"""
+Tests para el módulo de reportes.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from sqlalchemy.orm import Session
+
+from app.models.contabilidad import CuentaContable
+from app.schemas.contabilidad import AsientoContableCrear, MovimientoContableCrear
+from app.services import exportaciones, reportes
+from app.services.contabilidad import ContabilidadService
+
+
+def _cuenta(db: Session, codigo: str) -> CuentaContable:
+    return db.query(CuentaContable).filter(CuentaContable.codigo == codigo).first()
+
+
+def _registrar_asiento(db: Session, usuario_id: int, fecha: date, debito_id: int, credito_id: int, valor: str):
+    """Registrar un asiento simple de dos movimientos."""
+    return ContabilidadService.crear_asiento(
+        db,
+        AsientoContableCrear(
+            fecha=fecha,
+            tipo_movimiento="ajuste",
+            concepto="Asiento de prueba",
+            movimientos=[
+                MovimientoContableCrear(cuenta_id=debito_id, debito=Decimal(valor), credito=Decimal("0")),
+                MovimientoContableCrear(cuenta_id=credito_id, debito=Decimal("0"), credito=Decimal(valor)),
+            ]
+        ),
+        usuario_id
+    )
+
+
+# ============================================================================
+# BALANCE GENERAL
+# ============================================================================
+
+def test_balance_general_saldos_y_grupos(db: Session, init_cuentas_contables, admin_user):
+    """El balance trae un grupo por sección, también si está vacía, y cuadra."""
+    bancos = _cuenta(db, "1110")
+    caja = _cuenta(db, "1105")
+    clientes = _cuenta(db, "1305")
+    aportes = _cuenta(db, "3105")
+    hoy = date.today()
+
+    _registrar_asiento(db, admin_user.id, hoy, bancos.id, aportes.id, "1000000")
+    _registrar_asiento(db, admin_user.id, hoy, caja.id, aportes.id, "200000")
+    _registrar_asiento(db, admin_user.id, hoy, clientes.id, bancos.id, "300000")
+
+    balance = reportes.generar_balance_general(db, hoy)
+
+    assert balance.total_activos == Decimal("1200000")
+    assert balance.total_patrimonio == Decimal("1200000")
+    assert balance.total_pasivos == Decimal("0")
+    assert balance.cuadrado is True
+
+    (activos,) = balance.activos
+    assert (activos.nombre, activos.total) == ("Activos", Decimal("1200000"))
+    assert {c.codigo: c.saldo for c in activos.cuentas} == {
+        "1105": Decimal("200000"),
+        "1110": Decimal("700000"),
+        "1305": Decimal("300000"),
+    }
+    assert [(g.nombre, g.total, g.cuentas) for g in balance.pasivos] == [("Pasivos", Decimal("0"), [])]
+    assert [(g.nombre, g.total) for g in balance.patrimonio] == [("Patrimonio", Decimal("1200000"))]
+
+
+def test_balance_general_respeta_fecha_corte_y_anulados(db: Session, init_cuentas_contables, admin_user):
+    """Movimientos posteriores al corte o anulados no afectan el balance."""
+    bancos = _cuenta(db, "1110")
+    aportes = _cuenta(db, "3105")
+    hoy = date.today()
+
+    _registrar_asiento(db, admin_user.id, hoy - timedelta(days=10), bancos.id, aportes.id, "500000")
+    _registrar_asiento(db, admin_user.id, hoy, bancos.id, aportes.id, "250000")
+    anulado = _registrar_asiento(db, admin_user.id, hoy - timedelta(days=5), bancos.id, aportes.id, "999999")
+    ContabilidadService.anular_asiento(db, anulado, "Error de digitación", admin_user.id)
+
+    balance = reportes.generar_balance_general(db, hoy - timedelta(days=1))
+
+    assert balance.total_activos == Decimal("500000")
+    assert balance.total_patrimonio == Decimal("500000")
+
+
+def test_balance_general_consultas_constantes(db: Session, init_cuentas_contables, admin_user, contador_consultas):
+    """El número de consultas no crece con el número de cuentas."""
+    disponible = _cuenta(db, "11")
+    aportes = _cuenta(db, "3105")
+    hoy = date.today()
+
+    def agregar_cuentas(cantidad: int, inicio: int):
+        for i in range(inicio, inicio + cantidad):
+            cuenta = CuentaContable(
+                codigo=f"11{i:04d}",
+                nombre=f"Banco {i}",
+                tipo="activo",
+                naturaleza="debito",
+                cuenta_padre_id=disponible.id,
+                nivel=4,
+                es_auxiliar=True
+            )
+            db.add(cuenta)
+            db.flush()
+            _registrar_asiento(db, admin_user.id, hoy, cuenta.id, aportes.id, "1000")
+
+    agregar_cuentas(5, 0)
+    with contador_consultas() as pocas:
+        balance_pequeno = reportes.generar_balance_general(db, hoy)
+
+    agregar_cuentas(50, 5)
+    with contador_consultas() as muchas:
+        balance_grande = reportes.generar_balance_general(db, hoy)
+
+    assert balance_pequeno.total_activos == Decimal("5000")
+    assert balance_grande.total_activos == Decimal("55000")
+    assert muchas["total"] == pocas["total"]
+    assert muchas["total"] <= 3
+
+
+# ============================================================================
+# ESTADO DE RESULTADOS COMPARATIVO
+# ============================================================================
+
+def _registrar_resultados(db: Session, usuario_id: int):
+    """Registrar ingresos y gastos en tres meses distintos de 2024."""
+    bancos = _cuenta(db, "1110")
+    intereses = _cuenta(db, "4135")
+    personal = _cuenta(db, "5105")
+    servicios = _cuenta(db, "5120")
+
+    _registrar_asiento(db, usuario_id, date(2024, 1, 10), bancos.id, intereses.id, "100000")
+    _registrar_asiento(db, usuario_id, date(2024, 1, 20), personal.id, bancos.id, "30000")
+    _registrar_asiento(db, usuario_id, date(2024, 2, 15), bancos.id, intereses.id, "80000")
+    _registrar_asiento(db, usuario_id, date(2024, 3, 5), servicios.id, bancos.id, "10000")
+    _registrar_asiento(db, usuario_id, date(2024, 3, 28), bancos.id, intereses.id, "50000")
+
+
+def test_estado_resultados_comparativo_mensual(db: Session, init_cuentas_contables, admin_user):
+    """Cada período coincide con el estado de resultados simple del mismo rango."""
+    _registrar_resultados(db, admin_user.id)
+
+    comparativo = reportes.generar_estado_resultados_comparativo(
+        db, date(2024, 1, 1), date(2024, 3, 31), "mensual"
+    )
+
+    assert [(p.fecha_inicio, p.fecha_fin) for p in comparativo.periodos] == [
+        (date(2024, 1, 1), date(2024, 1, 31)),
+        (date(2024, 2, 1), date(2024, 2, 29)),
+        (date(2024, 3, 1), date(2024, 3, 31)),
+    ]
+    for periodo in comparativo.periodos:
+        simple = reportes.generar_estado_resultados(db, periodo.fecha_inicio, periodo.fecha_fin)
+        assert periodo.total_ingresos == simple.total_ingresos
+        assert periodo.total_gastos == simple.total_gastos
+        assert periodo.utilidad_neta == simple.utilidad_neta
+
+    ingresos = {c.codigo: c for c in comparativo.ingresos}
+    assert ingresos["4135"].valores == [Decimal("100000"), Decimal("80000"), Decimal("50000")]
+    assert ingresos["4135"].total == Decimal("230000")
+    assert {c.codigo for c in comparativo.gastos} == {"5105", "5120"}
+
+
+def test_estado_resultados_comparativo_periodos_parciales(db: Session, init_cuentas_contables, admin_user):
+    """Los períodos extremos se recortan al rango pedido."""
+    _registrar_resultados(db, admin_user.id)
+
+    comparativo = reportes.generar_estado_resultados_comparativo(
+        db, date(2024, 1, 15), date(2024, 3, 10), "trimestral"
+    )
+
+    assert len(comparativo.periodos) == 1
+    periodo = comparativo.periodos[0]
+    assert (periodo.fecha_inicio, periodo.fecha_fin) == (date(2024, 1, 15), date(2024, 3, 10))
+    assert periodo.total_ingresos == Decimal("80000")
+    assert periodo.total_gastos == Decimal("40000")
+
+
+def test_estado_resultados_comparativo_consultas_constantes(
+    db: Session, init_cuentas_contables, admin_user, contador_consultas
+):
+    """El número de consultas no depende del número de períodos."""
+    _registrar_resultados(db, admin_user.id)
+
+    with contador_consultas() as un_periodo:
+        reportes.generar_estado_resultados_comparativo(db, date(2024, 1, 1), date(2024, 12, 31), "anual")
+    with contador_consultas() as doce_periodos:
+        reportes.generar_estado_resultados_comparativo(db, date(2024, 1, 1), date(2024, 12, 31), "mensual")
+
+    assert un_periodo["total"] == doce_periodos["total"] == 2
+
+
+def test_estado_resultados_comparativo_endpoint(client, db: Session, auth_headers_admin, init_cuentas_contables):
+    """El endpoint valida la agrupación y retorna un período por año."""
+    response = client.get(
+        "/api/v1/reportes/estado-resultados/comparativo",
+        params={"fecha_inicio": "2023-01-01", "fecha_fin": "2024-12-31", "agrupacion": "anual"},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == 200
+    assert len(response.json()["periodos"]) == 2
+
+    response = client.get(
+        "/api/v1/reportes/estado-resultados/comparativo",
+        params={"fecha_inicio": "2023-01-01", "fecha_fin": "2024-12-31", "agrupacion": "semanal"},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == 400
+
+
+# ============================================================================
+# EXPORTACIONES A EXCEL
+# ============================================================================
+
+def _crear_creditos_cartera(db: Session, asociado_id: int):
+    """Crear un crédito al día y dos en mora para las exportaciones."""
+    from app.models.credito import Credito, EstadoCredito, TipoCredito
+
+    datos = [
+        ("CR-001", EstadoCredito.AL_DIA, "1000000", "0", 0),
+        ("CR-002", EstadoCredito.MORA, "2000000", "15000", 20),
+        ("CR-003", EstadoCredito.MORA, "3000000", "90000", 75),
+    ]
+    for numero, estado, saldo, saldo_mora, dias in datos:
+        db.add(Credito(
+            numero_credito=numero,
+            asociado_id=asociado_id,
+            tipo_credito=TipoCredito.CONSUMO,
+            monto_solicitado=Decimal(saldo),
+            monto_desembolsado=Decimal(saldo),
+            tasa_interes=Decimal("1.5"),
+            plazo_meses=12,
+            destino="Prueba",
+            estado=estado,
+            saldo_capital=Decimal(saldo),
+            saldo_mora=Decimal(saldo_mora),
+            dias_mora=dias
+        ))
+    db.commit()
+
+
+def _leer_hoja(archivo):
+    from openpyxl import load_workbook
+
+    datos = b"".join(reportes.iterar_archivo(archivo, tamano_bloque=1024))
+    assert archivo.closed
+    return load_workbook(BytesIO(datos)).active
+
+
+def test_exportar_cartera_excel_por_lotes(db: Session, asociado_test, monkeypatch):
+    """La cartera se escribe completa aunque el cursor lea en lotes pequeños."""
+    _crear_creditos_cartera(db, asociado_test.id)
+    monkeypatch.setattr(reportes, "FILAS_POR_LOTE_EXPORTACION", 2)
+
+    ws = _leer_hoja(reportes.exportar_cartera_excel(db, date.today()))
+
+    assert [str(rango) for rango in ws.merged_cells.ranges] == ["A1:H1"]
+    assert ws["A1"].alignment.horizontal == "center"
+    assert ws["B4"].value == 3
+    assert ws["B5"].value == 6000000
+    assert ws["B7"].value == 5000000
+    filas = list(ws.iter_rows(min_row=12, values_only=True))
+    assert [fila[0] for fila in filas] == ["CR-001", "CR-002", "CR-003"]
+    assert filas[0][1] == "Juan Carlos Pérez Gómez"
+    assert filas[1][2] == "consumo"
+    assert filas[2][6] == "mora"
+
+
+def test_exportar_mora_excel_filtra_por_dias(db: Session, asociado_test):
+    """Solo se exportan los créditos en mora con los días mínimos."""
+    _crear_creditos_cartera(db, asociado_test.id)
+
+    ws = _leer_hoja(reportes.exportar_mora_excel(db, dias_mora_minimo=30))
+
+    assert [str(rango) for rango in ws.merged_cells.ranges] == ["A1:I1"]
+    assert ws["A1"].alignment.horizontal == "center"
+    assert ws["B3"].value == 1
+    assert ws["B4"].value == 90000
+    filas = list(ws.iter_rows(min_row=9, values_only=True))
+    assert len(filas) == 1
+    assert filas[0][0] == "CR-003"
+    assert filas[0][8] == "61-90"
+
+
+def test_exportar_cartera_excel_endpoint(client, db: Session, auth_headers_admin, asociado_test):
+    _crear_creditos_cartera(db, asociado_test.id)
+
+    response = client.get("/api/v1/reportes/cartera/export/excel", headers=auth_headers_admin)
+
+    assert response.status_code == 200
+    assert response.content[:2] == b"PK"
+
+
+# ============================================================================
+# EXPORTACIÓN TABULAR (CSV / PARQUET)
+# ============================================================================
+
+def test_exportar_cartera_csv(db: Session, asociado_test, monkeypatch):
+    """El CSV se emite por bloques y conserva una fila por crédito."""
+    import csv
+
+    _crear_creditos_cartera(db, asociado_test.id)
+    monkeypatch.setattr(reportes, "FILAS_POR_LOTE_EXPORTACION", 2)
+
+    bloques = list(exportaciones.exportar_reporte(exportaciones.tabla_cartera(db), "csv"))
+    assert len(bloques) == 2
+
+    filas = list(csv.DictReader(b"".join(bloques).decode("utf-8").splitlines()))
+    assert [fila["numero_credito"] for fila in filas] == ["CR-001", "CR-002", "CR-003"]
+    assert filas[1]["estado"] == "mora"
+    assert filas[1]["tipo_credito"] == "consumo"
+    assert Decimal(filas[2]["saldo_capital"]) == Decimal("3000000")
+
+
+def test_exportar_mora_parquet(db: Session, asociado_test):
+    """El Parquet conserva tipos de columna y valores decimales exactos."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _crear_creditos_cartera(db, asociado_test.id)
+
+    datos = b"".join(exportaciones.exportar_reporte(exportaciones.tabla_mora(db, 1), "parquet"))
+    tabla = pq.read_table(pa.BufferReader(datos))
+
+    assert tabla.num_rows == 2
+    assert tabla.schema.field("saldo_mora").type == pa.decimal128(18, 2)
+    assert tabla.column("numero_credito").to_pylist() == ["CR-002", "CR-003"]
+    assert tabla.column("saldo_mora").to_pylist() == [Decimal("15000.00"), Decimal("90000.00")]
+    assert tabla.column("rango_mora").to_pylist() == ["1-30", "61-90"]
+
+
+def test_exportar_balance_csv_por_cuenta(db: Session, init_cuentas_contables, admin_user):
+    """El balance tabular trae una fila por cuenta con saldo y su grupo."""
+    import csv
+
+    bancos = _cuenta(db, "1110")
+    aportes = _cuenta(db, "3105")
+    hoy = date.today()
+    _registrar_asiento(db, admin_user.id, hoy, bancos.id, aportes.id, "1000000")
+
+    datos = b"".join(exportaciones.exportar_reporte(exportaciones.tabla_balance_general(db, hoy), "csv"))
+    filas = {fila["codigo"]: fila for fila in csv.DictReader(datos.decode("utf-8").splitlines())}
+
+    assert set(filas) == {"1110", "3105"}
+    assert filas["1110"]["grupo_nombre"] == "DISPONIBLE"
+    assert Decimal(filas["3105"]["saldo"]) == Decimal("1000000")
+
+
+def test_exportar_tabular_endpoints(client, db: Session, auth_headers_admin, asociado_test):
+    _crear_creditos_cartera(db, asociado_test.id)
+    numero_documento = asociado_test.numero_documento
+
+    response = client.get("/api/v1/reportes/mora/export/csv", headers=auth_headers_admin)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines()[0].startswith("numero_credito,asociado_id")
+    assert len(response.text.splitlines()) == 3
+
+    response = client.get(
+        f"/api/v1/reportes/estado-cuenta/{numero_documento}/export/parquet",
+        headers=auth_headers_admin
+    )
+    assert response.status_code == 200
+    assert response.content[:4] == b"PAR1"
+
+    response = client.get("/api/v1/reportes/mora/export/xml", headers=auth_headers_admin)
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/reportes/estado-cuenta/000/export/csv", headers=auth_headers_admin)
+    assert response.status_code == 404
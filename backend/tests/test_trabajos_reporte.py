@@ -0,0 +1,158 @@
+"""
+Tests para la cola de trabajos de reportes en segundo plano.
+"""
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.trabajo_reporte import EstadoTrabajoReporte
+from app.services.trabajos_reporte import TIEMPO_MAXIMO_TRABAJO, TrabajoReporteService
+
+
+@pytest.fixture
+def directorio_reportes(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "reportes_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_crear_trabajo_normaliza_parametros(db: Session, admin_user):
+    """Los parámetros se validan y se completan los valores por defecto."""
+    trabajo = TrabajoReporteService.crear_trabajo(
+        db, "estado_cuenta_pdf", {"numero_documento": 123, "fecha_inicio": "2024-01-01"}, admin_user.id
+    )
+
+    assert trabajo.estado == EstadoTrabajoReporte.PENDIENTE.value
+    assert trabajo.parametros == {
+        "numero_documento": "123",
+        "fecha_inicio": "2024-01-01",
+        "fecha_fin": date.today().isoformat(),
+    }
+
+
+@pytest.mark.parametrize("tipo, parametros", [
+    ("reporte_inexistente", {}),
+    ("balance_pdf", {}),
+    ("balance_pdf", {"fecha_corte": "31/12/2024"}),
+    ("balance_pdf", {"fecha_corte": "2024-12-31", "formato": "pdf"}),
+    ("certificados_masivos", {"tipo": "renta"}),
+])
+def test_crear_trabajo_parametros_invalidos(db: Session, admin_user, tipo, parametros):
+    with pytest.raises(ValueError):
+        TrabajoReporteService.crear_trabajo(db, tipo, parametros, admin_user.id)
+
+
+def test_reclamar_siguiente_en_orden(db: Session, admin_user):
+    """Los trabajos se reclaman del más antiguo al más reciente, una sola vez."""
+    primero = TrabajoReporteService.crear_trabajo(db, "mora_excel", {}, admin_user.id)
+    segundo = TrabajoReporteService.crear_trabajo(db, "mora_excel", {}, admin_user.id)
+
+    assert TrabajoReporteService.reclamar_siguiente(db) == primero.id
+    assert TrabajoReporteService.reclamar_siguiente(db) == segundo.id
+    assert TrabajoReporteService.reclamar_siguiente(db) is None
+
+    db.refresh(primero)
+    assert primero.estado == EstadoTrabajoReporte.EN_PROCESO.value
+    assert primero.iniciado_at is not None
+
+
+def test_ejecutar_trabajo_guarda_archivo(db: Session, admin_user, init_cuentas_contables, directorio_reportes):
+    trabajo = TrabajoReporteService.crear_trabajo(
+        db, "balance_pdf", {"fecha_corte": "2024-12-31"}, admin_user.id
+    )
+
+    trabajo = TrabajoReporteService.ejecutar(db, trabajo.id)
+
+    assert trabajo.estado == EstadoTrabajoReporte.COMPLETADO.value
+    assert os.path.dirname(trabajo.ruta_archivo) == str(directorio_reportes)
+    with open(trabajo.ruta_archivo, "rb") as archivo:
+        assert archivo.read(4) == b"%PDF"
+    assert trabajo.tamano_bytes == os.path.getsize(trabajo.ruta_archivo)
+    assert trabajo.expira_at == trabajo.finalizado_at + timedelta(hours=settings.reportes_ttl_horas)
+
+
+def test_ejecutar_trabajo_con_error(db: Session, admin_user, directorio_reportes):
+    """Un error del reporte queda registrado en el trabajo."""
+    trabajo = TrabajoReporteService.crear_trabajo(
+        db, "certificado_paz_salvo", {"numero_documento": "000"}, admin_user.id
+    )
+
+    trabajo = TrabajoReporteService.ejecutar(db, trabajo.id)
+
+    assert trabajo.estado == EstadoTrabajoReporte.ERROR.value
+    assert "no encontrado" in trabajo.mensaje_error
+    assert list(directorio_reportes.iterdir()) == []
+
+
+def test_limpiar_expirados_y_liberar_abandonados(db: Session, admin_user, init_cuentas_contables, directorio_reportes):
+    completado = TrabajoReporteService.crear_trabajo(db, "balance_pdf", {"fecha_corte": "2024-12-31"}, admin_user.id)
+    completado = TrabajoReporteService.ejecutar(db, completado.id)
+    ruta = completado.ruta_archivo
+
+    abandonado = TrabajoReporteService.crear_trabajo(db, "mora_excel", {}, admin_user.id)
+    TrabajoReporteService.reclamar_siguiente(db)
+
+    # Antes del vencimiento no se toca nada
+    assert TrabajoReporteService.limpiar_expirados(db) == 0
+    assert TrabajoReporteService.liberar_abandonados(db) == 0
+
+    despues = datetime.utcnow() + timedelta(hours=settings.reportes_ttl_horas) + TIEMPO_MAXIMO_TRABAJO
+    assert TrabajoReporteService.limpiar_expirados(db, despues) == 1
+    assert TrabajoReporteService.liberar_abandonados(db, despues) == 1
+
+    db.refresh(completado)
+    db.refresh(abandonado)
+    assert completado.estado == EstadoTrabajoReporte.EXPIRADO.value
+    assert not os.path.exists(ruta)
+    assert abandonado.estado == EstadoTrabajoReporte.PENDIENTE.value
+
+
+def test_endpoints_trabajos(client, db: Session, auth_headers_admin, init_cuentas_contables, directorio_reportes):
+    response = client.post(
+        "/api/v1/reportes/trabajos",
+        json={"tipo": "balance_pdf", "parametros": {"fecha_corte": "2024-12-31"}},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == 202
+    trabajo_id = response.json()["id"]
+    assert response.json()["estado"] == "pendiente"
+
+    response = client.get(f"/api/v1/reportes/trabajos/{trabajo_id}/descarga", headers=auth_headers_admin)
+    assert response.status_code == 409
+
+    # Lo que haría un worker de la cola
+    assert TrabajoReporteService.reclamar_siguiente(db) == trabajo_id
+    TrabajoReporteService.ejecutar(db, trabajo_id)
+
+    response = client.get(f"/api/v1/reportes/trabajos/{trabajo_id}", headers=auth_headers_admin)
+    assert response.status_code == 200
+    assert response.json()["estado"] == "completado"
+
+    response = client.get(f"/api/v1/reportes/trabajos/{trabajo_id}/descarga", headers=auth_headers_admin)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content[:4] == b"%PDF"
+
+    # Vencido pero aún no limpiado: el archivo sigue en disco y no se entrega
+    trabajo = TrabajoReporteService.obtener_trabajo(db, trabajo_id)
+    trabajo.expira_at = datetime.utcnow() - timedelta(minutes=1)
+    db.commit()
+    response = client.get(f"/api/v1/reportes/trabajos/{trabajo_id}/descarga", headers=auth_headers_admin)
+    assert response.status_code == 410
+    assert os.path.exists(trabajo.ruta_archivo)
+
+    response = client.post(
+        "/api/v1/reportes/trabajos",
+        json={"tipo": "balance_pdf", "parametros": {}},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == 400
+
+
+def test_trabajo_de_otro_usuario_no_visible(client, db: Session, admin_user, auth_headers_analista):
+    trabajo = TrabajoReporteService.crear_trabajo(db, "mora_excel", {}, admin_user.id)
+
+    response = client.get(f"/api/v1/reportes/trabajos/{trabajo.id}", headers=auth_headers_analista)
+    assert response.status_code == 404